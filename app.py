@@ -1,36 +1,60 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
-from utils.database import create_redshift_engine
+from utils.database import create_redshift_engine, stream_query
 import matplotlib.dates as mdates
 from typing import Optional
 from utils.config import REDSHIFT_SCHEMA
+from silver.price_store import PriceStore, price_store_exists
 
 
 def plot_stock_data(engine: Engine) -> None:
     """
-    Retrieve stock data from a Redshift database
-    and plot selected stock variables over time.
+    Retrieve the stock data of the selected symbol from the local price
+    store, or from a Redshift database if the store was not built, and plot
+    selected stock variables over time.
 
     Args:
         engine (Engine): SQLAlchemy engine object to interact
         with the Redshift database.
     """
-    # Query to retrieve stock data
-    with engine.begin() as connection:
-        query = f"""
-            SELECT
-                date,
-                symbol,
-                open_price,
-                high_price,
-                low_price,
-                close_price,
-                volume
-            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
-        """
-        df: pd.DataFrame = pd.read_sql_query(query, connection)
+    # Read the history of the selected symbol from the local price store,
+    # or from the warehouse if the store was not built; only the rows of the
+    # selected symbol are read, never the whole table
+    store: Optional[PriceStore] = PriceStore() if price_store_exists() else None
+    if store is not None:
+        selected_symbol = st.sidebar.selectbox('Select a symbol', store.symbols())
+        df: pd.DataFrame = store.to_frame(selected_symbol)
+    else:
+        with engine.connect() as connection:
+            symbols = pd.read_sql_query(
+                f"""
+                SELECT DISTINCT symbol
+                FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+                ORDER BY symbol
+                """,
+                connection,
+            )['symbol']
+            selected_symbol = st.sidebar.selectbox('Select a symbol', symbols)
+
+            # Query to retrieve stock data, streamed in chunks
+            query = text(f"""
+                SELECT
+                    date,
+                    symbol,
+                    open_price,
+                    high_price,
+                    low_price,
+                    close_price,
+                    volume
+                FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+                WHERE symbol = :symbol
+                ORDER BY date
+            """)
+            chunks = list(stream_query(connection, query, {'symbol': selected_symbol}))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
 
     # Handle the case where no data is available
     if df.empty:
@@ -44,15 +68,12 @@ def plot_stock_data(engine: Engine) -> None:
             'close_price': [0.0],
             'volume': [0]
         })
+        selected_symbol = 'N/A'
 
     # Display the loaded data in Streamlit
     st.write("Loaded data:")
     st.write(df.tail())
 
-    # Allow user to select a stock symbol from the available options
-    symbols = df['symbol'].unique()
-    selected_symbol: Optional[str] = st.sidebar.selectbox('Select a symbol', symbols)
-
     # Filter data for the selected symbol
     filtered_df = df[df['symbol'] == selected_symbol].copy()
     filtered_df['date'] = pd.to_datetime(filtered_df['date'])
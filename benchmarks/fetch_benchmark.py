@@ -0,0 +1,120 @@
+"""
+Benchmark of the synchronous and asynchronous bronze fetch paths against a
+local mock of the Alpha Vantage and Finnhub APIs.
+
+Usage:
+    python benchmarks/fetch_benchmark.py --symbols 200 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Callable, List
+from aiohttp import web
+
+BENCHMARK_DATE: str = "2024-09-10"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _mock_app(latency: float) -> web.Application:
+    """
+    Build an application answering like the Alpha Vantage TIME_SERIES_DAILY
+    and the Finnhub profile2 endpoints after `latency` seconds.
+    """
+
+    async def alpha_vantage(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "Time Series (Daily)": {
+                BENCHMARK_DATE: {
+                    "1. open": "150.00",
+                    "2. high": "155.00",
+                    "3. low": "148.00",
+                    "4. close": "152.00",
+                    "5. volume": "1200000",
+                }
+            }
+        })
+
+    async def finnhub(request: web.Request) -> web.Response:
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "ticker": request.query["symbol"],
+            "name": "Mock Inc",
+            "finnhubIndustry": "Technology",
+            "exchange": "NASDAQ NMS - GLOBAL MARKET",
+            "logo": "",
+            "weburl": "",
+        })
+
+    app = web.Application()
+    app.router.add_get("/query", alpha_vantage)
+    app.router.add_get("/api/v1/stock/profile2", finnhub)
+    return app
+
+
+def _serve(app: web.Application, port: int) -> None:
+    """
+    Run the mock server forever in the current thread.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+    loop.run_forever()
+
+
+def _time(fetch: Callable[[], List], label: str) -> None:
+    start = time.perf_counter()
+    records = fetch()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<6} {len(records):>6} records in {elapsed:8.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    port = _free_port()
+    threading.Thread(
+        target=_serve, args=(_mock_app(args.latency), port), daemon=True
+    ).start()
+
+    # Point the downloaders at the mock server before importing them
+    os.environ["ALPHA_VANTAGE_URL"] = f"http://127.0.0.1:{port}/query"
+    os.environ["FINNHUB_URL"] = f"http://127.0.0.1:{port}/api/v1"
+    os.environ["FETCH_CONCURRENCY"] = str(args.concurrency)
+    os.environ["ALPHA_VANTAGE_REQUESTS_PER_MINUTE"] = "1000000"
+    os.environ["FINNHUB_REQUESTS_PER_MINUTE"] = "1000000"
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from bronze import api_data_downloader, async_api_data_downloader
+
+    time.sleep(0.5)  # Let the mock server start
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    for label, downloader in (
+        ("sync", api_data_downloader),
+        ("async", async_api_data_downloader),
+    ):
+        _time(
+            lambda: downloader.fetch_daily_stock_prices_records(
+                symbols, BENCHMARK_DATE, "dummy_api_key"
+            ),
+            label,
+        )
+
+
+if __name__ == "__main__":
+    main()
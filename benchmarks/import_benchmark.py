@@ -0,0 +1,60 @@
+"""
+Benchmark of the import time of the DAG file, as paid by the Airflow
+scheduler on every parse, and of each task module, as paid at task start.
+
+Every module is imported in a fresh interpreter so nothing is cached.
+
+Usage:
+    python benchmarks/import_benchmark.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import List
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES: List[str] = [
+    "dags.airflow_dags",
+    "tasks.run_bronze",
+    "tasks.run_validation",
+    "tasks.run_silver",
+    "tasks.run_gold",
+]
+TIMER: str = (
+    "import importlib, sys, time; start = time.perf_counter(); "
+    "importlib.import_module(sys.argv[1]); print(time.perf_counter() - start)"
+)
+
+
+def import_time(module: str) -> float:
+    """
+    Import a module in a fresh interpreter and return the seconds it took.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER, module],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        try:
+            times = [import_time(module) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<24} not importable: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{module:<24} median {statistics.median(times) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
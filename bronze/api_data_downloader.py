@@ -1,26 +1,87 @@
 import pandas as pd
 import requests
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
+from bronze.archive import ResponseArchive
+from utils.config import ALPHA_VANTAGE_URL, FINNHUB_URL
 
+# Column layout of the records produced for each bronze table
+DAILY_STOCK_PRICES_COLUMNS: List[str] = [
+    "date",
+    "stock_symbol",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+]
+INTRADAY_COLUMNS: List[str] = [
+    "timestamp",
+    "symbol",
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+]
+CORPORATE_ACTION_COLUMNS: List[str] = [
+    "symbol",
+    "ex_date",
+    "action_type",
+    "value",
+]
+STOCK_COLUMNS: List[str] = [
+    "symbol",
+    "name",
+    "industry",
+    "exchange",
+    "logo",
+    "weburl",
+]
 
-def create_daily_stock_prices_table(
-    symbol: str, date: str, api_key: str
-) -> pd.DataFrame:
+
+def to_float(value: Any) -> float:
     """
-    Fetches daily stock prices from the Alpha Vantage API.
+    Converts a numeric field of an API payload to float.
+
+    Missing or malformed fields become NaN instead of 0, so the validation
+    stage can tell them apart from real values.
+
+    Args:
+        value (Any): The field value, usually a string.
+
+    Returns:
+        float: The value, or NaN if it is missing or not a number.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def fetch_daily_stock_prices_record(
+    symbol: str,
+    date: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the daily stock price of a symbol from the Alpha Vantage API.
 
     Args:
         symbol (str): The stock symbol for which prices are retrieved.
         date (str): The date for which prices are retrieved, in 'YYYY-MM-DD' format.
         api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
 
     Returns:
-        pd.DataFrame: A DataFrame containing open, high, low, close prices, and volume
-                      for the specified date. Returns an empty DataFrame if data cannot
-                      be retrieved or if no data is available for the given date.
+        Optional[Dict[str, Any]]: A record with the keys of
+                                  DAILY_STOCK_PRICES_COLUMNS, or None if data
+                                  cannot be retrieved or if no data is available
+                                  for the given date.
     """
     url: str = (
-        "https://www.alphavantage.co/query"
+        f"{ALPHA_VANTAGE_URL}"
         "?function=TIME_SERIES_DAILY"
         f"&symbol={symbol}&apikey={api_key}&outputsize=compact"
     )
@@ -32,53 +93,341 @@ def create_daily_stock_prices_table(
 
         if "Information" in data:
             print(f"Alpha Vantage API Error: {data['Information']}")
-            return pd.DataFrame()
+            return None
 
     except requests.exceptions.RequestException as e:
         print(f"Error making request to Alpha Vantage API: {e}")
-        return pd.DataFrame()
+        return None
 
+    if archive is not None:
+        archive.put("alpha_vantage", symbol, data)
+
+    return parse_daily_stock_prices(data, symbol, date)
+
+
+def parse_daily_stock_prices(
+    data: Dict, symbol: str, date: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Builds a daily stock prices record from an Alpha Vantage
+    TIME_SERIES_DAILY payload.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        symbol (str): The stock symbol the payload belongs to.
+        date (str): The date to extract, in 'YYYY-MM-DD' format.
+
+    Returns:
+        Optional[Dict[str, Any]]: The record for the date, or None if the payload
+                                  has no price information for it.
+    """
     daily_prices: Optional[Dict] = data.get("Time Series (Daily)", {})
     if not daily_prices:
         print(f"No price data found for symbol {symbol} on date {date}.")
-        return pd.DataFrame()
+        return None
 
     price_info: Optional[Dict] = daily_prices.get(date, {})
-
-    if price_info:
-        rows = [
-            {
-                "date": date,
-                "stock_symbol": symbol,
-                "open_price": float(price_info.get("1. open", 0)),
-                "high_price": float(price_info.get("2. high", 0)),
-                "low_price": float(price_info.get("3. low", 0)),
-                "close_price": float(price_info.get("4. close", 0)),
-                "volume": float(price_info.get("5. volume", 0)),
-            }
-        ]
-    else:
+    if not price_info:
         print(f"No price information available for {symbol} on date {date}.")
-        return pd.DataFrame()
+        return None
 
-    return pd.DataFrame(rows)
+    return {
+        "date": date,
+        "stock_symbol": symbol,
+        "open_price": to_float(price_info.get("1. open")),
+        "high_price": to_float(price_info.get("2. high")),
+        "low_price": to_float(price_info.get("3. low")),
+        "close_price": to_float(price_info.get("4. close")),
+        "volume": to_float(price_info.get("5. volume")),
+    }
 
 
-def create_stock_table(symbol: str, api_key: str) -> pd.DataFrame:
+def fetch_bulk_quotes_records(
+    symbols: List[str],
+    date: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> List[Dict[str, Any]]:
     """
-    Fetches stock profile information from the Finnhub API.
+    Fetches the latest quotes of several symbols with a single request to the
+    Alpha Vantage REALTIME_BULK_QUOTES endpoint (premium plans only).
+
+    Args:
+        symbols (List[str]): The stock symbols to quote, at most 100.
+        date (str): The trading date the quotes must belong to, in 'YYYY-MM-DD'
+                    format.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the symbols quoted on the date.
+    """
+    url: str = (
+        f"{ALPHA_VANTAGE_URL}"
+        "?function=REALTIME_BULK_QUOTES"
+        f"&symbol={','.join(symbols)}&apikey={api_key}"
+    )
+
+    try:
+        response: requests.Response = requests.get(url)
+        response.raise_for_status()
+        data: Dict = response.json()
+
+        if "Information" in data:
+            print(f"Alpha Vantage API Error: {data['Information']}")
+            return []
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error making request to Alpha Vantage API: {e}")
+        return []
+
+    if archive is not None:
+        archive.put("alpha_vantage_bulk", ",".join(symbols), data)
+
+    return parse_bulk_quotes(data, date)
+
+
+def parse_bulk_quotes(data: Dict, date: str) -> List[Dict[str, Any]]:
+    """
+    Builds daily stock prices records from an Alpha Vantage
+    REALTIME_BULK_QUOTES payload.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        date (str): The trading date to keep, in 'YYYY-MM-DD' format. Quotes
+                    with a timestamp on another date are discarded.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the quotes of the date. Malformed
+        quotes without a symbol are skipped, so their symbols are missing from
+        the records and fetched one by one.
+    """
+    return [
+        {
+            "date": date,
+            "stock_symbol": quote["symbol"],
+            "open_price": to_float(quote.get("open")),
+            "high_price": to_float(quote.get("high")),
+            "low_price": to_float(quote.get("low")),
+            "close_price": to_float(quote.get("close")),
+            "volume": to_float(quote.get("volume")),
+        }
+        for quote in data.get("data", [])
+        if isinstance(quote, dict) and quote.get("symbol")
+        and str(quote.get("timestamp", "")).startswith(date)
+    ]
+
+
+def fetch_intraday_bars(
+    symbol: str,
+    date: str,
+    interval: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the intraday bars of a symbol for a date from the Alpha Vantage
+    TIME_SERIES_INTRADAY endpoint. The whole month of the date is requested,
+    so past dates can be backfilled.
+
+    Args:
+        symbol (str): The stock symbol for which bars are retrieved.
+        date (str): The date for which bars are retrieved, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval: '1min', '5min', '15min', '30min' or '60min'.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: Records with the keys of INTRADAY_COLUMNS, empty
+                              if data cannot be retrieved or if no bar is
+                              available for the given date.
+    """
+    url: str = (
+        f"{ALPHA_VANTAGE_URL}"
+        "?function=TIME_SERIES_INTRADAY"
+        f"&symbol={symbol}&interval={interval}&month={date[:7]}"
+        f"&apikey={api_key}&outputsize=full"
+    )
+
+    try:
+        response: requests.Response = requests.get(url)
+        response.raise_for_status()
+        data: Dict = response.json()
+
+        if "Information" in data:
+            print(f"Alpha Vantage API Error: {data['Information']}")
+            return []
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error making request to Alpha Vantage API: {e}")
+        return []
+
+    if archive is not None:
+        archive.put("alpha_vantage_intraday", symbol, data)
+
+    return parse_intraday_bars(data, symbol, date, interval)
+
+
+def parse_intraday_bars(
+    data: Dict, symbol: str, date: str, interval: str
+) -> List[Dict[str, Any]]:
+    """
+    Builds intraday bar records from an Alpha Vantage TIME_SERIES_INTRADAY
+    payload.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        symbol (str): The stock symbol the payload belongs to.
+        date (str): The date to extract, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval of the payload.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the bars of the date, sorted by
+                              timestamp.
+    """
+    bars: Dict = data.get(f"Time Series ({interval})", {})
+    records: List[Dict[str, Any]] = [
+        {
+            "timestamp": timestamp,
+            "symbol": symbol,
+            "open_price": to_float(bar.get("1. open")),
+            "high_price": to_float(bar.get("2. high")),
+            "low_price": to_float(bar.get("3. low")),
+            "close_price": to_float(bar.get("4. close")),
+            "volume": to_float(bar.get("5. volume")),
+        }
+        for timestamp, bar in sorted(bars.items())
+        if timestamp.startswith(date)
+    ]
+    if not records:
+        print(f"No {interval} bars found for symbol {symbol} on date {date}.")
+    return records
+
+
+def fetch_corporate_action_records(
+    symbol: str, api_key: str, archive: Optional[ResponseArchive] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetches the splits and the cash dividends of a symbol from the Alpha
+    Vantage SPLITS and DIVIDENDS endpoints, which return its whole history.
+
+    Args:
+        symbol (str): The stock symbol for which actions are retrieved.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw responses
+                                             are stored, if any.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: Records with the keys of
+                                        CORPORATE_ACTION_COLUMNS, or None if
+                                        either endpoint cannot be retrieved,
+                                        so a failed request is not mistaken
+                                        for a symbol without actions.
+    """
+    payloads: Dict[str, Dict] = {}
+    for function in ("SPLITS", "DIVIDENDS"):
+        url: str = (
+            f"{ALPHA_VANTAGE_URL}"
+            f"?function={function}&symbol={symbol}&apikey={api_key}"
+        )
+
+        try:
+            response: requests.Response = requests.get(url)
+            response.raise_for_status()
+            data: Dict = response.json()
+
+            if "Information" in data:
+                print(f"Alpha Vantage API Error: {data['Information']}")
+                return None
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error making request to Alpha Vantage API: {e}")
+            return None
+
+        if archive is not None:
+            archive.put(f"alpha_vantage_{function.lower()}", symbol, data)
+        payloads[function] = data
+
+    return parse_splits(payloads["SPLITS"], symbol) + parse_dividends(
+        payloads["DIVIDENDS"], symbol
+    )
+
+
+def parse_splits(data: Dict, symbol: str) -> List[Dict[str, Any]]:
+    """
+    Builds split records from an Alpha Vantage SPLITS payload. The value is
+    the number of new shares per old share, e.g. 4.0 for a 4-for-1 split.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        symbol (str): The stock symbol the payload belongs to.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the splits with a valid factor.
+    """
+    records: List[Dict[str, Any]] = [
+        {
+            "symbol": symbol,
+            "ex_date": split.get("effective_date"),
+            "action_type": "split",
+            "value": to_float(split.get("split_factor")),
+        }
+        for split in data.get("data", [])
+    ]
+    return [
+        record for record in records
+        if record["ex_date"] and record["value"] > 0
+    ]
+
+
+def parse_dividends(data: Dict, symbol: str) -> List[Dict[str, Any]]:
+    """
+    Builds cash dividend records from an Alpha Vantage DIVIDENDS payload.
+    The value is the amount paid per share.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        symbol (str): The stock symbol the payload belongs to.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the dividends with a valid amount.
+    """
+    records: List[Dict[str, Any]] = [
+        {
+            "symbol": symbol,
+            "ex_date": dividend.get("ex_dividend_date"),
+            "action_type": "dividend",
+            "value": to_float(dividend.get("amount")),
+        }
+        for dividend in data.get("data", [])
+    ]
+    return [
+        record for record in records
+        if record["ex_date"] and record["ex_date"] != "None" and record["value"] > 0
+    ]
+
+
+def fetch_stock_record(
+    symbol: str, api_key: str, archive: Optional[ResponseArchive] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the stock profile of a symbol from the Finnhub API.
 
     Args:
         symbol (str): The stock symbol for which the profile is retrieved.
         api_key (str): The Finnhub API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
 
     Returns:
-        pd.DataFrame: A DataFrame with the stock profile including name, industry, etc.
-                      Returns an empty DataFrame if data cannot be retrieved or if no
-                      data is available for the given symbol.
+        Optional[Dict[str, Any]]: A record with the keys of STOCK_COLUMNS, or None
+                                  if data cannot be retrieved or if no data is
+                                  available for the given symbol.
     """
     url: str = (
-        "https://finnhub.io/api/v1/stock/profile2"
+        f"{FINNHUB_URL}/stock/profile2"
         f"?symbol={symbol}&token={api_key}"
     )
 
@@ -89,25 +438,185 @@ def create_stock_table(symbol: str, api_key: str) -> pd.DataFrame:
 
         if not data or data.get("error"):
             print(f"Finnhub API Error: {data.get('error', 'Data not available.')}")
-            return pd.DataFrame()
+            return None
 
     except requests.exceptions.RequestException as e:
         print(f"Error making request to Finnhub API: {e}")
-        return pd.DataFrame()
+        return None
+
+    if archive is not None:
+        archive.put("finnhub", symbol, data)
 
+    return parse_stock_profile(data, symbol)
+
+
+def parse_stock_profile(data: Dict, symbol: str) -> Optional[Dict[str, Any]]:
+    """
+    Builds a stock profile record from a Finnhub profile2 payload.
+
+    Args:
+        data (Dict): The decoded JSON response of the API.
+        symbol (str): The stock symbol the payload belongs to.
+
+    Returns:
+        Optional[Dict[str, Any]]: The profile record, or None if the payload
+                                  is empty.
+    """
     if not data:
         print(f"No profile data found for symbol {symbol}.")
-        return pd.DataFrame()
+        return None
 
-    rows = [
-        {
-            "symbol": data.get("ticker", ""),
-            "name": data.get("name", ""),
-            "industry": data.get("finnhubIndustry", ""),
-            "exchange": data.get("exchange", ""),
-            "logo": data.get("logo", ""),
-            "weburl": data.get("weburl", ""),
-        }
+    return {
+        "symbol": data.get("ticker", ""),
+        "name": data.get("name", ""),
+        "industry": data.get("finnhubIndustry", ""),
+        "exchange": data.get("exchange", ""),
+        "logo": data.get("logo", ""),
+        "weburl": data.get("weburl", ""),
+    }
+
+
+def fetch_daily_stock_prices_records(
+    symbols: List[str],
+    date: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the daily stock prices of several symbols, one request at a time.
+
+    Args:
+        symbols (List[str]): The stock symbols for which prices are retrieved.
+        date (str): The date for which prices are retrieved, in 'YYYY-MM-DD' format.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the symbols with data for the date.
+    """
+    records = [
+        fetch_daily_stock_prices_record(symbol, date, api_key, archive)
+        for symbol in symbols
     ]
+    return [record for record in records if record is not None]
+
+
+def fetch_stock_records(
+    symbols: List[str], api_key: str, archive: Optional[ResponseArchive] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the stock profiles of several symbols, one request at a time.
+
+    Args:
+        symbols (List[str]): The stock symbols for which profiles are retrieved.
+        api_key (str): The Finnhub API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the symbols with a profile.
+    """
+    records = [fetch_stock_record(symbol, api_key, archive) for symbol in symbols]
+    return [record for record in records if record is not None]
+
+
+def fetch_intraday_records(
+    symbols: List[str],
+    date: str,
+    interval: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the intraday bars of several symbols, one request at a time.
+
+    Args:
+        symbols (List[str]): The stock symbols for which bars are retrieved.
+        date (str): The date for which bars are retrieved, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw response is
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The bars of every symbol for the date.
+    """
+    return [
+        record
+        for symbol in symbols
+        for record in fetch_intraday_bars(symbol, date, interval, api_key, archive)
+    ]
+
+
+def fetch_corporate_actions_records(
+    symbols: List[str], api_key: str, archive: Optional[ResponseArchive] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetches the corporate actions of several symbols, one symbol at a time.
+
+    Args:
+        symbols (List[str]): The stock symbols for which actions are retrieved.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw responses
+                                             are stored, if any.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The actions of each symbol whose
+                                         requests succeeded.
+    """
+    actions: Dict[str, List[Dict[str, Any]]] = {}
+    for symbol in symbols:
+        records = fetch_corporate_action_records(symbol, api_key, archive)
+        if records is not None:
+            actions[symbol] = records
+    return actions
+
+
+def create_daily_stock_prices_table(
+    symbol: str, date: str, api_key: str
+) -> pd.DataFrame:
+    """
+    Fetches daily stock prices from the Alpha Vantage API.
+
+    Prefer fetch_daily_stock_prices_records when fetching many symbols, so
+    the records can be materialized into a single DataFrame.
+
+    Args:
+        symbol (str): The stock symbol for which prices are retrieved.
+        date (str): The date for which prices are retrieved, in 'YYYY-MM-DD' format.
+        api_key (str): The Alpha Vantage API key.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing open, high, low, close prices, and volume
+                      for the specified date. Returns an empty DataFrame if data cannot
+                      be retrieved or if no data is available for the given date.
+    """
+    record = fetch_daily_stock_prices_record(symbol, date, api_key)
+    if record is None:
+        return pd.DataFrame()
+
+    return pd.DataFrame([record], columns=DAILY_STOCK_PRICES_COLUMNS)
+
+
+def create_stock_table(symbol: str, api_key: str) -> pd.DataFrame:
+    """
+    Fetches stock profile information from the Finnhub API.
+
+    Prefer fetch_stock_records when fetching many symbols, so the records can
+    be materialized into a single DataFrame.
+
+    Args:
+        symbol (str): The stock symbol for which the profile is retrieved.
+        api_key (str): The Finnhub API key.
+
+    Returns:
+        pd.DataFrame: A DataFrame with the stock profile including name, industry, etc.
+                      Returns an empty DataFrame if data cannot be retrieved or if no
+                      data is available for the given symbol.
+    """
+    record = fetch_stock_record(symbol, api_key)
+    if record is None:
+        return pd.DataFrame()
 
-    return pd.DataFrame(rows)
+    return pd.DataFrame([record], columns=STOCK_COLUMNS)
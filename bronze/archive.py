@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+from utils.config import RAW_ARCHIVE_PATH
+
+
+class ResponseArchive:
+    """
+    Content-addressed archive of the raw API responses of a date.
+
+    Each payload is stored once, gzip-compressed, under
+    `{root}/objects/{hash[:2]}/{hash}.json.gz`, where hash is the SHA-256 of
+    its canonical JSON. A manifest per date, `{root}/manifests/{date}.json`,
+    maps every source (e.g. 'alpha_vantage') and key (usually the symbol) to
+    the hash of the response it returned.
+    """
+
+    def __init__(self, date: str, root: str = RAW_ARCHIVE_PATH) -> None:
+        self.date: str = date
+        self.root: str = root
+        self.manifest_path: str = os.path.join(root, "manifests", f"{date}.json")
+        self.responses: Dict[str, Dict[str, str]] = {}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.responses = json.load(file)["responses"]
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.json.gz")
+
+    def put(self, source: str, key: str, payload: Dict) -> str:
+        """
+        Archive a response and record it in the manifest of the date.
+
+        Args:
+            source (str): Name of the API the response comes from.
+            key (str): Key of the response within the source, usually the symbol.
+            payload (Dict): The decoded JSON response.
+
+        Returns:
+            str: The SHA-256 hash addressing the stored response.
+        """
+        content: bytes = json.dumps(
+            payload, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+        digest: str = hashlib.sha256(content).hexdigest()
+
+        path: str = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a
+            # truncated object behind its hash
+            tmp_path: str = f"{path}.tmp"
+            with gzip.open(tmp_path, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+
+        self.responses.setdefault(source, {})[key] = digest
+        return digest
+
+    def get(self, source: str, key: str) -> Optional[Dict]:
+        """
+        Read an archived response.
+
+        Args:
+            source (str): Name of the API the response comes from.
+            key (str): Key of the response within the source.
+
+        Returns:
+            Optional[Dict]: The decoded response, or None if it was not archived.
+        """
+        digest: Optional[str] = self.responses.get(source, {}).get(key)
+        if digest is None:
+            return None
+
+        with gzip.open(self._object_path(digest), "rb") as file:
+            return json.loads(file.read())
+
+    def keys(self, source: str) -> List[str]:
+        """
+        List the keys archived for a source.
+
+        Args:
+            source (str): Name of the API.
+
+        Returns:
+            List[str]: The archived keys, sorted.
+        """
+        return sorted(self.responses.get(source, {}))
+
+    def save(self) -> None:
+        """
+        Write the manifest of the date.
+        """
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with open(self.manifest_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"date": self.date, "responses": self.responses},
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"Manifest '{self.manifest_path}' saved.")
@@ -0,0 +1,277 @@
+import asyncio
+import time
+from collections import deque
+from types import TracebackType
+from typing import Any, Awaitable, Deque, Dict, List, Optional, Type
+import aiohttp
+from bronze.api_data_downloader import parse_daily_stock_prices, parse_stock_profile
+from bronze.archive import ResponseArchive
+from utils.config import (
+    ALPHA_VANTAGE_URL,
+    ALPHA_VANTAGE_REQUESTS_PER_MINUTE,
+    FETCH_CONCURRENCY,
+    FETCH_TIMEOUT,
+    FINNHUB_URL,
+    FINNHUB_REQUESTS_PER_MINUTE,
+)
+
+
+class RateLimiter:
+    """
+    Sliding window rate limiter allowing at most `max_requests` requests
+    every `period` seconds.
+    """
+
+    def __init__(self, max_requests: int, period: float = 60.0) -> None:
+        self.max_requests: int = max_requests
+        self.period: float = period
+        self._timestamps: Deque[float] = deque()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request can be made without exceeding the rate limit.
+        """
+        async with self._lock:
+            while True:
+                now: float = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self.period:
+                    self._timestamps.popleft()
+
+                if len(self._timestamps) < self.max_requests:
+                    self._timestamps.append(now)
+                    return
+
+                await asyncio.sleep(self.period - (now - self._timestamps[0]))
+
+
+class AsyncFetcher:
+    """
+    Asynchronous client for the Alpha Vantage and Finnhub APIs.
+
+    All requests share one connection pool, the number of in-flight requests
+    is bounded by `concurrency` and each provider has its own rate limiter.
+    Successful responses are stored in `archive`, if any. Use it as an async
+    context manager so the pool is closed on exit.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = FETCH_CONCURRENCY,
+        timeout: float = FETCH_TIMEOUT,
+        archive: Optional[ResponseArchive] = None,
+    ) -> None:
+        self.concurrency: int = concurrency
+        self.timeout: float = timeout
+        self.archive: Optional[ResponseArchive] = archive
+        self.alpha_vantage_limiter = RateLimiter(ALPHA_VANTAGE_REQUESTS_PER_MINUTE)
+        self.finnhub_limiter = RateLimiter(FINNHUB_REQUESTS_PER_MINUTE)
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncFetcher":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency)
+        )
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_json(
+        self, url: str, params: Dict[str, str], limiter: RateLimiter, provider: str
+    ) -> Optional[Dict]:
+        """
+        Make a GET request and decode its JSON body.
+
+        Args:
+            url (str): URL of the endpoint.
+            params (Dict[str, str]): Query string parameters.
+            limiter (RateLimiter): Rate limiter of the provider.
+            provider (str): Name of the provider, used in error messages.
+
+        Returns:
+            Optional[Dict]: The decoded response, or None if the request failed.
+        """
+        async with self._semaphore:
+            await limiter.acquire()
+            try:
+                async with self._session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"Error making request to {provider} API: {e}")
+                return None
+
+    async def fetch_daily_stock_prices_record(
+        self, symbol: str, date: str, api_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetches the daily stock price of a symbol from the Alpha Vantage API.
+
+        Args:
+            symbol (str): The stock symbol for which prices are retrieved.
+            date (str): The date for which prices are retrieved, in 'YYYY-MM-DD'
+                        format.
+            api_key (str): The Alpha Vantage API key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The record for the date, or None if data
+                                      cannot be retrieved.
+        """
+        data: Optional[Dict] = await self._get_json(
+            ALPHA_VANTAGE_URL,
+            {
+                "function": "TIME_SERIES_DAILY",
+                "symbol": symbol,
+                "apikey": api_key,
+                "outputsize": "compact",
+            },
+            self.alpha_vantage_limiter,
+            "Alpha Vantage",
+        )
+        if data is None:
+            return None
+
+        if "Information" in data:
+            print(f"Alpha Vantage API Error: {data['Information']}")
+            return None
+
+        if self.archive is not None:
+            self.archive.put("alpha_vantage", symbol, data)
+
+        return parse_daily_stock_prices(data, symbol, date)
+
+    async def fetch_stock_record(
+        self, symbol: str, api_key: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetches the stock profile of a symbol from the Finnhub API.
+
+        Args:
+            symbol (str): The stock symbol for which the profile is retrieved.
+            api_key (str): The Finnhub API key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The profile record, or None if data cannot
+                                      be retrieved.
+        """
+        data: Optional[Dict] = await self._get_json(
+            f"{FINNHUB_URL}/stock/profile2",
+            {"symbol": symbol, "token": api_key},
+            self.finnhub_limiter,
+            "Finnhub",
+        )
+        if data is None:
+            return None
+
+        if not data or data.get("error"):
+            print(f"Finnhub API Error: {data.get('error', 'Data not available.')}")
+            return None
+
+        if self.archive is not None:
+            self.archive.put("finnhub", symbol, data)
+
+        return parse_stock_profile(data, symbol)
+
+    async def gather(
+        self, requests: List[Awaitable[Optional[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the requests concurrently, cancelling the ones still pending
+        when the fetch timeout expires.
+
+        Args:
+            requests (List[Awaitable[Optional[Dict[str, Any]]]]): The requests.
+
+        Returns:
+            List[Dict[str, Any]]: The records of the requests that returned data
+                                  before the timeout.
+        """
+        if not requests:
+            return []
+
+        tasks = [asyncio.ensure_future(request) for request in requests]
+        _, pending = await asyncio.wait(tasks, timeout=self.timeout)
+
+        if pending:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(
+                f"Fetch timeout of {self.timeout}s reached; "
+                f"cancelled {len(pending)} pending requests."
+            )
+
+        return [
+            task.result()
+            for task in tasks
+            if not task.cancelled() and task.result() is not None
+        ]
+
+
+def fetch_daily_stock_prices_records(
+    symbols: List[str],
+    date: str,
+    api_key: str,
+    archive: Optional[ResponseArchive] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the daily stock prices of several symbols concurrently.
+
+    If the task is interrupted (e.g. by an Airflow execution timeout), the
+    event loop is closed and every pending request is cancelled.
+
+    Args:
+        symbols (List[str]): The stock symbols for which prices are retrieved.
+        date (str): The date for which prices are retrieved, in 'YYYY-MM-DD' format.
+        api_key (str): The Alpha Vantage API key.
+        archive (Optional[ResponseArchive]): Archive where the raw responses are
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the symbols with data for the date.
+    """
+
+    async def fetch() -> List[Dict[str, Any]]:
+        async with AsyncFetcher(archive=archive) as fetcher:
+            return await fetcher.gather(
+                [
+                    fetcher.fetch_daily_stock_prices_record(symbol, date, api_key)
+                    for symbol in symbols
+                ]
+            )
+
+    return asyncio.run(fetch())
+
+
+def fetch_stock_records(
+    symbols: List[str], api_key: str, archive: Optional[ResponseArchive] = None
+) -> List[Dict[str, Any]]:
+    """
+    Fetches the stock profiles of several symbols concurrently.
+
+    Args:
+        symbols (List[str]): The stock symbols for which profiles are retrieved.
+        api_key (str): The Finnhub API key.
+        archive (Optional[ResponseArchive]): Archive where the raw responses are
+                                             stored, if any.
+
+    Returns:
+        List[Dict[str, Any]]: The records of the symbols with a profile.
+    """
+
+    async def fetch() -> List[Dict[str, Any]]:
+        async with AsyncFetcher(archive=archive) as fetcher:
+            return await fetcher.gather(
+                [fetcher.fetch_stock_record(symbol, api_key) for symbol in symbols]
+            )
+
+    return asyncio.run(fetch())
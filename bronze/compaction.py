@@ -0,0 +1,325 @@
+import datetime
+import json
+import os
+import re
+import uuid
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Any, Dict, List, Optional
+from utils.config import (
+    BRONZE_COMPACTED_PATH,
+    BRONZE_COMPACTION_GRACE_DAYS,
+    BRONZE_DATA_PATH,
+)
+from utils.parquet import (
+    DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    STOCK_BRONZE_SCHEMA,
+    bronze_path,
+    read_table,
+    write_table,
+)
+
+# Tables of the bronze layer, with their declared schema and sort column
+BRONZE_TABLES: Dict[str, pa.Schema] = {
+    "daily_stock_prices_table": DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    "stock_table": STOCK_BRONZE_SCHEMA,
+}
+SORT_COLUMNS: Dict[str, str] = {
+    "daily_stock_prices_table": "stock_symbol",
+    "stock_table": "symbol",
+}
+STAGES: List[str] = ["bronze", "validated"]
+MANIFEST_FILE: str = "manifest.json"
+
+# Name of a per-date bronze file, e.g. stock_table_2024-09-10_bronze.parquet
+BRONZE_FILE_PATTERN = re.compile(
+    r"^(?P<table>\w+?)_(?P<date>\d{4}-\d{2}-\d{2})_(?P<stage>bronze|validated)"
+    r"\.parquet$"
+)
+
+
+def compacted_path(
+    table_name: str,
+    month: str,
+    stage: str = "bronze",
+    root: str = BRONZE_COMPACTED_PATH,
+) -> str:
+    """
+    Path of the monthly file a bronze table and stage are compacted into.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        month (str): The month, in 'YYYY-MM' format.
+        stage (str): 'bronze' or 'validated'.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return os.path.join(root, f"{table_name}_{month}_{stage}.parquet")
+
+
+def load_compaction_manifest(root: str = BRONZE_COMPACTED_PATH) -> Dict[str, Any]:
+    """
+    Load the manifest of the compacted files: for each month, table and
+    stage, the dates and number of rows the monthly file holds.
+    """
+    path: str = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"months": {}}
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compacted_dates(
+    manifest: Dict[str, Any], table_name: str, month: str, stage: str
+) -> List[str]:
+    """
+    List the dates of a table and stage compacted into the file of a month.
+    """
+    return (
+        manifest["months"].get(month, {}).get(f"{table_name}_{stage}", {}).get(
+            "dates", []
+        )
+    )
+
+
+def bronze_source(
+    table_name: str,
+    date: str,
+    stage: str = "bronze",
+    data_path: str = BRONZE_DATA_PATH,
+    root: str = BRONZE_COMPACTED_PATH,
+) -> str:
+    """
+    Path of the file holding the bronze rows of a date: its own file if it
+    exists, otherwise the monthly file it was compacted into.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        date (str): The date of the rows.
+        stage (str): 'bronze' or 'validated'.
+        data_path (str): Directory of the per-date bronze files.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        str: Path of the Parquet file, or of the missing per-date file if the
+        date is in neither form.
+    """
+    path: str = bronze_path(table_name, date, stage, data_path)
+    if os.path.exists(path):
+        return path
+
+    month: str = date[:7]
+    manifest: Dict[str, Any] = load_compaction_manifest(root)
+    if date in compacted_dates(manifest, table_name, month, stage):
+        return compacted_path(table_name, month, stage, root)
+    return path
+
+
+def read_bronze(
+    table_name: str,
+    date: str,
+    stage: str = "bronze",
+    schema: Optional[pa.Schema] = None,
+    data_path: str = BRONZE_DATA_PATH,
+    root: str = BRONZE_COMPACTED_PATH,
+) -> pa.Table:
+    """
+    Read the bronze rows of a date from its own file or from the monthly file
+    it was compacted into, so callers do not depend on the compaction.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        date (str): The date of the rows.
+        stage (str): 'bronze' or 'validated'.
+        schema (Optional[pa.Schema]): Declared schema of the table, if any.
+        data_path (str): Directory of the per-date bronze files.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        pa.Table: The rows of the date, without the compaction columns.
+    """
+    path: str = bronze_source(table_name, date, stage, data_path, root)
+    if path == bronze_path(table_name, date, stage, data_path):
+        return read_table(path, schema)
+
+    # Row groups of other dates are skipped with the file_date statistics
+    schema = schema or BRONZE_TABLES[table_name]
+    return read_table(
+        path,
+        schema,
+        columns=schema.names,
+        filters=[("file_date", "=", datetime.date.fromisoformat(date))],
+    )
+
+
+def closed_months(
+    date: str,
+    grace_days: int = BRONZE_COMPACTION_GRACE_DAYS,
+    data_path: str = BRONZE_DATA_PATH,
+) -> Dict[str, List[str]]:
+    """
+    Find the per-date bronze files of the months closed at least `grace_days`
+    before the date, which are no longer expected to receive late files.
+
+    Args:
+        date (str): The date of the run.
+        grace_days (int): Days after the end of a month before it is compacted.
+        data_path (str): Directory of the per-date bronze files.
+
+    Returns:
+        Dict[str, List[str]]: For each closed month, the names of its files.
+    """
+    cutoff = datetime.date.fromisoformat(date) - datetime.timedelta(days=grace_days)
+    months: Dict[str, List[str]] = {}
+    for name in sorted(os.listdir(data_path)) if os.path.isdir(data_path) else []:
+        match = BRONZE_FILE_PATTERN.match(name)
+        if match is None or match["table"] not in BRONZE_TABLES:
+            continue
+
+        month_start = datetime.date.fromisoformat(match["date"]).replace(day=1)
+        next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        if next_month <= cutoff:
+            months.setdefault(month_start.strftime("%Y-%m"), []).append(name)
+    return months
+
+
+def compact_month(
+    month: str,
+    names: List[str],
+    manifest: Dict[str, Any],
+    data_path: str = BRONZE_DATA_PATH,
+    root: str = BRONZE_COMPACTED_PATH,
+) -> Dict[str, int]:
+    """
+    Merge the per-date files of a month into one file per table and stage.
+
+    The rows get a file_date column with the date of the file they come from
+    and are sorted by it, so each date is a contiguous range the readers find
+    with the row group statistics. Files of dates already compacted (e.g. a
+    late backfill) replace the compacted rows of those dates.
+
+    Args:
+        month (str): The month, in 'YYYY-MM' format.
+        names (List[str]): Names of the per-date files of the month.
+        manifest (Dict[str, Any]): Manifest of the compacted files, updated
+            with the dates and rows of the new monthly files.
+        data_path (str): Directory of the per-date bronze files.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        Dict[str, int]: Number of rows of each compacted table and stage.
+    """
+    rows: Dict[str, int] = {}
+    entries: Dict[str, Any] = manifest["months"].setdefault(month, {})
+
+    for table_name, schema in BRONZE_TABLES.items():
+        compacted_schema: pa.Schema = schema.append(pa.field("file_date", pa.date32()))
+        for stage in STAGES:
+            dates: List[str] = sorted(
+                match["date"]
+                for match in map(BRONZE_FILE_PATTERN.match, names)
+                if match["table"] == table_name and match["stage"] == stage
+            )
+            if not dates:
+                continue
+
+            tables: List[pa.Table] = []
+            path: str = compacted_path(table_name, month, stage, root)
+            if os.path.exists(path):
+                # Keep the compacted rows of the dates without a newer file
+                existing: pa.Table = read_table(path, compacted_schema)
+                replaced = pa.array(
+                    [datetime.date.fromisoformat(date) for date in dates], pa.date32()
+                )
+                tables.append(existing.filter(
+                    pc.invert(pc.is_in(existing["file_date"], replaced))
+                ))
+            for date in dates:
+                table: pa.Table = read_table(
+                    bronze_path(table_name, date, stage, data_path), schema
+                )
+                file_date = pa.array(
+                    [datetime.date.fromisoformat(date)] * table.num_rows, pa.date32()
+                )
+                tables.append(table.append_column("file_date", file_date))
+
+            # Dictionary columns cannot be sorted, so sort by their values
+            merged: pa.Table = pa.concat_tables(tables)
+            order = pc.sort_indices(
+                pa.table({
+                    "file_date": merged["file_date"],
+                    "symbol": merged[SORT_COLUMNS[table_name]].cast(pa.string()),
+                }),
+                sort_keys=[("file_date", "ascending"), ("symbol", "ascending")],
+            )
+            merged = merged.take(order)
+
+            # Write to a temporary file first so readers never see a partial file
+            os.makedirs(root, exist_ok=True)
+            tmp_path: str = os.path.join(root, f".{uuid.uuid4().hex}.tmp")
+            write_table(merged, tmp_path)
+            os.replace(tmp_path, path)
+
+            previous: List[str] = compacted_dates(manifest, table_name, month, stage)
+            key: str = f"{table_name}_{stage}"
+            entries[key] = {
+                "file": os.path.basename(path),
+                "dates": sorted(set(previous) | set(dates)),
+                "rows": merged.num_rows,
+                "compacted_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            }
+            rows[key] = merged.num_rows
+
+    return rows
+
+
+def save_compaction_manifest(
+    manifest: Dict[str, Any], root: str = BRONZE_COMPACTED_PATH
+) -> None:
+    """
+    Replace the manifest of the compacted files atomically.
+    """
+    os.makedirs(root, exist_ok=True)
+    path: str = os.path.join(root, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def compact_bronze(
+    date: str,
+    grace_days: int = BRONZE_COMPACTION_GRACE_DAYS,
+    data_path: str = BRONZE_DATA_PATH,
+    root: str = BRONZE_COMPACTED_PATH,
+) -> Dict[str, Dict[str, int]]:
+    """
+    Compact the per-date bronze files of every closed month into monthly
+    files, record them in the manifest and remove the per-date files.
+
+    The per-date files are only removed once the monthly files and the
+    manifest are written; until then they take precedence for the readers,
+    so an interrupted compaction is completed by the next run.
+
+    Args:
+        date (str): The date of the run.
+        grace_days (int): Days after the end of a month before it is compacted.
+        data_path (str): Directory of the per-date bronze files.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        Dict[str, Dict[str, int]]: For each compacted month, the number of
+        rows of each table and stage.
+    """
+    manifest: Dict[str, Any] = load_compaction_manifest(root)
+    report: Dict[str, Dict[str, int]] = {}
+
+    for month, names in closed_months(date, grace_days, data_path).items():
+        report[month] = compact_month(month, names, manifest, data_path, root)
+        save_compaction_manifest(manifest, root)
+        for name in names:
+            os.remove(os.path.join(data_path, name))
+        print(f"Compacted {len(names)} bronze files of {month}: {report[month]}")
+
+    return report
@@ -0,0 +1,304 @@
+import datetime
+import json
+import os
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.config import (
+    FETCH_BATCH_SIZE,
+    FETCH_DAILY_QUOTAS,
+    FETCH_PRIORITY_SYMBOLS,
+    FETCH_STATUS_PATH,
+)
+from utils.parquet import FETCH_STATUS_SCHEMA, read_parquet, write_parquet
+
+# Outcomes of a symbol: fetched, requested without data, not requested because
+# the deadline passed or the quota ran out, or requested in a failed batch
+FETCHED: str = "fetched"
+MISSING: str = "missing"
+DEADLINE: str = "deadline"
+QUOTA: str = "quota"
+FAILED: str = "failed"
+# Outcomes that another attempt may change, unlike a symbol without data
+RETRYABLE: Tuple[str, ...] = (DEADLINE, QUOTA, FAILED)
+# Outcomes of the symbols left for a catch-up run without being requested
+DEFERRED: Tuple[str, ...] = (DEADLINE, QUOTA)
+
+
+def symbol_priorities(
+    symbols: List[str], priority_symbols: List[str] = FETCH_PRIORITY_SYMBOLS
+) -> Dict[str, int]:
+    """
+    Rank the symbols to be fetched: the symbols of FETCH_PRIORITY_SYMBOLS in
+    their configured order, then every other symbol in its original order.
+
+    Args:
+        symbols (List[str]): The symbols of the run.
+        priority_symbols (List[str]): The symbols fetched first.
+
+    Returns:
+        Dict[str, int]: The priority of each symbol, 0 being fetched first.
+    """
+    ranked: List[str] = [symbol for symbol in priority_symbols if symbol in symbols]
+    ranked += [symbol for symbol in symbols if symbol not in ranked]
+    return {symbol: priority for priority, symbol in enumerate(ranked)}
+
+
+class QuotaLedger:
+    """
+    Requests spent per provider and day, shared by the runs of the day (e.g.
+    the daily run and its catch-up), so each run knows the quota left.
+    """
+
+    def __init__(
+        self,
+        root: str = FETCH_STATUS_PATH,
+        quotas: Dict[str, int] = FETCH_DAILY_QUOTAS,
+        today: Optional[datetime.date] = None,
+    ) -> None:
+        self.quotas: Dict[str, int] = quotas
+        day: str = (today or datetime.date.today()).isoformat()
+        self.path: str = os.path.join(root, "quota", f"{day}.json")
+        self.spent: Dict[str, int] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as file:
+                self.spent = json.load(file)
+
+    def remaining(self, provider: str) -> float:
+        """
+        Get the requests left today for a provider, infinite without a quota.
+        """
+        quota: int = self.quotas.get(provider, 0)
+        if quota <= 0:
+            return float("inf")
+        return quota - self.spent.get(provider, 0)
+
+    def spend(self, provider: str, requests: int) -> None:
+        """
+        Record the requests made to a provider with a quota, replacing the
+        ledger atomically.
+        """
+        if self.quotas.get(provider, 0) <= 0:
+            return
+        self.spent[provider] = self.spent.get(provider, 0) + requests
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as file:
+            json.dump(self.spent, file, indent=2, sort_keys=True)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+class FetchScheduler:
+    """
+    Fetches the symbols of a run in batches, in priority order, while the run
+    is before its deadline and the provider has quota left, and records the
+    outcome of every symbol.
+
+    A batch is only started if its estimated cost can be paid for and the
+    deadline has not passed, so when time or quota runs out the symbols left
+    behind are the least important ones, and they are recorded for a catch-up
+    run. The quota is charged with the requests the provider actually sent,
+    which may exceed the estimate (e.g. the per-symbol fallback of a bulk
+    request).
+    """
+
+    def __init__(
+        self,
+        priorities: Dict[str, int],
+        deadline: Optional[float] = None,
+        ledger: Optional[QuotaLedger] = None,
+        batch_size: int = FETCH_BATCH_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.priorities: Dict[str, int] = priorities
+        self.deadline: Optional[float] = deadline
+        self.ledger: QuotaLedger = ledger if ledger is not None else QuotaLedger()
+        self.batch_size: int = batch_size
+        self.clock: Callable[[], float] = clock
+        self.outcomes: Dict[str, Dict[str, str]] = {}
+
+    def fetch(
+        self,
+        dataset: str,
+        symbols: List[str],
+        provider: Any,
+        fetch: Callable[[List[str]], List[Dict[str, Any]]],
+        symbol_key: str,
+        cost: Optional[Callable[[List[str]], int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch a dataset of the symbols through the provider.
+
+        Args:
+            dataset (str): Name of the dataset, e.g. 'prices' or 'profiles'.
+            symbols (List[str]): The symbols to be fetched.
+            provider (Any): Provider of the dataset; its name, request_cost
+                and requests_made are used to account for its quota.
+            fetch (Callable[[List[str]], List[Dict[str, Any]]]): Function
+                fetching the records of a batch of symbols.
+            symbol_key (str): Key of the symbol in the records.
+            cost (Optional[Callable[[List[str]], int]]): Estimate of the
+                requests of a batch, provider.request_cost by default.
+
+        Returns:
+            List[Dict[str, Any]]: The records fetched.
+        """
+        ordered: List[str] = sorted(
+            symbols, key=lambda symbol: self.priorities.get(symbol, len(symbols))
+        )
+        outcomes: Dict[str, str] = self.outcomes.setdefault(dataset, {})
+        records: List[Dict[str, Any]] = []
+        request_cost: Callable[[List[str]], int] = cost or provider.request_cost
+
+        for start in range(0, len(ordered), self.batch_size):
+            batch: List[str] = ordered[start:start + self.batch_size]
+            batch_cost: int = request_cost(batch)
+
+            if self.deadline is not None and self.clock() >= self.deadline:
+                outcomes.update(dict.fromkeys(ordered[start:], DEADLINE))
+                print(f"Deadline reached, {len(ordered) - start} {dataset} left.")
+                break
+            if self.ledger.remaining(provider.name) < batch_cost:
+                outcomes.update(dict.fromkeys(ordered[start:], QUOTA))
+                print(f"Quota of {provider.name} exhausted, "
+                      f"{len(ordered) - start} {dataset} left.")
+                break
+
+            requests_before: int = provider.requests_made
+            try:
+                batch_records = fetch(batch)
+            except Exception as e:
+                # A failed batch does not cancel the more important ones
+                # already fetched nor the rest of the run
+                print(f"Error fetching {dataset} of {batch}: {e}")
+                outcomes.update(dict.fromkeys(batch, FAILED))
+                continue
+            finally:
+                self.ledger.spend(
+                    provider.name, provider.requests_made - requests_before
+                )
+
+            fetched = {record[symbol_key] for record in batch_records}
+            outcomes.update({
+                symbol: FETCHED if symbol in fetched else MISSING for symbol in batch
+            })
+            records += batch_records
+
+        return records
+
+    def missed(
+        self, dataset: str, statuses: Optional[Tuple[str, ...]] = None
+    ) -> List[str]:
+        """
+        List the symbols of a dataset that were not fetched, by priority,
+        optionally only those with one of the given outcomes.
+        """
+        return [
+            symbol for symbol, status in self.outcomes.get(dataset, {}).items()
+            if status != FETCHED and (statuses is None or status in statuses)
+        ]
+
+    def deferred(self, dataset: str) -> bool:
+        """
+        Check whether the deadline or the quota left every symbol of a
+        dataset for a catch-up run, without any of them being requested.
+        """
+        outcomes: Dict[str, str] = self.outcomes.get(dataset, {})
+        return bool(outcomes) and all(
+            status in DEFERRED for status in outcomes.values()
+        )
+
+    def status_frame(self, date: str) -> pd.DataFrame:
+        """
+        Get the outcome of every symbol of the run, with the columns of
+        FETCH_STATUS_SCHEMA.
+        """
+        now = datetime.datetime.now().replace(microsecond=0)
+        return pd.DataFrame(
+            [
+                (pd.Timestamp(date).date(), dataset, symbol,
+                 self.priorities.get(symbol, len(self.priorities)), status, 1, now)
+                for dataset, outcomes in self.outcomes.items()
+                for symbol, status in outcomes.items()
+            ],
+            columns=FETCH_STATUS_SCHEMA.names,
+        )
+
+
+def status_path(date: str, root: str = FETCH_STATUS_PATH) -> str:
+    """
+    Path of the fetch status file of a date.
+    """
+    return os.path.join(root, f"fetch_status_{date}.parquet")
+
+
+def load_fetch_status(date: str, root: str = FETCH_STATUS_PATH) -> pd.DataFrame:
+    """
+    Load the outcome of every symbol fetched for a date, empty if the date
+    was never fetched.
+    """
+    path: str = status_path(date, root)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=FETCH_STATUS_SCHEMA.names)
+    return read_parquet(path, FETCH_STATUS_SCHEMA).astype(
+        {"dataset": object, "symbol": object, "status": object}
+    )
+
+
+def save_fetch_status(
+    status_df: pd.DataFrame, date: str, root: str = FETCH_STATUS_PATH
+) -> pd.DataFrame:
+    """
+    Merge the outcomes of a run into the status of the date: the symbols
+    fetched again take their new outcome and count one more attempt, and the
+    others keep their previous one.
+
+    Args:
+        status_df (pd.DataFrame): Output of FetchScheduler.status_frame.
+        date (str): The date fetched.
+        root (str): Directory of the status files.
+
+    Returns:
+        pd.DataFrame: The merged status of the date.
+    """
+    previous_df: pd.DataFrame = load_fetch_status(date, root)
+    if not previous_df.empty:
+        attempts = previous_df.set_index(["dataset", "symbol"])["attempts"]
+        keys = pd.MultiIndex.from_frame(status_df[["dataset", "symbol"]])
+        status_df = status_df.assign(
+            attempts=attempts.reindex(keys).fillna(0).to_numpy() + 1
+        )
+        kept = ~pd.MultiIndex.from_frame(
+            previous_df[["dataset", "symbol"]]
+        ).isin(keys)
+        status_df = pd.concat(
+            [previous_df[kept].astype(status_df.dtypes.to_dict()), status_df],
+            ignore_index=True,
+        )
+
+    os.makedirs(root, exist_ok=True)
+    path: str = status_path(date, root)
+    write_parquet(status_df, f"{path}.tmp", FETCH_STATUS_SCHEMA)
+    os.replace(f"{path}.tmp", path)
+
+    counts = status_df.groupby(["dataset", "status"]).size().to_dict()
+    print(f"Fetch status of {date}: {counts}")
+    return status_df
+
+
+def missed_symbols(
+    date: str,
+    dataset: str,
+    root: str = FETCH_STATUS_PATH,
+    statuses: Optional[Tuple[str, ...]] = None,
+) -> List[str]:
+    """
+    List the symbols of a dataset still not fetched for a date, by priority,
+    optionally only those with one of the given outcomes.
+    """
+    status_df: pd.DataFrame = load_fetch_status(date, root)
+    missed = status_df[
+        (status_df["dataset"] == dataset)
+        & (status_df["status"] != FETCHED)
+        & (statuses is None or status_df["status"].isin(statuses))
+    ]
+    return list(missed.sort_values("priority")["symbol"])
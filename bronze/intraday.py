@@ -0,0 +1,166 @@
+import os
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from typing import Any, Dict, List, Optional
+from bronze.api_data_downloader import INTRADAY_COLUMNS
+from bronze.fetch_scheduler import FetchScheduler, symbol_priorities
+from bronze.providers import StockDataProvider
+from utils.config import INTRADAY_INTERVAL, INTRADAY_PATH
+from utils.parquet import INTRADAY_BRONZE_SCHEMA, to_arrow_table, write_table
+
+# Hive partitioning of the intraday files: {root}/interval=5min/date=2024-09-10
+INTRADAY_PARTITIONING: ds.Partitioning = ds.partitioning(
+    pa.schema([("interval", pa.string()), ("date", pa.string())]), flavor="hive"
+)
+
+
+def intraday_partition(
+    date: str, interval: str = INTRADAY_INTERVAL, root: str = INTRADAY_PATH
+) -> str:
+    """
+    Directory of the intraday bars of a date and interval.
+
+    Args:
+        date (str): The date of the bars, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval, e.g. '5min'.
+        root (str): Root of the intraday files.
+
+    Returns:
+        str: Path of the partition directory.
+    """
+    return os.path.join(root, f"interval={interval}", f"date={date}")
+
+
+def write_intraday_bars(
+    df: pd.DataFrame,
+    date: str,
+    interval: str = INTRADAY_INTERVAL,
+    root: str = INTRADAY_PATH,
+) -> str:
+    """
+    Write the intraday bars of a date to their own partition.
+
+    Each date and interval gets a single file sorted by symbol and timestamp,
+    so new dates only add partitions and never rewrite the files of earlier
+    ones. A re-run of the date replaces its file atomically: readers see
+    either the old or the new bars, never both.
+
+    Args:
+        df (pd.DataFrame): Bars with the columns of INTRADAY_COLUMNS.
+        date (str): The date of the bars, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval, e.g. '5min'.
+        root (str): Root of the intraday files.
+
+    Returns:
+        str: Path of the written file.
+    """
+    complete = df.dropna(subset=INTRADAY_COLUMNS)
+    if len(complete) < len(df):
+        print(f"Dropped {len(df) - len(complete)} intraday bars with missing values.")
+
+    bars: pd.DataFrame = complete.assign(
+        timestamp=pd.to_datetime(complete["timestamp"])
+    ).sort_values(["symbol", "timestamp"])
+
+    partition: str = intraday_partition(date, interval, root)
+    os.makedirs(partition, exist_ok=True)
+    path: str = os.path.join(partition, "bars.parquet")
+    tmp_path: str = os.path.join(partition, f".bars_{uuid.uuid4().hex}.tmp")
+    write_table(to_arrow_table(bars, INTRADAY_BRONZE_SCHEMA), tmp_path)
+    os.replace(tmp_path, path)
+
+    print(f"File '{path}' created successfully with {len(bars)} bars.")
+    return path
+
+
+def read_intraday_bars(
+    start: str,
+    end: str,
+    interval: str = INTRADAY_INTERVAL,
+    symbols: Optional[List[str]] = None,
+    root: str = INTRADAY_PATH,
+) -> pa.Table:
+    """
+    Read the intraday bars between two dates (inclusive). Only the partitions
+    of the range are opened, and row groups of other symbols are skipped.
+
+    Args:
+        start (str): First date of the range, in 'YYYY-MM-DD' format.
+        end (str): Last date of the range, in 'YYYY-MM-DD' format.
+        interval (str): Bar interval, e.g. '5min'.
+        symbols (Optional[List[str]]): Symbols to read. Defaults to all.
+        root (str): Root of the intraday files.
+
+    Returns:
+        pa.Table: The bars with the columns of INTRADAY_BRONZE_SCHEMA plus
+        the date of their partition.
+    """
+    if not os.path.isdir(os.path.join(root, f"interval={interval}")):
+        schema = INTRADAY_BRONZE_SCHEMA.append(pa.field("date", pa.string()))
+        return schema.empty_table()
+
+    dataset = ds.dataset(
+        root,
+        format="parquet",
+        partitioning=INTRADAY_PARTITIONING,
+        exclude_invalid_files=True,
+        ignore_prefixes=["."],
+    )
+    condition = (
+        (ds.field("interval") == interval)
+        & (ds.field("date") >= start)
+        & (ds.field("date") <= end)
+    )
+    if symbols is not None:
+        condition &= ds.field("symbol").isin(symbols)
+
+    return dataset.to_table(
+        columns=INTRADAY_BRONZE_SCHEMA.names + ["date"], filter=condition
+    )
+
+
+def create_intraday_file(
+    date: str,
+    symbols: List[str],
+    provider: StockDataProvider,
+    interval: str = INTRADAY_INTERVAL,
+    scheduler: Optional[FetchScheduler] = None,
+) -> Optional[str]:
+    """
+    Fetch the intraday bars of the symbols for a date and write them to
+    their partition.
+
+    The bars are fetched through the scheduler, one request per symbol, so
+    they are charged to the daily quota of the provider and no batch is
+    started once it runs out.
+
+    Args:
+        date (str): The date of the bars, in 'YYYY-MM-DD' format.
+        symbols (List[str]): The stock symbols for which bars are retrieved.
+        provider (StockDataProvider): Provider of the intraday bars.
+        interval (str): Bar interval, e.g. '5min'.
+        scheduler (Optional[FetchScheduler]): Scheduler of the fetches, by
+            default one with the priorities of the symbols.
+
+    Returns:
+        Optional[str]: Path of the written file, or None if no bar was
+        retrieved for the date (e.g. a market holiday).
+    """
+    if scheduler is None:
+        scheduler = FetchScheduler(symbol_priorities(symbols))
+    records: List[Dict[str, Any]] = scheduler.fetch(
+        "intraday",
+        symbols,
+        provider,
+        lambda batch: provider.fetch_intraday_records(batch, date, interval),
+        "symbol",
+        cost=len,
+    )
+    if not records:
+        print(f"No {interval} bars retrieved for the date {date}.")
+        return None
+
+    df = pd.DataFrame.from_records(records, columns=INTRADAY_COLUMNS)
+    return write_intraday_bars(df, date, interval)
@@ -1,77 +1,182 @@
 import os
-from typing import List
+from typing import Any, Dict, List, Optional
 import pandas as pd
-from airflow.exceptions import AirflowException
-from bronze.api_data_downloader import (
-    create_stock_table,
-    create_daily_stock_prices_table,
+import pyarrow as pa
+from airflow.exceptions import AirflowException, AirflowSkipException
+from bronze.api_data_downloader import DAILY_STOCK_PRICES_COLUMNS, STOCK_COLUMNS
+from bronze.compaction import bronze_source, read_bronze
+from bronze.fetch_scheduler import FetchScheduler, symbol_priorities
+from bronze.providers import StockDataProvider
+from utils.parquet import (
+    DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    STOCK_BRONZE_SCHEMA,
+    bronze_path,
+    to_arrow_table,
+    write_parquet,
 )
-from utils.config import DIR_PATH
+
+
+def merge_with_bronze(
+    df: pd.DataFrame, table_name: str, date: str, schema: pa.Schema, keys: List[str]
+) -> pd.DataFrame:
+    """
+    Add the rows of the existing bronze file of a date to the rows of a
+    catch-up run; the rows fetched again replace the existing ones.
+
+    Args:
+        df (pd.DataFrame): Rows fetched by the catch-up run.
+        table_name (str): Name of the bronze table.
+        date (str): The date of the bronze file.
+        schema (pa.Schema): Declared schema of the bronze table.
+        keys (List[str]): Columns identifying a row.
+
+    Returns:
+        pd.DataFrame: The merged rows.
+    """
+    tables: List[pa.Table] = [to_arrow_table(df, schema)]
+    if os.path.exists(bronze_source(table_name, date)):
+        existing: pa.Table = read_bronze(table_name, date, schema=schema)
+        tables.insert(0, existing.select(schema.names).cast(schema))
+
+    return pa.concat_tables(tables).to_pandas().drop_duplicates(keys, keep="last")
 
 
 def parquet_create(
-    date: str, stock_symbols: List[str], api_key_alpha: str, api_key_finnhub: str
-) -> None:
+    date: str,
+    stock_symbols: List[str],
+    price_provider: StockDataProvider,
+    profile_provider: StockDataProvider,
+    scheduler: Optional[FetchScheduler] = None,
+    merge: bool = False,
+    profile_symbols: Optional[List[str]] = None,
+) -> FetchScheduler:
     """
     Creates Parquet files for daily stock prices and stock profiles.
 
+    The symbols are fetched through a FetchScheduler, by priority and within
+    the deadline and quota of the run; the files hold whatever was fetched,
+    and the outcome of every symbol is kept in the scheduler. A dataset the
+    deadline or the quota left entirely for the catch-up run does not fail
+    the run: the other file is still written and the downstream stages are
+    skipped until the catch-up loads the date.
+
     Args:
         date (str): The date for which the data is retrieved, in 'YYYY-MM-DD' format.
         stock_symbols (List[str]): A list of stock symbols to retrieve data for.
-        api_key_alpha (str): The Alpha Vantage API key.
-        api_key_finnhub (str): The Finnhub API key.
+        price_provider (StockDataProvider): Provider of the daily stock prices.
+        profile_provider (StockDataProvider): Provider of the stock profiles.
+        scheduler (Optional[FetchScheduler]): Scheduler of the fetches, by
+            default one without deadline nor quota.
+        merge (bool): Whether the rows are added to the existing files of the
+            date, as a catch-up run does, instead of replacing them.
+        profile_symbols (Optional[List[str]]): Symbols whose profile is
+            retrieved, by default the same as the prices.
+
+    Returns:
+        FetchScheduler: The scheduler, holding the outcome of every symbol.
 
     Raises:
+        AirflowSkipException: If the deadline or the quota deferred a whole
+            dataset to the catch-up run.
         AirflowException: If no valid data is retrieved for the given symbols.
     """
-    # Create DataFrame for daily stock prices
-    daily_stock_prices_table: pd.DataFrame = pd.concat(
-        [
-            create_daily_stock_prices_table(symbol, date, api_key_alpha)
-            for symbol in stock_symbols
-        ],
-        ignore_index=True,
+    if profile_symbols is None:
+        profile_symbols = stock_symbols
+    if scheduler is None:
+        scheduler = FetchScheduler(
+            symbol_priorities(sorted(set(stock_symbols) | set(profile_symbols)))
+        )
+
+    # Collect the daily stock prices records and build a single DataFrame
+    daily_stock_prices_records: List[Dict[str, Any]] = scheduler.fetch(
+        "prices",
+        stock_symbols,
+        price_provider,
+        lambda symbols: price_provider.fetch_daily_stock_prices_records(
+            symbols, date
+        ),
+        "stock_symbol",
+    )
+    daily_stock_prices_table: pd.DataFrame = pd.DataFrame.from_records(
+        daily_stock_prices_records, columns=DAILY_STOCK_PRICES_COLUMNS
     )
 
     # Check if the DataFrame is empty
-    if daily_stock_prices_table.empty:
+    if (
+        daily_stock_prices_table.empty
+        and not merge
+        and not scheduler.deferred("prices")
+    ):
         raise ValueError(
             "Failed to retrieve daily stock prices for the provided symbols."
         )
 
-    # Create DataFrame for stock profiles
-    stock_table: pd.DataFrame = pd.concat(
-        [create_stock_table(symbol, api_key_finnhub) for symbol in stock_symbols],
-        ignore_index=True,
+    # Collect the stock profile records and build a single DataFrame
+    stock_records: List[Dict[str, Any]] = scheduler.fetch(
+        "profiles",
+        profile_symbols,
+        profile_provider,
+        profile_provider.fetch_stock_records,
+        "symbol",
+    )
+    stock_table: pd.DataFrame = pd.DataFrame.from_records(
+        stock_records, columns=STOCK_COLUMNS
     )
 
     # Check if the DataFrame is empty
-    if stock_table.empty:
+    if stock_table.empty and not merge and not scheduler.deferred("profiles"):
         raise ValueError(
             "Failed to retrieve stock profile information for the provided symbols."
         )
 
+    if merge:
+        daily_stock_prices_table = merge_with_bronze(
+            daily_stock_prices_table,
+            "daily_stock_prices_table",
+            date,
+            DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+            ["stock_symbol", "date"],
+        )
+        stock_table = merge_with_bronze(
+            stock_table, "stock_table", date, STOCK_BRONZE_SCHEMA, ["symbol"]
+        )
+
+    # Datasets left entirely for the catch-up run, which writes their files
+    deferred: List[str] = [
+        dataset
+        for dataset, table in [
+            ("prices", daily_stock_prices_table), ("profiles", stock_table)
+        ]
+        if table.empty and not merge and scheduler.deferred(dataset)
+    ]
+
     # Validate that daily_stock_prices_table DataFrame have data
     # before saving to Parquet files
-    if daily_stock_prices_table.empty:
+    if daily_stock_prices_table.empty and "prices" not in deferred:
         raise AirflowException(
             "No valid data was retrieved from the API. Cancel the DAG."
         )
 
     # Save daily stock prices DataFrame to a Parquet file
-
-    daily_stock_prices_file: str = os.path.join(
-        DIR_PATH,
-        "bronze",
-        "data",
-        f"daily_stock_prices_table_{date}_bronze.parquet",
-    )
-    daily_stock_prices_table.to_parquet(daily_stock_prices_file, index=False)
-    print(f"File '{daily_stock_prices_file}' created successfully.")
+    if "prices" not in deferred:
+        daily_stock_prices_file: str = bronze_path("daily_stock_prices_table", date)
+        write_parquet(
+            daily_stock_prices_table,
+            daily_stock_prices_file,
+            DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+        )
+        print(f"File '{daily_stock_prices_file}' created successfully.")
 
     # Save stock profile DataFrame to a Parquet file
-    stock_table_file: str = os.path.join(
-        DIR_PATH, "bronze", "data", f"stock_table_{date}_bronze.parquet"
-    )
-    stock_table.to_parquet(stock_table_file, index=False)
-    print(f"File '{stock_table_file}' created successfully.")
+    if "profiles" not in deferred:
+        stock_table_file: str = bronze_path("stock_table", date)
+        write_parquet(stock_table, stock_table_file, STOCK_BRONZE_SCHEMA)
+        print(f"File '{stock_table_file}' created successfully.")
+
+    if deferred:
+        raise AirflowSkipException(
+            f"The {' and '.join(deferred)} of {date} were deferred by the deadline "
+            "or the quota to the catch-up run."
+        )
+
+    return scheduler
@@ -0,0 +1,397 @@
+import json
+import os
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+from bronze import api_data_downloader
+from bronze.api_data_downloader import (
+    parse_bulk_quotes,
+    parse_daily_stock_prices,
+    parse_dividends,
+    parse_intraday_bars,
+    parse_splits,
+    parse_stock_profile,
+)
+from bronze.archive import ResponseArchive
+from utils.config import (
+    ALPHA_VANTAGE_BULK_QUOTES,
+    ALPHA_VANTAGE_BULK_SIZE,
+    API_KEY_ALPHA,
+    API_KEY_FINHUB,
+    FETCH_MODE,
+    PROVIDER_FILES_PATH,
+)
+
+# Requests sent to fetch the corporate actions of a symbol
+CORPORATE_ACTION_REQUESTS: int = 2
+
+
+def get_downloader(fetch_mode: str) -> ModuleType:
+    """
+    Returns the downloader module implementing the given fetch mode.
+
+    Both modules expose fetch_daily_stock_prices_records and fetch_stock_records.
+
+    Args:
+        fetch_mode (str): 'sync' for requests or 'async' for aiohttp.
+
+    Returns:
+        ModuleType: The downloader module.
+
+    Raises:
+        ValueError: If the fetch mode is unknown.
+    """
+    if fetch_mode == "sync":
+        return api_data_downloader
+    if fetch_mode == "async":
+        from bronze import async_api_data_downloader
+
+        return async_api_data_downloader
+
+    raise ValueError(f"Unknown fetch mode '{fetch_mode}'.")
+
+
+class StockDataProvider:
+    """
+    Base class of the sources of bronze data.
+
+    A provider returns records with the layout of DAILY_STOCK_PRICES_COLUMNS
+    and STOCK_COLUMNS for a batch of symbols, using bulk endpoints when it has
+    them. Providers that do not offer one of the datasets raise
+    NotImplementedError.
+
+    Providers calling an API count in `requests_made` every request sent,
+    whichever the dataset, which the FetchScheduler charges to their quota.
+    """
+
+    name: str = ""
+    requests_made: int = 0
+
+    def request_cost(self, symbols: List[str]) -> int:
+        """
+        Estimate the API requests needed to fetch the symbols, so a batch is
+        not started without the quota to pay for it.
+
+        Args:
+            symbols (List[str]): The stock symbols to be fetched.
+
+        Returns:
+            int: The number of requests, one per symbol by default.
+        """
+        return len(symbols)
+
+    def fetch_daily_stock_prices_records(
+        self, symbols: List[str], date: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the daily stock prices of the symbols for the date.
+
+        Args:
+            symbols (List[str]): The stock symbols for which prices are retrieved.
+            date (str): The date for which prices are retrieved, in 'YYYY-MM-DD'
+                        format.
+
+        Returns:
+            List[Dict[str, Any]]: The records of the symbols with data for the date.
+        """
+        raise NotImplementedError(f"{self.name} does not provide daily prices.")
+
+    def fetch_stock_records(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch the profiles of the symbols.
+
+        Args:
+            symbols (List[str]): The stock symbols for which profiles are retrieved.
+
+        Returns:
+            List[Dict[str, Any]]: The records of the symbols with a profile.
+        """
+        raise NotImplementedError(f"{self.name} does not provide stock profiles.")
+
+    def fetch_intraday_records(
+        self, symbols: List[str], date: str, interval: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the intraday bars of the symbols for the date.
+
+        Args:
+            symbols (List[str]): The stock symbols for which bars are retrieved.
+            date (str): The date for which bars are retrieved, in 'YYYY-MM-DD'
+                        format.
+            interval (str): Bar interval, e.g. '5min'.
+
+        Returns:
+            List[Dict[str, Any]]: The records of the bars, with the layout of
+            INTRADAY_COLUMNS.
+        """
+        raise NotImplementedError(f"{self.name} does not provide intraday bars.")
+
+    def fetch_corporate_action_records(
+        self, symbols: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the whole history of splits and cash dividends of the symbols.
+
+        Args:
+            symbols (List[str]): The stock symbols for which actions are
+                                 retrieved.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: The actions of each symbol that
+            could be retrieved, with the layout of CORPORATE_ACTION_COLUMNS.
+            Symbols whose actions could not be retrieved are left out.
+        """
+        raise NotImplementedError(
+            f"{self.name} does not provide corporate actions."
+        )
+
+
+class AlphaVantageProvider(StockDataProvider):
+    """
+    Daily stock prices from Alpha Vantage.
+
+    With `bulk` enabled, symbols are quoted in batches of `bulk_size` through
+    REALTIME_BULK_QUOTES, and only the symbols missing from the bulk response
+    (e.g. when backfilling a past date) are fetched one by one with
+    TIME_SERIES_DAILY. Raw responses are stored in `archive`, if any.
+    """
+
+    name: str = "alpha_vantage"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = API_KEY_ALPHA,
+        fetch_mode: str = FETCH_MODE,
+        bulk: bool = ALPHA_VANTAGE_BULK_QUOTES,
+        bulk_size: int = ALPHA_VANTAGE_BULK_SIZE,
+        archive: Optional[ResponseArchive] = None,
+    ) -> None:
+        self.api_key: Optional[str] = api_key
+        self.downloader: ModuleType = get_downloader(fetch_mode)
+        self.bulk: bool = bulk
+        self.bulk_size: int = bulk_size
+        self.archive: Optional[ResponseArchive] = archive
+
+    def request_cost(self, symbols: List[str]) -> int:
+        if self.bulk:
+            return -(-len(symbols) // self.bulk_size)
+        return len(symbols)
+
+    def fetch_daily_stock_prices_records(
+        self, symbols: List[str], date: str
+    ) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+
+        if self.bulk:
+            for start in range(0, len(symbols), self.bulk_size):
+                self.requests_made += 1
+                records += api_data_downloader.fetch_bulk_quotes_records(
+                    symbols[start:start + self.bulk_size],
+                    date,
+                    self.api_key,
+                    self.archive,
+                )
+
+        quoted = {record["stock_symbol"] for record in records}
+        missing = [symbol for symbol in symbols if symbol not in quoted]
+        if missing:
+            # One TIME_SERIES_DAILY request per symbol missing from the bulk
+            self.requests_made += len(missing)
+            records += self.downloader.fetch_daily_stock_prices_records(
+                missing, date, self.api_key, self.archive
+            )
+
+        return records
+
+    def fetch_intraday_records(
+        self, symbols: List[str], date: str, interval: str
+    ) -> List[Dict[str, Any]]:
+        # One TIME_SERIES_INTRADAY request per symbol
+        self.requests_made += len(symbols)
+        return api_data_downloader.fetch_intraday_records(
+            symbols, date, interval, self.api_key, self.archive
+        )
+
+    def fetch_corporate_action_records(
+        self, symbols: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        # A SPLITS and a DIVIDENDS request per symbol. A symbol whose SPLITS
+        # request fails is charged for both, so the quota is never overspent
+        self.requests_made += CORPORATE_ACTION_REQUESTS * len(symbols)
+        return api_data_downloader.fetch_corporate_actions_records(
+            symbols, self.api_key, self.archive
+        )
+
+
+class FinnhubProvider(StockDataProvider):
+    """
+    Stock profiles from Finnhub, one request per symbol. Raw responses are
+    stored in `archive`, if any.
+    """
+
+    name: str = "finnhub"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = API_KEY_FINHUB,
+        fetch_mode: str = FETCH_MODE,
+        archive: Optional[ResponseArchive] = None,
+    ) -> None:
+        self.api_key: Optional[str] = api_key
+        self.downloader: ModuleType = get_downloader(fetch_mode)
+        self.archive: Optional[ResponseArchive] = archive
+
+    def fetch_stock_records(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        self.requests_made += len(symbols)
+        return self.downloader.fetch_stock_records(
+            symbols, self.api_key, self.archive
+        )
+
+
+class FileProvider(StockDataProvider):
+    """
+    Reads API payloads stored as JSON files, for tests and replays.
+
+    The files keep the format of the API responses:
+    `{root}/alpha_vantage/{symbol}.json` holds a TIME_SERIES_DAILY response,
+    `{root}/alpha_vantage_intraday/{symbol}.json` a TIME_SERIES_INTRADAY
+    response, `{root}/alpha_vantage_splits/{symbol}.json` and
+    `{root}/alpha_vantage_dividends/{symbol}.json` SPLITS and DIVIDENDS
+    responses and `{root}/finnhub/{symbol}.json` a profile2 response.
+    """
+
+    name: str = "file"
+
+    def __init__(self, root: str = PROVIDER_FILES_PATH) -> None:
+        self.root: str = root
+
+    def _load(self, source: str, symbol: str) -> Optional[Dict]:
+        """
+        Load the payload of a symbol, or None if it was not stored.
+        """
+        path: str = os.path.join(self.root, source, f"{symbol}.json")
+        if not os.path.exists(path):
+            print(f"No {source} file found for symbol {symbol} in {self.root}.")
+            return None
+
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def fetch_daily_stock_prices_records(
+        self, symbols: List[str], date: str
+    ) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        for symbol in symbols:
+            data: Optional[Dict] = self._load("alpha_vantage", symbol)
+            record = parse_daily_stock_prices(data, symbol, date) if data else None
+            if record is not None:
+                records.append(record)
+        return records
+
+    def fetch_stock_records(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        for symbol in symbols:
+            data: Optional[Dict] = self._load("finnhub", symbol)
+            record = parse_stock_profile(data, symbol) if data else None
+            if record is not None:
+                records.append(record)
+        return records
+
+    def fetch_intraday_records(
+        self, symbols: List[str], date: str, interval: str
+    ) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        for symbol in symbols:
+            data: Optional[Dict] = self._load("alpha_vantage_intraday", symbol)
+            if data:
+                records += parse_intraday_bars(data, symbol, date, interval)
+        return records
+
+    def fetch_corporate_action_records(
+        self, symbols: List[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        actions: Dict[str, List[Dict[str, Any]]] = {}
+        for symbol in symbols:
+            splits: Optional[Dict] = self._load("alpha_vantage_splits", symbol)
+            dividends: Optional[Dict] = self._load("alpha_vantage_dividends", symbol)
+            if splits is not None and dividends is not None:
+                actions[symbol] = parse_splits(splits, symbol) + parse_dividends(
+                    dividends, symbol
+                )
+        return actions
+
+
+class ArchiveProvider(FileProvider):
+    """
+    Replays the raw responses of a date stored in a ResponseArchive, without
+    network access.
+    """
+
+    name: str = "archive"
+
+    def __init__(self, archive: ResponseArchive) -> None:
+        self.archive: ResponseArchive = archive
+
+    def _load(self, source: str, symbol: str) -> Optional[Dict]:
+        data: Optional[Dict] = self.archive.get(source, symbol)
+        if data is None:
+            print(f"No {source} response archived for symbol {symbol}.")
+        return data
+
+    def symbols(self) -> List[str]:
+        """
+        List the symbols with an archived response.
+
+        Returns:
+            List[str]: The archived symbols, sorted.
+        """
+        symbols = set(self.archive.keys("alpha_vantage"))
+        symbols.update(self.archive.keys("finnhub"))
+        for key in self.archive.keys("alpha_vantage_bulk"):
+            symbols.update(key.split(","))
+        return sorted(symbols)
+
+    def fetch_daily_stock_prices_records(
+        self, symbols: List[str], date: str
+    ) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = [
+            record
+            for key in self.archive.keys("alpha_vantage_bulk")
+            for record in parse_bulk_quotes(
+                self.archive.get("alpha_vantage_bulk", key), date
+            )
+            if record["stock_symbol"] in symbols
+        ]
+
+        quoted = {record["stock_symbol"] for record in records}
+        missing = [symbol for symbol in symbols if symbol not in quoted]
+        return records + super().fetch_daily_stock_prices_records(missing, date)
+
+
+def get_provider(
+    name: str, archive: Optional[ResponseArchive] = None
+) -> StockDataProvider:
+    """
+    Build the provider registered under the given name.
+
+    Args:
+        name (str): 'alpha_vantage', 'finnhub' or 'file'.
+        archive (Optional[ResponseArchive]): Archive where the API providers
+                                             store their raw responses, if any.
+
+    Returns:
+        StockDataProvider: The provider configured from utils.config.
+
+    Raises:
+        ValueError: If no provider is registered under the name.
+    """
+    providers = {
+        AlphaVantageProvider.name: AlphaVantageProvider,
+        FinnhubProvider.name: FinnhubProvider,
+        FileProvider.name: FileProvider,
+    }
+    if name not in providers:
+        raise ValueError(f"Unknown provider '{name}'.")
+
+    if name == FileProvider.name:
+        return FileProvider()
+    return providers[name](archive=archive)
@@ -0,0 +1,302 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Dict, List, Optional, Tuple
+from bronze.compaction import read_bronze
+from silver.adjustments import factors_at, load_adjustment_factors
+from silver.price_store import PriceStore, price_store_exists
+from utils.config import (
+    QUARANTINE_PATH,
+    VALIDATION_HISTORY_DAYS,
+    VALIDATION_JUMP_SIGMA,
+    VALIDATION_MIN_HISTORY,
+)
+from utils.parquet import (
+    DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    STOCK_BRONZE_SCHEMA,
+    bronze_path,
+    write_parquet,
+)
+
+PRICE_COLUMNS: List[str] = ["open_price", "high_price", "low_price", "close_price"]
+
+
+def quarantine_schema(schema: pa.Schema) -> pa.Schema:
+    """
+    Schema of a quarantine file: the columns of the table and the reasons why
+    each row failed.
+    """
+    return schema.append(pa.field("reasons", pa.string()))
+
+
+def check_schema(table: pa.Table, schema: pa.Schema) -> None:
+    """
+    Check that a table has every column of the declared schema with a type
+    that can be cast to it.
+
+    Args:
+        table (pa.Table): Table read from a bronze file.
+        schema (pa.Schema): Declared schema of the table.
+
+    Raises:
+        ValueError: If a column is missing or cannot be cast.
+    """
+    missing = [name for name in schema.names if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Columns {missing} missing from the batch.")
+
+    try:
+        table.select(schema.names).cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise ValueError(f"Batch does not conform to its schema: {e}") from e
+
+
+def history_stats(
+    symbols: np.ndarray,
+    date: str,
+    store: Optional[PriceStore],
+    days: int = VALIDATION_HISTORY_DAYS,
+    factors_df: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Get the last close and the standard deviation of the daily log returns
+    of each symbol before the date, from the price store.
+
+    The stored closes are unadjusted, so they are first scaled by the
+    adjustment factors into the terms of the batch date; a split between the
+    history and the batch is then not taken for a price jump.
+
+    Args:
+        symbols (np.ndarray): The symbols of the batch.
+        date (str): The date of the batch; only earlier prices are used.
+        store (Optional[PriceStore]): Store of the silver prices, if built.
+        days (int): Number of past prices used per symbol.
+        factors_df (Optional[pd.DataFrame]): Adjustment factor ranges of the
+            symbols, if any.
+
+    Returns:
+        pd.DataFrame: One row per symbol with history, with the columns
+        stock_symbol, last_close, return_std and observations.
+    """
+    rows: List[Tuple[str, float, float, int]] = []
+    if store is not None:
+        before = np.datetime64(date, "D") - np.timedelta64(1, "D")
+        histories = [
+            (symbol, store.history(symbol, end=before)[-days:]) for symbol in symbols
+        ]
+        histories = [(symbol, records) for symbol, records in histories
+                     if len(records) >= 2]
+
+        # Factor of each past close and, last, of the batch date, per symbol
+        factors: Optional[np.ndarray] = None
+        if histories and factors_df is not None and not factors_df.empty:
+            factors, _ = factors_at(
+                np.concatenate([
+                    np.append(records["date"].astype("datetime64[D]"),
+                              np.datetime64(date, "D"))
+                    for _, records in histories
+                ]),
+                np.repeat(
+                    [symbol for symbol, _ in histories],
+                    [len(records) + 1 for _, records in histories],
+                ),
+                factors_df,
+            )
+
+        offset: int = 0
+        for symbol, records in histories:
+            closes = records["close_price"].astype(np.float64)
+            if factors is not None:
+                symbol_factors = factors[offset:offset + len(closes) + 1]
+                closes = closes * symbol_factors[:-1] / symbol_factors[-1]
+                offset += len(closes) + 1
+            returns = np.diff(np.log(closes))
+            rows.append((symbol, float(closes[-1]), float(returns.std()), len(returns)))
+
+    return pd.DataFrame(
+        rows, columns=["stock_symbol", "last_close", "return_std", "observations"]
+    )
+
+
+def flag(reasons: pd.Series, mask: pd.Series, name: str) -> pd.Series:
+    """
+    Append the name of a failed check to the reasons of the masked rows.
+    """
+    return reasons.mask(mask, reasons + name + ";")
+
+
+def validate_daily_stock_prices(
+    df: pd.DataFrame,
+    history_df: Optional[pd.DataFrame] = None,
+    sigma: float = VALIDATION_JUMP_SIGMA,
+    min_history: int = VALIDATION_MIN_HISTORY,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]:
+    """
+    Run the checks of the daily stock prices over a whole batch at once.
+
+    Checks: missing or non-finite values, non-positive prices, high below the
+    open or close, low above the open or close, negative volume, repeated
+    (date, stock_symbol) keys (the last row is kept) and close prices that
+    jump more than `sigma` standard deviations of the symbol's log returns
+    away from its previous close.
+
+    Args:
+        df (pd.DataFrame): Batch with the columns of the bronze table.
+        history_df (Optional[pd.DataFrame]): Output of history_stats; the jump
+            check is skipped for symbols without it.
+        sigma (float): Number of standard deviations of a price jump.
+        min_history (int): Minimum number of past returns of the jump check.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]: The valid rows, the
+        failing rows with their reasons, and the number of rows failing each
+        check.
+    """
+    prices = df[PRICE_COLUMNS].astype(np.float64)
+    volume = df["volume"].astype(np.float64)
+
+    checks: Dict[str, pd.Series] = {
+        "missing_value": (
+            df[["date", "stock_symbol"]].isna().any(axis=1)
+            | ~np.isfinite(prices).all(axis=1)
+            | ~np.isfinite(volume)
+        ),
+        "non_positive_price": (prices <= 0).any(axis=1),
+        "high_below_open_close": (
+            prices["high_price"] < prices[["open_price", "close_price"]].max(axis=1)
+        ),
+        "low_above_open_close": (
+            prices["low_price"] > prices[["open_price", "close_price"]].min(axis=1)
+        ),
+        "negative_volume": volume < 0,
+        "duplicate_key": df.duplicated(["date", "stock_symbol"], keep="last"),
+    }
+
+    jump = pd.Series(False, index=df.index)
+    if history_df is not None and not history_df.empty:
+        history = df[["stock_symbol"]].astype(object).merge(
+            history_df, on="stock_symbol", how="left"
+        ).set_index(df.index)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            move = np.abs(np.log(prices["close_price"] / history["last_close"]))
+        jump = (
+            (history["observations"] >= min_history)
+            & (history["return_std"] > 0)
+            & (move > sigma * history["return_std"])
+        )
+    checks["price_jump"] = jump
+
+    reasons = pd.Series("", index=df.index)
+    for name, mask in checks.items():
+        reasons = flag(reasons, mask.fillna(False).astype(bool), name)
+
+    failed = reasons != ""
+    counts: Dict[str, int] = {name: int(mask.sum()) for name, mask in checks.items()}
+    return (
+        df[~failed].reset_index(drop=True),
+        df[failed].assign(reasons=reasons[failed].str.rstrip(";")).reset_index(
+            drop=True
+        ),
+        counts,
+    )
+
+
+def validate_stock(
+    df: pd.DataFrame,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]:
+    """
+    Run the checks of the stock profiles over a whole batch at once: missing
+    symbol and repeated symbols (the last row is kept).
+
+    Args:
+        df (pd.DataFrame): Batch with the columns of the bronze table.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]: The valid rows, the
+        failing rows with their reasons, and the number of rows failing each
+        check.
+    """
+    symbol = df["symbol"].astype(object)
+    checks: Dict[str, pd.Series] = {
+        "missing_symbol": symbol.isna() | (symbol.fillna("") == ""),
+        "duplicate_key": df.duplicated(["symbol"], keep="last"),
+    }
+
+    reasons = pd.Series("", index=df.index)
+    for name, mask in checks.items():
+        reasons = flag(reasons, mask, name)
+
+    failed = reasons != ""
+    counts: Dict[str, int] = {name: int(mask.sum()) for name, mask in checks.items()}
+    return (
+        df[~failed].reset_index(drop=True),
+        df[failed].assign(reasons=reasons[failed].str.rstrip(";")).reset_index(
+            drop=True
+        ),
+        counts,
+    )
+
+
+def validate_bronze_files(date: str) -> Dict[str, Dict[str, int]]:
+    """
+    Validate the bronze files of a date, write the rows that pass to the
+    validated files read by the silver layer and the failing rows to the
+    quarantine directory.
+
+    Args:
+        date (str): The date of the bronze files.
+
+    Returns:
+        Dict[str, Dict[str, int]]: For each table, the number of rows read,
+        passed and quarantined and the number of rows failing each check.
+
+    Raises:
+        ValueError: If a bronze file does not conform to its schema.
+    """
+    store: Optional[PriceStore] = PriceStore() if price_store_exists() else None
+    report: Dict[str, Dict[str, int]] = {}
+
+    for table_name, schema in (
+        ("daily_stock_prices_table", DAILY_STOCK_PRICES_BRONZE_SCHEMA),
+        ("stock_table", STOCK_BRONZE_SCHEMA),
+    ):
+        table: pa.Table = read_bronze(table_name, date)
+        check_schema(table, schema)
+        df: pd.DataFrame = table.select(schema.names).cast(schema).to_pandas()
+
+        if table_name == "stock_table":
+            valid_df, quarantined_df, counts = validate_stock(df)
+        else:
+            symbols = df["stock_symbol"].astype(object).dropna().unique()
+            valid_df, quarantined_df, counts = validate_daily_stock_prices(
+                df,
+                history_stats(
+                    symbols, date, store, factors_df=load_adjustment_factors()
+                ),
+            )
+
+        write_parquet(valid_df, bronze_path(table_name, date, "validated"), schema)
+
+        quarantine_file: str = os.path.join(
+            QUARANTINE_PATH, f"{table_name}_{date}_quarantine.parquet"
+        )
+        if not quarantined_df.empty:
+            os.makedirs(QUARANTINE_PATH, exist_ok=True)
+            write_parquet(quarantined_df, quarantine_file, quarantine_schema(schema))
+        elif os.path.exists(quarantine_file):
+            # Remove the quarantine of a previous run of the date
+            os.remove(quarantine_file)
+
+        report[table_name] = {
+            "rows": len(df),
+            "passed": len(valid_df),
+            "quarantined": len(quarantined_df),
+            **counts,
+        }
+        print(
+            f"{table_name}: {len(valid_df)} of {len(df)} rows passed validation, "
+            f"{len(quarantined_df)} quarantined. Failed checks: {counts}"
+        )
+
+    return report
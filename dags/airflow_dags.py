@@ -1,16 +1,91 @@
 import os
 import sys
 from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
 from airflow import DAG
-from airflow.operators.python import PythonOperator
+from airflow.operators.python import PythonOperator, ShortCircuitOperator
+from airflow.operators.trigger_dagrun import TriggerDagRunOperator
 from airflow.utils.dates import days_ago
 
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from tasks.run_bronze import run_bronze  # noqa: E402
-from tasks.run_silver import run_silver  # noqa: E402
-from tasks.run_gold import run_gold  # noqa: E402
+
+# The task modules import pandas, SQLAlchemy and the project configuration,
+# so they are imported when a task runs rather than every time the scheduler
+# parses this file.
+def run_bronze(**context: Any) -> None:
+    from tasks.run_bronze import run_bronze as task
+
+    return task(**context)
+
+
+def run_corporate_actions(**context: Any) -> int:
+    from tasks.run_corporate_actions import run_corporate_actions as task
+
+    return task(**context)
+
+
+def is_market_open(**context: Any) -> bool:
+    from tasks.run_bronze import is_market_open as check
+
+    return check(**context)
+
+
+def has_missed_symbols(**context: Any) -> bool:
+    from tasks.run_bronze import has_missed_symbols as check
+
+    return check(**context)
+
+
+def run_validation(**context: Any) -> Dict[str, Dict[str, int]]:
+    from tasks.run_validation import run_validation as task
+
+    return task(**context)
+
+
+def run_silver(**context: Any) -> None:
+    from tasks.run_silver import run_silver as task
+
+    return task(**context)
+
+
+def run_gold(**context: Any) -> None:
+    from tasks.run_gold import run_gold as task
+
+    return task(**context)
+
+
+def run_cdc_export(**context: Any) -> Optional[int]:
+    from tasks.run_cdc_export import run_cdc_export as task
+
+    return task(**context)
+
+
+def run_compaction(**context: Any) -> Dict[str, Dict[str, int]]:
+    from tasks.run_compaction import run_compaction as task
+
+    return task(**context)
+
+
+def run_intraday(**context: Any) -> Optional[int]:
+    from tasks.run_intraday import run_intraday as task
+
+    return task(**context)
+
+
+def for_catch_up_date(task: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Run a task for the date given in the configuration of the catch-up run,
+    instead of the logical date of the run.
+    """
+
+    def run(**context: Any) -> Any:
+        return task(**{**context, "ds": context["dag_run"].conf["date"]})
+
+    run.__name__ = task.__name__
+    return run
+
 
 # Default arguments for the DAG
 default_args = {
@@ -32,6 +107,12 @@ with DAG(
     catchup=True,
 ) as dag:
 
+    # Skip every task of the run on weekends and market holidays
+    trading_day_check = ShortCircuitOperator(
+        task_id="trading_day_check",
+        python_callable=is_market_open,
+    )
+
     # Task to extract data from the API and generate Parquet files (Bronze layer)
     bronze_task = PythonOperator(
         task_id="bronze_run",
@@ -39,6 +120,20 @@ with DAG(
         provide_context=True,  # Allows passing context if needed in the function
     )
 
+    # Task to fetch the splits and dividends and update the adjustment factors
+    corporate_actions_task = PythonOperator(
+        task_id="corporate_actions_run",
+        python_callable=run_corporate_actions,
+        provide_context=True,
+    )
+
+    # Task to validate the bronze files and quarantine the failing rows
+    validation_task = PythonOperator(
+        task_id="validation_run",
+        python_callable=run_validation,
+        provide_context=True,
+    )
+
     # Task to load Parquet files into Redshift (Silver layer)
     silver_task = PythonOperator(
         task_id="silver_run",
@@ -53,5 +148,101 @@ with DAG(
         provide_context=True,
     )
 
+    # Task to export the rows changed by the run for downstream consumers
+    cdc_export_task = PythonOperator(
+        task_id="cdc_export_run",
+        python_callable=run_cdc_export,
+        provide_context=True,
+    )
+
+    # Task to compact the bronze files of the closed months
+    compaction_task = PythonOperator(
+        task_id="compaction_run",
+        python_callable=run_compaction,
+        provide_context=True,
+    )
+
     # Define task execution sequence
-    bronze_task >> silver_task >> gold_task
+    (
+        trading_day_check
+        >> bronze_task
+        >> corporate_actions_task
+        >> validation_task
+        >> silver_task
+        >> gold_task
+        >> cdc_export_task
+        >> compaction_task
+    )
+
+    # Schedule a catch-up run if the deadline or the quota left symbols behind,
+    # also when the bronze task was skipped or failed because of them
+    missed_symbols_check = ShortCircuitOperator(
+        task_id="missed_symbols_check",
+        python_callable=has_missed_symbols,
+        trigger_rule="all_done",
+    )
+    catch_up_trigger = TriggerDagRunOperator(
+        task_id="catch_up_trigger",
+        trigger_dag_id="stock_price_catch_up_dags",
+        conf={"date": "{{ ds }}", "catch_up": True},
+    )
+    bronze_task >> missed_symbols_check >> catch_up_trigger
+
+# Catch-up runs fetch only the symbols a daily run missed and load them
+# through the same stages for that date. The bronze task is retried hourly,
+# so a provider quota that ran out has time to reset
+with DAG(
+    dag_id="stock_price_catch_up_dags",
+    default_args={
+        **default_args,
+        "retries": 3,
+        "retry_delay": timedelta(minutes=60),
+    },
+    description="DAG to fetch and load the symbols missed by a daily run",
+    schedule_interval=None,
+    start_date=days_ago(1),
+    catchup=False,
+    max_active_runs=1,
+) as catch_up_dag:
+
+    catch_up_tasks = [
+        PythonOperator(
+            task_id=f"{name}_run",
+            python_callable=for_catch_up_date(task),
+            provide_context=True,
+        )
+        for name, task in (
+            ("bronze", run_bronze),
+            ("validation", run_validation),
+            ("silver", run_silver),
+            ("gold", run_gold),
+            ("cdc_export", run_cdc_export),
+        )
+    ]
+    for upstream, downstream in zip(catch_up_tasks, catch_up_tasks[1:]):
+        upstream >> downstream
+
+# Intraday bars are ingested and loaded by their own DAG, so a slow intraday
+# fetch never delays the daily layers
+with DAG(
+    dag_id="intraday_stock_price_dags",
+    default_args=default_args,
+    description="DAG to ingest intraday stock bars and load them into Redshift",
+    schedule_interval="0 0 * * 2-6",
+    start_date=days_ago(1),
+    catchup=True,
+) as intraday_dag:
+
+    # Task to fetch the intraday bars, store their partition and load them
+    intraday_task = PythonOperator(
+        task_id="intraday_run",
+        python_callable=run_intraday,
+        provide_context=True,
+    )
+
+    # Skip the intraday fetch on weekends and market holidays
+    intraday_trading_day_check = ShortCircuitOperator(
+        task_id="trading_day_check",
+        python_callable=is_market_open,
+    )
+    intraday_trading_day_check >> intraday_task
@@ -1,39 +1,185 @@
 import pandas as pd
-from sqlalchemy import text
-from sqlalchemy.engine import Engine
-from utils.config import REDSHIFT_SCHEMA
+from typing import Iterable, Iterator, List, Optional
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from utils.config import GOLD_MEMORY_LIMIT_MB, GOLD_STREAM_ROWS, REDSHIFT_SCHEMA
+from utils.database import bulk_insert, stage_keys, stream_query
 
+PRICE_COLUMNS: List[str] = [
+    "id_transaction", "date", "symbol", "open_price", "high_price",
+    "low_price", "close_price", "volume"
+]
+# The attribute columns and the copies made while computing them take about
+# this many times the memory of the prices they are computed from
+ATTRIBUTE_MEMORY_FACTOR: int = 3
+# Prices of a symbol the volume moving average is computed over
+VOLUME_WINDOW: int = 5
 
-def calculate_stock_attributes(engine: Engine, date: str) -> None:
+
+def add_attributes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the attributes of each price and drop the price columns.
+
+    The volume change and moving average are computed within each symbol,
+    over its prices in date order, so they only depend on the previous
+    prices of the symbol, whichever path reads them.
+
+    Args:
+        df (pd.DataFrame): Prices with the PRICE_COLUMNS.
+
+    Returns:
+        pd.DataFrame: The id_transaction, date, symbol and attributes of each
+        price, sorted by symbol and date.
+    """
+    df = df.sort_values(
+        ["symbol", "date"],
+        key=lambda column: pd.to_datetime(column) if column.name == "date" else column,
+        kind="mergesort",
+    ).reset_index(drop=True)
+    df['price_range'] = df['high_price'] - df['low_price']
+    df['price_change'] = df['close_price'] - df['open_price']
+    df['price_change_pct'] = (df['price_change'] / df['open_price']) * 100
+    df['high_open_diff'] = df['high_price'] - df['open_price']
+    df['low_close_diff'] = df['low_price'] - df['close_price']
+    volume = df.groupby("symbol", sort=False)['volume']
+    df['volume_change'] = volume.pct_change().fillna(0)
+    df['volume_moving_avg'] = (
+        volume.rolling(window=VOLUME_WINDOW).mean()
+        .reset_index(level=0, drop=True).fillna(0)
+    )
+    df['price_volatility'] = df['price_range'] / df['close_price']
+
+    # Drop unnecessary columns
+    return df.drop(columns=[
+        "open_price", "high_price", "low_price",
+        "close_price", "volume"
+    ])
+
+
+def history_query(symbol_filter: str = "") -> str:
+    """
+    Build the query of the last VOLUME_WINDOW - 1 prices of each symbol before
+    :start_date, which the attributes of its prices from that date depend on.
+    The rows are flagged with in_range = 0, so they are dropped once the
+    attributes are computed.
+
+    Args:
+        symbol_filter (str): Extra condition on the symbols read.
+
+    Returns:
+        str: The SELECT statement, taking :start_date and :window.
+    """
+    columns: str = ", ".join(PRICE_COLUMNS)
+    return f"""
+        SELECT {columns}, 0 AS in_range
+        FROM (
+            SELECT {columns}, ROW_NUMBER() OVER (
+                PARTITION BY symbol ORDER BY date DESC
+            ) AS position
+            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+            WHERE date < :start_date {symbol_filter}
+        ) AS history
+        WHERE position < :window
+    """
+
+
+def drop_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep the attributes of the prices flagged with in_range = 1.
+    """
+    return df[df["in_range"] == 1].drop(columns="in_range").reset_index(drop=True)
+
+
+def daily_attributes(connection: Connection, prices_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the attributes of the prices of a run, reading the previous
+    prices of their symbols from the warehouse, so they match the attributes
+    a recompute of the same dates writes.
+
+    Args:
+        connection (Connection): Connection the previous prices are read from.
+        prices_df (pd.DataFrame): Prices with the PRICE_COLUMNS.
+
+    Returns:
+        pd.DataFrame: The attributes of the prices, as add_attributes.
+    """
+    query = text(
+        history_query("AND symbol IN :symbols")
+    ).bindparams(bindparam("symbols", expanding=True))
+    history_df: pd.DataFrame = pd.read_sql_query(
+        query,
+        connection,
+        params={
+            "start_date": min(pd.to_datetime(prices_df["date"])).date(),
+            "window": VOLUME_WINDOW,
+            "symbols": prices_df["symbol"].unique().tolist(),
+        },
+    )
+    df = pd.concat(
+        [history_df, prices_df[PRICE_COLUMNS].assign(in_range=1)], ignore_index=True
+    )
+    return drop_history(add_attributes(df))
+
+
+def replace_attributes(connection: Connection, df: pd.DataFrame) -> None:
+    """
+    Replace the attributes of the given id_transaction in the
+    'atributes_stock_prices_table' through the bulk insert path.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        df (pd.DataFrame): Output of add_attributes.
+    """
+    # Delete existing rows for the same id_transaction before inserting,
+    # joining against the staged keys instead of a literal IN list
+    stage_keys(
+        connection, df, 'staged_id_transactions', {'id_transaction': 'BIGINT'}
+    )
+    connection.execute(text(f"""
+        DELETE FROM "{REDSHIFT_SCHEMA}".atributes_stock_prices_table
+        USING staged_id_transactions
+        WHERE atributes_stock_prices_table.id_transaction
+            = staged_id_transactions.id_transaction
+    """))
+    connection.execute(text("DROP TABLE staged_id_transactions"))
+
+    # Insert calculated attributes into the 'gold' table
+    bulk_insert(connection, df, 'atributes_stock_prices_table')
+
+
+def calculate_stock_attributes(
+    engine: Engine, date: str, prices_df: Optional[pd.DataFrame] = None
+) -> None:
     """
     Calculate financial attributes for the 'gold' layer based on stock data and insert
     the results into the 'atributes_stock_prices_table' in the database. If data for
-    a given id_transaction already exists, it will be overwritten.
+    a given id_transaction already exists, it will be overwritten. The previous
+    prices of each symbol are read from the warehouse for its volume change
+    and moving average.
 
     Args:
         engine (Engine): SQLAlchemy engine for database connection.
         date (str): Date for which the stock attributes are calculated.
+        prices_df (Optional[pd.DataFrame]): Prices loaded by the silver layer with
+            their id_transaction. If not provided, the prices of the date are read
+            from the 'daily_stock_prices_table'.
 
     Raises:
         Exception: If there is an issue with the database query or insertion.
     """
 
     with engine.begin() as connection:
-        # Read data from daily_stock_prices_table for the given date
-        query = text(f"""
-            SELECT
-                id_transaction,
-                date,
-                symbol,
-                open_price,
-                high_price,
-                low_price,
-                close_price,
-                volume
-            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
-            WHERE date = :date
-        """)
-        df = pd.read_sql_query(query, connection, params={'date': date})
+        if prices_df is not None and not prices_df.empty:
+            # Reuse the id_transaction mapping returned by the silver load
+            df = prices_df[PRICE_COLUMNS].astype({"symbol": object})
+        else:
+            # Read data from daily_stock_prices_table for the given date
+            query = text(f"""
+                SELECT {", ".join(PRICE_COLUMNS)}
+                FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+                WHERE date = :date
+            """)
+            df = pd.read_sql_query(query, connection, params={'date': date})
 
         if df.empty:
             # If no data is available for the given date
@@ -41,36 +187,138 @@ def calculate_stock_attributes(engine: Engine, date: str) -> None:
             return
 
         # Calculate attributes for the stock data
-        df['price_range'] = df['high_price'] - df['low_price']
-        df['price_change'] = df['close_price'] - df['open_price']
-        df['price_change_pct'] = (df['price_change'] / df['open_price']) * 100
-        df['high_open_diff'] = df['high_price'] - df['open_price']
-        df['low_close_diff'] = df['low_price'] - df['close_price']
-        df['volume_change'] = df['volume'].pct_change().fillna(0)
-        df['volume_moving_avg'] = df['volume'].rolling(window=5).mean().fillna(0)
-        df['price_volatility'] = df['price_range'] / df['close_price']
-
-        # Drop unnecessary columns
-        df = df.drop(columns=[
-            "open_price", "high_price", "low_price",
-            "close_price", "volume"
-        ])
-
-        # Delete existing rows for the same id_transaction before inserting
-        delete_query = text(f"""
-            DELETE FROM "{REDSHIFT_SCHEMA}".atributes_stock_prices_table
-            WHERE id_transaction IN :id_transactions
-        """)
-        connection.execute(delete_query, {'id_transactions': tuple(df['id_transaction'].tolist())})  # noqa: E501
-
-        # Insert calculated attributes into the 'gold' table
-        df.to_sql(
-            'atributes_stock_prices_table',
-            con=connection,
-            schema=f'{REDSHIFT_SCHEMA}',
-            if_exists='append',
-            index=False
-        )
+        replace_attributes(connection, daily_attributes(connection, df))
 
         # Log the successful insertion of calculated attributes
         print(f"Attributes calculated and successfully inserted for the date {date}.")  # noqa: E501
+
+
+def symbol_batches(
+    chunks: Iterable[pd.DataFrame], memory_limit_mb: float = GOLD_MEMORY_LIMIT_MB
+) -> Iterator[pd.DataFrame]:
+    """
+    Regroup chunks of prices sorted by symbol into batches of whole symbols,
+    each small enough to be processed within the memory limit.
+
+    The rows of the last symbol of the chunks read so far may continue in the
+    next chunk, so they are held back until the symbol is complete. A single
+    symbol larger than the limit is kept whole.
+
+    Args:
+        chunks (Iterable[pd.DataFrame]): Prices sorted by symbol and date.
+        memory_limit_mb (float): Ceiling of the memory of a batch and of its
+            attributes.
+
+    Returns:
+        Iterator[pd.DataFrame]: Batches of prices of whole symbols, in order.
+    """
+    limit: float = memory_limit_mb * 1024 ** 2 / ATTRIBUTE_MEMORY_FACTOR
+    pending: List[pd.DataFrame] = []
+    pending_bytes: int = 0
+
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        pending.append(chunk)
+        pending_bytes += int(chunk.memory_usage(deep=True).sum())
+        if pending_bytes < limit:
+            continue
+
+        df = pd.concat(pending, ignore_index=True)
+        is_complete = df["symbol"] != df["symbol"].iloc[-1]
+        if is_complete.any():
+            yield df[is_complete]
+            df = df[~is_complete].reset_index(drop=True)
+        pending = [df]
+        pending_bytes = int(df.memory_usage(deep=True).sum())
+
+    if pending:
+        df = pd.concat(pending, ignore_index=True)
+        if not df.empty:
+            yield df
+
+
+def iter_attribute_batches(
+    connection: Connection,
+    start_date: str,
+    end_date: str,
+    memory_limit_mb: float = GOLD_MEMORY_LIMIT_MB,
+    chunksize: int = GOLD_STREAM_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the prices of a date range from the warehouse, sorted by symbol and
+    date, and calculate their attributes per batch of whole symbols.
+
+    Args:
+        connection (Connection): Connection the prices are streamed from.
+        start_date (str): First date of the range.
+        end_date (str): Last date of the range.
+        memory_limit_mb (float): Ceiling of the memory of a batch.
+        chunksize (int): Rows per round trip of the server-side cursor.
+
+    Returns:
+        Iterator[pd.DataFrame]: The attributes of each batch of symbols, as
+        add_attributes. The previous prices of each symbol are read along
+        with the range, so the first dates get the same attributes as the
+        daily run wrote.
+    """
+    query = text(f"""
+        {history_query()}
+        UNION ALL
+        SELECT {", ".join(PRICE_COLUMNS)}, 1 AS in_range
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+        WHERE date BETWEEN :start_date AND :end_date
+        ORDER BY symbol, date
+    """)
+    chunks = stream_query(
+        connection,
+        query,
+        {"start_date": start_date, "end_date": end_date, "window": VOLUME_WINDOW},
+        chunksize,
+    )
+    for df in symbol_batches(chunks, memory_limit_mb):
+        attributes_df: pd.DataFrame = drop_history(add_attributes(df))
+        # Symbols without prices in the range only bring their history
+        if not attributes_df.empty:
+            yield attributes_df
+
+
+def recompute_stock_attributes(
+    engine: Engine,
+    start_date: str,
+    end_date: str,
+    memory_limit_mb: float = GOLD_MEMORY_LIMIT_MB,
+    chunksize: int = GOLD_STREAM_ROWS,
+) -> int:
+    """
+    Recompute the attributes of every price of a date range with bounded
+    memory, e.g. over years of history for thousands of symbols.
+
+    The prices are streamed through a server-side cursor and each batch of
+    whole symbols is written in its own transaction, so memory does not grow
+    with the range. The replace is keyed by id_transaction, so a recompute
+    that fails midway is completed by running it again.
+
+    Args:
+        engine (Engine): SQLAlchemy engine for database connection.
+        start_date (str): First date of the range.
+        end_date (str): Last date of the range.
+        memory_limit_mb (float): Ceiling of the memory of a batch.
+        chunksize (int): Rows per round trip of the server-side cursor.
+
+    Returns:
+        int: Number of attribute rows written.
+    """
+    rows: int = 0
+    with engine.connect() as read_connection:
+        for df in iter_attribute_batches(
+            read_connection, start_date, end_date, memory_limit_mb, chunksize
+        ):
+            with engine.begin() as connection:
+                replace_attributes(connection, df)
+            rows += len(df)
+            print(f"Attributes of {df['symbol'].nunique()} symbols recomputed "
+                  f"({rows} rows so far).")
+
+    print(f"Attributes recomputed from {start_date} to {end_date}: {rows} rows.")
+    return rows
@@ -0,0 +1,264 @@
+import datetime
+import json
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from gold.rollups import PERIOD_TABLES, SECTOR_TABLE, period_start
+from utils.config import CDC_EXPORT_PATH, REDSHIFT_SCHEMA
+from utils.parquet import write_table
+
+WATERMARK_FILE: str = "watermark.json"
+# Gold tables whose rows are replaced for the dates of the loaded prices, and
+# for the date of the run only
+DATE_TABLES: List[str] = [
+    "atributes_stock_prices_table",
+    SECTOR_TABLE,
+]
+RUN_DATE_TABLES: List[str] = [
+    "daily_log_returns_table",
+    "correlation_matrix_table",
+    "stock_beta_table",
+]
+# Silver tables whose rows of the affected symbols are replaced as a whole by
+# the corporate actions task of the run
+SYMBOL_TABLES: List[str] = [
+    "corporate_actions_table",
+    "adjustment_factor_table",
+]
+
+
+def batch_path(watermark: int, root: str = CDC_EXPORT_PATH) -> str:
+    """
+    Directory of the batch of a watermark, zero-padded so the batches sort in
+    the order they were written.
+    """
+    return os.path.join(root, f"batch_{watermark:012d}")
+
+
+def load_watermark(root: str = CDC_EXPORT_PATH) -> Dict[str, Any]:
+    """
+    Load the watermark file of the export: the last watermark and the tables
+    and row counts of every batch.
+
+    Args:
+        root (str): Directory of the export.
+
+    Returns:
+        Dict[str, Any]: The watermark file, or an empty export.
+    """
+    path: str = os.path.join(root, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return {"watermark": 0, "batches": []}
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def next_watermark(root: str = CDC_EXPORT_PATH) -> int:
+    """
+    Get the watermark of the next batch. It is also above every batch
+    directory on disk, so a batch renamed into place right before a crash is
+    never overwritten.
+    """
+    written: List[int] = [
+        int(name.split("_")[1])
+        for name in (os.listdir(root) if os.path.isdir(root) else [])
+        if name.startswith("batch_") and name.split("_")[1].isdigit()
+    ]
+    return max([load_watermark(root)["watermark"]] + written) + 1
+
+
+def read_rows(
+    connection: Connection, table_name: str, column: str, values: List[Any]
+) -> pd.DataFrame:
+    """
+    Read the rows of a table whose key column takes one of the given values.
+    """
+    query = text(
+        f"""
+        SELECT *
+        FROM "{REDSHIFT_SCHEMA}".{table_name}
+        WHERE {column} IN :values
+        """
+    ).bindparams(bindparam("values", expanding=True))
+    return pd.read_sql_query(query, connection, params={"values": values})
+
+
+def read_range(
+    connection: Connection, table_name: str, column: str, start: str, end: str
+) -> pd.DataFrame:
+    """
+    Read the rows of a table whose key column is within a range (inclusive).
+    """
+    query = text(
+        f"""
+        SELECT *
+        FROM "{REDSHIFT_SCHEMA}".{table_name}
+        WHERE {column} BETWEEN :start AND :end
+        """
+    )
+    return pd.read_sql_query(
+        query, connection, params={"start": start, "end": end}
+    )
+
+
+def collect_changes(
+    engine: Engine,
+    date: str,
+    prices_df: Optional[pd.DataFrame],
+    stock_df: Optional[pd.DataFrame],
+    adjusted_symbols: Optional[List[str]] = None,
+    recompute: Optional[Tuple[str, str]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Collect the rows inserted or changed by the run of a date: the prices
+    loaded by silver, every SCD2 version of the symbols whose profile changed
+    (so the closed and the new version both reach the consumers), the
+    corporate actions and adjustment factors of the symbols whose actions
+    changed, and the gold rows of the dates and periods the run replaced,
+    including the attributes of a recomputed range. Only those keys are read
+    from the warehouse.
+
+    Args:
+        engine (Engine): SQLAlchemy engine for database connection.
+        date (str): Date of the run.
+        prices_df (Optional[pd.DataFrame]): Prices loaded by the silver run.
+        stock_df (Optional[pd.DataFrame]): Stock profiles changed by the run.
+        adjusted_symbols (Optional[List[str]]): Symbols whose corporate actions
+            and factors the run replaced.
+        recompute (Optional[Tuple[str, str]]): Range of dates whose attributes
+            the gold run recomputed.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The changed rows of each table with changes,
+        with an `_op` column: 'insert' for new facts, 'upsert' for rows that
+        replace the rows with the same key, and 'replace' for rows that
+        replace every row of their symbol.
+    """
+    changes: Dict[str, pd.DataFrame] = {}
+    if prices_df is not None and not prices_df.empty:
+        changes["daily_stock_prices_table"] = prices_df.assign(_op="insert")
+
+    touched = pd.Series(
+        prices_df["date"].unique()
+        if prices_df is not None and not prices_df.empty
+        else [date]
+    )
+    keys: Dict[str, tuple] = {
+        table: ("date", list(pd.to_datetime(touched).dt.date)) for table in DATE_TABLES
+    }
+    keys.update({
+        table: ("date", [datetime.date.fromisoformat(date)])
+        for table in RUN_DATE_TABLES
+    })
+    keys.update({
+        table: ("period_start", list(period_start(touched, freq).unique()))
+        for table, freq in PERIOD_TABLES.items()
+    })
+    if stock_df is not None and not stock_df.empty:
+        keys["stock_table"] = ("symbol", list(stock_df["symbol"].astype(object)))
+    if adjusted_symbols:
+        keys.update({table: ("symbol", adjusted_symbols) for table in SYMBOL_TABLES})
+
+    with engine.connect() as connection:
+        for table_name, (column, values) in keys.items():
+            df: pd.DataFrame = read_rows(connection, table_name, column, values)
+            if table_name == "atributes_stock_prices_table" and recompute:
+                df = pd.concat(
+                    [df, read_range(connection, table_name, "date", *recompute)],
+                    ignore_index=True,
+                ).drop_duplicates(ignore_index=True)
+            if not df.empty:
+                changes[table_name] = df.assign(
+                    _op="replace" if table_name in SYMBOL_TABLES else "upsert"
+                )
+    return changes
+
+
+def write_batch(
+    changes: Dict[str, pd.DataFrame], date: str, root: str = CDC_EXPORT_PATH
+) -> Optional[int]:
+    """
+    Write the changes of a run as a new batch with the next watermark: one
+    Parquet file per table, each row tagged with the watermark.
+
+    The batch is written to a temporary directory and renamed into place
+    before the watermark file is replaced, so consumers that read the batches
+    up to the published watermark never see a partial batch.
+
+    Args:
+        changes (Dict[str, pd.DataFrame]): Output of collect_changes.
+        date (str): Date of the run.
+        root (str): Directory of the export.
+
+    Returns:
+        Optional[int]: The watermark of the batch, or None if there were no
+        changes to export.
+    """
+    if not changes:
+        print(f"No changes to export for {date}.")
+        return None
+
+    watermark: int = next_watermark(root)
+    final_path: str = batch_path(watermark, root)
+    tmp_path: str = f"{final_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    counts: Dict[str, int] = {}
+    for table_name, df in sorted(changes.items()):
+        table = pa.Table.from_pandas(
+            df.assign(_watermark=watermark), preserve_index=False
+        )
+        write_table(table, os.path.join(tmp_path, f"{table_name}.parquet"))
+        counts[table_name] = len(df)
+    os.rename(tmp_path, final_path)
+
+    # Publish the batch by replacing the watermark file atomically
+    export: Dict[str, Any] = load_watermark(root)
+    export["watermark"] = watermark
+    export["batches"].append({
+        "watermark": watermark,
+        "date": date,
+        "exported_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "tables": counts,
+    })
+    path: str = os.path.join(root, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(export, file, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+    print(f"Batch {watermark} of {date} exported: {counts}")
+    return watermark
+
+
+def read_batches(
+    after: int, root: str = CDC_EXPORT_PATH
+) -> Dict[str, pd.DataFrame]:
+    """
+    Read the changes of every published batch after a watermark, as a
+    consumer syncing incrementally does.
+
+    Args:
+        after (int): Last watermark the consumer applied.
+        root (str): Directory of the export.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The changed rows of each table, in watermark
+        order.
+    """
+    frames: Dict[str, List[pd.DataFrame]] = {}
+    for batch in load_watermark(root)["batches"]:
+        if batch["watermark"] <= after:
+            continue
+        for table_name in batch["tables"]:
+            frames.setdefault(table_name, []).append(pd.read_parquet(os.path.join(
+                batch_path(batch["watermark"], root), f"{table_name}.parquet"
+            )))
+    return {
+        table_name: pd.concat(dfs, ignore_index=True)
+        for table_name, dfs in frames.items()
+    }
@@ -0,0 +1,287 @@
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional, Tuple
+from sqlalchemy.engine import Engine
+from silver.adjustments import factors_at, load_adjustment_factors
+from silver.price_store import PriceStore, price_store_exists
+from utils.config import (
+    BENCHMARK_SYMBOL,
+    CROSS_SECTIONAL_BLOCK_SIZE,
+    CROSS_SECTIONAL_MIN_OBSERVATIONS,
+    CROSS_SECTIONAL_WINDOW,
+)
+from utils.database import bulk_insert, delete_rows
+
+# Gold tables of the cross-sectional analytics
+RETURNS_TABLE: str = "daily_log_returns_table"
+CORRELATION_TABLE: str = "correlation_matrix_table"
+BETA_TABLE: str = "stock_beta_table"
+
+
+def build_price_matrix(
+    dates: np.ndarray, symbols: np.ndarray, close_prices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scatter long-format close prices into a date × symbol float32 matrix,
+    without pivoting through pandas.
+
+    Args:
+        dates (np.ndarray): Date of each price.
+        symbols (np.ndarray): Symbol of each price.
+        close_prices (np.ndarray): Close price of each row.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The sorted distinct dates,
+        the sorted distinct symbols and the matrix of close prices, with NaN
+        where a symbol has no price for a date.
+    """
+    date_index, date_rows = np.unique(dates, return_inverse=True)
+    symbol_index, symbol_columns = np.unique(symbols, return_inverse=True)
+
+    matrix = np.full((len(date_index), len(symbol_index)), np.nan, dtype=np.float32)
+    matrix[date_rows, symbol_columns] = close_prices
+    return date_index, symbol_index, matrix
+
+
+def log_returns(matrix: np.ndarray) -> np.ndarray:
+    """
+    Compute the daily log returns of a date × symbol price matrix.
+
+    Args:
+        matrix (np.ndarray): Close prices, one row per date.
+
+    Returns:
+        np.ndarray: One row less than the prices, NaN where a price is missing
+        or not positive.
+    """
+    positive = np.where(matrix > 0, matrix, np.nan)
+    return np.diff(np.log(positive), axis=0)
+
+
+def pairwise_moments(
+    returns_a: np.ndarray, returns_b: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute the covariance of every column of `returns_a` with every column of
+    `returns_b` over the dates where both have a return, as matrix products.
+
+    Args:
+        returns_a (np.ndarray): Returns of a block of symbols, one row per date.
+        returns_b (np.ndarray): Returns of another block of symbols.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The covariances,
+        the variances of the columns of `returns_a` and of `returns_b` over
+        the common dates, and the number of common dates of each pair.
+    """
+    mask_a = (~np.isnan(returns_a)).astype(np.float32)
+    mask_b = (~np.isnan(returns_b)).astype(np.float32)
+    values_a = np.nan_to_num(returns_a)
+    values_b = np.nan_to_num(returns_b)
+
+    observations = mask_a.T @ mask_b
+    sum_a = values_a.T @ mask_b
+    sum_b = mask_a.T @ values_b
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = ((values_a.T @ values_b) - sum_a * sum_b / observations) / (
+            observations - 1
+        )
+        variance_a = ((values_a ** 2).T @ mask_b - sum_a ** 2 / observations) / (
+            observations - 1
+        )
+        variance_b = (mask_a.T @ values_b ** 2 - sum_b ** 2 / observations) / (
+            observations - 1
+        )
+
+    return covariance, variance_a, variance_b, observations
+
+
+def iter_correlation_blocks(
+    date: datetime.date,
+    symbols: np.ndarray,
+    returns: np.ndarray,
+    block_size: int = CROSS_SECTIONAL_BLOCK_SIZE,
+    min_observations: int = CROSS_SECTIONAL_MIN_OBSERVATIONS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Compute the correlation and covariance matrix of the returns one block of
+    symbols at a time, so memory is bounded by the block size rather than the
+    number of symbols.
+
+    Args:
+        date (datetime.date): Date the matrix is computed for.
+        symbols (np.ndarray): Symbol of each column of the returns.
+        returns (np.ndarray): Returns over the window, one row per date.
+        block_size (int): Number of symbols per block.
+        min_observations (int): Minimum number of common returns of a pair.
+
+    Yields:
+        pd.DataFrame: The pairs (symbol_a < symbol_b) of a block with their
+        correlation, covariance and number of observations.
+    """
+    n_symbols = len(symbols)
+    for start_a in range(0, n_symbols, block_size):
+        end_a = min(start_a + block_size, n_symbols)
+        for start_b in range(start_a, n_symbols, block_size):
+            end_b = min(start_b + block_size, n_symbols)
+            covariance, variance_a, variance_b, observations = pairwise_moments(
+                returns[:, start_a:end_a], returns[:, start_b:end_b]
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                correlation = covariance / np.sqrt(variance_a * variance_b)
+
+            rows, columns = np.nonzero(
+                (observations >= min_observations) & np.isfinite(correlation)
+            )
+            rows, columns = rows + start_a, columns + start_b
+            upper = rows < columns
+            rows, columns = rows[upper], columns[upper]
+            if len(rows) == 0:
+                continue
+
+            yield pd.DataFrame({
+                "date": date,
+                "symbol_a": symbols[rows],
+                "symbol_b": symbols[columns],
+                "correlation": correlation[rows - start_a, columns - start_b],
+                "covariance": covariance[rows - start_a, columns - start_b],
+                "observations": observations[rows - start_a, columns - start_b]
+                .astype(np.int32),
+            })
+
+
+def calculate_betas(
+    date: datetime.date,
+    symbols: np.ndarray,
+    returns: np.ndarray,
+    benchmark: str = BENCHMARK_SYMBOL,
+    min_observations: int = CROSS_SECTIONAL_MIN_OBSERVATIONS,
+) -> pd.DataFrame:
+    """
+    Compute the beta and correlation of every symbol against the benchmark.
+
+    Args:
+        date (datetime.date): Date the betas are computed for.
+        symbols (np.ndarray): Symbol of each column of the returns.
+        returns (np.ndarray): Returns over the window, one row per date.
+        benchmark (str): Symbol the betas are measured against.
+        min_observations (int): Minimum number of common returns with the
+            benchmark.
+
+    Returns:
+        pd.DataFrame: One row per symbol with its beta, or an empty DataFrame
+        if the benchmark has no prices.
+    """
+    position = np.searchsorted(symbols, benchmark)
+    if position == len(symbols) or symbols[position] != benchmark:
+        print(f"Benchmark symbol {benchmark} not found, betas not calculated.")
+        return pd.DataFrame()
+
+    covariance, variance, variance_benchmark, observations = pairwise_moments(
+        returns, returns[:, [position]]
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (covariance / variance_benchmark)[:, 0]
+        correlation = (covariance / np.sqrt(variance * variance_benchmark))[:, 0]
+
+    valid = (observations[:, 0] >= min_observations) & np.isfinite(beta)
+    return pd.DataFrame({
+        "date": date,
+        "symbol": symbols[valid],
+        "benchmark": benchmark,
+        "beta": beta[valid],
+        "correlation": correlation[valid],
+        "observations": observations[valid, 0].astype(np.int32),
+    })
+
+
+def read_close_prices(
+    date: str, window: int = CROSS_SECTIONAL_WINDOW
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Read the close prices of the last `window` + 1 dates up to `date` from the
+    memory-mapped price store built by the silver layer, adjusted for the
+    splits and dividends of each symbol.
+
+    Args:
+        date (str): Last date of the window.
+        window (int): Number of daily returns of the window.
+
+    Returns:
+        Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]: The date, symbol
+        and close price of each record of the window, or None if the store
+        has no prices up to the date.
+    """
+    if not price_store_exists():
+        return None
+
+    store = PriceStore()
+    dates: np.ndarray = store.dates()
+    dates = dates[dates <= np.datetime64(date)]
+    if len(dates) == 0:
+        return None
+
+    window_dates, symbols, closes = store.window(dates[-(window + 1):][0].item(), date)
+    price_factor, _ = factors_at(window_dates, symbols, load_adjustment_factors())
+    return window_dates, symbols, closes * price_factor
+
+
+def calculate_cross_sectional(
+    engine: Engine, date: str, window: int = CROSS_SECTIONAL_WINDOW
+) -> None:
+    """
+    Compute the log returns of the date and the trailing correlation,
+    covariance and beta matrices of all symbols from the price store, and
+    replace their rows for the date in the gold tables.
+
+    Args:
+        engine (Engine): SQLAlchemy engine for database connection.
+        date (str): Date for which the analytics are calculated.
+        window (int): Number of daily returns of the trailing window.
+
+    Raises:
+        Exception: If there is an issue with the database insertion.
+    """
+    close_prices = read_close_prices(date, window)
+    if close_prices is None:
+        print(f"No silver prices available for the date {date}.")
+        return
+
+    date_index, symbols, matrix = build_price_matrix(*close_prices)
+    run_date = datetime.date.fromisoformat(date)
+    if len(date_index) < 2 or date_index[-1] != np.datetime64(run_date):
+        print(f"Not enough prices to calculate returns for the date {date}.")
+        return
+
+    returns = log_returns(matrix)
+    last_returns = returns[-1]
+    has_return = ~np.isnan(last_returns)
+    returns_df = pd.DataFrame({
+        "date": run_date,
+        "symbol": symbols[has_return],
+        "log_return": last_returns[has_return],
+    })
+    keys_df = pd.DataFrame({"date": [run_date]})
+
+    with engine.begin() as connection:
+        delete_rows(connection, keys_df, RETURNS_TABLE, {"date": "DATE"})
+        bulk_insert(connection, returns_df, RETURNS_TABLE)
+
+        # Insert the correlation matrix block by block
+        delete_rows(connection, keys_df, CORRELATION_TABLE, {"date": "DATE"})
+        pairs: int = 0
+        for block_df in iter_correlation_blocks(run_date, symbols, returns):
+            bulk_insert(connection, block_df, CORRELATION_TABLE)
+            pairs += len(block_df)
+
+        betas_df = calculate_betas(run_date, symbols, returns)
+        delete_rows(connection, keys_df, BETA_TABLE, {"date": "DATE"})
+        if not betas_df.empty:
+            bulk_insert(connection, betas_df, BETA_TABLE)
+
+    print(
+        f"Cross-sectional analytics of {len(symbols)} symbols and "
+        f"{pairs} pairs inserted for the date {date}."
+    )
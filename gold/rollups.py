@@ -0,0 +1,170 @@
+import pandas as pd
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from silver.point_in_time import profiles_as_of, read_profile_versions
+from utils.config import REDSHIFT_SCHEMA
+from utils.database import replace_rows
+
+# Rollup tables of daily stock prices and the pandas period they aggregate
+PERIOD_TABLES: Dict[str, str] = {
+    "weekly_stock_prices_table": "W-SUN",
+    "monthly_stock_prices_table": "M",
+}
+SECTOR_TABLE: str = "sector_daily_stock_prices_table"
+
+
+def period_start(dates: pd.Series, freq: str) -> pd.Series:
+    """
+    Get the first day of the period each date belongs to.
+
+    Args:
+        dates (pd.Series): Dates as strings, dates or timestamps.
+        freq (str): Pandas period frequency, e.g. 'W-SUN' for weeks starting
+            on Monday or 'M' for months.
+
+    Returns:
+        pd.Series: The start date of the period of each date.
+    """
+    return pd.to_datetime(dates).dt.to_period(freq).dt.start_time.dt.date
+
+
+def aggregate_ohlcv(prices_df: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Aggregate daily stock prices into OHLCV rows per symbol and period.
+
+    Args:
+        prices_df (pd.DataFrame): Daily prices with the columns of
+            daily_stock_prices_table.
+        freq (str): Pandas period frequency of the rollup.
+
+    Returns:
+        pd.DataFrame: One row per (period_start, symbol) with the open of the
+        first day, the high and low of the period, the close of the last day,
+        the total volume and the number of trading days.
+    """
+    df = prices_df.assign(
+        date=pd.to_datetime(prices_df["date"]),
+        period_start=period_start(prices_df["date"], freq),
+    ).sort_values("date")
+
+    return df.groupby(["period_start", "symbol"], as_index=False, sort=True).agg(
+        open_price=("open_price", "first"),
+        high_price=("high_price", "max"),
+        low_price=("low_price", "min"),
+        close_price=("close_price", "last"),
+        volume=("volume", "sum"),
+        trading_days=("date", "nunique"),
+    )
+
+
+def aggregate_sectors(prices_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate daily stock prices per date and industry.
+
+    Args:
+        prices_df (pd.DataFrame): Daily prices with the industry of the
+            stock_table version valid on each date.
+
+    Returns:
+        pd.DataFrame: One row per (date, industry) with the number of symbols,
+        the total volume, the average close price and the average daily price
+        change in percent.
+    """
+    df = prices_df.assign(
+        industry=prices_df["industry"].fillna("Unknown"),
+        price_change_pct=(
+            (prices_df["close_price"] - prices_df["open_price"])
+            / prices_df["open_price"] * 100
+        ),
+    )
+
+    return df.groupby(["date", "industry"], as_index=False, sort=True).agg(
+        symbol_count=("symbol", "nunique"),
+        total_volume=("volume", "sum"),
+        avg_close_price=("close_price", "mean"),
+        avg_price_change_pct=("price_change_pct", "mean"),
+    )
+
+
+def update_rollups(
+    engine: Engine, date: str, prices_df: Optional[pd.DataFrame] = None
+) -> None:
+    """
+    Recompute the weekly, monthly and sector rollups for the periods touched
+    by a run and replace their rows in the database.
+
+    Only the prices of the touched weeks and months are read, so the cost of
+    a run does not grow with the size of daily_stock_prices_table.
+
+    Args:
+        engine (Engine): SQLAlchemy engine for database connection.
+        date (str): Date of the run.
+        prices_df (Optional[pd.DataFrame]): Prices loaded by the silver layer.
+            Their dates are the touched dates; defaults to the date of the run.
+
+    Raises:
+        Exception: If there is an issue with the database query or insertion.
+    """
+    touched = pd.Series(
+        prices_df["date"].unique()
+        if prices_df is not None and not prices_df.empty
+        else [date]
+    )
+    touched_dates = set(pd.to_datetime(touched).dt.date)
+    periods: Dict[str, pd.Series] = {
+        table: pd.Series(period_start(touched, freq).unique())
+        for table, freq in PERIOD_TABLES.items()
+    }
+
+    # Read the prices of every touched period in a single query
+    start_date = min(starts.min() for starts in periods.values())
+    end_date = max(
+        pd.to_datetime(touched).dt.to_period(freq).dt.end_time.max().date()
+        for freq in PERIOD_TABLES.values()
+    )
+
+    with engine.begin() as connection:
+        query = text(f"""
+            SELECT
+                p.date,
+                p.symbol,
+                p.open_price,
+                p.high_price,
+                p.low_price,
+                p.close_price,
+                p.volume
+            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table p
+            WHERE p.date BETWEEN :start_date AND :end_date
+        """)
+        df = pd.read_sql_query(
+            query,
+            connection,
+            params={"start_date": start_date, "end_date": end_date},
+        )
+        df["date"] = pd.to_datetime(df["date"]).dt.date
+
+        # Group each price by the industry of the profile valid on its date
+        versions_df = read_profile_versions(connection, list(df["symbol"].unique()))
+        df = profiles_as_of(df, versions_df, ["industry"])
+
+        for table, freq in PERIOD_TABLES.items():
+            starts = periods[table]
+            in_periods = period_start(df["date"], freq).isin(starts)
+            replace_rows(
+                connection,
+                aggregate_ohlcv(df[in_periods], freq),
+                table,
+                {"period_start": "DATE"},
+                keys_df=pd.DataFrame({"period_start": starts}),
+            )
+            print(f"{table} updated for {len(starts)} periods.")
+
+        replace_rows(
+            connection,
+            aggregate_sectors(df[df["date"].isin(touched_dates)]),
+            SECTOR_TABLE,
+            {"date": "DATE"},
+            keys_df=pd.DataFrame({"date": sorted(touched_dates)}),
+        )
+        print(f"{SECTOR_TABLE} updated for {len(touched_dates)} dates.")
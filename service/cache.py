@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from utils.config import GOLD_REFRESH_MARKER, QUERY_CACHE_SIZE, QUERY_CACHE_TTL
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of query results with a time to live.
+
+    Every entry expires `ttl` seconds after it was computed, the least
+    recently used entry is evicted beyond `max_entries`, and the whole cache
+    is cleared when the gold refresh marker written by the gold task changes,
+    so no result computed before a refresh is served after it.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_CACHE_SIZE,
+        ttl: float = QUERY_CACHE_TTL,
+        marker: str = GOLD_REFRESH_MARKER,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.marker: str = marker
+        self.clock: Callable[[], float] = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+        self.version: Optional[int] = self.marker_version()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def marker_version(self) -> Optional[int]:
+        """
+        Get the modification time of the gold refresh marker, if it exists.
+        """
+        try:
+            return os.stat(self.marker).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get the cached result of a key, or compute and cache it.
+
+        The result is computed outside the lock, so a slow query does not
+        block the requests served from the cache.
+
+        Args:
+            key (Hashable): Key of the query, e.g. its endpoint and parameters.
+            compute (Callable[[], Any]): Function running the query.
+
+        Returns:
+            Any: The cached or computed result.
+        """
+        with self.lock:
+            version = self.marker_version()
+            if version != self.version:
+                self.entries.clear()
+                self.version = version
+
+            entry = self.entries.get(key)
+            if entry is not None and self.clock() - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        computed_at: float = self.clock()
+        result: Any = compute()
+
+        with self.lock:
+            # Skip results computed before a refresh that happened meanwhile
+            if self.marker_version() == version:
+                self.entries[key] = (computed_at, result)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """
+        Drop every cached result.
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of entries, hits and misses of the cache.
+        """
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,304 @@
+import datetime
+import json
+import urllib.parse
+import pandas as pd
+import pyarrow as pa
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from service.cache import ResultCache
+from utils.config import (
+    QUERY_POOL_SIZE,
+    QUERY_SERVICE_HOST,
+    QUERY_SERVICE_PORT,
+    REDSHIFT_SCHEMA,
+)
+from utils.database import create_redshift_engine
+
+ARROW_CONTENT_TYPE: str = "application/vnd.apache.arrow.stream"
+JSON_CONTENT_TYPE: str = "application/json"
+# Maximum number of days returned by the history endpoints
+MAX_DAYS: int = 3660
+
+Params = Dict[str, str]
+
+
+class QueryError(ValueError):
+    """
+    Invalid request parameters, answered with a 400 status.
+    """
+
+
+def date_param(params: Params, name: str, default: Optional[str] = None) -> str:
+    """
+    Get a date parameter in 'YYYY-MM-DD' format.
+
+    Raises:
+        QueryError: If the parameter is missing or is not a date.
+    """
+    value: Optional[str] = params.get(name, default)
+    if value is None:
+        raise QueryError(f"Missing parameter '{name}'.")
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError as e:
+        raise QueryError(f"Parameter '{name}' must be a YYYY-MM-DD date.") from e
+
+
+def symbols_param(params: Params, name: str = "symbols") -> List[str]:
+    """
+    Get a comma-separated list of symbols, upper-cased.
+
+    Raises:
+        QueryError: If the parameter is missing or empty.
+    """
+    symbols: List[str] = [
+        symbol.strip().upper()
+        for symbol in params.get(name, "").split(",")
+        if symbol.strip()
+    ]
+    if not symbols:
+        raise QueryError(f"Missing parameter '{name}'.")
+    return symbols
+
+
+def days_param(params: Params) -> int:
+    """
+    Get the number of days of a history endpoint.
+
+    Raises:
+        QueryError: If the parameter is not an integer between 1 and MAX_DAYS.
+    """
+    try:
+        days = int(params.get("days", "30"))
+    except ValueError as e:
+        raise QueryError("Parameter 'days' must be an integer.") from e
+    if not 1 <= days <= MAX_DAYS:
+        raise QueryError(f"Parameter 'days' must be between 1 and {MAX_DAYS}.")
+    return days
+
+
+def latest_close(connection: Connection, params: Params) -> pd.DataFrame:
+    """
+    Latest close price of each of the `symbols`.
+    """
+    query = text(
+        f"""
+        SELECT prices.symbol, prices.date, prices.close_price
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table AS prices
+        JOIN (
+            SELECT symbol, MAX(date) AS date
+            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+            WHERE symbol IN :symbols
+            GROUP BY symbol
+        ) AS latest
+            ON prices.symbol = latest.symbol AND prices.date = latest.date
+        ORDER BY prices.symbol
+        """
+    ).bindparams(bindparam("symbols", expanding=True))
+    return pd.read_sql_query(
+        query, connection, params={"symbols": symbols_param(params)}
+    )
+
+
+def prices(connection: Connection, params: Params) -> pd.DataFrame:
+    """
+    Daily prices of a `symbol` between `start` and `end` (inclusive).
+    """
+    query = text(
+        f"""
+        SELECT date, symbol, open_price, high_price, low_price, close_price, volume
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+        WHERE symbol = :symbol AND date BETWEEN :start AND :end
+        ORDER BY date
+        """
+    )
+    return pd.read_sql_query(query, connection, params={
+        "symbol": symbols_param(params, "symbol")[0],
+        "start": date_param(params, "start"),
+        "end": date_param(params, "end", datetime.date.today().isoformat()),
+    })
+
+
+def attributes(connection: Connection, params: Params) -> pd.DataFrame:
+    """
+    Attributes of the last `days` dates of a `symbol`, optionally up to `end`.
+    """
+    query = text(
+        f"""
+        SELECT date, symbol, price_range, price_change, price_change_pct,
+            high_open_diff, low_close_diff, volume_change, volume_moving_avg,
+            price_volatility
+        FROM "{REDSHIFT_SCHEMA}".atributes_stock_prices_table
+        WHERE symbol = :symbol AND date <= :end
+        ORDER BY date DESC
+        LIMIT :days
+        """
+    )
+    df = pd.read_sql_query(query, connection, params={
+        "symbol": symbols_param(params, "symbol")[0],
+        "end": date_param(params, "end", datetime.date.today().isoformat()),
+        "days": days_param(params),
+    })
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def betas(connection: Connection, params: Params) -> pd.DataFrame:
+    """
+    Betas of every symbol, or of the `symbols`, for a `date`.
+    """
+    condition: str = "AND symbol IN :symbols" if "symbols" in params else ""
+    query = text(
+        f"""
+        SELECT date, symbol, benchmark, beta, correlation, observations
+        FROM "{REDSHIFT_SCHEMA}".stock_beta_table
+        WHERE date = :date {condition}
+        ORDER BY symbol
+        """
+    )
+    query_params: Dict[str, Any] = {"date": date_param(params, "date")}
+    if condition:
+        query = query.bindparams(bindparam("symbols", expanding=True))
+        query_params["symbols"] = symbols_param(params)
+    return pd.read_sql_query(query, connection, params=query_params)
+
+
+# Endpoints of the service and the query each one runs
+ENDPOINTS: Dict[str, Callable[[Connection, Params], pd.DataFrame]] = {
+    "/latest_close": latest_close,
+    "/prices": prices,
+    "/attributes": attributes,
+    "/betas": betas,
+}
+
+
+def to_json(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a result as a JSON array of records, with ISO dates and null
+    for missing values.
+    """
+    records: List[Dict[str, Any]] = (
+        df.astype(object).where(df.notna(), None).to_dict("records")
+    )
+    return json.dumps(records, default=str).encode("utf-8")
+
+
+def to_arrow(df: pd.DataFrame) -> bytes:
+    """
+    Serialize a result as an Arrow IPC stream.
+    """
+    table: pa.Table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class QueryService:
+    """
+    Read-only queries over the gold tables, served from a result cache and
+    run on the pooled connections of a single engine.
+    """
+
+    def __init__(
+        self, engine: Engine, cache: Optional[ResultCache] = None
+    ) -> None:
+        self.engine: Engine = engine
+        self.cache: ResultCache = cache if cache is not None else ResultCache()
+
+    def query(self, endpoint: str, params: Params) -> pd.DataFrame:
+        """
+        Get the result of an endpoint, from the cache if it is fresh.
+
+        Args:
+            endpoint (str): Path of the endpoint, e.g. '/prices'.
+            params (Params): Query string parameters of the request.
+
+        Returns:
+            pd.DataFrame: The result of the query.
+        """
+        def compute() -> pd.DataFrame:
+            with self.engine.connect() as connection:
+                return ENDPOINTS[endpoint](connection, params)
+
+        key: Tuple = (endpoint, tuple(sorted(params.items())))
+        return self.cache.get_or_compute(key, compute)
+
+    def handle(self, path: str, accept: str = "") -> Tuple[int, str, bytes]:
+        """
+        Answer a GET request.
+
+        The result is returned as JSON, or as an Arrow IPC stream with
+        `format=arrow` or an Accept header asking for it.
+
+        Args:
+            path (str): Path and query string of the request.
+            accept (str): Accept header of the request.
+
+        Returns:
+            Tuple[int, str, bytes]: The status, content type and body.
+        """
+        url = urllib.parse.urlsplit(path)
+        params: Params = dict(urllib.parse.parse_qsl(url.query))
+        output_format: str = params.pop("format", "")
+
+        if url.path == "/health":
+            return 200, JSON_CONTENT_TYPE, json.dumps(self.cache.stats()).encode()
+        if url.path not in ENDPOINTS:
+            return 404, JSON_CONTENT_TYPE, b'{"error": "Unknown endpoint."}'
+
+        try:
+            df: pd.DataFrame = self.query(url.path, params)
+        except QueryError as e:
+            return 400, JSON_CONTENT_TYPE, json.dumps({"error": str(e)}).encode()
+        except SQLAlchemyError as e:
+            print(f"Error querying the database: {e}")
+            return 500, JSON_CONTENT_TYPE, b'{"error": "Database error."}'
+
+        if output_format == "arrow" or (
+            not output_format and ARROW_CONTENT_TYPE in accept
+        ):
+            return 200, ARROW_CONTENT_TYPE, to_arrow(df)
+        return 200, JSON_CONTENT_TYPE, to_json(df)
+
+
+def make_handler(service: QueryService) -> type:
+    """
+    Build the HTTP request handler class serving the given service.
+    """
+
+    class QueryHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            status, content_type, body = service.handle(
+                self.path, self.headers.get("Accept", "")
+            )
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return QueryHandler
+
+
+def serve(host: str = QUERY_SERVICE_HOST, port: int = QUERY_SERVICE_PORT) -> None:
+    """
+    Serve the gold tables over HTTP until interrupted, one thread per request.
+
+    Args:
+        host (str): Address the service listens on.
+        port (int): Port the service listens on.
+    """
+    service = QueryService(create_redshift_engine(pool_size=QUERY_POOL_SIZE))
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Query service listening on {host}:{port}.")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,505 @@
+import datetime
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from bronze.api_data_downloader import CORPORATE_ACTION_COLUMNS
+from bronze.fetch_scheduler import FetchScheduler, symbol_priorities
+from bronze.providers import CORPORATE_ACTION_REQUESTS, StockDataProvider
+from sqlalchemy.engine import Connection
+from silver.price_store import PriceStore
+from utils.config import ADJUST_DIVIDENDS, CORPORATE_ACTIONS_PATH
+from utils.database import replace_rows
+from utils.parquet import (
+    ADJUSTMENT_FACTORS_SCHEMA,
+    CORPORATE_ACTIONS_SCHEMA,
+    read_parquet,
+    write_parquet,
+)
+
+ACTIONS_FILE: str = "corporate_actions.parquet"
+FACTORS_FILE: str = "adjustment_factors.parquet"
+# Symbols whose actions and factors the run of a date replaced
+CHANGES_FILE: str = "changed_symbols_{date}.json"
+# Start of the range of the prices before the first action of a symbol
+FIRST_DATE: datetime.date = datetime.date(1900, 1, 1)
+
+
+def load_corporate_actions(root: str = CORPORATE_ACTIONS_PATH) -> pd.DataFrame:
+    """
+    Load the stored corporate actions of every symbol.
+    """
+    path: str = os.path.join(root, ACTIONS_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=CORPORATE_ACTION_COLUMNS)
+    return read_parquet(path, CORPORATE_ACTIONS_SCHEMA).astype(
+        {"symbol": object, "action_type": object}
+    )
+
+
+def load_adjustment_factors(root: str = CORPORATE_ACTIONS_PATH) -> pd.DataFrame:
+    """
+    Load the stored cumulative adjustment factors of every symbol.
+    """
+    path: str = os.path.join(root, FACTORS_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=ADJUSTMENT_FACTORS_SCHEMA.names)
+    return read_parquet(path, ADJUSTMENT_FACTORS_SCHEMA).astype({"symbol": object})
+
+
+def previous_closes(actions_df: pd.DataFrame, store: Optional[PriceStore]) -> pd.Series:
+    """
+    Get the close price of the last trading day before the ex-date of each
+    dividend, from the price store.
+
+    Args:
+        actions_df (pd.DataFrame): Actions with the CORPORATE_ACTION_COLUMNS.
+        store (Optional[PriceStore]): Store of the silver prices, if built.
+
+    Returns:
+        pd.Series: The close price of each dividend, NaN for the splits and
+        for dividends without an earlier price.
+    """
+    closes = pd.Series(np.nan, index=actions_df.index)
+    if store is None:
+        return closes
+
+    dividends = actions_df[actions_df["action_type"] == "dividend"]
+    for index, symbol, ex_date in zip(
+        dividends.index, dividends["symbol"], dividends["ex_date"]
+    ):
+        before = np.datetime64(ex_date, "D") - np.timedelta64(1, "D")
+        close = store.history(symbol, end=before)["close_price"][-1:]
+        if len(close):
+            closes[index] = float(close[0])
+    return closes
+
+
+def action_factors(
+    actions_df: pd.DataFrame,
+    closes: pd.Series,
+    adjust_dividends: bool = ADJUST_DIVIDENDS,
+) -> pd.DataFrame:
+    """
+    Compute the factor each action applies to the prices and volumes before
+    its ex-date: 1 / ratio and ratio for a split, and 1 - amount / previous
+    close for a cash dividend. Actions of a symbol on the same ex-date are
+    combined.
+
+    Args:
+        actions_df (pd.DataFrame): Actions with the CORPORATE_ACTION_COLUMNS.
+        closes (pd.Series): Close before the ex-date of each dividend.
+        adjust_dividends (bool): Whether dividends adjust the prices.
+
+    Returns:
+        pd.DataFrame: One row per symbol and ex-date with its price_factor and
+        volume_factor.
+    """
+    value = actions_df["value"].astype(np.float64)
+    split = (actions_df["action_type"] == "split").to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dividend_factor = 1 - value / closes
+
+    # Dividends without a previous close, or larger than it, are not applied
+    usable = adjust_dividends & (dividend_factor > 0) & (dividend_factor < 1)
+    skipped = int((~split & ~usable).sum())
+    if adjust_dividends and skipped:
+        print(f"{skipped} dividends without a previous close were not applied.")
+
+    factors = pd.DataFrame({
+        "symbol": actions_df["symbol"].astype(object),
+        "ex_date": pd.to_datetime(actions_df["ex_date"]).dt.date,
+        "price_factor": np.where(
+            split, 1 / value, np.where(usable, dividend_factor, 1.0)
+        ),
+        "volume_factor": np.where(split, value, 1.0),
+    })
+    return factors.groupby(["symbol", "ex_date"], as_index=False)[
+        ["price_factor", "volume_factor"]
+    ].prod()
+
+
+def build_adjustment_factors(factors_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn the factors of the actions into cumulative factors per date range:
+    the prices of a symbol before an ex-date are multiplied by the factors of
+    that action and of every later one, so the whole history is expressed in
+    the terms of the latest prices. Prices on or after the last ex-date have
+    no range and a factor of 1.
+
+    Args:
+        factors_df (pd.DataFrame): Output of action_factors.
+
+    Returns:
+        pd.DataFrame: The ranges with the columns of ADJUSTMENT_FACTORS_SCHEMA.
+    """
+    df = factors_df.sort_values(["symbol", "ex_date"]).reset_index(drop=True)
+    reverse = df.iloc[::-1].groupby("symbol")
+    return pd.DataFrame({
+        "symbol": df["symbol"],
+        "start_date": df.groupby("symbol")["ex_date"].shift(1).fillna(FIRST_DATE),
+        "end_date": df["ex_date"],
+        "price_factor": reverse["price_factor"].cumprod().sort_index(),
+        "volume_factor": reverse["volume_factor"].cumprod().sort_index(),
+    })
+
+
+def factors_at(
+    dates: Any, symbols: Any, factors_df: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Look up the cumulative price and volume factors of each (date, symbol)
+    with a single as-of join against the start of the ranges.
+
+    Args:
+        dates (Any): Date of each row.
+        symbols (Any): Symbol of each row.
+        factors_df (pd.DataFrame): Ranges with the ADJUSTMENT_FACTORS_SCHEMA.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The price and volume factor of each row,
+        1 where no range covers the date.
+    """
+    rows = pd.DataFrame({
+        "symbol": np.asarray(symbols, dtype=object),
+        "date": pd.to_datetime(np.asarray(dates)).astype("datetime64[ns]"),
+        "position": np.arange(len(dates)),
+    })
+    if rows.empty or factors_df.empty:
+        return np.ones(len(rows)), np.ones(len(rows))
+
+    ranges = factors_df.astype({"symbol": object}).assign(
+        start_date=pd.to_datetime(factors_df["start_date"]).astype("datetime64[ns]"),
+        end_date=pd.to_datetime(factors_df["end_date"]).astype("datetime64[ns]"),
+    )
+    merged = pd.merge_asof(
+        rows.sort_values("date"),
+        ranges.sort_values("start_date"),
+        left_on="date",
+        right_on="start_date",
+        by="symbol",
+        direction="backward",
+    ).sort_values("position")
+
+    inside = (merged["date"] < merged["end_date"]).to_numpy()
+    return (
+        np.where(inside, merged["price_factor"], 1.0),
+        np.where(inside, merged["volume_factor"], 1.0),
+    )
+
+
+def adjust_prices(
+    df: pd.DataFrame, factors_df: pd.DataFrame, symbol_column: str = "symbol"
+) -> pd.DataFrame:
+    """
+    Adjust the OHLC prices and volumes of a DataFrame of daily prices for the
+    corporate actions after each date.
+
+    Args:
+        df (pd.DataFrame): Prices with a date column and OHLCV columns.
+        factors_df (pd.DataFrame): Ranges with the ADJUSTMENT_FACTORS_SCHEMA.
+        symbol_column (str): Name of the symbol column of the prices.
+
+    Returns:
+        pd.DataFrame: A copy of the prices, adjusted.
+    """
+    price_factor, volume_factor = factors_at(
+        df["date"].to_numpy(), df[symbol_column].to_numpy(), factors_df
+    )
+    adjusted = df.copy()
+    for column in ["open_price", "high_price", "low_price", "close_price"]:
+        adjusted[column] = df[column] * price_factor
+    adjusted["volume"] = df["volume"] * volume_factor
+    return adjusted
+
+
+def fetch_corporate_actions(
+    symbols: List[str],
+    provider: StockDataProvider,
+    scheduler: Optional[FetchScheduler] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch the corporate actions of the symbols through the scheduler, so
+    their requests are charged to the daily quota of the provider and no
+    batch is started once it runs out.
+
+    Args:
+        symbols (List[str]): The stock symbols for which actions are retrieved.
+        provider (StockDataProvider): Provider of the corporate actions.
+        scheduler (Optional[FetchScheduler]): Scheduler of the fetches, by
+            default one with the priorities of the symbols.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The actions of each symbol that could
+        be retrieved, as StockDataProvider.fetch_corporate_action_records.
+        The symbols left by the quota are left out, so their stored factors
+        are kept.
+    """
+    if scheduler is None:
+        scheduler = FetchScheduler(symbol_priorities(symbols))
+    actions: Dict[str, List[Dict[str, Any]]] = {}
+
+    def fetch(batch: List[str]) -> List[Dict[str, Any]]:
+        fetched = provider.fetch_corporate_action_records(batch)
+        actions.update(fetched)
+        # A symbol without actions is fetched all the same
+        return [{"symbol": symbol} for symbol in fetched]
+
+    scheduler.fetch(
+        "corporate_actions",
+        symbols,
+        provider,
+        fetch,
+        "symbol",
+        cost=lambda batch: CORPORATE_ACTION_REQUESTS * len(batch),
+    )
+    return actions
+
+
+def stale_factor_symbols(
+    actions_df: pd.DataFrame,
+    store: Optional[PriceStore],
+    stored_factors: pd.DataFrame,
+    adjust_dividends: bool = ADJUST_DIVIDENDS,
+) -> List[str]:
+    """
+    Find the symbols with dividends whose stored factors differ from those of
+    the closes now in the price store, e.g. a dividend stored without an
+    earlier close, on the first run or before a backfill loaded its prices.
+
+    Args:
+        actions_df (pd.DataFrame): Unchanged actions of the fetched symbols.
+        store (Optional[PriceStore]): Store of the silver prices, if built.
+        stored_factors (pd.DataFrame): The stored factor ranges.
+        adjust_dividends (bool): Whether dividends adjust the prices.
+
+    Returns:
+        List[str]: The symbols whose factors must be recomputed, sorted.
+    """
+    with_dividends = actions_df.loc[
+        actions_df["action_type"] == "dividend", "symbol"
+    ].unique()
+    if store is None or not len(with_dividends):
+        return []
+
+    candidates = actions_df[actions_df["symbol"].isin(with_dividends)].reset_index(
+        drop=True
+    )
+    current = build_adjustment_factors(action_factors(
+        candidates, previous_closes(candidates, store), adjust_dividends
+    ))
+    stale: List[str] = []
+    for symbol, factors in current.groupby("symbol"):
+        stored = stored_factors[stored_factors["symbol"] == symbol]
+        if len(stored) != len(factors) or not np.allclose(
+            stored.sort_values("end_date")[["price_factor", "volume_factor"]]
+            .to_numpy(dtype=np.float64),
+            factors[["price_factor", "volume_factor"]].to_numpy(dtype=np.float64),
+            rtol=1e-9,
+        ):
+            stale.append(symbol)
+    return stale
+
+
+def update_adjustments(
+    actions: Dict[str, List[Dict[str, Any]]],
+    store: Optional[PriceStore],
+    root: str = CORPORATE_ACTIONS_PATH,
+    adjust_dividends: bool = ADJUST_DIVIDENDS,
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+    """
+    Compare freshly fetched corporate actions with the stored ones and
+    recompute the adjustment factors of the symbols whose actions changed,
+    or whose dividends now have a different close before their ex-date in
+    the price store; the factors of every other symbol are kept as stored.
+
+    Args:
+        actions (Dict[str, List[Dict[str, Any]]]): The full history of actions
+            of each fetched symbol.
+        store (Optional[PriceStore]): Store of the silver prices, used for the
+            close before each dividend.
+        root (str): Directory of the stored actions.
+        adjust_dividends (bool): Whether dividends adjust the prices.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, List[str]]: The actions and the
+        factor ranges of the affected symbols, and the affected symbols.
+    """
+    stored_actions = load_corporate_actions(root)
+
+    fetched = pd.DataFrame.from_records(
+        [record for records in actions.values() for record in records],
+        columns=CORPORATE_ACTION_COLUMNS,
+    )
+    fetched["ex_date"] = pd.to_datetime(fetched["ex_date"]).dt.date
+    fetched = fetched.drop_duplicates().sort_values(
+        ["symbol", "ex_date", "action_type"]
+    ).reset_index(drop=True)
+
+    # Symbols whose set of actions differs from the stored one
+    def action_set(df: pd.DataFrame, symbol: str) -> set:
+        rows = df[df["symbol"] == symbol]
+        return set(zip(rows["ex_date"], rows["action_type"], rows["value"].round(6)))
+
+    affected: List[str] = sorted(
+        symbol for symbol in actions
+        if action_set(stored_actions, symbol) != action_set(fetched, symbol)
+    )
+    # A dividend applied with no earlier close has a factor of 1 until its
+    # close is in the store, which its unchanged actions would never show
+    affected = sorted(set(affected) | set(stale_factor_symbols(
+        fetched[~fetched["symbol"].isin(affected)].reset_index(drop=True),
+        store,
+        load_adjustment_factors(root),
+        adjust_dividends,
+    )))
+
+    new_actions = fetched[fetched["symbol"].isin(affected)].reset_index(drop=True)
+    new_factors = build_adjustment_factors(action_factors(
+        new_actions, previous_closes(new_actions, store), adjust_dividends
+    )) if not new_actions.empty else pd.DataFrame(
+        columns=ADJUSTMENT_FACTORS_SCHEMA.names
+    )
+
+    print(f"Corporate actions changed for {len(affected)} symbols: {affected}")
+    return new_actions, new_factors, affected
+
+
+def adjustment_changes_path(date: str, root: str = CORPORATE_ACTIONS_PATH) -> str:
+    """
+    Path of the file holding the symbols whose actions and factors the run of
+    a date replaced.
+    """
+    return os.path.join(root, CHANGES_FILE.format(date=date))
+
+
+def save_adjustment_changes(
+    symbols: List[str], date: str, root: str = CORPORATE_ACTIONS_PATH
+) -> None:
+    """
+    Save the symbols whose actions and factors the run of a date replaced, so
+    the change data export knows which rows to publish.
+
+    Args:
+        symbols (List[str]): The affected symbols.
+        date (str): The date of the run.
+        root (str): Directory of the stored actions and factors.
+    """
+    path: str = adjustment_changes_path(date, root)
+    if not symbols:
+        # A re-run without changes must not export the changes of a prior run
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    os.makedirs(root, exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump({"symbols": sorted(symbols)}, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_adjustment_changes(
+    date: str, root: str = CORPORATE_ACTIONS_PATH
+) -> Optional[List[str]]:
+    """
+    Read the symbols whose actions and factors the run of a date replaced.
+
+    Returns:
+        Optional[List[str]]: The symbols, or None if the run changed none.
+    """
+    path: str = adjustment_changes_path(date, root)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)["symbols"]
+
+
+def save_adjustments(
+    actions_df: pd.DataFrame,
+    factors_df: pd.DataFrame,
+    symbols: List[str],
+    root: str = CORPORATE_ACTIONS_PATH,
+    date: Optional[str] = None,
+) -> None:
+    """
+    Replace the stored actions and factors of the affected symbols, keeping
+    those of every other symbol, and record the affected symbols of the run.
+    It runs after the warehouse load, so a failed load is retried by the next
+    run.
+
+    Args:
+        actions_df (pd.DataFrame): Actions of the affected symbols.
+        factors_df (pd.DataFrame): Factor ranges of the affected symbols.
+        symbols (List[str]): The affected symbols.
+        root (str): Directory of the stored actions and factors.
+        date (Optional[str]): Date of the run, whose changes are recorded for
+            the change data export.
+    """
+    if date is not None:
+        save_adjustment_changes(symbols, date, root)
+    if not symbols:
+        return
+
+    files = [
+        (ACTIONS_FILE, load_corporate_actions(root), actions_df,
+         CORPORATE_ACTIONS_SCHEMA),
+        (FACTORS_FILE, load_adjustment_factors(root), factors_df,
+         ADJUSTMENT_FACTORS_SCHEMA),
+    ]
+    os.makedirs(root, exist_ok=True)
+    for name, stored_df, new_df, schema in files:
+        path: str = os.path.join(root, name)
+        # Written aside and renamed, so readers never see a partial file
+        write_parquet(
+            pd.concat(
+                [
+                    df
+                    for df in (stored_df[~stored_df["symbol"].isin(symbols)], new_df)
+                    if not df.empty
+                ] or [new_df],
+                ignore_index=True,
+            ),
+            f"{path}.tmp",
+            schema,
+        )
+        os.replace(f"{path}.tmp", path)
+
+
+def load_adjustments(
+    connection: Connection,
+    actions_df: pd.DataFrame,
+    factors_df: pd.DataFrame,
+    symbols: List[str],
+) -> int:
+    """
+    Replace the corporate actions and adjustment factors of the affected
+    symbols in the warehouse. The prices themselves are not rewritten: the
+    adjusted_daily_stock_prices_view applies the factors on read.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        actions_df (pd.DataFrame): Actions of the affected symbols.
+        factors_df (pd.DataFrame): Factor ranges of the affected symbols.
+        symbols (List[str]): The affected symbols.
+
+    Returns:
+        int: Number of factor ranges loaded.
+    """
+    keys_df = pd.DataFrame({"symbol": symbols})
+    replace_rows(
+        connection,
+        actions_df,
+        "corporate_actions_table",
+        {"symbol": "VARCHAR(255)"},
+        keys_df,
+    )
+    replace_rows(
+        connection,
+        factors_df,
+        "adjustment_factor_table",
+        {"symbol": "VARCHAR(255)"},
+        keys_df,
+    )
+    print(f"{len(factors_df)} adjustment factors loaded for {len(symbols)} symbols.")
+    return len(factors_df)
@@ -1,151 +1,388 @@
+from typing import Set
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection
 from utils.config import REDSHIFT_SCHEMA
 
 
-def create_tables(engine: Engine) -> None:
+def create_tables(connection: Connection) -> None:
     """
     Create tables in the Redshift database if they do not exist.
 
     Args:
-        engine (Engine): SQLAlchemy engine for the database connection.
+        connection (Connection): SQLAlchemy connection whose transaction
+            the tables are created in.
     """
 
-    def table_exists(table_name: str) -> bool:
+    def existing_tables() -> Set[str]:
         """
-        Check if a table exists in the database schema.
-
-        Args:
-            table_name (str): Name of the table to check.
+        List the tables of the database schema with a single query.
 
         Returns:
-            bool: True if the table exists, False otherwise.
+            Set[str]: Names of the tables that already exist.
         """
 
-        with engine.connect() as connection:
-            query = text(
+        query = text(
+            """
+            SELECT table_name
+            FROM information_schema.tables
+            WHERE table_schema = :table_schema
+            """
+        )
+        result = connection.execute(query, {"table_schema": REDSHIFT_SCHEMA})
+        return {row[0] for row in result}
+
+    tables: Set[str] = existing_tables()
+
+    # Create stock_table if it does not exist
+    if "stock_table" not in tables:
+        connection.execute(
+            text(
                 f"""
-                SELECT EXISTS (
-                    SELECT 1
-                    FROM information_schema.tables
-                    WHERE table_schema = '{REDSHIFT_SCHEMA}'
-                    AND table_name = :table_name
-                )
+                CREATE TABLE "{REDSHIFT_SCHEMA}".stock_table (
+                    id_record BIGINT IDENTITY(1,1) PRIMARY KEY,
+                    symbol VARCHAR(255) UNIQUE,
+                    name VARCHAR(255),
+                    industry VARCHAR(255),
+                    exchange VARCHAR(255),
+                    logo VARCHAR(255),
+                    weburl VARCHAR(255),
+                    start_date DATE,
+                    end_date DATE,
+                    is_current INTEGER
+                );
                 """
             )
-            result = connection.execute(query, {"table_name": table_name})
-            return result.fetchone()[0]
+        )
+        print("Table 'stock_table' created successfully.")
+    else:
+        print("Table 'stock_table' already exists.")
 
-    with engine.connect() as connection:
-        # Create stock_table if it does not exist
-        if not table_exists("stock_table"):
-            connection.execute(
-                text(
-                    f"""
-                    CREATE TABLE "{REDSHIFT_SCHEMA}".stock_table (
-                        id_record BIGINT IDENTITY(1,1) PRIMARY KEY,
-                        symbol VARCHAR(255) UNIQUE,
-                        name VARCHAR(255),
-                        industry VARCHAR(255),
-                        exchange VARCHAR(255),
-                        logo VARCHAR(255),
-                        weburl VARCHAR(255),
-                        start_date DATE,
-                        end_date DATE,
-                        is_current INTEGER
-                    );
-                    """
-                )
+    # Create date_table if it does not exist
+    if "date_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".date_table (
+                    date DATE PRIMARY KEY,
+                    day_of_week TEXT,
+                    day_of_week_short TEXT,
+                    day_of_month INTEGER,
+                    day_of_year INTEGER,
+                    week_of_year INTEGER,
+                    month TEXT,
+                    month_short TEXT,
+                    month_number INTEGER,
+                    quarter INTEGER,
+                    year INTEGER,
+                    is_weekend INTEGER
+                );
+                """
             )
-            print("Table 'stock_table' created successfully.")
-        else:
-            print("Table 'stock_table' already exists.")
+        )
+        print("Table 'date_table' created successfully.")
+    else:
+        print("Table 'date_table' already exists.")
 
-        # Create date_table if it does not exist
-        if not table_exists("date_table"):
-            connection.execute(
-                text(
-                    f"""
-                    CREATE TABLE "{REDSHIFT_SCHEMA}".date_table (
-                        date DATE PRIMARY KEY,
-                        day_of_week TEXT,
-                        day_of_week_short TEXT,
-                        day_of_month INTEGER,
-                        day_of_year INTEGER,
-                        week_of_year INTEGER,
-                        month TEXT,
-                        month_short TEXT,
-                        month_number INTEGER,
-                        quarter INTEGER,
-                        year INTEGER,
-                        is_weekend INTEGER
-                    );
-                    """
-                )
+    # Create daily_stock_prices_table if it does not exist
+    if "daily_stock_prices_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE
+                    "{REDSHIFT_SCHEMA}".daily_stock_prices_table (
+                    id_transaction BIGINT IDENTITY(1,1) PRIMARY KEY,
+                    date DATE,
+                    symbol TEXT,
+                    open_price REAL,
+                    high_price REAL,
+                    low_price REAL,
+                    close_price REAL,
+                    volume INTEGER,
+                    FOREIGN KEY (date)
+                        REFERENCES
+                        "{REDSHIFT_SCHEMA}".date_table(date),
+                    FOREIGN KEY (symbol)
+                        REFERENCES
+                        "{REDSHIFT_SCHEMA}".stock_table(symbol)
+                );
+                """
             )
-            print("Table 'date_table' created successfully.")
-        else:
-            print("Table 'date_table' already exists.")
+        )
+        print("Table 'daily_stock_prices_table' created successfully.")
+    else:
+        print("Table 'daily_stock_prices_table' already exists.")
+
+    # Create atributes_stock_prices_table if it does not exist
+    if "atributes_stock_prices_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE
+                "{REDSHIFT_SCHEMA}".atributes_stock_prices_table (
+                    id BIGINT IDENTITY(1,1) PRIMARY KEY,
+                    id_transaction BIGINT,
+                    date DATE,
+                    symbol VARCHAR(10),
+                    price_range FLOAT,
+                    price_change FLOAT,
+                    price_change_pct FLOAT,
+                    high_open_diff FLOAT,
+                    low_close_diff FLOAT,
+                    volume_change FLOAT,
+                    volume_moving_avg FLOAT,
+                    price_volatility FLOAT,
+                    FOREIGN KEY (symbol)
+                        REFERENCES
+                        "{REDSHIFT_SCHEMA}".stock_table(symbol),
+                    FOREIGN KEY (id_transaction)
+                        REFERENCES
+                        "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+                            (id_transaction)
+                );
+                """
+            )
+        )
+        print("Table 'atributes_stock_prices_table' created successfully.")
+    else:
+        print("Table 'atributes_stock_prices_table' already exists.")
 
-        # Create daily_stock_prices_table if it does not exist
-        if not table_exists("daily_stock_prices_table"):
+    # Create the weekly and monthly rollups of the gold layer if they do not exist
+    for rollup_table in ("weekly_stock_prices_table", "monthly_stock_prices_table"):
+        if rollup_table not in tables:
             connection.execute(
                 text(
                     f"""
-                    CREATE TABLE
-                        "{REDSHIFT_SCHEMA}".daily_stock_prices_table (
-                        id_transaction BIGINT IDENTITY(1,1) PRIMARY KEY,
-                        date DATE,
-                        symbol TEXT,
+                    CREATE TABLE "{REDSHIFT_SCHEMA}".{rollup_table} (
+                        period_start DATE,
+                        symbol VARCHAR(255),
                         open_price REAL,
                         high_price REAL,
                         low_price REAL,
                         close_price REAL,
-                        volume INTEGER,
-                        FOREIGN KEY (date)
-                            REFERENCES
-                            "{REDSHIFT_SCHEMA}".date_table(date),
-                        FOREIGN KEY (symbol)
-                            REFERENCES
-                            "{REDSHIFT_SCHEMA}".stock_table(symbol)
-                    );
+                        volume BIGINT,
+                        trading_days INTEGER,
+                        PRIMARY KEY (period_start, symbol)
+                    )
+                    SORTKEY (period_start);
                     """
                 )
             )
-            print("Table 'daily_stock_prices_table' created successfully.")
+            print(f"Table '{rollup_table}' created successfully.")
         else:
-            print("Table 'daily_stock_prices_table' already exists.")
+            print(f"Table '{rollup_table}' already exists.")
 
-        # Create atributes_stock_prices_table if it does not exist
-        if not table_exists("atributes_stock_prices_table"):
-            connection.execute(
-                text(
-                    f"""
-                    CREATE TABLE
-                    "{REDSHIFT_SCHEMA}".atributes_stock_prices_table (
-                        id BIGINT IDENTITY(1,1) PRIMARY KEY,
-                        id_transaction BIGINT,
-                        date DATE,
-                        symbol VARCHAR(10),
-                        price_range FLOAT,
-                        price_change FLOAT,
-                        price_change_pct FLOAT,
-                        high_open_diff FLOAT,
-                        low_close_diff FLOAT,
-                        volume_change FLOAT,
-                        volume_moving_avg FLOAT,
-                        price_volatility FLOAT,
-                        FOREIGN KEY (symbol)
-                            REFERENCES
-                            "{REDSHIFT_SCHEMA}".stock_table(symbol),
-                        FOREIGN KEY (id_transaction)
-                            REFERENCES
-                            "{REDSHIFT_SCHEMA}".daily_stock_prices_table
-                                (id_transaction)
-                    );
-                    """
+    # Create sector_daily_stock_prices_table if it does not exist
+    if "sector_daily_stock_prices_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE
+                "{REDSHIFT_SCHEMA}".sector_daily_stock_prices_table (
+                    date DATE,
+                    industry VARCHAR(255),
+                    symbol_count INTEGER,
+                    total_volume BIGINT,
+                    avg_close_price FLOAT,
+                    avg_price_change_pct FLOAT,
+                    PRIMARY KEY (date, industry)
                 )
+                SORTKEY (date);
+                """
             )
-            print("Table 'atributes_stock_prices_table' created successfully.")
-        else:
-            print("Table 'atributes_stock_prices_table' already exists.")
+        )
+        print("Table 'sector_daily_stock_prices_table' created successfully.")
+    else:
+        print("Table 'sector_daily_stock_prices_table' already exists.")
+
+    # Create the cross-sectional analytics tables of the gold layer
+    if "daily_log_returns_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".daily_log_returns_table (
+                    date DATE,
+                    symbol VARCHAR(255),
+                    log_return FLOAT,
+                    PRIMARY KEY (date, symbol)
+                )
+                SORTKEY (date);
+                """
+            )
+        )
+        print("Table 'daily_log_returns_table' created successfully.")
+    else:
+        print("Table 'daily_log_returns_table' already exists.")
+
+    if "correlation_matrix_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".correlation_matrix_table (
+                    date DATE,
+                    symbol_a VARCHAR(255),
+                    symbol_b VARCHAR(255),
+                    correlation REAL,
+                    covariance REAL,
+                    observations INTEGER,
+                    PRIMARY KEY (date, symbol_a, symbol_b)
+                )
+                SORTKEY (date, symbol_a);
+                """
+            )
+        )
+        print("Table 'correlation_matrix_table' created successfully.")
+    else:
+        print("Table 'correlation_matrix_table' already exists.")
+
+    if "stock_beta_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".stock_beta_table (
+                    date DATE,
+                    symbol VARCHAR(255),
+                    benchmark VARCHAR(255),
+                    beta REAL,
+                    correlation REAL,
+                    observations INTEGER,
+                    PRIMARY KEY (date, symbol)
+                )
+                SORTKEY (date);
+                """
+            )
+        )
+        print("Table 'stock_beta_table' created successfully.")
+    else:
+        print("Table 'stock_beta_table' already exists.")
+
+    # Create intraday_stock_prices_table if it does not exist. It holds
+    # hundreds of bars per symbol and date, so it has no identity column nor
+    # unique constraints, is distributed by symbol and sorted by date, symbol
+    # and bar time, so loads append in sort order and a date range scan only
+    # reads its blocks
+    if "intraday_stock_prices_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".intraday_stock_prices_table (
+                    date DATE ENCODE AZ64,
+                    bar_time TIMESTAMP ENCODE AZ64,
+                    symbol VARCHAR(255) ENCODE ZSTD,
+                    bar_interval VARCHAR(8) ENCODE ZSTD,
+                    open_price REAL ENCODE ZSTD,
+                    high_price REAL ENCODE ZSTD,
+                    low_price REAL ENCODE ZSTD,
+                    close_price REAL ENCODE ZSTD,
+                    volume BIGINT ENCODE AZ64
+                )
+                DISTSTYLE KEY
+                DISTKEY (symbol)
+                COMPOUND SORTKEY (date, symbol, bar_time);
+                """
+            )
+        )
+        print("Table 'intraday_stock_prices_table' created successfully.")
+    else:
+        print("Table 'intraday_stock_prices_table' already exists.")
+
+    # Create the corporate action tables. Prices stay unadjusted in
+    # daily_stock_prices_table; adjustment_factor_table holds, per symbol,
+    # the cumulative factor of each range of dates between two ex-dates
+    if "corporate_actions_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".corporate_actions_table (
+                    symbol VARCHAR(255),
+                    ex_date DATE,
+                    action_type VARCHAR(16),
+                    value FLOAT,
+                    PRIMARY KEY (symbol, ex_date, action_type)
+                )
+                SORTKEY (symbol, ex_date);
+                """
+            )
+        )
+        print("Table 'corporate_actions_table' created successfully.")
+    else:
+        print("Table 'corporate_actions_table' already exists.")
+
+    if "adjustment_factor_table" not in tables:
+        connection.execute(
+            text(
+                f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".adjustment_factor_table (
+                    symbol VARCHAR(255),
+                    start_date DATE,
+                    end_date DATE,
+                    price_factor FLOAT,
+                    volume_factor FLOAT,
+                    PRIMARY KEY (symbol, start_date)
+                )
+                DISTSTYLE ALL
+                SORTKEY (symbol, start_date);
+                """
+            )
+        )
+        print("Table 'adjustment_factor_table' created successfully.")
+    else:
+        print("Table 'adjustment_factor_table' already exists.")
+
+    # Adjusted prices are computed on read, so a new split only rewrites the
+    # factors of its symbol instead of its whole price history
+    connection.execute(
+        text(
+            f"""
+            CREATE OR REPLACE VIEW
+            "{REDSHIFT_SCHEMA}".adjusted_daily_stock_prices_view AS
+            SELECT
+                p.date,
+                p.symbol,
+                p.open_price * COALESCE(f.price_factor, 1) AS open_price,
+                p.high_price * COALESCE(f.price_factor, 1) AS high_price,
+                p.low_price * COALESCE(f.price_factor, 1) AS low_price,
+                p.close_price * COALESCE(f.price_factor, 1) AS close_price,
+                p.volume * COALESCE(f.volume_factor, 1) AS volume
+            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table p
+            LEFT JOIN "{REDSHIFT_SCHEMA}".adjustment_factor_table f
+                ON f.symbol = p.symbol
+                AND p.date >= f.start_date
+                AND p.date < f.end_date;
+            """
+        )
+    )
+
+    # Each price with the profile version valid on its date, the first
+    # version of a symbol also covering the prices loaded before it
+    connection.execute(
+        text(
+            f"""
+            CREATE OR REPLACE VIEW
+            "{REDSHIFT_SCHEMA}".point_in_time_daily_stock_prices_view AS
+            WITH versions AS (
+                SELECT
+                    s.*,
+                    CASE
+                        WHEN s.start_date = MIN(s.start_date)
+                            OVER (PARTITION BY s.symbol)
+                        THEN '1900-01-01'::DATE
+                        ELSE s.start_date
+                    END AS valid_from
+                FROM "{REDSHIFT_SCHEMA}".stock_table s
+                WHERE s.start_date < s.end_date
+            )
+            SELECT
+                p.*,
+                v.name,
+                v.industry,
+                v.exchange,
+                v.logo,
+                v.weburl
+            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table p
+            LEFT JOIN versions v
+                ON v.symbol = p.symbol
+                AND p.date >= v.valid_from
+                AND p.date < v.end_date;
+            """
+        )
+    )
@@ -0,0 +1,64 @@
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy.engine import Connection
+from utils.database import replace_rows
+
+INTRADAY_TABLE: str = "intraday_stock_prices_table"
+
+
+def intraday_rows(bars: pa.Table, date: str, interval: str) -> pd.DataFrame:
+    """
+    Convert the intraday bars of a partition to the columns of
+    intraday_stock_prices_table.
+
+    Args:
+        bars (pa.Table): Bars read from the intraday files.
+        date (str): The date of the bars.
+        interval (str): Bar interval of the bars.
+
+    Returns:
+        pd.DataFrame: The rows to be loaded.
+    """
+    df: pd.DataFrame = bars.select(
+        ["timestamp", "symbol", "open_price", "high_price", "low_price",
+         "close_price", "volume"]
+    ).to_pandas()
+    df["symbol"] = df["symbol"].astype(object)
+    df = df.rename(columns={"timestamp": "bar_time"})
+    df.insert(0, "date", pd.Timestamp(date).date())
+    df.insert(3, "bar_interval", interval)
+    return df
+
+
+def load_intraday_bars(
+    connection: Connection, bars: pa.Table, date: str, interval: str
+) -> int:
+    """
+    Replace the intraday bars of a date and interval in the warehouse.
+
+    The rows of the partition are deleted with a single join against the
+    staged key and the bars are appended with multi-row inserts, as the daily
+    facts, so the cost of the load does not grow with one statement per bar.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        bars (pa.Table): Bars of the date read from the intraday files.
+        date (str): The date of the bars.
+        interval (str): Bar interval of the bars.
+
+    Returns:
+        int: Number of bars loaded.
+    """
+    df: pd.DataFrame = intraday_rows(bars, date, interval)
+    keys_df = pd.DataFrame(
+        {"date": [pd.Timestamp(date).date()], "bar_interval": [interval]}
+    )
+    replace_rows(
+        connection,
+        df,
+        INTRADAY_TABLE,
+        {"date": "DATE", "bar_interval": "VARCHAR(8)"},
+        keys_df,
+    )
+    print(f"{len(df)} {interval} bars loaded for the date {date}.")
+    return len(df)
@@ -1,130 +1,525 @@
 import pandas as pd
+import pyarrow as pa
 import os
-from typing import Tuple
+import uuid
+from typing import Iterable, List, Optional, Tuple
+from bronze.compaction import bronze_source, read_bronze
 from utils.config import DIR_PATH
+from utils.parquet import (
+    DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    DAILY_STOCK_PRICES_SILVER_SCHEMA,
+    DATE_SILVER_SCHEMA,
+    LOADED_DAILY_STOCK_PRICES_SCHEMA,
+    STOCK_BRONZE_SCHEMA,
+    STOCK_SILVER_SCHEMA,
+    read_parquet,
+    read_table,
+    to_arrow_table,
+    write_parquet,
+    write_table,
+)
+
+# Paths of the silver files. The daily stock prices are append-only part
+# files partitioned by date: {DAILY_SILVER_PATH}/date=2024-09-10/part-*.parquet
+DAILY_SILVER_PATH: str = os.path.join(
+    DIR_PATH, "silver", "data", "daily_stock_prices_table_silver"
+)
+# Single file the daily stock prices were kept in before they were partitioned
+LEGACY_DAILY_SILVER_PATH: str = f"{DAILY_SILVER_PATH}.parquet"
+STOCK_SILVER_PATH: str = os.path.join(
+    DIR_PATH, "silver", "data", "stock_table_silver.parquet"
+)
+DATE_SILVER_PATH: str = os.path.join(
+    DIR_PATH, "silver", "data", "date_table_silver.parquet"
+)
+
+
+def create_date_table(dates: pd.Series) -> pd.DataFrame:
+    """
+    Build the rows of the date dimension for the given dates.
+
+    Args:
+        dates (pd.Series): Dates to describe, as strings, dates or timestamps.
+
+    Returns:
+        pd.DataFrame: One row per distinct date with its calendar attributes.
+    """
+    date_index = pd.DatetimeIndex(pd.to_datetime(dates).unique())
+    date_df = pd.DataFrame({"date": date_index.date})
+    date_df["day_of_week"] = date_index.strftime("%A")
+    date_df["day_of_week_short"] = date_index.strftime("%a")
+    date_df["day_of_month"] = date_index.day
+    date_df["day_of_year"] = date_index.dayofyear
+    date_df["week_of_year"] = date_index.isocalendar().week.to_numpy()
+    date_df["month"] = date_index.strftime("%B")
+    date_df["month_short"] = date_index.strftime("%b")
+    date_df["month_number"] = date_index.month
+    date_df["quarter"] = date_index.quarter
+    date_df["year"] = date_index.year
+    date_df["is_weekend"] = (date_index.weekday >= 5).astype(int)
+    return date_df
+
+
+def input_stage(table_name: str, date: str) -> str:
+    """
+    Stage of the bronze rows of a date loaded by the silver layer: the rows
+    written by the validation stage, or the raw bronze rows for dates that
+    were not validated.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        date (str): The date of the rows.
+
+    Returns:
+        str: 'validated' or 'bronze'.
+    """
+    if os.path.exists(bronze_source(table_name, date, "validated")):
+        return "validated"
+
+    return "bronze"
+
+
+def input_file(table_name: str, date: str) -> str:
+    """
+    Path of the file holding the bronze rows of a date loaded by the silver
+    layer, either its own file or the monthly file it was compacted into.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        date (str): The date of the rows.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return bronze_source(table_name, date, input_stage(table_name, date))
+
+
+def silver_partition(date: str, root: str = DAILY_SILVER_PATH) -> str:
+    """
+    Directory of the silver daily stock prices of a date.
+
+    Args:
+        date (str): The date of the prices, in 'YYYY-MM-DD' format.
+        root (str): Root of the silver prices.
+
+    Returns:
+        str: Path of the partition directory.
+    """
+    return os.path.join(root, f"date={date}")
+
+
+def silver_price_files(
+    root: str = DAILY_SILVER_PATH, dates: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    List the part files of the silver daily stock prices, of every date or
+    only of the given ones, so a run only opens the partitions it needs.
+
+    Args:
+        root (str): Root of the silver prices.
+        dates (Optional[Iterable[str]]): Dates in 'YYYY-MM-DD' format.
+            Defaults to every date.
+
+    Returns:
+        List[str]: Paths of the part files, sorted by date.
+    """
+    if not os.path.isdir(root):
+        return []
+    partitions: List[str] = (
+        sorted(name for name in os.listdir(root) if name.startswith("date="))
+        if dates is None
+        else [f"date={date}" for date in sorted(set(dates))]
+    )
+
+    files: List[str] = []
+    for partition in partitions:
+        directory: str = os.path.join(root, partition)
+        if os.path.isdir(directory):
+            files += [
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith(".parquet") and not name.startswith(".")
+            ]
+    return files
+
+
+def read_silver_prices(
+    files: List[str], columns: Optional[List[str]] = None
+) -> pa.Table:
+    """
+    Read part files of the silver daily stock prices as one Arrow table.
+
+    Args:
+        files (List[str]): Paths returned by silver_price_files.
+        columns (Optional[List[str]]): Columns to read. Defaults to all columns.
+
+    Returns:
+        pa.Table: The rows of the files, empty if there are none.
+    """
+    if not files:
+        names: List[str] = columns or DAILY_STOCK_PRICES_SILVER_SCHEMA.names
+        return pa.schema(
+            [DAILY_STOCK_PRICES_SILVER_SCHEMA.field(name) for name in names]
+        ).empty_table()
+
+    return pa.concat_tables([
+        read_table(path, DAILY_STOCK_PRICES_SILVER_SCHEMA, columns) for path in files
+    ])
+
+
+def append_silver_prices(df: pd.DataFrame, root: str = DAILY_SILVER_PATH) -> List[str]:
+    """
+    Write the daily stock prices of a delta as a new part file in the
+    partition of each of their dates.
+
+    The files of earlier runs are never rewritten, so a run costs the size of
+    its delta, not of the history. Each file is written under a hidden
+    temporary name and renamed, so readers never see a partial file.
+
+    Args:
+        df (pd.DataFrame): New daily stock prices.
+        root (str): Root of the silver prices.
+
+    Returns:
+        List[str]: Paths of the written files.
+    """
+    paths: List[str] = []
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    for date, rows in df.groupby(dates.to_numpy()):
+        partition: str = silver_partition(date, root)
+        os.makedirs(partition, exist_ok=True)
+        name: str = f"part-{uuid.uuid4().hex}.parquet"
+        tmp_path: str = os.path.join(partition, f".{name}.tmp")
+        write_parquet(rows, tmp_path, DAILY_STOCK_PRICES_SILVER_SCHEMA)
+        os.replace(tmp_path, os.path.join(partition, name))
+        paths.append(os.path.join(partition, name))
+
+    print(f"{len(df)} rows added to {len(paths)} partitions of "
+          f"{os.path.basename(root)}.")
+    return paths
+
+
+def split_legacy_silver_prices(
+    path: str = LEGACY_DAILY_SILVER_PATH, root: str = DAILY_SILVER_PATH
+) -> None:
+    """
+    Move the daily stock prices of the single silver file used before the
+    prices were partitioned to the partitions of their dates, once.
+
+    Args:
+        path (str): Path of the single silver file.
+        root (str): Root of the silver prices.
+    """
+    if not os.path.exists(path):
+        return
+
+    append_silver_prices(read_parquet(path, DAILY_STOCK_PRICES_SILVER_SCHEMA), root)
+    os.remove(path)
+    print(f"{os.path.basename(path)} split into the partitions of its dates.")
+
+
+def new_prices(
+    daily_stock_prices_df: pd.DataFrame, root: str = DAILY_SILVER_PATH
+) -> pd.DataFrame:
+    """
+    Keep the daily stock prices whose (date, symbol) is not in the silver
+    layer yet, reading only the keys of the partitions of their dates.
+
+    Args:
+        daily_stock_prices_df (pd.DataFrame): Prices read from bronze, with
+            the 'symbol' column.
+        root (str): Root of the silver prices.
+
+    Returns:
+        pd.DataFrame: The new prices.
+    """
+    dates = pd.to_datetime(daily_stock_prices_df["date"]).dt.strftime("%Y-%m-%d")
+    existing_keys_df = read_silver_prices(
+        silver_price_files(root, dates.unique()), columns=["date", "symbol"]
+    ).to_pandas()
+    if existing_keys_df.empty:
+        return daily_stock_prices_df.reset_index(drop=True)
+
+    existing_keys = pd.MultiIndex.from_frame(existing_keys_df.astype(object))
+    new_keys = pd.MultiIndex.from_frame(
+        daily_stock_prices_df[["date", "symbol"]].astype(object)
+    )
+    return daily_stock_prices_df[~new_keys.isin(existing_keys)].reset_index(drop=True)
+
+
+def changed_profiles(
+    stock_df: pd.DataFrame, path: str = STOCK_SILVER_PATH
+) -> pd.DataFrame:
+    """
+    Keep the stock profiles that are new or changed with respect to the
+    silver stock file.
+
+    Args:
+        stock_df (pd.DataFrame): Profiles read from bronze.
+        path (str): Path of the silver stock file.
+
+    Returns:
+        pd.DataFrame: The new or changed profiles.
+    """
+    if not os.path.exists(path):
+        return stock_df
+
+    existing_stock_df = read_parquet(path, STOCK_SILVER_SCHEMA)
+    new_data = pd.merge(
+        stock_df.astype(object),
+        existing_stock_df.astype(object).drop_duplicates(),
+        how="left",
+        indicator=True,
+    )
+    return new_data[new_data["_merge"] == "left_only"].drop(
+        columns=["_merge"]
+    ).reset_index(drop=True)
+
+
+def new_dates(date_df: pd.DataFrame, path: str = DATE_SILVER_PATH) -> pd.DataFrame:
+    """
+    Keep the rows of the date dimension whose date is not in the silver date
+    file yet.
+
+    Args:
+        date_df (pd.DataFrame): Output of create_date_table.
+        path (str): Path of the silver date file.
+
+    Returns:
+        pd.DataFrame: The new dates.
+    """
+    if not os.path.exists(path):
+        return date_df
+
+    existing_dates_df = read_parquet(path, DATE_SILVER_SCHEMA, columns=["date"])
+    return date_df[
+        ~date_df["date"].isin(existing_dates_df["date"])
+    ].reset_index(drop=True)
 
 
 def load_parquet_files(date: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
     """
-    Load and update Parquet files for daily stock prices, stock data, and dates.
+    Load the (validated) bronze Parquet files of a date and compute the rows
+    they add to the silver layer: daily stock prices with a new (date, symbol),
+    new or changed stock profiles, and new dates.
+
+    Only the key columns of the silver partitions of the dates of the prices
+    are read to compute their delta, and the files are not modified; call
+    save_silver_files once the delta is loaded.
 
     Args:
         date (str): The date string used for identifying the Parquet files.
 
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        DataFrames for daily stock prices, stock data, and date information.
+        Delta DataFrames for daily stock prices, stock data, and date information.
 
     Raises:
         Exception: If there is an error in processing the Parquet files.
     """
 
-    # Paths for daily stock prices
-    daily_stock_prices_path = os.path.join(
-        DIR_PATH,
-        "bronze",
-        "data",
-        f"daily_stock_prices_table_{date}_bronze.parquet",
-    )
-    daily_silver_path = os.path.join(
-        DIR_PATH, "silver", "data", "daily_stock_prices_table_silver.parquet"
-    )
-
     # Load daily stock prices DataFrame
-    daily_stock_prices_df = pd.read_parquet(daily_stock_prices_path)
+    daily_stock_prices_df = read_bronze(
+        "daily_stock_prices_table",
+        date,
+        input_stage("daily_stock_prices_table", date),
+        DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    ).to_pandas()
     daily_stock_prices_df = daily_stock_prices_df.rename(
         columns={"stock_symbol": "symbol"}
-    )
+    ).drop_duplicates(["date", "symbol"], keep="last")
+
+    # Keep the prices whose (date, symbol) is not in the silver layer yet
+    daily_stock_prices_df = new_prices(daily_stock_prices_df)
+    print(f"{len(daily_stock_prices_df)} new rows for daily_stock_prices_table.")
+
+    # Load stock data DataFrame
+    stock_df = read_bronze(
+        "stock_table", date, input_stage("stock_table", date), STOCK_BRONZE_SCHEMA
+    ).to_pandas()
+
+    # Keep the profiles that are new or changed with respect to the silver file
+    stock_df = changed_profiles(stock_df)
+    print(f"{len(stock_df)} new or changed rows for stock_table.")
+
+    # Generate date DataFrame for the dates of the new prices
+    date_df = new_dates(create_date_table(daily_stock_prices_df["date"]))
+    print(f"{len(date_df)} new rows for date_table.")
+
+    return daily_stock_prices_df, stock_df, date_df
+
+
+def append_to_silver_file(df: pd.DataFrame, path: str, schema: pa.Schema) -> None:
+    """
+    Append rows to a silver Parquet file, creating it if it does not exist.
+    Used for the dimension files, which every run reads whole to compute
+    its delta.
 
-    # Check if Silver file exists and update it
-    if os.path.exists(daily_silver_path):
-        existing_daily_df = pd.read_parquet(daily_silver_path)
-        new_data = daily_stock_prices_df[
-            ~daily_stock_prices_df["date"].isin(existing_daily_df["date"])
-        ]
-
-        if not new_data.empty:
-            daily_stock_prices_df = pd.concat(
-                [existing_daily_df, new_data], ignore_index=True
-            )
-            daily_stock_prices_df.to_parquet(daily_silver_path, index=False)
-            print("New data added to daily_stock_prices_table_silver.")
-        else:
-            print(
-                "No new data added to daily_stock_prices_table_silver; \
-data for these dates already exists."
-            )
+    Args:
+        df (pd.DataFrame): Rows to be appended.
+        path (str): Path of the silver file.
+        schema (pa.Schema): Declared schema of the silver table.
+    """
+    table: pa.Table = to_arrow_table(df, schema)
+    if os.path.exists(path):
+        write_table(pa.concat_tables([read_table(path, schema), table]), path)
+        print(f"{len(df)} rows added to {os.path.basename(path)}.")
     else:
-        daily_stock_prices_df.to_parquet(daily_silver_path, index=False)
-        print("File daily_stock_prices_table_silver created with initial data.")
+        write_table(table, path)
+        print(f"File {os.path.basename(path)} created with initial data.")
 
-    # Paths for stock data
-    stock_path = os.path.join(
-        DIR_PATH, "bronze", "data", f"stock_table_{date}_bronze.parquet"
-    )
-    stock_silver_path = os.path.join(
-        DIR_PATH, "silver", "data", "stock_table_silver.parquet"
-    )
 
-    # Load stock data DataFrame
-    stock_df = pd.read_parquet(stock_path)
-
-    # Check if Silver file exists and update it
-    if os.path.exists(stock_silver_path):
-        existing_stock_df = pd.read_parquet(stock_silver_path)
-        new_data = pd.merge(stock_df, existing_stock_df, how="left", indicator=True)
-        new_data = new_data[new_data["_merge"] == "left_only"].drop(
-            columns=["_merge"]
-        )
-
-        if not new_data.empty:
-            stock_df = pd.concat([existing_stock_df, new_data], ignore_index=True)
-            stock_df.to_parquet(stock_silver_path, index=False)
-            print("New data added to stock_table_silver.")
-        else:
-            print(
-                "No new data added to stock_table_silver; \
-data for these rows already exists."
-            )
+def save_silver_files(
+    daily_stock_prices_df: pd.DataFrame, stock_df: pd.DataFrame, date_df: pd.DataFrame
+) -> None:
+    """
+    Append the delta returned by load_parquet_files to the silver files: the
+    daily stock prices as new part files of their dates, the profiles and
+    dates to their dimension files.
+
+    Args:
+        daily_stock_prices_df (pd.DataFrame): New daily stock prices.
+        stock_df (pd.DataFrame): New or changed stock profiles.
+        date_df (pd.DataFrame): New dates.
+    """
+    if daily_stock_prices_df.empty:
+        print(f"No new data added to {os.path.basename(DAILY_SILVER_PATH)}.")
     else:
-        stock_df.to_parquet(stock_silver_path, index=False)
-        print("File stock_table_silver created with initial data.")
-
-    # Generate date DataFrame
-    unique_dates = pd.to_datetime(daily_stock_prices_df["date"]).dt.date.unique()
-    date_df = pd.DataFrame(pd.to_datetime(unique_dates), columns=["date"])
-    date_df["day_of_week"] = date_df["date"].apply(lambda x: x.strftime("%A"))
-    date_df["day_of_week_short"] = date_df["date"].apply(lambda x: x.strftime("%a"))
-    date_df["day_of_month"] = date_df["date"].apply(lambda x: x.day)
-    date_df["day_of_year"] = date_df["date"].apply(lambda x: x.timetuple().tm_yday)
-    date_df["week_of_year"] = date_df["date"].apply(lambda x: x.isocalendar()[1])
-    date_df["month"] = date_df["date"].apply(lambda x: x.strftime("%B"))
-    date_df["month_short"] = date_df["date"].apply(lambda x: x.strftime("%b"))
-    date_df["month_number"] = date_df["date"].apply(lambda x: x.month)
-    date_df["quarter"] = date_df["date"].apply(lambda x: (x.month - 1) // 3 + 1)
-    date_df["year"] = date_df["date"].apply(lambda x: x.year)
-    date_df["is_weekend"] = date_df["date"].apply(
-        lambda x: 1 if x.weekday() >= 5 else 0
+        append_silver_prices(daily_stock_prices_df)
+
+    for df, path, schema in (
+        (stock_df, STOCK_SILVER_PATH, STOCK_SILVER_SCHEMA),
+        (date_df, DATE_SILVER_PATH, DATE_SILVER_SCHEMA),
+    ):
+        if df.empty:
+            print(f"No new data added to {os.path.basename(path)}.")
+            continue
+
+        append_to_silver_file(df, path, schema)
+
+
+def loaded_prices_path(date: str) -> str:
+    """
+    Path of the file holding the daily stock prices loaded by the silver run
+    of a date, with their id_transaction.
+
+    Args:
+        date (str): The date of the run.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return os.path.join(
+        DIR_PATH, "silver", "data", f"daily_stock_prices_table_{date}_loaded.parquet"
     )
 
-    # Paths for date table
-    date_silver_path = os.path.join(
-        DIR_PATH, "silver", "data", "date_table_silver.parquet"
+
+def save_loaded_prices(loaded_prices_df: pd.DataFrame, date: str) -> None:
+    """
+    Save the daily stock prices inserted by the silver run of a date, so the
+    gold layer can reuse their id_transaction without reading them back.
+
+    Args:
+        loaded_prices_df (pd.DataFrame): Inserted rows with their id_transaction.
+        date (str): The date of the run.
+    """
+    path: str = loaded_prices_path(date)
+    if loaded_prices_df.empty:
+        # A re-run without new prices must not hand the prices of a prior
+        # run to the gold layer and the change data export
+        if os.path.exists(path):
+            os.remove(path)
+        print("No loaded prices to save for the gold layer.")
+        return
+
+    write_parquet(loaded_prices_df, path, LOADED_DAILY_STOCK_PRICES_SCHEMA)
+    print(f"{len(loaded_prices_df)} loaded prices saved for the gold layer.")
+
+
+def read_loaded_prices(date: str) -> Optional[pd.DataFrame]:
+    """
+    Read the daily stock prices loaded by the silver run of a date.
+
+    Args:
+        date (str): The date of the run.
+
+    Returns:
+        Optional[pd.DataFrame]: The loaded rows with their id_transaction, or
+        None if the run did not load any row.
+    """
+    path: str = loaded_prices_path(date)
+    if not os.path.exists(path):
+        return None
+
+    return read_parquet(path, LOADED_DAILY_STOCK_PRICES_SCHEMA)
+
+
+def stock_changes_path(date: str) -> str:
+    """
+    Path of the file holding the new or changed stock profiles loaded by the
+    silver run of a date.
+
+    Args:
+        date (str): The date of the run.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return os.path.join(
+        DIR_PATH, "silver", "data", f"stock_table_{date}_changed.parquet"
     )
 
-    # Check if Silver file exists and update it
-    if os.path.exists(date_silver_path):
-        existing_date_df = pd.read_parquet(date_silver_path)
-        new_dates = date_df[~date_df["date"].isin(existing_date_df["date"])]
-
-        if not new_dates.empty:
-            date_df = pd.concat([existing_date_df, new_dates], ignore_index=True)
-            date_df.to_parquet(date_silver_path, index=False)
-            print("New dates added to date_table_silver.")
-        else:
-            print("No new dates added to date_table_silver; dates already exist.")
-    else:
-        date_df.to_parquet(date_silver_path, index=False)
-        print("File date_table_silver created with initial dates.")
 
-    return daily_stock_prices_df, stock_df, date_df
+def save_stock_changes(stock_df: pd.DataFrame, date: str) -> None:
+    """
+    Save the new or changed stock profiles of the silver run of a date, so the
+    change data export knows which symbols got a new SCD2 version.
+
+    Args:
+        stock_df (pd.DataFrame): Stock profiles of the delta.
+        date (str): The date of the run.
+    """
+    path: str = stock_changes_path(date)
+    if stock_df.empty:
+        # A re-run without changes must not export the changes of a prior run
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    write_parquet(stock_df, path, STOCK_SILVER_SCHEMA)
+
+
+def read_stock_changes(date: str) -> Optional[pd.DataFrame]:
+    """
+    Read the new or changed stock profiles of the silver run of a date.
+
+    Args:
+        date (str): The date of the run.
+
+    Returns:
+        Optional[pd.DataFrame]: The profiles, or None if the run did not
+        change any.
+    """
+    path: str = stock_changes_path(date)
+    if not os.path.exists(path):
+        return None
+
+    return read_parquet(path, STOCK_SILVER_SCHEMA)
+
+
+def read_listed_exchanges(path: str = STOCK_SILVER_PATH) -> List[str]:
+    """
+    Read the distinct exchanges of the profiles loaded so far, reading only
+    the exchange column of the silver stock file.
+
+    Args:
+        path (str): Path of the silver stock file.
+
+    Returns:
+        List[str]: The exchanges, empty before the first load.
+    """
+    if not os.path.exists(path):
+        return []
+
+    exchanges = read_parquet(path, STOCK_SILVER_SCHEMA, columns=["exchange"])
+    return sorted(exchanges["exchange"].dropna().astype(str).unique())
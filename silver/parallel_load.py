@@ -0,0 +1,114 @@
+import math
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+from sqlalchemy.engine import Connection, Engine
+from silver.create_tables import create_tables
+from silver.table_insert_sql import (
+    insert_stock_data_scd2,
+    insert_date_data,
+    insert_staged_stock_prices_data
+)
+from utils.config import SILVER_FACT_PARTITION_ROWS, SILVER_LOAD_CONCURRENCY
+
+
+def in_transaction(
+    engine: Engine, load: Callable[[Connection, pd.DataFrame], object], df: pd.DataFrame
+) -> object:
+    """
+    Run a load on its own pooled connection and transaction.
+
+    Args:
+        engine (Engine): SQLAlchemy engine whose pool provides the connection.
+        load (Callable): Insert function taking a connection and a DataFrame.
+        df (pd.DataFrame): Rows to be loaded.
+
+    Returns:
+        object: The value returned by the load.
+    """
+    with engine.begin() as connection:
+        return load(connection, df)
+
+
+def partition_by_symbol(
+    df: pd.DataFrame, max_rows: int = SILVER_FACT_PARTITION_ROWS
+) -> List[pd.DataFrame]:
+    """
+    Split the daily stock prices into partitions of whole symbols, so the
+    (date, symbol) keys of different partitions never overlap. The partitions
+    bound the rows staged per round before the fact insert.
+
+    Args:
+        df (pd.DataFrame): Daily stock prices to be loaded.
+        max_rows (int): Target maximum number of rows per partition.
+
+    Returns:
+        List[pd.DataFrame]: The non-empty partitions.
+    """
+    partitions: int = max(1, math.ceil(len(df) / max_rows))
+    if partitions == 1:
+        return [df]
+
+    buckets = pd.util.hash_pandas_object(
+        df["symbol"].astype(str), index=False
+    ) % partitions
+    return [
+        partition.reset_index(drop=True)
+        for _, partition in df.groupby(buckets.to_numpy())
+    ]
+
+
+def load_silver_parallel(
+    engine: Engine,
+    stock_df: pd.DataFrame,
+    date_df: pd.DataFrame,
+    daily_stock_prices_df: pd.DataFrame,
+    concurrency: int = SILVER_LOAD_CONCURRENCY,
+) -> pd.DataFrame:
+    """
+    Load the silver delta with up to `concurrency` connections: the tables are
+    created, then stock_table and date_table are loaded concurrently, and the
+    daily stock prices are loaded once both dimensions commit.
+
+    The fact rows are staged partition by partition into one temporary table
+    and inserted with a single INSERT ... SELECT in one transaction, since
+    concurrent transactions writing the same table serialize on its write
+    lock or abort with serializable isolation violations on Redshift.
+
+    Each dimension load and the fact load commit on their own, so a failure
+    may leave some of them committed. Every insert skips the rows that
+    already exist, so the task can still be retried safely.
+
+    Args:
+        engine (Engine): SQLAlchemy engine with a pool of at least
+            `concurrency` connections.
+        stock_df (pd.DataFrame): New or changed stock profiles.
+        date_df (pd.DataFrame): New dates.
+        daily_stock_prices_df (pd.DataFrame): New daily stock prices.
+        concurrency (int): Maximum number of concurrent loads.
+
+    Returns:
+        pd.DataFrame: The inserted daily stock prices with their id_transaction.
+
+    Raises:
+        Exception: The first error raised by a dimension load, once both
+            finish, or the error of the fact load.
+    """
+    with engine.begin() as connection:
+        create_tables(connection)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # The dimension loads are independent of each other
+        dimension_loads: List[Future] = [
+            executor.submit(in_transaction, engine, insert_stock_data_scd2, stock_df),
+            executor.submit(in_transaction, engine, insert_date_data, date_df),
+        ]
+        for future in dimension_loads:
+            future.result()
+
+    # The fact load starts once both dimensions are committed, in a single
+    # transaction
+    with engine.begin() as connection:
+        return insert_staged_stock_prices_data(
+            connection, partition_by_symbol(daily_stock_prices_df)
+        )
@@ -0,0 +1,112 @@
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Any, List
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+from utils.config import REDSHIFT_SCHEMA
+
+# Attributes of the SCD2 versions of stock_table
+PROFILE_COLUMNS: List[str] = ["name", "industry", "exchange", "logo", "weburl"]
+# Start of the range of the first version of a symbol, so the prices loaded
+# before its profile was first recorded take that version
+FIRST_DATE: datetime.date = datetime.date(1900, 1, 1)
+
+
+def read_profile_versions(connection: Connection, symbols: List[str]) -> pd.DataFrame:
+    """
+    Read every SCD2 version of the profile of the given symbols.
+
+    Args:
+        connection (Connection): SQLAlchemy connection for database operation.
+        symbols (List[str]): The symbols whose versions are read.
+
+    Returns:
+        pd.DataFrame: The symbol, PROFILE_COLUMNS, start_date and end_date of
+        each version.
+    """
+    query = text(
+        f"""
+        SELECT symbol, {", ".join(PROFILE_COLUMNS)}, start_date, end_date
+        FROM "{REDSHIFT_SCHEMA}".stock_table
+        WHERE symbol IN :symbols
+        """
+    ).bindparams(bindparam("symbols", expanding=True))
+    return pd.read_sql_query(query, connection, params={"symbols": list(symbols)})
+
+
+def to_days(values: Any) -> np.ndarray:
+    """
+    Convert dates, timestamps or ISO strings to datetime64 values, which also
+    hold the open end_date of the current versions (3000-12-01) that is out
+    of the range of nanosecond timestamps.
+    """
+    return np.asarray(values, dtype="datetime64[D]").astype("datetime64[s]")
+
+
+def valid_ranges(versions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get the range of dates each version is valid for, start_date inclusive
+    and end_date exclusive, sorted by start so it can be searched.
+
+    Versions closed on the day they were opened (a profile changed twice in
+    a day) are valid for no date and dropped, and the first version of each
+    symbol starts at FIRST_DATE.
+    """
+    ranges = versions_df.astype({"symbol": object}).assign(
+        start_date=to_days(versions_df["start_date"]),
+        end_date=to_days(versions_df["end_date"]),
+    )
+    ranges = ranges[ranges["start_date"] < ranges["end_date"]].sort_values(
+        ["start_date", "end_date"], kind="stable"
+    )
+    first = ~ranges["symbol"].duplicated()
+    ranges.loc[first, "start_date"] = np.datetime64(FIRST_DATE, "s")
+    return ranges.sort_values("start_date", kind="stable")
+
+
+def profiles_as_of(
+    prices_df: pd.DataFrame,
+    versions_df: pd.DataFrame,
+    columns: List[str] = PROFILE_COLUMNS,
+) -> pd.DataFrame:
+    """
+    Attach to each price the attributes of the profile version valid on its
+    date, with a single as-of join against the sorted starts of the versions.
+
+    Sorting the prices is the main cost, O(n log n), so the join also runs
+    over the full fact history. point_in_time_daily_stock_prices_view is the
+    equivalent join in the warehouse.
+
+    Args:
+        prices_df (pd.DataFrame): Prices with a date and a symbol column.
+        versions_df (pd.DataFrame): Output of read_profile_versions.
+        columns (List[str]): The profile attributes to attach.
+
+    Returns:
+        pd.DataFrame: prices_df, in its order, with the given columns; None
+        where no version of the symbol is valid on the date.
+    """
+    rows = pd.DataFrame({
+        "symbol": prices_df["symbol"].to_numpy(dtype=object),
+        "date": to_days(prices_df["date"]),
+        "position": np.arange(len(prices_df)),
+    })
+    if rows.empty or versions_df.empty:
+        return prices_df.assign(**{column: None for column in columns})
+
+    ranges = valid_ranges(versions_df)[["symbol", "start_date", "end_date"] + columns]
+    merged = pd.merge_asof(
+        rows.sort_values("date", kind="stable"),
+        ranges,
+        left_on="date",
+        right_on="start_date",
+        by="symbol",
+        direction="backward",
+    ).sort_values("position")
+
+    inside = (merged["date"] < merged["end_date"]).to_numpy()
+    return prices_df.assign(**{
+        column: np.where(inside, merged[column].to_numpy(dtype=object), None)
+        for column in columns
+    })
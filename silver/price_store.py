@@ -0,0 +1,389 @@
+import datetime
+import json
+import os
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from typing import Dict, List, Optional, Tuple, Union
+from silver.load_parquet import (
+    DAILY_SILVER_PATH,
+    read_silver_prices,
+    silver_price_files,
+)
+from utils.config import PRICE_STORE_PATH
+
+# Layout of a record of the store: the date as days since 1970-01-01 and OHLCV
+PRICE_STORE_DTYPE: np.dtype = np.dtype([
+    ("date", "<i4"),
+    ("open_price", "<f4"),
+    ("high_price", "<f4"),
+    ("low_price", "<f4"),
+    ("close_price", "<f4"),
+    ("volume", "<i8"),
+])
+INDEX_FILE: str = "index.json"
+# Segments an update adds to before merging them all into one
+MAX_SEGMENTS: int = 16
+# Times the store is opened again when its segments are removed meanwhile
+OPEN_ATTEMPTS: int = 3
+
+DateLike = Union[str, datetime.date]
+
+
+def to_day(date: DateLike) -> int:
+    """
+    Convert a date to the number of days since 1970-01-01 used by the store.
+
+    Args:
+        date (DateLike): Date as a 'YYYY-MM-DD' string or a date.
+
+    Returns:
+        int: Days since the epoch.
+    """
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+def price_store_exists(root: str = PRICE_STORE_PATH) -> bool:
+    """
+    Check whether a price store was built under the given directory.
+    """
+    return os.path.exists(os.path.join(root, INDEX_FILE))
+
+
+def table_records(table: pa.Table) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert silver daily stock prices to records of the store.
+
+    Args:
+        table (pa.Table): Prices with the DAILY_STOCK_PRICES_SILVER_SCHEMA.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The symbol and the record of each row.
+    """
+    records = np.empty(table.num_rows, dtype=PRICE_STORE_DTYPE)
+    records["date"] = table.column("date").cast(pa.int32()).to_numpy()
+    for field in PRICE_STORE_DTYPE.names[1:]:
+        records[field] = table.column(field).to_numpy()
+    symbols: np.ndarray = (
+        table.column("symbol").cast(pa.string()).to_numpy(zero_copy_only=False)
+    )
+    return symbols, records
+
+
+def write_segment(
+    symbols: np.ndarray, records: np.ndarray, root: str, segment: int
+) -> Tuple[str, Dict[str, List[List[int]]]]:
+    """
+    Write records to a new data file, those of each symbol contiguous and
+    sorted by date.
+
+    Args:
+        symbols (np.ndarray): The symbol of each record.
+        records (np.ndarray): Records of the store.
+        root (str): Directory of the store.
+        segment (int): Position the data file takes in the index.
+
+    Returns:
+        Tuple[str, Dict[str, List[List[int]]]]: Name of the data file, and the
+        segment, offset and length of the records of each symbol.
+    """
+    order: np.ndarray = np.lexsort((records["date"], symbols))
+    names, offsets, lengths = np.unique(
+        symbols[order], return_index=True, return_counts=True
+    )
+
+    os.makedirs(root, exist_ok=True)
+    data_file: str = f"prices_{uuid.uuid4().hex}.npy"
+    with open(os.path.join(root, data_file), "wb") as file:
+        np.save(file, records[order])
+
+    return data_file, {
+        str(name): [[segment, int(offset), int(length)]]
+        for name, offset, length in zip(names, offsets, lengths)
+    }
+
+
+def write_index(root: str, index: Dict) -> None:
+    """
+    Replace the index of the store atomically, then remove the data files
+    neither it nor the previous index references.
+
+    The segments the new index supersedes (e.g. after a merge or a rebuild)
+    are listed in it as retired and kept until the next update, so a reader
+    that read the previous index can still load its segments.
+    """
+    index_path: str = os.path.join(root, INDEX_FILE)
+    previous: List[str] = (
+        read_index(root)["segments"] if os.path.exists(index_path) else []
+    )
+    index["retired"] = [
+        data_file for data_file in previous if data_file not in index["segments"]
+    ]
+    with open(f"{index_path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(f"{index_path}.tmp", index_path)
+
+    kept = set(index["segments"]) | set(index["retired"])
+    for name in os.listdir(root):
+        if name.startswith("prices_") and name not in kept:
+            os.remove(os.path.join(root, name))
+
+
+def read_index(root: str = PRICE_STORE_PATH) -> Dict:
+    """
+    Read the index of the store. The index of a store built before it had
+    segments is converted to a single segment.
+    """
+    with open(os.path.join(root, INDEX_FILE), encoding="utf-8") as file:
+        index: Dict = json.load(file)
+
+    if "data" in index:
+        index = {
+            "segments": [index["data"]],
+            "symbols": {
+                symbol: [[0] + location]
+                for symbol, location in index["symbols"].items()
+            },
+        }
+    return index
+
+
+def build_price_store(
+    silver_path: str = DAILY_SILVER_PATH, root: str = PRICE_STORE_PATH
+) -> int:
+    """
+    Rebuild the price store from the silver partitions of daily stock prices.
+
+    The records of each symbol are written contiguously and sorted by date in a
+    single .npy file, and index.json maps each symbol to its offset and length,
+    and lists the silver files the store holds. The data file gets a new name
+    on every build, the index is replaced atomically and the data files it
+    supersedes are kept until the next update, so readers that already opened
+    the store keep a consistent view.
+
+    Args:
+        silver_path (str): Root of the silver daily stock prices.
+        root (str): Directory of the store.
+
+    Returns:
+        int: Number of records written.
+    """
+    files: List[str] = silver_price_files(silver_path)
+    symbols, records = table_records(read_silver_prices(files))
+    data_file, locations = write_segment(symbols, records, root, 0)
+    write_index(root, {
+        "segments": [data_file],
+        "symbols": locations,
+        "files": [os.path.relpath(path, silver_path) for path in files],
+    })
+
+    print(f"Price store built with {len(records)} records of {len(locations)} symbols.")
+    return len(records)
+
+
+def update_price_store(
+    silver_path: str = DAILY_SILVER_PATH,
+    root: str = PRICE_STORE_PATH,
+    max_segments: int = MAX_SEGMENTS,
+) -> int:
+    """
+    Add to the price store the silver files written since it was last
+    updated, building it if it does not exist and there are silver prices.
+
+    Only the new files are read, and their records are written as a new
+    segment, so an update costs the size of the delta. Once the store has
+    max_segments segments they are merged into one, which keeps the history
+    of most symbols in a single zero-copy slice. The files already in the
+    store are listed in its index, so an update interrupted before the index
+    is replaced is completed by the next one.
+
+    Args:
+        silver_path (str): Root of the silver daily stock prices.
+        root (str): Directory of the store.
+        max_segments (int): Segments of the store before they are merged.
+
+    Returns:
+        int: Number of records added.
+    """
+    if not price_store_exists(root) or "files" not in read_index(root):
+        if not silver_price_files(silver_path):
+            return 0
+        return build_price_store(silver_path, root)
+
+    index: Dict = read_index(root)
+    stored = set(index["files"])
+    files: List[str] = [
+        path for path in silver_price_files(silver_path)
+        if os.path.relpath(path, silver_path) not in stored
+    ]
+    if not files:
+        print("Price store is up to date.")
+        return 0
+
+    symbols, records = table_records(read_silver_prices(files))
+    added: int = len(records)
+    if len(index["segments"]) >= max_segments:
+        # Merge the segments with the new records into a single one
+        store = PriceStore(root)
+        histories: List[np.ndarray] = [
+            store.history(symbol) for symbol in store.symbols()
+        ]
+        symbols = np.concatenate([
+            np.repeat(np.array(store.symbols(), dtype=object),
+                      [len(history) for history in histories]),
+            symbols,
+        ])
+        records = np.concatenate(histories + [records])
+        data_file, locations = write_segment(symbols, records, root, 0)
+        index["segments"] = [data_file]
+        index["symbols"] = locations
+    else:
+        data_file, locations = write_segment(
+            symbols, records, root, len(index["segments"])
+        )
+        index["segments"].append(data_file)
+        for symbol, location in locations.items():
+            index["symbols"].setdefault(symbol, []).extend(location)
+
+    index["files"] += [os.path.relpath(path, silver_path) for path in files]
+    write_index(root, index)
+
+    print(f"Price store updated with {added} records, "
+          f"{len(index['segments'])} segments.")
+    return added
+
+
+class PriceStore:
+    """
+    Read-only view of the price store, memory-mapped from disk.
+
+    The history of a symbol held by a single segment is a slice of the mapped
+    array, so reading it does not copy data nor load the records of other
+    symbols. The history of a symbol spread over several segments is copied
+    from their slices.
+    """
+
+    def __init__(self, root: str = PRICE_STORE_PATH) -> None:
+        for attempt in range(OPEN_ATTEMPTS):
+            index: Dict = read_index(root)
+            try:
+                segments: List[np.ndarray] = [
+                    np.load(os.path.join(root, data_file), mmap_mode="r")
+                    for data_file in index["segments"]
+                ]
+                break
+            except FileNotFoundError:
+                # Updates after the index was read removed its segments, so
+                # the current index is read again
+                if attempt == OPEN_ATTEMPTS - 1:
+                    raise
+        self.index: Dict[str, List[List[int]]] = index["symbols"]
+        self.segments: List[np.ndarray] = segments
+
+    def symbols(self) -> List[str]:
+        """
+        List the symbols of the store, sorted.
+        """
+        return sorted(self.index)
+
+    def history(
+        self,
+        symbol: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> np.ndarray:
+        """
+        Get the records of a symbol, optionally between two dates (inclusive).
+
+        Args:
+            symbol (str): The stock symbol.
+            start (Optional[DateLike]): First date of the range.
+            end (Optional[DateLike]): Last date of the range.
+
+        Returns:
+            np.ndarray: The records of the symbol sorted by date, a view if
+            they are in a single segment, empty if the symbol is not in the
+            store.
+        """
+        slices: List[np.ndarray] = [
+            self.segments[segment][offset:offset + length]
+            for segment, offset, length in self.index.get(symbol, [])
+        ]
+        records: np.ndarray
+        if not slices:
+            records = np.empty(0, dtype=PRICE_STORE_DTYPE)
+        elif len(slices) == 1:
+            records = slices[0]
+        else:
+            records = np.concatenate(slices)
+            # A later segment may hold dates before those of earlier ones
+            if np.any(np.diff(records["date"]) < 0):
+                records = records[np.argsort(records["date"], kind="stable")]
+        length: int = len(records)
+
+        if start is not None or end is not None:
+            days: np.ndarray = records["date"]
+            first = np.searchsorted(days, to_day(start)) if start is not None else 0
+            last = (
+                np.searchsorted(days, to_day(end), side="right")
+                if end is not None
+                else length
+            )
+            records = records[first:last]
+        return records
+
+    def dates(self) -> np.ndarray:
+        """
+        Get the distinct dates of the store, sorted.
+        """
+        return np.unique(
+            np.concatenate([segment["date"] for segment in self.segments])
+            if self.segments else np.empty(0, dtype="<i4")
+        ).astype("datetime64[D]")
+
+    def window(
+        self, start: DateLike, end: DateLike
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the close prices of every symbol between two dates (inclusive).
+
+        Args:
+            start (DateLike): First date of the range.
+            end (DateLike): Last date of the range.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The date, symbol and
+            close price of each record in long format.
+        """
+        slices: List[np.ndarray] = [
+            self.history(symbol, start, end) for symbol in self.symbols()
+        ]
+        lengths: List[int] = [len(records) for records in slices]
+        records = (
+            np.concatenate(slices) if slices else np.empty(0, dtype=PRICE_STORE_DTYPE)
+        )
+        return (
+            records["date"].astype("datetime64[D]"),
+            np.repeat(np.array(self.symbols(), dtype=object), lengths),
+            np.asarray(records["close_price"]),
+        )
+
+    def to_frame(self, symbol: str) -> pd.DataFrame:
+        """
+        Get the history of a symbol as a DataFrame with the columns of
+        daily_stock_prices_table.
+
+        Args:
+            symbol (str): The stock symbol.
+
+        Returns:
+            pd.DataFrame: The prices of the symbol sorted by date.
+        """
+        records: np.ndarray = self.history(symbol)
+        df = pd.DataFrame({
+            field: records[field] for field in PRICE_STORE_DTYPE.names[1:]
+        })
+        df.insert(0, "symbol", symbol)
+        df.insert(0, "date", pd.to_datetime(records["date"].astype("datetime64[D]")))
+        return df
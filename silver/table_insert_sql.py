@@ -1,250 +1,350 @@
 import pandas as pd
 from datetime import datetime
-from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from typing import Dict, List
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
 from utils.config import REDSHIFT_SCHEMA
+from utils.database import bulk_insert, stage_keys
 
+# SQL types of the columns of the daily stock prices staged for the insert
+STAGED_PRICE_COLUMNS: Dict[str, str] = {
+    "date": "DATE",
+    "symbol": "VARCHAR(255)",
+    "open_price": "REAL",
+    "high_price": "REAL",
+    "low_price": "REAL",
+    "close_price": "REAL",
+    "volume": "BIGINT",
+}
 
-def insert_stock_data_scd2(engine: Engine, stock_df: pd.DataFrame) -> None:
+
+def insert_stock_data_scd2(connection: Connection, stock_df: pd.DataFrame) -> None:
     """
     Implement Slowly Changing Dimension (SCD) Type 2 in the 'stock_table'.
 
+    The current records are read with one query and compared in memory, then
+    the changed records are closed with one UPDATE and the new versions are
+    appended with multi-row INSERTs, all within the caller's transaction.
+
     Args:
-        engine (Engine): SQLAlchemy engine for database connection.
+        connection (Connection): SQLAlchemy connection for the database operation.
         stock_df (pd.DataFrame): DataFrame containing stock data to be inserted.
 
     Raises:
         Exception: If an error occurs during the database operation.
     """
-    with engine.begin() as connection:
-        rows_added = 0
-        rows_updated = 0
-
-        for _, row in stock_df.iterrows():
-            # Check if there's an existing current record for the symbol
-            result = connection.execute(
-                text(
-                    f"""
-                SELECT * FROM "{REDSHIFT_SCHEMA}".stock_table
-                WHERE symbol = :symbol AND is_current = 1
-            """
-                ),
-                {"symbol": row["symbol"]},
-            )
-            current_record = result.fetchone()
-
-            if current_record:
-                # Check if any values have changed
-                # (excluding start_date, end_date, is_current)
-                if (
-                    row["name"] != current_record[2]
-                    or row["industry"] != current_record[3]
-                    or row["exchange"] != current_record[4]
-                    or row["logo"] != current_record[5]
-                    or row["weburl"] != current_record[6]
-                ):
-                    # Mark the existing record as not current and set the end date
-                    connection.execute(
-                        text(
-                            f"""
-                        UPDATE "{REDSHIFT_SCHEMA}".stock_table
-                        SET is_current = 0, end_date = :end_date
-                        WHERE symbol = :symbol AND is_current = 1
-                    """
-                        ),
-                        {
-                            "end_date": datetime.now().date(),
-                            "symbol": row["symbol"],
-                        },
-                    )
-                    rows_updated += 1
-
-                    # Insert a new record with is_current = 1 and start_date = today
-                    connection.execute(
-                        text(
-                            f"""
-                        INSERT INTO "{REDSHIFT_SCHEMA}".stock_table (
-                            symbol, name, industry, exchange, logo, weburl
-                                , start_date, end_date, is_current
-                        ) VALUES (:symbol, :name, :industry, :exchange,
-                            :logo, :weburl, :start_date, :end_date, :is_current)
-                    """
-                        ),
-                        {
-                            "symbol": row["symbol"],
-                            "name": row["name"],
-                            "industry": row["industry"],
-                            "exchange": row["exchange"],
-                            "logo": row["logo"],
-                            "weburl": row["weburl"],
-                            "start_date": datetime.now().date(),
-                            "end_date": datetime.strptime(
-                                "3000-12-01", "%Y-%m-%d"
-                            ).date(),
-                            "is_current": 1,
-                        },
-                    )
-                    rows_added += 1
-            else:
-                # Insert a new record if no current record exists
-                connection.execute(
-                    text(
-                        f"""
-                    INSERT INTO "{REDSHIFT_SCHEMA}".stock_table (
-                        symbol, name, industry, exchange
-                            , logo, weburl, start_date, end_date, is_current
-                    ) VALUES (:symbol, :name, :industry, :exchange,
-                        :logo, :weburl, :start_date, :end_date, :is_current)
-                """
-                    ),
-                    {
-                        "symbol": row["symbol"],
-                        "name": row["name"],
-                        "industry": row["industry"],
-                        "exchange": row["exchange"],
-                        "logo": row["logo"],
-                        "weburl": row["weburl"],
-                        "start_date": datetime.now().date(),
-                        "end_date": datetime.strptime(
-                            "3000-12-01", "%Y-%m-%d"
-                        ).date(),
-                        "is_current": 1,
-                    },
-                )
-                rows_added += 1
-
-        # Notify how many records were added or updated
-        if rows_updated > 0:
-            print(f"Updated {rows_updated} records in stock_table.")
-        if rows_added > 0:
-            print(f"Added {rows_added} new records to stock_table.")
-        if rows_added == 0 and rows_updated == 0:
-            print("No records were added or updated in stock_table.")
-
-
-def insert_date_data(engine: Engine, date_df: pd.DataFrame) -> None:
+    attribute_columns: List[str] = ["name", "industry", "exchange", "logo", "weburl"]
+
+    if stock_df.empty:
+        print("No records were added or updated in stock_table.")
+        return
+
+    # Keep the latest version of each symbol in the batch
+    stock_df = stock_df.astype(object).drop_duplicates("symbol", keep="last")
+
+    # Read the current records of the symbols with a single query
+    current_df: pd.DataFrame = pd.read_sql_query(
+        text(
+            f"""
+        SELECT symbol, name, industry, exchange, logo, weburl
+        FROM "{REDSHIFT_SCHEMA}".stock_table
+        WHERE symbol IN :symbols AND is_current = 1
     """
-    Insert or update date data in the 'date_table'.
+        ).bindparams(bindparam("symbols", expanding=True)),
+        connection,
+        params={"symbols": stock_df["symbol"].tolist()},
+    )
+
+    merged_df: pd.DataFrame = stock_df.merge(
+        current_df, on="symbol", how="left", suffixes=("", "_current"), indicator=True
+    )
+    is_new = merged_df["_merge"] == "left_only"
+
+    # Check if any values have changed (excluding start_date, end_date, is_current)
+    is_changed = pd.Series(False, index=merged_df.index)
+    for column in attribute_columns:
+        is_changed |= merged_df[column].fillna("") != merged_df[
+            f"{column}_current"
+        ].fillna("")
+    is_changed &= ~is_new
+
+    today = datetime.now().date()
+    changed_symbols: List[str] = merged_df.loc[is_changed, "symbol"].tolist()
+    rows_updated = len(changed_symbols)
+
+    if changed_symbols:
+        # Mark the existing records as not current and set the end date
+        connection.execute(
+            text(
+                f"""
+            UPDATE "{REDSHIFT_SCHEMA}".stock_table
+            SET is_current = 0, end_date = :end_date
+            WHERE symbol IN :symbols AND is_current = 1
+        """
+            ).bindparams(bindparam("symbols", expanding=True)),
+            {"end_date": today, "symbols": changed_symbols},
+        )
+
+    # Insert new records, and new versions of the changed records,
+    # with is_current = 1 and start_date = today
+    new_records_df: pd.DataFrame = merged_df.loc[
+        is_new | is_changed, ["symbol"] + attribute_columns
+    ].assign(
+        start_date=today,
+        end_date=datetime.strptime("3000-12-01", "%Y-%m-%d").date(),
+        is_current=1,
+    )
+    rows_added = len(new_records_df)
+    if rows_added > 0:
+        bulk_insert(connection, new_records_df, "stock_table")
+
+    # Notify how many records were added or updated
+    if rows_updated > 0:
+        print(f"Updated {rows_updated} records in stock_table.")
+    if rows_added > 0:
+        print(f"Added {rows_added} new records to stock_table.")
+    if rows_added == 0 and rows_updated == 0:
+        print("No records were added or updated in stock_table.")
+
+
+def insert_date_data(connection: Connection, date_df: pd.DataFrame) -> None:
+    """
+    Insert the new dates of the run in the 'date_table'.
+
+    Only the dates of the table within the range of date_df are read to skip
+    the ones already present, so the cost follows the size of the delta.
 
     Args:
-        engine (Engine): SQLAlchemy engine for database connection.
+        connection (Connection): SQLAlchemy connection for the database operation.
         date_df (pd.DataFrame): DataFrame containing date data to be inserted.
 
     Raises:
         Exception: If an error occurs during the database operation.
     """
-    with engine.connect() as connection:
-        result = connection.execute(
-            text(
-                f"""
-            SELECT MAX(date) FROM "{REDSHIFT_SCHEMA}".date_table
-        """
-            )
+    if date_df.empty:
+        print("No new dates were added; there are no new dates in this run.")
+        return
+
+    # Ensure the 'date' column in date_df matches the database date type
+    date_df = date_df.assign(date=pd.to_datetime(date_df["date"]).dt.date)
+
+    # Get the dates of the table within the range of the DataFrame
+    result = connection.execute(
+        text(
+            f"""
+        SELECT date FROM "{REDSHIFT_SCHEMA}".date_table
+        WHERE date BETWEEN :min_date AND :max_date
+    """
+        ),
+        {"min_date": date_df["date"].min(), "max_date": date_df["date"].max()},
+    )
+    existing_dates = {pd.to_datetime(row[0]).date() for row in result}
+
+    # Filter new dates
+    new_dates_df = date_df[~date_df["date"].isin(existing_dates)]
+
+    if not new_dates_df.empty:
+        # Insert new dates into the table
+        bulk_insert(connection, new_dates_df, "date_table")
+        print(f"Added {len(new_dates_df)} new dates to date_table.")
+    else:
+        print(
+            "No new dates were added; they were already present in date_table."
         )
-        max_date_in_table = result.fetchone()[0]
-
-        # Convert the date from the table to date type if it's not None
-        if max_date_in_table is not None:
-            max_date_in_table = pd.to_datetime(max_date_in_table).date()
-
-        # Ensure the 'date' column in date_df matches the database date type
-        date_df["date"] = pd.to_datetime(date_df["date"]).dt.date
-
-        # Get the latest date in the DataFrame
-        max_date_in_df = date_df["date"].max()
-
-        # Check if the latest date in the DataFrame already exists in the table
-        if max_date_in_table is None or max_date_in_df > max_date_in_table:
-            # Filter new dates
-            new_dates_df = (
-                date_df[date_df["date"] > max_date_in_table]
-                if max_date_in_table
-                else date_df
-            )
-
-            # Insert new dates into the table
-            new_dates_df.to_sql(
-                "date_table",
-                con=connection,
-                schema=f"{REDSHIFT_SCHEMA}",
-                if_exists="append",
-                index=False,
-            )
-            print(f"Added {len(new_dates_df)} new dates to date_table.")
-        else:
-            print(
-                "No new dates were added; they were already present in date_table."
-            )
 
 
 def insert_stock_prices_data(
-    engine: Engine, daily_stock_prices_df: pd.DataFrame
-) -> None:
+    connection: Connection, daily_stock_prices_df: pd.DataFrame
+) -> pd.DataFrame:
     """
-    Insert or update daily stock prices data in the 'daily_stock_prices_table'.
+    Insert the new daily stock prices of the run in the 'daily_stock_prices_table'.
+
+    Only the (date, symbol) keys of the table within the date range of
+    daily_stock_prices_df are read to skip the rows already present, so the
+    cost follows the size of the delta. The id_transaction generated for the
+    inserted rows is read back by joining the table with their staged keys.
 
     Args:
-        engine (Engine): SQLAlchemy engine for database connection.
+        connection (Connection): SQLAlchemy connection for the database operation.
         daily_stock_prices_df (pd.DataFrame): DataFrame containing
             daily stock prices data to be inserted.
 
+    Returns:
+        pd.DataFrame: The inserted rows with their id_transaction.
+
     Raises:
         Exception: If an error occurs during the database operation.
     """
-    with engine.begin() as connection:
-        # Get the latest date from the daily_stock_prices_table
-        result = connection.execute(
-            text(
-                f"""
-            SELECT MAX(date)
-            FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
-        """
-            )
+    if daily_stock_prices_df.empty:
+        print("No new records were added; there are no new prices in this run.")
+        return daily_stock_prices_df.assign(id_transaction=pd.Series(dtype="int64"))
+
+    # Ensure the 'date' column in daily_stock_prices_df matches
+    # the database date type
+    daily_stock_prices_df = daily_stock_prices_df.assign(
+        date=pd.to_datetime(daily_stock_prices_df["date"]).dt.date,
+        symbol=daily_stock_prices_df["symbol"].astype(object),
+    )
+
+    # Get the keys of the table within the date range of the DataFrame
+    result = connection.execute(
+        text(
+            f"""
+        SELECT date, symbol
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table
+        WHERE date BETWEEN :min_date AND :max_date
+    """
+        ),
+        {
+            "min_date": daily_stock_prices_df["date"].min(),
+            "max_date": daily_stock_prices_df["date"].max(),
+        },
+    )
+    existing_keys = {(pd.to_datetime(row[0]).date(), row[1]) for row in result}
+
+    # Filter new records
+    is_new = [
+        key not in existing_keys
+        for key in zip(daily_stock_prices_df["date"], daily_stock_prices_df["symbol"])
+    ]
+    new_prices_df = daily_stock_prices_df[is_new]
+
+    if not new_prices_df.empty:
+        # Insert new records into the daily stock prices table
+        bulk_insert(connection, new_prices_df, "daily_stock_prices_table")
+        print(
+            f"Added {len(new_prices_df)} records to daily_stock_prices_table."
+        )
+    else:
+        print(
+            "No new records were added; \
+they were already present in daily_stock_prices_table."
+        )
+        return new_prices_df.assign(id_transaction=pd.Series(dtype="int64"))
+
+    # Read back the generated id_transaction through the staged keys
+    stage_keys(
+        connection,
+        new_prices_df,
+        "staged_price_keys",
+        {"date": "DATE", "symbol": "VARCHAR(255)"},
+    )
+    ids_df: pd.DataFrame = pd.read_sql_query(
+        text(
+            f"""
+        SELECT prices.id_transaction, prices.date, prices.symbol
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table AS prices
+        JOIN staged_price_keys AS keys
+            ON prices.date = keys.date AND prices.symbol = keys.symbol
+    """
+        ),
+        connection,
+    )
+    connection.execute(text("DROP TABLE staged_price_keys"))
+
+    ids_df["date"] = pd.to_datetime(ids_df["date"]).dt.date
+    return new_prices_df.merge(ids_df, on=["date", "symbol"], how="left")
+
+
+def insert_staged_stock_prices_data(
+    connection: Connection, partitions: List[pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Insert the new daily stock prices of the run in the 'daily_stock_prices_table'
+    with a single INSERT ... SELECT.
+
+    The partitions are staged one after the other into one temporary table,
+    and the rows whose (date, symbol) key is not in the table yet are inserted
+    by one statement, so the fact table is only written by the caller's
+    transaction. The id_transaction generated for the inserted rows is read
+    back by joining the table with the staged keys.
+
+    Args:
+        connection (Connection): SQLAlchemy connection for the database operation.
+        partitions (List[pd.DataFrame]): Partitions of the daily stock prices
+            to be inserted.
+
+    Returns:
+        pd.DataFrame: The inserted rows with their id_transaction, as returned
+        by insert_stock_prices_data.
+
+    Raises:
+        Exception: If an error occurs during the database operation.
+    """
+    daily_stock_prices_df: pd.DataFrame = pd.concat(partitions, ignore_index=True)
+    if daily_stock_prices_df.empty:
+        print("No new records were added; there are no new prices in this run.")
+        return daily_stock_prices_df.assign(id_transaction=pd.Series(dtype="int64"))
+
+    columns: Dict[str, str] = {
+        column: STAGED_PRICE_COLUMNS[column]
+        for column in daily_stock_prices_df.columns
+        if column in STAGED_PRICE_COLUMNS
+    }
+    for position, partition in enumerate(partitions):
+        # Ensure the 'date' column matches the database date type
+        partition = partition.assign(
+            date=pd.to_datetime(partition["date"]).dt.date,
+            symbol=partition["symbol"].astype(object),
         )
-        max_date_in_prices_table = result.fetchone()[0]
-
-        # Convert the date from the table to date type if it's not None
-        if max_date_in_prices_table is not None:
-            max_date_in_prices_table = pd.to_datetime(
-                max_date_in_prices_table
-            ).date()
-
-        # Ensure the 'date' column in daily_stock_prices_df matches
-        # the database date type
-        daily_stock_prices_df["date"] = pd.to_datetime(
-            daily_stock_prices_df["date"]
-        ).dt.date
-
-        # Get the latest date in the daily stock prices DataFrame
-        max_date_in_prices_df = daily_stock_prices_df["date"].max()
-
-        # Check if the latest date in the DataFrame already exists in the table
-        if (
-            max_date_in_prices_table is None
-            or max_date_in_prices_df > max_date_in_prices_table
-        ):
-            # Filter new records
-            new_prices_df = (
-                daily_stock_prices_df[
-                    daily_stock_prices_df["date"] > max_date_in_prices_table
-                ]
-                if max_date_in_prices_table
-                else daily_stock_prices_df
-            )
-
-            # Insert new records into the daily stock prices table
-            new_prices_df.to_sql(
-                "daily_stock_prices_table",
-                con=connection,
-                schema=f"{REDSHIFT_SCHEMA}",
-                if_exists="append",
-                index=False,
-            )
-            print(
-                f"Added {len(new_prices_df)} records to daily_stock_prices_table."
-            )
+        if position == 0:
+            stage_keys(connection, partition, "staged_prices", columns)
         else:
-            print(
-                "No new records were added; \
+            bulk_insert(connection, partition[list(columns)], "staged_prices", None)
+
+    is_new: str = f"""
+        NOT EXISTS (
+            SELECT 1 FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table AS prices
+            WHERE prices.date = staged.date AND prices.symbol = staged.symbol
+        )
+    """
+    new_keys_df: pd.DataFrame = pd.read_sql_query(
+        text(f"SELECT staged.date, staged.symbol FROM staged_prices AS staged "
+             f"WHERE {is_new}"),
+        connection,
+    )
+    if new_keys_df.empty:
+        connection.execute(text("DROP TABLE staged_prices"))
+        print(
+            "No new records were added; \
 they were already present in daily_stock_prices_table."
-            )
+        )
+        return daily_stock_prices_df.iloc[:0].assign(
+            id_transaction=pd.Series(dtype="int64")
+        )
+
+    # Insert the new records into the daily stock prices table at once
+    column_list: str = ", ".join(columns)
+    staged_columns: str = ", ".join(f"staged.{column}" for column in columns)
+    connection.execute(text(f"""
+        INSERT INTO "{REDSHIFT_SCHEMA}".daily_stock_prices_table ({column_list})
+        SELECT {staged_columns}
+        FROM staged_prices AS staged
+        WHERE {is_new}
+    """))
+    print(f"Added {len(new_keys_df)} records to daily_stock_prices_table.")
+
+    # Read back the generated id_transaction through the staged keys
+    ids_df: pd.DataFrame = pd.read_sql_query(
+        text(
+            f"""
+        SELECT prices.id_transaction, prices.date, prices.symbol
+        FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table AS prices
+        JOIN staged_prices AS staged
+            ON prices.date = staged.date AND prices.symbol = staged.symbol
+    """
+        ),
+        connection,
+    )
+    connection.execute(text("DROP TABLE staged_prices"))
+
+    daily_stock_prices_df = daily_stock_prices_df.assign(
+        date=pd.to_datetime(daily_stock_prices_df["date"]).dt.date,
+        symbol=daily_stock_prices_df["symbol"].astype(object),
+    )
+    new_keys_df["date"] = pd.to_datetime(new_keys_df["date"]).dt.date
+    ids_df["date"] = pd.to_datetime(ids_df["date"]).dt.date
+    new_prices_df: pd.DataFrame = daily_stock_prices_df.merge(
+        new_keys_df, on=["date", "symbol"]
+    )
+    return new_prices_df.merge(ids_df, on=["date", "symbol"], how="left")
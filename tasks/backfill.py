@@ -0,0 +1,65 @@
+"""
+List the trading days of a date range whose bronze prices are missing, and
+the command that triggers the daily DAG for each of them, so a backfill only
+runs (and spends API quota on) the dates that need it.
+
+Usage:
+    python -m tasks.backfill --start 2024-01-01 --end 2024-03-31
+"""
+import argparse
+import os
+from typing import List, Optional
+from bronze.compaction import bronze_source
+from silver.load_parquet import read_listed_exchanges
+from utils.config import BRONZE_COMPACTED_PATH, BRONZE_DATA_PATH
+from utils.trading_calendar import exchange_calendars, trading_days
+
+
+def backfill_dates(
+    start: str,
+    end: str,
+    calendars: Optional[List[str]] = None,
+    data_path: str = BRONZE_DATA_PATH,
+    root: str = BRONZE_COMPACTED_PATH,
+) -> List[str]:
+    """
+    List the trading days between start and end, both included, without
+    bronze prices in a per-date or a compacted file.
+
+    Args:
+        start (str): First date of the range.
+        end (str): Last date of the range.
+        calendars (Optional[List[str]]): Calendars of the exchanges. Defaults
+            to those of the exchanges of the listed symbols.
+        data_path (str): Directory of the per-date bronze files.
+        root (str): Directory of the compacted files.
+
+    Returns:
+        List[str]: The dates to be run, in order.
+    """
+    if calendars is None:
+        calendars = exchange_calendars(read_listed_exchanges())
+    return [
+        date
+        for date in trading_days(start, end, calendars)
+        if not os.path.exists(
+            bronze_source("daily_stock_prices_table", date, "bronze", data_path, root)
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--dag-id", default="stock_price_dags")
+    args = parser.parse_args()
+
+    dates: List[str] = backfill_dates(args.start, args.end)
+    print(f"{len(dates)} trading days to backfill between {args.start} and {args.end}.")
+    for date in dates:
+        print(f"airflow dags trigger {args.dag_id} --exec-date {date}")
+
+
+if __name__ == "__main__":
+    main()
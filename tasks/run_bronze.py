@@ -1,23 +1,248 @@
+import time
+from bronze.archive import ResponseArchive
+from bronze.compaction import bronze_source
+from bronze.fetch_scheduler import (
+    RETRYABLE,
+    FetchScheduler,
+    missed_symbols,
+    save_fetch_status,
+    symbol_priorities,
+)
 from bronze.parquet_create import parquet_create
-from utils.config import API_KEY_ALPHA, API_KEY_FINHUB,  STOCKS_SYMBOLS_LIST
-from airflow.exceptions import AirflowException
-from typing import Any
+from bronze.providers import ArchiveProvider, get_provider
+from silver.load_parquet import read_listed_exchanges
+from utils.config import (
+    ARCHIVE_RESPONSES,
+    BRONZE_MODE,
+    FETCH_DEADLINE_MINUTES,
+    PRICE_PROVIDER,
+    PROFILE_PROVIDER,
+    SKIP_NON_TRADING_DAYS,
+    STOCKS_SYMBOLS_LIST,
+)
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
+from utils.trading_calendar import exchange_calendars, is_trading_day
+from airflow.exceptions import AirflowException, AirflowSkipException
+from typing import Any, List, Optional
 
 
+def is_replay(context: Any) -> bool:
+    """
+    Check whether the bronze layer must be rebuilt from the archived responses,
+    either because BRONZE_MODE is 'replay' or because the DAG run was
+    triggered with {"replay": true} in its configuration.
+
+    Args:
+        context (Any): The Airflow context of the task.
+
+    Returns:
+        bool: True if the run is a replay.
+    """
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf or {}) if dag_run is not None else {}
+    return bool(conf.get("replay", BRONZE_MODE == "replay"))
+
+
+def is_market_open(**context: Any) -> bool:
+    """
+    Check whether the exchanges of the listed symbols trade on the date of
+    the run, so no API call is made for a weekend or a market holiday.
+    Always True if SKIP_NON_TRADING_DAYS is not set.
+    """
+    if not SKIP_NON_TRADING_DAYS:
+        return True
+    calendars: List[str] = exchange_calendars(read_listed_exchanges())
+    return is_trading_day(context["ds"], calendars)
+
+
+def is_catch_up(context: Any) -> bool:
+    """
+    Check whether the run is a catch-up run, triggered with
+    {"catch_up": true} to fetch only the symbols the run of the date missed.
+    """
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf or {}) if dag_run is not None else {}
+    return bool(conf.get("catch_up", False))
+
+
+def has_missed_symbols(**context: Any) -> bool:
+    """
+    Check whether the deadline, the quota or a failed request left symbols
+    of the date without prices or profile, so a catch-up run must be
+    scheduled for them.
+    """
+    date: str = context["ds"]
+    return bool(
+        missed_symbols(date, "prices", statuses=RETRYABLE)
+        or missed_symbols(date, "profiles", statuses=RETRYABLE)
+    )
+
+
+def fetch_with_scheduler(
+    date: str,
+    symbols: List[str],
+    price_provider: Any,
+    profile_provider: Any,
+    merge: bool = False,
+    profile_symbols: Optional[List[str]] = None,
+) -> FetchScheduler:
+    """
+    Fetch the symbols by priority within the deadline of the run, and record
+    the outcome of every symbol in the fetch status of the date, also when
+    the fetch fails or is deferred. The profiles are fetched for
+    profile_symbols, by default the same symbols as the prices.
+    """
+    if profile_symbols is None:
+        profile_symbols = symbols
+    deadline: Optional[float] = (
+        time.monotonic() + FETCH_DEADLINE_MINUTES * 60
+        if FETCH_DEADLINE_MINUTES > 0
+        else None
+    )
+    scheduler = FetchScheduler(
+        symbol_priorities(sorted(set(symbols) | set(profile_symbols))), deadline
+    )
+    try:
+        parquet_create(
+            date,
+            symbols,
+            price_provider,
+            profile_provider,
+            scheduler,
+            merge,
+            profile_symbols,
+        )
+    finally:
+        if scheduler.outcomes:
+            save_fetch_status(scheduler.status_frame(date), date)
+    return scheduler
+
+
+def run_catch_up(date: str) -> None:
+    """
+    Fetch again the symbols the run of the date missed and add them to its
+    bronze files, which makes the next stages load them. Each dataset is only
+    fetched for the symbols it missed.
+
+    Raises:
+        AirflowException: If symbols were left behind by the deadline, the
+        quota or a failed request, so the catch-up is retried once the quota
+        had time to reset. Symbols the API has no data for are not retried.
+    """
+    missed_prices: List[str] = missed_symbols(date, "prices", statuses=RETRYABLE)
+    missed_profiles: List[str] = missed_symbols(date, "profiles", statuses=RETRYABLE)
+    if not missed_prices and not missed_profiles:
+        print(f"No symbols missed on {date}, nothing to catch up.")
+        return
+
+    archive: Optional[ResponseArchive] = (
+        ResponseArchive(date) if ARCHIVE_RESPONSES else None
+    )
+    try:
+        scheduler = fetch_with_scheduler(
+            date,
+            missed_prices,
+            get_provider(PRICE_PROVIDER, archive),
+            get_provider(PROFILE_PROVIDER, archive),
+            merge=True,
+            profile_symbols=missed_profiles,
+        )
+    finally:
+        if archive is not None:
+            archive.save()
+
+    still_missed = scheduler.missed("prices", RETRYABLE) + scheduler.missed(
+        "profiles", RETRYABLE
+    )
+    if still_missed:
+        raise AirflowException(
+            f"{len(set(still_missed))} symbols still missing for {date}."
+        )
+
+
+@profiled("bronze")
 def run_bronze(**context: Any) -> None:
     """
     Executes the bronze layer task, which creates parquet files with stock data
-    retrieved from external APIs.
+    retrieved from external APIs, or replayed from the archived raw responses
+    of the date without network access.
+
+    Dates the exchanges of the listed symbols are closed are skipped before
+    any request is made. The symbols are fetched by priority within
+    FETCH_DEADLINE_MINUTES and the daily quota of the providers, and the
+    outcome of each one is written to the fetch status of the date. A run
+    triggered with {"catch_up": true} only fetches the symbols missed and
+    adds them to the files of the date. If the deadline or the quota deferred
+    a whole dataset, the task is skipped along with the downstream stages,
+    and the catch-up run loads the date.
+
+    The stage is skipped if it already completed for the date with the same
+    symbols, mode and code, unless the DAG run is triggered with
+    {"force": true}.
 
     Args:
         **kwargs (Any): Additional arguments passed from Airflow or the context.
 
     Raises:
+        AirflowSkipException: If the date is not a trading day or a dataset
+        was deferred to the catch-up run, which also skips the downstream
+        stages.
         AirflowException: If the parquet creation process fails, this exception
         is raised to mark the task as failed in the DAG.
     """
+    date: str = context["ds"]
+    if not is_market_open(**context):
+        raise AirflowSkipException(f"{date} is not a trading day, nothing to fetch.")
+
+    replay: bool = is_replay(context)
+    if is_catch_up(context):
+        run_catch_up(date)
+        return
+
+    # Skip the stage if its files are up to date for the same inputs
+    manifest = RunManifest(date)
+    outputs: List[str] = [
+        bronze_source("daily_stock_prices_table", date),
+        bronze_source("stock_table", date),
+    ]
+    fingerprint: str = stage_fingerprint(
+        "bronze",
+        [ResponseArchive(date).manifest_path] if replay else [],
+        STOCKS_SYMBOLS_LIST,
+        ["bronze", "tasks/run_bronze.py", "utils"],
+        replay=replay,
+        price_provider=PRICE_PROVIDER,
+        profile_provider=PROFILE_PROVIDER,
+    )
+    if not is_forced(context) and manifest.is_up_to_date(
+        "bronze", fingerprint, outputs
+    ):
+        print(f"Bronze files of {date} are up to date, skipping the stage.")
+        return
+
     try:
-        parquet_create(context["ds"], STOCKS_SYMBOLS_LIST, API_KEY_ALPHA, API_KEY_FINHUB)  # noqa: E501
+        if replay:
+            provider = ArchiveProvider(ResponseArchive(date))
+            parquet_create(date, provider.symbols(), provider, provider)
+            manifest.record("bronze", fingerprint)
+            return
+
+        archive: Optional[ResponseArchive] = (
+            ResponseArchive(date) if ARCHIVE_RESPONSES else None
+        )
+        try:
+            fetch_with_scheduler(
+                date,
+                STOCKS_SYMBOLS_LIST,
+                get_provider(PRICE_PROVIDER, archive),
+                get_provider(PROFILE_PROVIDER, archive),
+            )
+        finally:
+            # Keep the responses that arrived even if the task fails
+            if archive is not None:
+                archive.save()
+        manifest.record("bronze", fingerprint)
     except AirflowException as e:
         raise e  # Force the task to fail to cancel the DAG
 
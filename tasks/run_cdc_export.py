@@ -0,0 +1,68 @@
+from gold.cdc_export import collect_changes, write_batch
+from silver.adjustments import adjustment_changes_path, read_adjustment_changes
+from silver.load_parquet import (
+    loaded_prices_path,
+    read_loaded_prices,
+    read_stock_changes,
+    stock_changes_path,
+)
+from tasks.run_gold import recompute_range
+from utils.database import create_redshift_engine
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
+from typing import Any, Optional, Tuple
+
+
+@profiled("cdc_export")
+def run_cdc_export(**context: Any) -> Optional[int]:
+    """
+    Executes the change data export, which writes the rows inserted or changed
+    by the run of the date in silver and gold as a new batch of Parquet files
+    with the next watermark, so downstream copies sync incrementally instead
+    of pulling whole tables.
+
+    The stage is skipped if it already exported the same silver output,
+    adjustment changes and recompute range, so a retry does not publish the
+    same changes twice, unless the DAG run is triggered with {"force": true}.
+
+    Args:
+        **context (Any): The Airflow context of the task.
+
+    Returns:
+        Optional[int]: The watermark of the batch, or None if nothing changed.
+    """
+    date: str = context["ds"]
+    recompute: Optional[Tuple[str, str]] = recompute_range(context)
+
+    manifest = RunManifest(date)
+    fingerprint: str = stage_fingerprint(
+        "cdc_export",
+        [
+            loaded_prices_path(date),
+            stock_changes_path(date),
+            adjustment_changes_path(date),
+        ],
+        [],
+        ["gold/cdc_export.py", "tasks/run_cdc_export.py", "utils"],
+        recompute=recompute,
+    )
+    if not is_forced(context) and manifest.is_up_to_date("cdc_export", fingerprint):
+        print(f"Changes of {date} were already exported, skipping the stage.")
+        return manifest.result("cdc_export")
+
+    changes = collect_changes(
+        create_redshift_engine(pool_size=1),
+        date,
+        read_loaded_prices(date),
+        read_stock_changes(date),
+        read_adjustment_changes(date),
+        recompute,
+    )
+    watermark: Optional[int] = write_batch(changes, date)
+
+    manifest.record("cdc_export", fingerprint, watermark)
+    return watermark
+
+
+if __name__ == "__main__":
+    run_cdc_export()
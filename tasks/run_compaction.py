@@ -0,0 +1,25 @@
+from bronze.compaction import compact_bronze
+from utils.profiling import profiled
+from typing import Any, Dict
+
+
+@profiled("compaction")
+def run_compaction(**context: Any) -> Dict[str, Dict[str, int]]:
+    """
+    Executes the compaction of the bronze layer, which merges the per-date
+    bronze and validated files of the months closed before the date into
+    monthly files. The silver layer and the re-runs of past dates read the
+    rows of a date from either form.
+
+    Args:
+        **context (Any): The Airflow context of the task.
+
+    Returns:
+        Dict[str, Dict[str, int]]: The rows of each compacted month, pushed
+        to XCom.
+    """
+    return compact_bronze(context["ds"])
+
+
+if __name__ == "__main__":
+    run_compaction()
@@ -0,0 +1,103 @@
+import os
+from bronze.archive import ResponseArchive
+from bronze.providers import AlphaVantageProvider, ArchiveProvider
+from silver.adjustments import (
+    ACTIONS_FILE,
+    fetch_corporate_actions,
+    load_adjustments,
+    save_adjustments,
+    update_adjustments,
+)
+from silver.create_tables import create_tables
+from silver.price_store import PriceStore, price_store_exists
+from tasks.run_bronze import is_replay
+from utils.config import (
+    ADJUST_DIVIDENDS,
+    ARCHIVE_RESPONSES,
+    CORPORATE_ACTIONS_PATH,
+    RAW_ARCHIVE_PATH,
+    RUN_MANIFEST_PATH,
+    STOCKS_SYMBOLS_LIST,
+)
+from utils.database import create_redshift_engine
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
+from typing import Any, List, Optional
+
+
+@profiled("corporate_actions")
+def run_corporate_actions(**context: Any) -> int:
+    """
+    Executes the corporate actions task, which fetches the splits and cash
+    dividends of the symbols (or replays them from the archived responses),
+    recomputes the cumulative adjustment factors of the symbols whose actions
+    changed and replaces their rows in the warehouse. The stored prices are
+    not rewritten; they are adjusted on read.
+
+    The stage is skipped if it already completed for the date with the same
+    symbols and code, unless the DAG run is triggered with {"force": true}.
+
+    Args:
+        **context (Any): The Airflow context of the task.
+
+    Returns:
+        int: Number of symbols whose adjustment factors changed.
+    """
+    date: str = context["ds"]
+    replay: bool = is_replay(context)
+    # The corporate action responses have their own archive, so this task and
+    # the bronze task never write the same manifest
+    archive: Optional[ResponseArchive] = (
+        ResponseArchive(date, os.path.join(RAW_ARCHIVE_PATH, "corporate_actions"))
+        if replay or ARCHIVE_RESPONSES
+        else None
+    )
+    symbols: List[str] = (
+        sorted(archive.keys("alpha_vantage_splits")) if replay else STOCKS_SYMBOLS_LIST
+    )
+
+    # Skip the stage if the factors are up to date for the same inputs
+    manifest = RunManifest(date, os.path.join(RUN_MANIFEST_PATH, "corporate_actions"))
+    fingerprint: str = stage_fingerprint(
+        "corporate_actions",
+        [archive.manifest_path] if replay else [],
+        symbols,
+        ["silver/adjustments.py", "tasks/run_corporate_actions.py", "utils"],
+        replay=replay,
+        adjust_dividends=ADJUST_DIVIDENDS,
+    )
+    if not is_forced(context) and manifest.is_up_to_date(
+        "corporate_actions",
+        fingerprint,
+        [os.path.join(CORPORATE_ACTIONS_PATH, ACTIONS_FILE)],
+    ):
+        print(f"Corporate actions of {date} are up to date, skipping the stage.")
+        return manifest.result("corporate_actions")
+
+    provider = (
+        ArchiveProvider(archive) if replay else AlphaVantageProvider(archive=archive)
+    )
+    try:
+        # Charged to the daily quota shared with the bronze fetches
+        actions = fetch_corporate_actions(symbols, provider)
+    finally:
+        # Keep the responses that arrived even if the task fails
+        if archive is not None and not replay:
+            archive.save()
+
+    store: Optional[PriceStore] = PriceStore() if price_store_exists() else None
+    actions_df, factors_df, affected = update_adjustments(actions, store)
+    if affected:
+        engine = create_redshift_engine(pool_size=1)
+        with engine.begin() as connection:
+            create_tables(connection)
+            load_adjustments(connection, actions_df, factors_df, affected)
+    # Also clears the changes recorded by a prior run of the date
+    save_adjustments(actions_df, factors_df, affected, date=date)
+
+    manifest.record("corporate_actions", fingerprint, len(affected))
+    return len(affected)
+
+
+if __name__ == "__main__":
+    run_corporate_actions()
@@ -1,8 +1,40 @@
+import os
+from typing import Any, Optional, Tuple
 from sqlalchemy.engine import Engine
 from utils.database import create_redshift_engine
-from gold.calculate_stock_attributes import calculate_stock_attributes
+from gold.calculate_stock_attributes import (
+    calculate_stock_attributes,
+    recompute_stock_attributes,
+)
+from gold.cross_sectional import calculate_cross_sectional
+from gold.rollups import update_rollups
+from silver.load_parquet import loaded_prices_path, read_loaded_prices
+from silver.price_store import INDEX_FILE
+from utils.config import BENCHMARK_SYMBOL, CROSS_SECTIONAL_WINDOW, PRICE_STORE_PATH
+from utils.manifest import (
+    RunManifest,
+    is_forced,
+    record_gold_refresh,
+    stage_fingerprint,
+)
+from utils.profiling import profiled
 
 
+def recompute_range(context: Any) -> Optional[Tuple[str, str]]:
+    """
+    Get the date range whose attributes are recomputed, if the DAG run was
+    triggered with {"recompute": {"start": "2020-01-01", "end": "2024-09-10"}}.
+    The end defaults to the date of the run.
+    """
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf or {}) if dag_run is not None else {}
+    recompute = conf.get("recompute")
+    if not recompute:
+        return None
+    return recompute["start"], recompute.get("end", context["ds"])
+
+
+@profiled("gold")
 def run_gold(**context) -> None:
     """
     Run the gold layer process, which calculates stock attributes
@@ -10,18 +42,62 @@ def run_gold(**context) -> None:
 
     Steps:
         1. Create a connection to the Redshift database.
-        2. Calculate stock attributes based on daily stock prices for the given date.
+        2. Calculate stock attributes based on the daily stock prices loaded by
+           the silver layer for the given date, reusing their id_transaction.
         3. Insert the calculated attributes into the relevant table in Redshift.
+        4. Refresh the weekly, monthly and sector rollups of the touched periods.
+        5. Calculate the returns, correlations and betas of all symbols.
+        6. Replace the gold refresh marker, invalidating the query service cache.
+
+    A run triggered with {"recompute": {"start": ..., "end": ...}} recomputes
+    the attributes of every price of the range instead of those of the date,
+    streaming them in batches of whole symbols within GOLD_MEMORY_LIMIT_MB.
+
+    The stage is skipped if it already completed for the same silver output
+    and code, unless the DAG run is triggered with {"force": true}.
 
     Args:
         None
 
     """
 
+    date: str = context["ds"]
+    recompute: Optional[Tuple[str, str]] = recompute_range(context)
+
+    # Skip the stage if it already ran for the same silver output
+    manifest = RunManifest(date)
+    fingerprint: str = stage_fingerprint(
+        "gold",
+        [loaded_prices_path(date), os.path.join(PRICE_STORE_PATH, INDEX_FILE)],
+        [],
+        ["gold", "silver/point_in_time.py", "tasks/run_gold.py", "utils"],
+        benchmark=BENCHMARK_SYMBOL,
+        window=CROSS_SECTIONAL_WINDOW,
+        recompute=recompute,
+    )
+    if not is_forced(context) and manifest.is_up_to_date("gold", fingerprint):
+        print(f"Gold layer of {date} is up to date, skipping the stage.")
+        return
+
     conn: Engine = create_redshift_engine()
 
     # Calculate stock attributes and insert them into Redshift
-    calculate_stock_attributes(conn, context["ds"])
+    loaded_prices_df = read_loaded_prices(date)
+    if recompute is not None:
+        recompute_stock_attributes(conn, *recompute)
+    else:
+        calculate_stock_attributes(conn, date, loaded_prices_df)
+
+    # Refresh the rollups of the periods touched by the run
+    update_rollups(conn, date, loaded_prices_df)
+
+    # Calculate the cross-sectional analytics from the silver prices
+    calculate_cross_sectional(conn, date)
+
+    manifest.record("gold", fingerprint)
+
+    # Invalidate the results cached by the query service
+    record_gold_refresh(date)
 
 
 if __name__ == "__main__":
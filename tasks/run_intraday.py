@@ -0,0 +1,106 @@
+import os
+from bronze.archive import ResponseArchive
+from bronze.intraday import (
+    create_intraday_file,
+    intraday_partition,
+    read_intraday_bars,
+)
+from bronze.providers import AlphaVantageProvider, ArchiveProvider
+from silver.create_tables import create_tables
+from silver.intraday_load import load_intraday_bars
+from tasks.run_bronze import is_replay
+from utils.config import (
+    ARCHIVE_RESPONSES,
+    INTRADAY_INTERVAL,
+    INTRADAY_SYMBOLS,
+    RAW_ARCHIVE_PATH,
+    RUN_MANIFEST_PATH,
+)
+from utils.database import create_redshift_engine
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
+from typing import Any, List, Optional
+
+
+@profiled("intraday")
+def run_intraday(**context: Any) -> Optional[int]:
+    """
+    Executes the intraday ingestion, which fetches the TIME_SERIES_INTRADAY
+    bars of INTRADAY_SYMBOLS for the date (or replays them from the archived
+    responses), appends them to their own date partition of the intraday
+    files and replaces the bars of the date in intraday_stock_prices_table.
+
+    The stage is skipped if it already completed for the date with the same
+    symbols, interval and code, unless the DAG run is triggered with
+    {"force": true}.
+
+    Args:
+        **context (Any): The Airflow context of the task.
+
+    Returns:
+        Optional[int]: Number of bars loaded, or None if there were no bars.
+    """
+    date: str = context["ds"]
+    replay: bool = is_replay(context)
+    # The intraday responses have their own archive, so this task and the
+    # bronze task never write the same manifest
+    archive: Optional[ResponseArchive] = (
+        ResponseArchive(date, os.path.join(RAW_ARCHIVE_PATH, "intraday"))
+        if replay or ARCHIVE_RESPONSES
+        else None
+    )
+
+    symbols: List[str] = (
+        sorted(archive.keys("alpha_vantage_intraday")) if replay else INTRADAY_SYMBOLS
+    )
+    if not symbols:
+        print("No intraday symbols configured, skipping the stage.")
+        return None
+
+    # Skip the stage if the bars of the date are up to date for the same inputs
+    manifest = RunManifest(date, os.path.join(RUN_MANIFEST_PATH, "intraday"))
+    fingerprint: str = stage_fingerprint(
+        "intraday",
+        [archive.manifest_path] if replay else [],
+        symbols,
+        [
+            "bronze/intraday.py",
+            "silver/intraday_load.py",
+            "tasks/run_intraday.py",
+            "utils",
+        ],
+        replay=replay,
+        interval=INTRADAY_INTERVAL,
+    )
+    partition: str = intraday_partition(date)
+    if not is_forced(context) and manifest.is_up_to_date(
+        "intraday", fingerprint, [os.path.join(partition, "bars.parquet")]
+    ):
+        print(f"Intraday bars of {date} are up to date, skipping the stage.")
+        return manifest.result("intraday")
+
+    provider = (
+        ArchiveProvider(archive) if replay else AlphaVantageProvider(archive=archive)
+    )
+    try:
+        path = create_intraday_file(date, symbols, provider)
+    finally:
+        # Keep the responses that arrived even if the task fails
+        if archive is not None and not replay:
+            archive.save()
+    if path is None:
+        return None
+
+    engine = create_redshift_engine(pool_size=1)
+    with engine.begin() as connection:
+        create_tables(connection)
+        loaded: int = load_intraday_bars(
+            connection, read_intraday_bars(date, date), date, INTRADAY_INTERVAL
+        )
+
+    manifest.record("intraday", fingerprint, loaded)
+    return loaded
+
+
+if __name__ == "__main__":
+    run_intraday()
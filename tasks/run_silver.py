@@ -1,7 +1,19 @@
 from sqlalchemy.engine import Engine
+from utils.config import SILVER_LOAD_CONCURRENCY
 from utils.database import create_redshift_engine
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
 from silver.create_tables import create_tables
-from silver.load_parquet import load_parquet_files
+from silver.parallel_load import load_silver_parallel
+from silver.load_parquet import (
+    input_file,
+    load_parquet_files,
+    save_loaded_prices,
+    save_silver_files,
+    save_stock_changes,
+    split_legacy_silver_prices,
+)
+from silver.price_store import update_price_store
 from silver.table_insert_sql import (
     insert_stock_data_scd2,
     insert_date_data,
@@ -10,33 +22,91 @@ from silver.table_insert_sql import (
 import pandas as pd
 
 
+@profiled("silver")
 def run_silver(**context) -> None:
     """
     Run the silver layer process, which includes creating tables,
     loading Parquet files, and inserting data into Redshift tables.
 
     Steps:
-        1. Create necessary tables in the Redshift database.
-        2. Load data from Parquet files.
+        1. Load the rows that bronze adds to the silver layer from Parquet files.
+        2. Create necessary tables in the Redshift database.
         3. Insert stock, date, and daily stock prices data into Redshift.
+        4. Append the loaded rows to the silver Parquet files, the prices as
+           new part files of their dates, and save the inserted prices with
+           their id_transaction for the gold layer and the changed stock
+           profiles for the change data export.
+        5. Add the new silver part files to the memory-mapped price store.
+
+    Steps 2 and 3 share one connection and one transaction, so a failure
+    leaves no half-loaded dimension or fact data and the task can be retried.
+    With SILVER_LOAD_CONCURRENCY above 1, stock_table and date_table are
+    loaded concurrently on pooled connections and the daily stock prices in
+    a single transaction once both commit; each load commits on its own, and
+    retries stay safe because every insert skips the rows that already exist.
+    The silver files are only updated once the transaction commits, so a
+    retry computes the same delta again. Only the partitions of the dates of
+    the prices are read to compute their delta, and the price store only
+    reads the part files it does not hold yet, so the cost of a run follows
+    the size of its delta, not of the history. Once the stage completes, a re-run
+    with the same input files and code is skipped, unless the DAG run is
+    triggered with {"force": true}.
 
     """
 
-    conn: Engine = create_redshift_engine()
+    date: str = context["ds"]
 
-    # Step 1: Create tables in the Redshift database if they don't exist
-    create_tables(conn)
+    # Skip the stage if it already loaded the same input files for the date
+    manifest = RunManifest(date)
+    fingerprint: str = stage_fingerprint(
+        "silver",
+        [
+            input_file("daily_stock_prices_table", date),
+            input_file("stock_table", date),
+        ],
+        [],
+        ["silver", "tasks/run_silver.py", "utils"],
+    )
+    if not is_forced(context) and manifest.is_up_to_date("silver", fingerprint):
+        print(f"Silver layer of {date} is up to date, skipping the stage.")
+        return
 
-    # Step 2: Load Parquet files into DataFrames
+    # Step 1: Load the delta of the Parquet files into DataFrames
+    split_legacy_silver_prices()
     daily_stock_prices_df: pd.DataFrame
     stock_df: pd.DataFrame
     date_df: pd.DataFrame
-    daily_stock_prices_df, stock_df, date_df = load_parquet_files(context["ds"])
+    daily_stock_prices_df, stock_df, date_df = load_parquet_files(date)
+
+    conn: Engine = create_redshift_engine(pool_size=SILVER_LOAD_CONCURRENCY)
+    loaded_prices_df: pd.DataFrame
+
+    if SILVER_LOAD_CONCURRENCY > 1:
+        # Steps 2 and 3: Load the dimensions concurrently, then the facts
+        loaded_prices_df = load_silver_parallel(
+            conn, stock_df, date_df, daily_stock_prices_df
+        )
+    else:
+        with conn.begin() as connection:
+            # Step 2: Create tables in the Redshift database if they don't exist
+            create_tables(connection)
+
+            # Step 3: Insert data into Redshift tables
+            insert_stock_data_scd2(connection, stock_df)
+            insert_date_data(connection, date_df)
+            loaded_prices_df = insert_stock_prices_data(
+                connection, daily_stock_prices_df
+            )
+
+    # Step 4: Update the silver files with the loaded delta
+    save_silver_files(daily_stock_prices_df, stock_df, date_df)
+    save_loaded_prices(loaded_prices_df, date)
+    save_stock_changes(stock_df, date)
+
+    # Step 5: Add the new silver prices to the price store
+    update_price_store()
 
-    # Step 3: Insert data into Redshift tables
-    insert_stock_data_scd2(conn, stock_df)
-    insert_date_data(conn, date_df)
-    insert_stock_prices_data(conn, daily_stock_prices_df)
+    manifest.record("silver", fingerprint)
 
 
 if __name__ == "__main__":
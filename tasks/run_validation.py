@@ -0,0 +1,87 @@
+import os
+from airflow.exceptions import AirflowException
+from bronze.compaction import bronze_source
+from bronze.validation import validate_bronze_files
+from silver.adjustments import FACTORS_FILE
+from silver.price_store import INDEX_FILE
+from typing import Any, Dict, List
+from utils.config import (
+    CORPORATE_ACTIONS_PATH,
+    PRICE_STORE_PATH,
+    VALIDATION_HISTORY_DAYS,
+    VALIDATION_JUMP_SIGMA,
+    VALIDATION_MIN_HISTORY,
+)
+from utils.manifest import RunManifest, is_forced, stage_fingerprint
+from utils.profiling import profiled
+
+
+@profiled("validation")
+def run_validation(**context: Any) -> Dict[str, Dict[str, int]]:
+    """
+    Executes the validation stage between the bronze and silver layers, which
+    checks the bronze files of the date, quarantines the failing rows and
+    writes the validated files loaded by the silver layer. The stage is
+    skipped if the bronze files, the price store, the adjustment factors and
+    the code did not change since it last completed for the date, unless the
+    DAG run is triggered with {"force": true}.
+
+    Args:
+        **context (Any): The Airflow context of the task.
+
+    Returns:
+        Dict[str, Dict[str, int]]: The counts of the validation, pushed to XCom.
+
+    Raises:
+        AirflowException: If a bronze file does not conform to its schema or
+        no daily stock price passes validation, to cancel the DAG.
+    """
+    date: str = context["ds"]
+
+    # Skip the stage if the validated files are up to date for the same inputs
+    manifest = RunManifest(date)
+    tables: List[str] = ["daily_stock_prices_table", "stock_table"]
+    fingerprint: str = stage_fingerprint(
+        "validation",
+        [bronze_source(table, date) for table in tables] + [
+            # The price jumps are checked against the stored history, adjusted
+            # by the factors; the index names new data files on every update
+            os.path.join(PRICE_STORE_PATH, INDEX_FILE),
+            os.path.join(CORPORATE_ACTIONS_PATH, FACTORS_FILE),
+        ],
+        [],
+        [
+            "bronze/validation.py",
+            "silver/adjustments.py",
+            "silver/price_store.py",
+            "tasks/run_validation.py",
+            "utils",
+        ],
+        jump_sigma=VALIDATION_JUMP_SIGMA,
+        history_days=VALIDATION_HISTORY_DAYS,
+        min_history=VALIDATION_MIN_HISTORY,
+    )
+    if not is_forced(context) and manifest.is_up_to_date(
+        "validation",
+        fingerprint,
+        [bronze_source(table, date, "validated") for table in tables],
+    ):
+        print(f"Validated files of {date} are up to date, skipping the stage.")
+        return manifest.result("validation")
+
+    try:
+        report = validate_bronze_files(date)
+    except ValueError as e:
+        raise AirflowException(str(e)) from e
+
+    if report["daily_stock_prices_table"]["passed"] == 0:
+        raise AirflowException(
+            "No daily stock price passed validation. Cancel the DAG."
+        )
+
+    manifest.record("validation", fingerprint, report)
+    return report
+
+
+if __name__ == "__main__":
+    run_validation()
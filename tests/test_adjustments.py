@@ -0,0 +1,147 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.api_data_downloader import parse_dividends, parse_splits
+from bronze.validation import history_stats
+from silver.adjustments import (
+    adjust_prices,
+    load_adjustment_factors,
+    save_adjustments,
+    update_adjustments,
+)
+from silver.load_parquet import append_silver_prices
+from silver.price_store import PriceStore, build_price_store
+
+
+class TestAdjustments(unittest.TestCase):
+    """
+    Unit tests for the split and dividend adjustment of the silver.adjustments
+    module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, 'corporate_actions')
+
+        # AAPL splits 4-for-1 on 2024-09-05: the close drops from ~100 to ~25
+        silver_path = os.path.join(self.tmp_dir.name, 'silver')
+        self.dates = pd.date_range('2024-09-02', periods=6).date
+        closes = [100.0, 101.0, 99.0, 25.5, 25.0, 25.25]
+        self.prices = pd.DataFrame({
+            'date': self.dates,
+            'symbol': ['AAPL'] * 6,
+            'open_price': closes,
+            'high_price': closes,
+            'low_price': closes,
+            'close_price': closes,
+            'volume': [100] * 6,
+        })
+        append_silver_prices(self.prices, silver_path)
+        build_price_store(silver_path, os.path.join(self.tmp_dir.name, 'store'))
+        self.store = PriceStore(os.path.join(self.tmp_dir.name, 'store'))
+
+        self.actions = {
+            'AAPL': parse_splits(
+                {'data': [{'effective_date': '2024-09-05', 'split_factor': '4.0'}]},
+                'AAPL',
+            ) + parse_dividends(
+                {'data': [{'ex_dividend_date': '2024-09-04', 'amount': '0.99'}]},
+                'AAPL',
+            ),
+            'MSFT': parse_splits({'data': []}, 'MSFT'),
+        }
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def update(self, actions: dict) -> tuple:
+        actions_df, factors_df, affected = update_adjustments(
+            actions, self.store, self.root
+        )
+        save_adjustments(actions_df, factors_df, affected, self.root)
+        return actions_df, factors_df, affected
+
+    def test_cumulative_factors(self) -> None:
+        """
+        Test that prices before each ex-date are scaled by the factors of that
+        action and of every later one, and later prices are left unchanged.
+        """
+        _, factors_df, affected = self.update(self.actions)
+        self.assertEqual(affected, ['AAPL'])
+
+        # Dividend factor: 1 - 0.99 / 101 (the close before its ex-date)
+        dividend = 1 - 0.99 / 101
+        np.testing.assert_allclose(
+            factors_df['price_factor'], [dividend / 4, 1 / 4]
+        )
+        np.testing.assert_allclose(factors_df['volume_factor'], [4, 4])
+
+        adjusted = adjust_prices(self.prices, factors_df)
+        np.testing.assert_allclose(
+            adjusted['close_price'],
+            [25 * dividend, 25.25 * dividend, 24.75, 25.5, 25.0, 25.25],
+        )
+        self.assertEqual(list(adjusted['volume'][:3]), [400, 400, 400])
+        self.assertEqual(list(adjusted['volume'][3:]), [100, 100, 100])
+
+    def test_incremental_update(self) -> None:
+        """
+        Test that only the symbols whose actions changed are recomputed and the
+        stored factors of the others are kept.
+        """
+        self.update(self.actions)
+        self.assertEqual(self.update(self.actions)[2], [])
+
+        # A new MSFT split touches MSFT only
+        actions = dict(self.actions, MSFT=parse_splits(
+            {'data': [{'effective_date': '2024-09-03', 'split_factor': '2'}]}, 'MSFT'
+        ))
+        _, factors_df, affected = self.update(actions)
+        self.assertEqual(affected, ['MSFT'])
+        self.assertEqual(len(factors_df), 1)
+
+        stored = load_adjustment_factors(self.root)
+        self.assertEqual(sorted(stored['symbol']), ['AAPL', 'AAPL', 'MSFT'])
+
+    def test_dividend_without_close_is_applied_later(self) -> None:
+        """
+        Test that a dividend stored without an earlier close, as on a first
+        run without a price store, is applied once the store has the close.
+        """
+        actions_df, factors_df, affected = update_adjustments(
+            self.actions, None, self.root
+        )
+        save_adjustments(actions_df, factors_df, affected, self.root)
+        np.testing.assert_allclose(factors_df['price_factor'], [1 / 4, 1 / 4])
+
+        # Same actions, but the close before the ex-date is now in the store
+        _, factors_df, affected = self.update(self.actions)
+        self.assertEqual(affected, ['AAPL'])
+        self.assertNotEqual(factors_df['price_factor'].iloc[0], 1 / 4)
+        np.testing.assert_allclose(
+            load_adjustment_factors(self.root)['price_factor'],
+            [(1 - 0.99 / 101) / 4, 1 / 4],
+        )
+        self.assertEqual(self.update(self.actions)[2], [])
+
+    def test_split_is_not_a_price_jump(self) -> None:
+        """
+        Test that the validation history is expressed in post-split terms.
+        """
+        _, factors_df, _ = self.update(self.actions)
+        stats = history_stats(
+            np.array(['AAPL']), '2024-09-06', self.store, factors_df=factors_df
+        )
+        self.assertAlmostEqual(stats['last_close'][0], 25.5)
+        self.assertLess(stats['return_std'][0], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
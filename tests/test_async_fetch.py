@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.async_api_data_downloader import AsyncFetcher, RateLimiter
+
+DATE = '2024-09-10'
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit tests for the sliding window of the RateLimiter of the
+    bronze.async_api_data_downloader module.
+    """
+
+    async def test_sliding_window(self) -> None:
+        """
+        Test that no more than max_requests requests start within any window
+        of period seconds.
+        """
+        limiter = RateLimiter(2, period=0.2)
+        started = []
+        for _ in range(5):
+            await limiter.acquire()
+            started.append(time.monotonic())
+
+        # The first two start at once, the others wait for a slot
+        self.assertLess(started[1] - started[0], 0.1)
+        for first, third in zip(started, started[2:]):
+            self.assertGreaterEqual(third - first, 0.19)
+        self.assertGreaterEqual(started[-1] - started[0], 0.38)
+
+
+class TestAsyncFetcher(unittest.IsolatedAsyncioTestCase):
+    """
+    Unit tests for the AsyncFetcher of the bronze.async_api_data_downloader
+    module, against a local aiohttp server standing in for Alpha Vantage.
+    """
+
+    async def asyncSetUp(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = []
+
+        app = web.Application()
+        app.router.add_get('/query', self.daily_prices)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        url_patch = patch(
+            'bronze.async_api_data_downloader.ALPHA_VANTAGE_URL',
+            str(self.server.make_url('/query')),
+        )
+        url_patch.start()
+        self.addCleanup(url_patch.stop)
+
+    async def asyncTearDown(self) -> None:
+        await self.server.close()
+
+    async def daily_prices(self, request: web.Request) -> web.Response:
+        symbol = request.query['symbol']
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(5 if symbol == 'SLOW' else 0.05)
+        except asyncio.CancelledError:
+            self.cancelled.append(symbol)
+            raise
+        finally:
+            self.in_flight -= 1
+
+        if symbol == 'FAIL':
+            return web.Response(status=500)
+        if symbol == 'BAD':
+            return web.Response(text='not json')
+        if symbol == 'LIMIT':
+            return web.json_response({'Information': 'Rate limit reached.'})
+        return web.json_response({'Time Series (Daily)': {DATE: {
+            '1. open': '100.0', '2. high': '110.0', '3. low': '90.0',
+            '4. close': '105.0', '5. volume': '1000',
+        }}})
+
+    def fetcher(self, **kwargs) -> AsyncFetcher:
+        fetcher = AsyncFetcher(**kwargs)
+        # The configured rate of a free key would slow the tests down
+        fetcher.alpha_vantage_limiter = RateLimiter(1000)
+        return fetcher
+
+    async def fetch(self, fetcher: AsyncFetcher, symbols: list) -> list:
+        async with fetcher:
+            return await fetcher.gather([
+                fetcher.fetch_daily_stock_prices_record(symbol, DATE, 'key')
+                for symbol in symbols
+            ])
+
+    async def test_in_flight_requests_are_bounded(self) -> None:
+        """
+        Test that no more than `concurrency` requests are in flight at once.
+        """
+        symbols = [f'SYM{i}' for i in range(10)]
+        records = await self.fetch(self.fetcher(concurrency=3), symbols)
+
+        self.assertEqual([record['stock_symbol'] for record in records], symbols)
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_failed_requests_return_none(self) -> None:
+        """
+        Test that an error status, a body that is not JSON or an API error
+        message drops the symbol without failing the other requests.
+        """
+        records = await self.fetch(
+            self.fetcher(), ['AAPL', 'FAIL', 'BAD', 'LIMIT', 'MSFT']
+        )
+        self.assertEqual(
+            [record['stock_symbol'] for record in records], ['AAPL', 'MSFT']
+        )
+        self.assertEqual(records[0]['close_price'], 105.0)
+
+    async def test_pending_requests_are_cancelled_on_timeout(self) -> None:
+        """
+        Test that the requests still pending when the fetch timeout expires
+        are cancelled, and the completed ones are returned.
+        """
+        start = time.monotonic()
+        records = await self.fetch(self.fetcher(timeout=0.5), ['AAPL', 'SLOW'])
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual([record['stock_symbol'] for record in records], ['AAPL'])
+        # The server sees the request of the slow symbol go away
+        for _ in range(50):
+            if self.cancelled:
+                break
+            await asyncio.sleep(0.02)
+        self.assertEqual(self.cancelled, ['SLOW'])
+        self.assertEqual(self.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
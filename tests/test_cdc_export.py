@@ -0,0 +1,172 @@
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gold.cdc_export import (
+    batch_path,
+    collect_changes,
+    load_watermark,
+    read_batches,
+    write_batch,
+)
+from silver.adjustments import read_adjustment_changes, save_adjustment_changes
+from utils.config import REDSHIFT_SCHEMA
+
+# Key column of each table read by the export, with one extra column
+TABLES = {
+    'stock_table': 'symbol TEXT, name TEXT, start_date TEXT, is_current INTEGER',
+    'atributes_stock_prices_table': 'date TEXT, symbol TEXT, price_range REAL',
+    'sector_daily_stock_prices_table': 'date TEXT, industry TEXT',
+    'daily_log_returns_table': 'date TEXT, symbol TEXT, log_return REAL',
+    'correlation_matrix_table': 'date TEXT, symbol_a TEXT, symbol_b TEXT',
+    'stock_beta_table': 'date TEXT, symbol TEXT, beta REAL',
+    'weekly_stock_prices_table': 'period_start TEXT, symbol TEXT',
+    'monthly_stock_prices_table': 'period_start TEXT, symbol TEXT',
+    'corporate_actions_table': 'symbol TEXT, ex_date TEXT, action_type TEXT',
+    'adjustment_factor_table': 'symbol TEXT, start_date TEXT, price_factor REAL',
+}
+
+
+class TestCdcExport(unittest.TestCase):
+    """
+    Unit tests for the change data export of the gold.cdc_export module, run
+    against a SQLite database holding the schema of the warehouse.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, 'cdc')
+        schema_path = os.path.join(self.tmp_dir.name, 'schema.db')
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}"
+        )
+
+        @event.listens_for(self.engine, 'connect')
+        def attach_schema(connection, _) -> None:
+            connection.execute(f'ATTACH DATABASE "{schema_path}" AS "{REDSHIFT_SCHEMA}"')
+
+        with self.engine.begin() as connection:
+            for table, columns in TABLES.items():
+                connection.execute(text(
+                    f'CREATE TABLE "{REDSHIFT_SCHEMA}".{table} ({columns})'
+                ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".stock_table VALUES '
+                "('AAPL', 'Apple', '2024-01-01', 0), "
+                "('AAPL', 'Apple Inc', '2024-09-10', 1), "
+                "('MSFT', 'Microsoft', '2024-01-01', 1)"
+            ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".atributes_stock_prices_table '
+                "VALUES ('2024-09-09', 'AAPL', 1.0), ('2024-09-10', 'AAPL', 2.0)"
+            ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".weekly_stock_prices_table '
+                "VALUES ('2024-09-02', 'AAPL'), ('2024-09-09', 'AAPL')"
+            ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".corporate_actions_table VALUES '
+                "('AAPL', '2024-09-05', 'split'), ('AAPL', '2024-09-04', 'dividend'), "
+                "('MSFT', '2024-09-03', 'split')"
+            ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".adjustment_factor_table VALUES '
+                "('AAPL', '1900-01-01', 0.25), ('MSFT', '1900-01-01', 0.5)"
+            ))
+
+        self.prices_df = pd.DataFrame({
+            'id_transaction': [7],
+            'date': [pd.Timestamp('2024-09-10').date()],
+            'symbol': ['AAPL'],
+            'close_price': [1.5],
+        })
+        self.stock_df = pd.DataFrame({'symbol': ['AAPL'], 'name': ['Apple Inc']})
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_only_changed_rows_are_exported(self) -> None:
+        """
+        Test that a batch holds the loaded prices, both SCD2 versions of the
+        changed symbol and the gold rows of the touched date and week only.
+        """
+        changes = collect_changes(
+            self.engine, '2024-09-10', self.prices_df, self.stock_df
+        )
+        self.assertEqual(sorted(changes), [
+            'atributes_stock_prices_table',
+            'daily_stock_prices_table',
+            'stock_table',
+            'weekly_stock_prices_table',
+        ])
+        self.assertEqual(list(changes['stock_table']['name']), ['Apple', 'Apple Inc'])
+        self.assertEqual(list(changes['atributes_stock_prices_table']['date']),
+                         ['2024-09-10'])
+        self.assertEqual(list(changes['weekly_stock_prices_table']['period_start']),
+                         ['2024-09-09'])
+        self.assertEqual(list(changes['daily_stock_prices_table']['_op']), ['insert'])
+
+    def test_adjustments_and_recompute_are_exported(self) -> None:
+        """
+        Test that the actions and factors of the symbols whose actions changed
+        replace those of the consumers, and that the attributes of a
+        recomputed range are exported along with those of the loaded dates.
+        """
+        save_adjustment_changes(['AAPL'], '2024-09-10', self.tmp_dir.name)
+        adjusted = read_adjustment_changes('2024-09-10', self.tmp_dir.name)
+        self.assertEqual(adjusted, ['AAPL'])
+
+        changes = collect_changes(
+            self.engine, '2024-09-10', self.prices_df, None, adjusted,
+            ('2024-09-01', '2024-09-09'),
+        )
+        actions = changes['corporate_actions_table']
+        self.assertEqual(list(actions['symbol']), ['AAPL', 'AAPL'])
+        self.assertEqual(set(actions['_op']), {'replace'})
+        self.assertEqual(list(changes['adjustment_factor_table']['price_factor']),
+                         [0.25])
+        self.assertEqual(
+            sorted(changes['atributes_stock_prices_table']['date']),
+            ['2024-09-09', '2024-09-10'],
+        )
+
+        # A re-run without changes clears the symbols of the prior run
+        save_adjustment_changes([], '2024-09-10', self.tmp_dir.name)
+        self.assertIsNone(read_adjustment_changes('2024-09-10', self.tmp_dir.name))
+        self.assertNotIn(
+            'corporate_actions_table',
+            collect_changes(self.engine, '2024-09-10', self.prices_df, None, None),
+        )
+
+    def test_watermark_is_monotonic(self) -> None:
+        """
+        Test that every batch gets the next watermark, survives a batch left
+        unpublished by a crash, and that consumers read only newer batches.
+        """
+        changes = collect_changes(self.engine, '2024-09-10', self.prices_df, None)
+        self.assertEqual(write_batch(changes, '2024-09-10', self.root), 1)
+        self.assertIsNone(write_batch({}, '2024-09-11', self.root))
+
+        # A batch renamed into place but never published keeps its watermark
+        os.makedirs(batch_path(2, self.root))
+        self.assertEqual(write_batch(changes, '2024-09-12', self.root), 3)
+
+        export = load_watermark(self.root)
+        self.assertEqual(export['watermark'], 3)
+        self.assertEqual([batch['date'] for batch in export['batches']],
+                         ['2024-09-10', '2024-09-12'])
+
+        synced = read_batches(1, self.root)
+        self.assertEqual(list(synced['daily_stock_prices_table']['_watermark']), [3])
+        self.assertEqual(len(read_batches(0, self.root)['daily_stock_prices_table']), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.compaction import (
+    bronze_source,
+    compact_bronze,
+    compacted_path,
+    load_compaction_manifest,
+    read_bronze,
+)
+from utils.parquet import (
+    DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+    STOCK_BRONZE_SCHEMA,
+    bronze_path,
+    write_parquet,
+)
+
+
+class TestBronzeCompaction(unittest.TestCase):
+    """
+    Unit tests for the small-file compaction of the bronze.compaction module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.tmp_dir.name
+        self.root = os.path.join(self.tmp_dir.name, 'compacted')
+        for date in ['2024-08-29', '2024-08-30', '2024-09-03']:
+            self.write_date(date, close=1.0)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def write_date(self, date: str, close: float) -> None:
+        write_parquet(pd.DataFrame({
+            'date': [pd.Timestamp(date).date()] * 2,
+            'stock_symbol': ['MSFT', 'AAPL'],
+            'open_price': 1.0,
+            'high_price': 2.0,
+            'low_price': 0.5,
+            'close_price': close,
+            'volume': 100,
+        }), bronze_path('daily_stock_prices_table', date, root=self.data_path),
+            DAILY_STOCK_PRICES_BRONZE_SCHEMA)
+        write_parquet(pd.DataFrame({
+            'symbol': ['AAPL'], 'name': ['Apple Inc'], 'industry': ['Technology'],
+            'exchange': ['NASDAQ'], 'logo': [''], 'weburl': [''],
+        }), bronze_path('stock_table', date, root=self.data_path), STOCK_BRONZE_SCHEMA)
+
+    def read_prices(self, date: str) -> pd.DataFrame:
+        return read_bronze(
+            'daily_stock_prices_table', date, schema=DAILY_STOCK_PRICES_BRONZE_SCHEMA,
+            data_path=self.data_path, root=self.root,
+        ).to_pandas()
+
+    def test_closed_months_are_compacted(self) -> None:
+        """
+        Test that only the months closed before the grace period are merged,
+        their per-date files removed and their rows still read by date.
+        """
+        before = self.read_prices('2024-08-30')
+
+        report = compact_bronze('2024-09-10', 7, self.data_path, self.root)
+
+        self.assertEqual(list(report), ['2024-08'])
+        self.assertEqual(report['2024-08']['daily_stock_prices_table_bronze'], 4)
+        self.assertFalse(os.path.exists(
+            bronze_path('daily_stock_prices_table', '2024-08-30', root=self.data_path)
+        ))
+        self.assertTrue(os.path.exists(
+            bronze_path('daily_stock_prices_table', '2024-09-03', root=self.data_path)
+        ))
+        self.assertEqual(
+            bronze_source('stock_table', '2024-08-30', data_path=self.data_path,
+                          root=self.root),
+            compacted_path('stock_table', '2024-08', root=self.root),
+        )
+        # Rows are sorted by symbol within their date
+        after = self.read_prices('2024-08-30')
+        self.assertEqual(after['stock_symbol'].tolist(), ['AAPL', 'MSFT'])
+        pd.testing.assert_frame_equal(
+            after.astype({'stock_symbol': object}),
+            before.astype({'stock_symbol': object}).iloc[::-1].reset_index(drop=True),
+        )
+
+    def test_late_file_replaces_its_date(self) -> None:
+        """
+        Test that a file written after its month was compacted takes
+        precedence and replaces the compacted rows of its date.
+        """
+        compact_bronze('2024-09-10', 7, self.data_path, self.root)
+        self.write_date('2024-08-30', close=3.0)
+        self.assertEqual(self.read_prices('2024-08-30')['close_price'].tolist(),
+                         [3.0, 3.0])
+
+        compact_bronze('2024-09-10', 7, self.data_path, self.root)
+
+        self.assertEqual(sorted(self.read_prices('2024-08-30')['close_price']),
+                         [3.0, 3.0])
+        self.assertEqual(sorted(self.read_prices('2024-08-29')['close_price']),
+                         [1.0, 1.0])
+        entry = load_compaction_manifest(self.root)['months']['2024-08']
+        self.assertEqual(entry['daily_stock_prices_table_bronze']['rows'], 4)
+        self.assertEqual(entry['stock_table_bronze']['dates'],
+                         ['2024-08-29', '2024-08-30'])
+
+
+if __name__ == "__main__":
+    unittest.main()
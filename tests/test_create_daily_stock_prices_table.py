@@ -8,6 +8,7 @@ import pandas as pd
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from bronze.api_data_downloader import create_daily_stock_prices_table  # Ajusta el nombre del módulo donde está la función
+from bronze.api_data_downloader import fetch_daily_stock_prices_record
 
 
 class TestCreateDailyStockPricesTable(unittest.TestCase):
@@ -92,6 +93,37 @@ class TestCreateDailyStockPricesTable(unittest.TestCase):
         # The DataFrame should be empty when there's an API error
         self.assertTrue(df.empty)
 
+    @patch('bronze.api_data_downloader.requests.get')
+    def test_record_without_dataframe(self, mock_get: MagicMock) -> None:
+        """
+        Test that the record-level function returns a plain dict, or None
+        when no data is available.
+        """
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "Time Series (Daily)": {
+                "2024-09-10": {
+                    "1. open": "150.00",
+                    "2. high": "155.00",
+                    "3. low": "148.00",
+                    "4. close": "152.00",
+                    "5. volume": "1200000"
+                }
+            }
+        }
+
+        mock_get.return_value = mock_response
+
+        record = fetch_daily_stock_prices_record('AAPL', '2024-09-10', 'dummy_api_key')
+        self.assertEqual(record['stock_symbol'], 'AAPL')
+        self.assertEqual(record['close_price'], 152.00)
+
+        # A date missing from the payload yields no record
+        self.assertIsNone(
+            fetch_daily_stock_prices_record('AAPL', '2024-09-11', 'dummy_api_key')
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import datetime
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gold.cross_sectional import (
+    build_price_matrix,
+    calculate_betas,
+    iter_correlation_blocks,
+    log_returns,
+)
+
+
+class TestCrossSectional(unittest.TestCase):
+    """
+    Unit tests for the matrix computations of the gold.cross_sectional module.
+    """
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (41, 5)), axis=0))
+        prices[5, 2] = np.nan
+        prices[10:15, 3] = np.nan
+
+        dates = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-02-11'))
+        symbols = np.array(['AAPL', 'AMZN', 'MSFT', 'SPY', 'TSLA'])
+        date_grid, symbol_grid = np.meshgrid(dates, symbols, indexing='ij')
+        present = ~np.isnan(prices)
+
+        self.dates, self.symbols, self.matrix = build_price_matrix(
+            date_grid[present], symbol_grid[present], prices[present]
+        )
+        self.returns = log_returns(self.matrix)
+        self.returns_df = pd.DataFrame(
+            self.returns.astype(float), columns=self.symbols
+        )
+        self.date = datetime.date(2024, 2, 10)
+
+    def test_price_matrix(self) -> None:
+        """
+        Test that the prices are scattered into a float32 date × symbol matrix.
+        """
+        self.assertEqual(self.matrix.shape, (41, 5))
+        self.assertEqual(self.matrix.dtype, np.float32)
+        self.assertTrue(np.isnan(self.matrix[5, 2]))
+        self.assertEqual(self.returns.shape, (40, 5))
+
+    def test_correlation_blocks_match_pandas(self) -> None:
+        """
+        Test that the blocked matrix matches the pairwise pandas correlation.
+        """
+        pairs = pd.concat(iter_correlation_blocks(
+            self.date, self.symbols, self.returns, block_size=2, min_observations=10
+        ))
+        correlation = self.returns_df.corr()
+        covariance = self.returns_df.cov()
+
+        self.assertEqual(len(pairs), 10)
+        for pair in pairs.itertuples():
+            self.assertLess(pair.symbol_a, pair.symbol_b)
+            self.assertAlmostEqual(
+                pair.correlation, correlation.loc[pair.symbol_a, pair.symbol_b], 4
+            )
+            self.assertAlmostEqual(
+                pair.covariance, covariance.loc[pair.symbol_a, pair.symbol_b], 6
+            )
+
+    def test_betas(self) -> None:
+        """
+        Test the betas against the benchmark, and a missing benchmark.
+        """
+        betas = calculate_betas(
+            self.date, self.symbols, self.returns, 'SPY', min_observations=10
+        ).set_index('symbol')
+
+        self.assertAlmostEqual(betas.loc['SPY', 'beta'], 1.0, 5)
+        common = self.returns_df[['AAPL', 'SPY']].dropna()
+        expected = common.cov().iloc[0, 1] / common['SPY'].var()
+        self.assertAlmostEqual(betas.loc['AAPL', 'beta'], expected, 4)
+
+        self.assertTrue(
+            calculate_betas(self.date, self.symbols, self.returns, 'QQQ').empty
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
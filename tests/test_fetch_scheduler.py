@@ -0,0 +1,193 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.fetch_scheduler import (
+    DEADLINE,
+    FAILED,
+    FETCHED,
+    MISSING,
+    QUOTA,
+    RETRYABLE,
+    FetchScheduler,
+    QuotaLedger,
+    load_fetch_status,
+    missed_symbols,
+    save_fetch_status,
+    symbol_priorities,
+)
+from bronze.intraday import create_intraday_file
+from bronze.providers import AlphaVantageProvider, FinnhubProvider
+from silver.adjustments import fetch_corporate_actions
+
+SYMBOLS = ['AAPL', 'MSFT', 'AMZN', 'GOOGL', 'TSLA']
+
+
+class TestFetchScheduler(unittest.TestCase):
+    """
+    Unit tests for the prioritized fetching of the bronze.fetch_scheduler
+    module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        self.provider = FinnhubProvider(api_key='key')
+        self.priorities = symbol_priorities(SYMBOLS, ['TSLA', 'MSFT'])
+        self.requested = []
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def fetch(self, symbols: list) -> list:
+        self.requested.append(symbols)
+        self.provider.requests_made += len(symbols)
+        if 'GOOGL' in symbols:
+            raise ConnectionError('connection reset')
+        return [{'symbol': symbol} for symbol in symbols if symbol != 'AAPL']
+
+    def scheduler(self, quota: int = 0, **kwargs) -> FetchScheduler:
+        ledger = QuotaLedger(self.root, {'finnhub': quota}, datetime.date(2024, 9, 10))
+        return FetchScheduler(self.priorities, ledger=ledger, batch_size=2, **kwargs)
+
+    def test_priority_order_and_outcomes(self) -> None:
+        """
+        Test that the configured symbols are fetched first and that a failed
+        batch does not stop the run.
+        """
+        self.assertEqual(
+            self.priorities, {'TSLA': 0, 'MSFT': 1, 'AAPL': 2, 'AMZN': 3, 'GOOGL': 4}
+        )
+        scheduler = self.scheduler()
+        records = scheduler.fetch('profiles', SYMBOLS, self.provider, self.fetch,
+                                  'symbol')
+
+        self.assertEqual(self.requested, [['TSLA', 'MSFT'], ['AAPL', 'AMZN'], ['GOOGL']])
+        self.assertEqual(len(records), 3)
+        self.assertEqual(scheduler.outcomes['profiles'], {
+            'TSLA': FETCHED, 'MSFT': FETCHED, 'AAPL': MISSING, 'AMZN': FETCHED,
+            'GOOGL': FAILED,
+        })
+
+    def test_quota_and_deadline(self) -> None:
+        """
+        Test that no batch is started beyond the quota of the day, which is
+        shared with later runs, nor after the deadline.
+        """
+        scheduler = self.scheduler(quota=3)
+        scheduler.fetch('profiles', SYMBOLS, self.provider, self.fetch, 'symbol')
+        self.assertEqual(self.requested, [['TSLA', 'MSFT']])
+        self.assertEqual(scheduler.missed('profiles'), ['AAPL', 'AMZN', 'GOOGL'])
+        self.assertEqual(scheduler.outcomes['profiles']['AMZN'], QUOTA)
+
+        # A later run of the same day only has one request left
+        self.assertEqual(self.scheduler(quota=3).ledger.remaining('finnhub'), 1)
+
+        ticks = iter([0, 10, 20])
+        scheduler = self.scheduler(deadline=15, clock=lambda: next(ticks))
+        scheduler.fetch('profiles', SYMBOLS, self.provider, self.fetch, 'symbol')
+        self.assertEqual(scheduler.outcomes['profiles']['GOOGL'], DEADLINE)
+        self.assertEqual(scheduler.outcomes['profiles']['AAPL'], MISSING)
+        self.assertFalse(scheduler.deferred('profiles'))
+
+    def test_quota_charges_requests_made(self) -> None:
+        """
+        Test that the quota is charged with the requests the provider sent,
+        not with the estimate the batch was started on, and that a dataset
+        left entirely by the quota is deferred.
+        """
+        def fetch_with_fallback(symbols: list) -> list:
+            # One request for the batch and one more for each symbol
+            self.provider.requests_made += 1 + len(symbols)
+            return [{'symbol': symbol} for symbol in symbols]
+
+        scheduler = self.scheduler(quota=4)
+        scheduler.fetch('profiles', SYMBOLS, self.provider, fetch_with_fallback,
+                        'symbol')
+        self.assertEqual(scheduler.ledger.remaining('finnhub'), 1)
+        self.assertEqual(scheduler.missed('profiles'), ['AAPL', 'AMZN', 'GOOGL'])
+
+        scheduler = self.scheduler(quota=4)
+        scheduler.fetch('profiles', SYMBOLS, self.provider, fetch_with_fallback,
+                        'symbol')
+        self.assertTrue(scheduler.deferred('profiles'))
+        self.assertEqual(
+            scheduler.missed('profiles', RETRYABLE),
+            ['TSLA', 'MSFT', 'AAPL', 'AMZN', 'GOOGL'],
+        )
+
+    @patch('bronze.intraday.write_intraday_bars', return_value='bars.parquet')
+    @patch('bronze.api_data_downloader.fetch_intraday_bars')
+    @patch('bronze.api_data_downloader.fetch_corporate_action_records')
+    def test_actions_and_intraday_share_the_quota(
+        self, mock_actions: MagicMock, mock_bars: MagicMock, _: MagicMock
+    ) -> None:
+        """
+        Test that the corporate actions, two requests per symbol, and the
+        intraday bars, one request per symbol, are charged to the quota of
+        the provider and stop once it runs out.
+        """
+        mock_actions.return_value = []
+        mock_bars.side_effect = lambda symbol, *args: [{'symbol': symbol}]
+        provider = AlphaVantageProvider('key', bulk=False)
+        ledger = QuotaLedger(self.root, {'alpha_vantage': 7},
+                             datetime.date(2024, 9, 10))
+
+        scheduler = FetchScheduler(self.priorities, ledger=ledger, batch_size=2)
+        actions = fetch_corporate_actions(SYMBOLS, provider, scheduler)
+        self.assertEqual(actions, {'TSLA': [], 'MSFT': []})
+        self.assertEqual(provider.requests_made, 4)
+        self.assertEqual(scheduler.outcomes['corporate_actions']['AAPL'], QUOTA)
+
+        scheduler = FetchScheduler(self.priorities, ledger=ledger, batch_size=2)
+        path = create_intraday_file('2024-09-10', SYMBOLS, provider, '5min', scheduler)
+        self.assertEqual(path, 'bars.parquet')
+        self.assertEqual(mock_bars.call_count, 2)
+        self.assertEqual(scheduler.missed('intraday'), ['AAPL', 'AMZN', 'GOOGL'])
+
+        # The prices of a later run of the day only have one request left
+        ledger = QuotaLedger(self.root, {'alpha_vantage': 7},
+                             datetime.date(2024, 9, 10))
+        self.assertEqual(ledger.remaining('alpha_vantage'), 1)
+
+    def test_status_of_catch_up(self) -> None:
+        """
+        Test that a catch-up run updates the status of the symbols it fetched
+        again and counts their attempts.
+        """
+        scheduler = self.scheduler(quota=3)
+        scheduler.fetch('profiles', SYMBOLS, self.provider, self.fetch, 'symbol')
+        save_fetch_status(scheduler.status_frame('2024-09-10'), '2024-09-10', self.root)
+        self.assertEqual(
+            missed_symbols('2024-09-10', 'profiles', self.root), ['AAPL', 'AMZN', 'GOOGL']
+        )
+
+        catch_up = self.scheduler()
+        catch_up.fetch('profiles', ['AMZN'], self.provider, self.fetch, 'symbol')
+        save_fetch_status(catch_up.status_frame('2024-09-10'), '2024-09-10', self.root)
+
+        status = load_fetch_status('2024-09-10', self.root).set_index('symbol')
+        self.assertEqual(status.loc['AMZN', 'status'], FETCHED)
+        self.assertEqual(status.loc['AMZN', 'attempts'], 2)
+        self.assertEqual(status.loc['TSLA', 'attempts'], 1)
+        self.assertEqual(
+            missed_symbols('2024-09-10', 'profiles', self.root), ['AAPL', 'GOOGL']
+        )
+
+        # Symbols the API has no data for are not fetched again
+        scheduler = self.scheduler()
+        scheduler.fetch('profiles', SYMBOLS, self.provider, self.fetch, 'symbol')
+        save_fetch_status(scheduler.status_frame('2024-09-11'), '2024-09-11', self.root)
+        self.assertEqual(
+            missed_symbols('2024-09-11', 'profiles', self.root, RETRYABLE), ['GOOGL']
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.archive import ResponseArchive
+from bronze.intraday import read_intraday_bars, write_intraday_bars
+from bronze.providers import AlphaVantageProvider, ArchiveProvider
+from silver.intraday_load import intraday_rows
+import pandas as pd
+
+
+def intraday_payload(bars: dict) -> dict:
+    return {
+        "Time Series (5min)": {
+            timestamp: {
+                "1. open": str(price),
+                "2. high": str(price + 1),
+                "3. low": str(price - 1),
+                "4. close": str(price + 0.5),
+                "5. volume": "1000",
+            }
+            for timestamp, price in bars.items()
+        }
+    }
+
+
+class TestIntradayIngestion(unittest.TestCase):
+    """
+    Unit tests for the intraday bars of the bronze.intraday module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    @patch('bronze.api_data_downloader.requests.get')
+    def test_fetch_and_replay(self, mock_get: MagicMock) -> None:
+        """
+        Test that only the bars of the date are parsed from the monthly
+        response and that the archived response replays to the same bars.
+        """
+        mock_response = MagicMock()
+        mock_response.json.return_value = intraday_payload({
+            "2024-09-10 09:35:00": 150.0,
+            "2024-09-10 09:30:00": 149.0,
+            "2024-09-09 15:55:00": 148.0,
+        })
+        mock_get.return_value = mock_response
+
+        archive = ResponseArchive('2024-09-10', self.root)
+        provider = AlphaVantageProvider('dummy_api_key', archive=archive)
+        records = provider.fetch_intraday_records(['AAPL'], '2024-09-10', '5min')
+        archive.save()
+
+        self.assertEqual(len(records), 2)
+        self.assertIn('month=2024-09', mock_get.call_args[0][0])
+
+        replay = ArchiveProvider(ResponseArchive('2024-09-10', self.root))
+        self.assertEqual(
+            replay.fetch_intraday_records(['AAPL'], '2024-09-10', '5min'), records
+        )
+
+    def test_partitions_are_appended(self) -> None:
+        """
+        Test that each date gets its own sorted partition, a re-run replaces
+        only its date and reads prune the other dates and symbols.
+        """
+        def bars(date: str, symbols: list) -> pd.DataFrame:
+            return pd.DataFrame({
+                'timestamp': [f'{date} 09:35:00', f'{date} 09:30:00'] * len(symbols),
+                'symbol': [symbol for symbol in symbols for _ in range(2)],
+                'open_price': 1.0,
+                'high_price': 2.0,
+                'low_price': 0.5,
+                'close_price': 1.5,
+                'volume': 100.0,
+            })
+
+        write_intraday_bars(bars('2024-09-09', ['AAPL', 'MSFT']), '2024-09-09',
+                            '5min', self.root)
+        write_intraday_bars(bars('2024-09-10', ['AAPL', 'MSFT']), '2024-09-10',
+                            '5min', self.root)
+        write_intraday_bars(bars('2024-09-10', ['AAPL']), '2024-09-10',
+                            '5min', self.root)
+
+        table = read_intraday_bars('2024-09-09', '2024-09-10', '5min', root=self.root)
+        self.assertEqual(table.num_rows, 6)
+
+        table = read_intraday_bars('2024-09-10', '2024-09-10', '5min', ['AAPL'],
+                                   self.root)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(
+            [str(value) for value in table.column('timestamp').to_pylist()],
+            ['2024-09-10 09:30:00', '2024-09-10 09:35:00'],
+        )
+
+        rows = intraday_rows(table, '2024-09-10', '5min')
+        self.assertEqual(
+            list(rows.columns),
+            ['date', 'bar_time', 'symbol', 'bar_interval', 'open_price',
+             'high_price', 'low_price', 'close_price', 'volume'],
+        )
+
+    def test_missing_interval(self) -> None:
+        """
+        Test that reading an interval without files returns no bars.
+        """
+        table = read_intraday_bars('2024-09-10', '2024-09-10', '1min', root=self.root)
+        self.assertEqual(table.num_rows, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.manifest import RunManifest, stage_fingerprint
+
+
+class TestRunManifest(unittest.TestCase):
+    """
+    Unit tests for the stage fingerprints and manifests of utils.manifest.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp_dir.name, 'input.parquet')
+        with open(self.input_path, 'wb') as file:
+            file.write(b'first version')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def fingerprint(self, **settings) -> str:
+        return stage_fingerprint(
+            'silver', [self.input_path], ['AAPL', 'MSFT'], ['utils'], **settings
+        )
+
+    def test_fingerprint_tracks_inputs(self) -> None:
+        """
+        Test that the fingerprint changes with the inputs, symbols and settings.
+        """
+        fingerprint = self.fingerprint()
+        self.assertEqual(fingerprint, self.fingerprint())
+        self.assertNotEqual(fingerprint, self.fingerprint(window=30))
+        self.assertNotEqual(
+            fingerprint,
+            stage_fingerprint('silver', [self.input_path], ['AAPL'], ['utils']),
+        )
+
+        with open(self.input_path, 'wb') as file:
+            file.write(b'second version')
+        self.assertNotEqual(fingerprint, self.fingerprint())
+
+    def test_record_and_skip(self) -> None:
+        """
+        Test that a recorded stage is up to date until its fingerprint changes
+        or an output disappears.
+        """
+        fingerprint = self.fingerprint()
+        manifest = RunManifest('2024-09-10', self.tmp_dir.name)
+        self.assertFalse(manifest.is_up_to_date('silver', fingerprint))
+
+        manifest.record('silver', fingerprint, {'rows': 5})
+
+        reloaded = RunManifest('2024-09-10', self.tmp_dir.name)
+        self.assertTrue(reloaded.is_up_to_date('silver', fingerprint))
+        self.assertEqual(reloaded.result('silver'), {'rows': 5})
+        self.assertFalse(reloaded.is_up_to_date('silver', 'other'))
+        self.assertFalse(reloaded.is_up_to_date(
+            'silver', fingerprint, [os.path.join(self.tmp_dir.name, 'missing')]
+        ))
+        self.assertFalse(
+            RunManifest('2024-09-11', self.tmp_dir.name).is_up_to_date(
+                'silver', fingerprint
+            )
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
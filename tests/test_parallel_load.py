@@ -0,0 +1,189 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from silver.parallel_load import load_silver_parallel, partition_by_symbol
+from silver.table_insert_sql import (
+    insert_date_data,
+    insert_stock_data_scd2,
+    insert_stock_prices_data,
+)
+from utils.config import REDSHIFT_SCHEMA
+
+# SQLite versions of the silver tables of silver.create_tables
+SQLITE_TABLES = [
+    """CREATE TABLE "{schema}".stock_table (
+        id_record INTEGER PRIMARY KEY AUTOINCREMENT, symbol TEXT, name TEXT,
+        industry TEXT, exchange TEXT, logo TEXT, weburl TEXT, start_date DATE,
+        end_date DATE, is_current INTEGER)""",
+    """CREATE TABLE "{schema}".date_table (
+        date DATE PRIMARY KEY, day_of_week TEXT, is_weekend INTEGER)""",
+    """CREATE TABLE "{schema}".daily_stock_prices_table (
+        id_transaction INTEGER PRIMARY KEY AUTOINCREMENT, date DATE, symbol TEXT,
+        open_price REAL, high_price REAL, low_price REAL, close_price REAL,
+        volume INTEGER)""",
+]
+
+
+class TestPartitionBySymbol(unittest.TestCase):
+    """
+    Unit tests for the fact partitioning of the silver.parallel_load module.
+    """
+
+    def setUp(self) -> None:
+        self.df = pd.DataFrame({
+            'date': ['2024-09-09', '2024-09-10'] * 10,
+            'symbol': [f'SYM{i // 2}' for i in range(20)],
+            'close_price': range(20),
+        })
+
+    def test_small_load_is_not_split(self) -> None:
+        """
+        Test that a load below the partition size stays in one partition.
+        """
+        partitions = partition_by_symbol(self.df, max_rows=100)
+
+        self.assertEqual(len(partitions), 1)
+        self.assertEqual(len(partitions[0]), 20)
+
+    def test_symbols_are_not_split(self) -> None:
+        """
+        Test that every row is kept and each symbol lands in a single partition.
+        """
+        partitions = partition_by_symbol(self.df, max_rows=5)
+
+        self.assertGreater(len(partitions), 1)
+        self.assertEqual(sum(len(partition) for partition in partitions), 20)
+        symbols = [set(partition['symbol']) for partition in partitions]
+        self.assertEqual(
+            sum(len(partition_symbols) for partition_symbols in symbols), 10
+        )
+
+
+
+class TestLoadSilverParallel(unittest.TestCase):
+    """
+    Unit tests for the parallel silver load of the silver.parallel_load
+    module, against SQLite databases.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        symbols = [f'SYM{i}' for i in range(6)]
+        dates = ['2024-09-09', '2024-09-10']
+        self.stock_df = pd.DataFrame({
+            'symbol': symbols, 'name': symbols, 'industry': 'Technology',
+            'exchange': 'NASDAQ', 'logo': '', 'weburl': '',
+        })
+        self.date_df = pd.DataFrame({
+            'date': dates, 'day_of_week': ['Monday', 'Tuesday'], 'is_weekend': 0,
+        })
+        self.prices_df = pd.DataFrame({
+            'date': dates * len(symbols),
+            'symbol': [symbol for symbol in symbols for _ in dates],
+            'open_price': 100.5, 'high_price': 110.25, 'low_price': 99.75,
+            'close_price': 105.0, 'volume': range(12),
+        })
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def engine(self, name: str):
+        """
+        Create a SQLite database with the silver tables, already holding the
+        prices of SYM0, so both loads have to skip them.
+        """
+        schema_path = os.path.join(self.tmp_dir.name, f'{name}_schema.db')
+        engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, f'{name}.db')}"
+        )
+
+        @event.listens_for(engine, 'connect')
+        def attach_schema(connection, _) -> None:
+            connection.execute(f'ATTACH DATABASE "{schema_path}" AS "{REDSHIFT_SCHEMA}"')
+
+        with engine.begin() as connection:
+            for statement in SQLITE_TABLES:
+                connection.execute(text(statement.format(schema=REDSHIFT_SCHEMA)))
+            insert_stock_prices_data(
+                connection, self.prices_df[self.prices_df['symbol'] == 'SYM0']
+            )
+        return engine
+
+    def read_prices(self, engine) -> pd.DataFrame:
+        with engine.connect() as connection:
+            return pd.read_sql_query(
+                f'SELECT * FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table '
+                'ORDER BY date, symbol',
+                connection,
+            ).drop(columns='id_transaction')
+
+    @patch('silver.parallel_load.create_tables')
+    def test_matches_serial_load(self, _) -> None:
+        """
+        Test that the parallel load inserts the same rows as the serial load,
+        skipping the existing ones, and returns the id_transaction of each
+        inserted row.
+        """
+        serial_engine = self.engine('serial')
+        with serial_engine.begin() as connection:
+            insert_stock_data_scd2(connection, self.stock_df)
+            insert_date_data(connection, self.date_df)
+            serial = insert_stock_prices_data(connection, self.prices_df)
+
+        parallel_engine = self.engine('parallel')
+        with patch('silver.parallel_load.partition_by_symbol',
+                   lambda df: partition_by_symbol(df, max_rows=3)):
+            parallel = load_silver_parallel(
+                parallel_engine, self.stock_df, self.date_df, self.prices_df,
+                concurrency=2,
+            )
+
+        self.assertEqual(len(parallel), 10)
+        key = ['date', 'symbol']
+        pd.testing.assert_frame_equal(
+            parallel.drop(columns='id_transaction').sort_values(key)
+            .reset_index(drop=True),
+            serial.drop(columns='id_transaction').sort_values(key)
+            .reset_index(drop=True),
+            check_dtype=False,
+        )
+        pd.testing.assert_frame_equal(
+            self.read_prices(parallel_engine), self.read_prices(serial_engine)
+        )
+
+        # The returned id_transaction are those of the inserted rows
+        with parallel_engine.connect() as connection:
+            ids = pd.read_sql_query(
+                f'SELECT id_transaction, date, symbol FROM '
+                f'"{REDSHIFT_SCHEMA}".daily_stock_prices_table',
+                connection,
+            )
+        parallel['date'] = parallel['date'].astype(str)
+        merged = parallel.merge(ids, on=key, suffixes=('', '_table'))
+        self.assertTrue(
+            (merged['id_transaction'] == merged['id_transaction_table']).all()
+        )
+
+        # A retry inserts nothing
+        with patch('silver.parallel_load.partition_by_symbol',
+                   lambda df: partition_by_symbol(df, max_rows=3)):
+            retried = load_silver_parallel(
+                parallel_engine, self.stock_df, self.date_df, self.prices_df,
+                concurrency=2,
+            )
+        self.assertTrue(retried.empty)
+
+        serial_engine.dispose()
+        parallel_engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+import pandas as pd
+import pyarrow as pa
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import parquet
+from utils.parquet import read_table, write_parquet
+
+SCHEMAS = {
+    name: value for name, value in vars(parquet).items()
+    if name.endswith('_SCHEMA') and isinstance(value, pa.Schema)
+}
+
+
+def sample_value(data_type: pa.DataType):
+    """
+    Build a value of a column type of the declared schemas.
+    """
+    if pa.types.is_dictionary(data_type) or pa.types.is_string(data_type):
+        return 'AAPL'
+    if pa.types.is_date32(data_type):
+        return datetime.date(2024, 9, 10)
+    if pa.types.is_timestamp(data_type):
+        return pd.Timestamp('2024-09-10 15:30:00')
+    if pa.types.is_floating(data_type):
+        # More significant digits than float32 keeps
+        return 123456.789012
+    if pa.types.is_integer(data_type):
+        return 12
+    raise TypeError(f'No sample value for {data_type}.')
+
+
+class TestParquetSchemas(unittest.TestCase):
+    """
+    Unit tests for the declared schemas of the utils.parquet module.
+    """
+
+    def test_declared_schemas_round_trip(self) -> None:
+        """
+        Test that a row written with each declared schema is read back with
+        the same types and values.
+        """
+        self.assertIn('DAILY_STOCK_PRICES_SILVER_SCHEMA', SCHEMAS)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, schema in SCHEMAS.items():
+                with self.subTest(schema=name):
+                    df = pd.DataFrame([{
+                        field.name: sample_value(field.type) for field in schema
+                    }])
+                    path = os.path.join(tmp_dir, f'{name}.parquet')
+                    write_parquet(df, path, schema)
+
+                    table = read_table(path, schema)
+                    self.assertTrue(table.schema.equals(schema))
+                    self.assertEqual(
+                        table.to_pylist()[0],
+                        pa.Table.from_pandas(df, preserve_index=False)
+                        .cast(schema).to_pylist()[0],
+                    )
+                    # The file itself keeps the declared types, except the
+                    # timestamps in seconds, which Parquet stores in ms
+                    stored = read_table(path).schema
+                    for field in schema:
+                        if not pa.types.is_timestamp(field.type):
+                            self.assertEqual(stored.field(field.name).type, field.type)
+
+    def test_prices_keep_their_digits(self) -> None:
+        """
+        Test that prices keep more digits than a float32 column would.
+        """
+        schema = parquet.DAILY_STOCK_PRICES_SILVER_SCHEMA
+        for column in ['open_price', 'high_price', 'low_price', 'close_price']:
+            self.assertEqual(schema.field(column).type, pa.float64())
+        self.assertEqual(schema.field('date').type, pa.date32())
+        self.assertTrue(pa.types.is_dictionary(schema.field('symbol').type))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'prices.parquet')
+            write_parquet(pd.DataFrame({
+                'date': [datetime.date(2024, 9, 10)], 'symbol': ['BRK.A'],
+                'open_price': [654321.125], 'high_price': [654999.99],
+                'low_price': [650000.01], 'close_price': [654321.37],
+                'volume': [1200],
+            }), path, schema)
+            df = read_table(path, schema).to_pandas()
+
+        self.assertEqual(df['close_price'].iloc[0], 654321.37)
+        self.assertEqual(df['low_price'].iloc[0], 650000.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from silver.point_in_time import profiles_as_of, read_profile_versions
+from utils.config import REDSHIFT_SCHEMA
+
+
+class TestPointInTime(unittest.TestCase):
+    """
+    Unit tests for the as-of join of prices and SCD2 profiles of the
+    silver.point_in_time module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        schema_path = os.path.join(self.tmp_dir.name, 'schema.db')
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}"
+        )
+
+        @event.listens_for(self.engine, 'connect')
+        def attach_schema(connection, _) -> None:
+            connection.execute(f'ATTACH DATABASE "{schema_path}" AS "{REDSHIFT_SCHEMA}"')
+
+        # AAPL changed its industry on 2024-09-10, and twice on 2024-09-12
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                f'CREATE TABLE "{REDSHIFT_SCHEMA}".stock_table (symbol TEXT, '
+                'name TEXT, industry TEXT, exchange TEXT, logo TEXT, weburl TEXT, '
+                'start_date TEXT, end_date TEXT, is_current INTEGER)'
+            ))
+            connection.execute(text(
+                f'INSERT INTO "{REDSHIFT_SCHEMA}".stock_table VALUES '
+                "('AAPL', 'Apple', 'Technology', 'NASDAQ', '', '', "
+                "'2024-09-05', '2024-09-10', 0), "
+                "('AAPL', 'Apple', 'Hardware', 'NASDAQ', '', '', "
+                "'2024-09-10', '2024-09-12', 0), "
+                "('AAPL', 'Apple', 'Devices', 'NASDAQ', '', '', "
+                "'2024-09-12', '2024-09-12', 0), "
+                "('AAPL', 'Apple', 'Electronics', 'NASDAQ', '', '', "
+                "'2024-09-12', '3000-12-01', 1), "
+                "('MSFT', 'Microsoft', 'Software', 'NASDAQ', '', '', "
+                "'2024-09-06', '3000-12-01', 1)"
+            ))
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def versions(self, symbols: list) -> pd.DataFrame:
+        with self.engine.connect() as connection:
+            return read_profile_versions(connection, symbols)
+
+    def test_version_valid_on_each_date(self) -> None:
+        """
+        Test that each price takes the version valid on its date, in the order
+        of the prices, and that the first version covers the earlier prices.
+        """
+        prices_df = pd.DataFrame({
+            'date': pd.to_datetime([
+                '2024-09-12', '2024-09-01', '2024-09-09', '2024-09-10',
+                '2024-09-11', '2024-09-13', '2024-09-10',
+            ]).date,
+            'symbol': ['AAPL', 'AAPL', 'AAPL', 'AAPL', 'AAPL', 'AAPL', 'TSLA'],
+        }, index=[10, 11, 12, 13, 14, 15, 16])
+
+        df = profiles_as_of(prices_df, self.versions(['AAPL', 'TSLA']), ['industry'])
+
+        self.assertEqual(list(df.index), [10, 11, 12, 13, 14, 15, 16])
+        self.assertEqual(list(df['industry']), [
+            'Electronics', 'Technology', 'Technology', 'Hardware', 'Hardware',
+            'Electronics', None,
+        ])
+
+    def test_matches_range_join(self) -> None:
+        """
+        Test that the as-of join matches the join on symbol and date range of
+        the SQL view over a random price history.
+        """
+        rng = np.random.default_rng(0)
+        prices_df = pd.DataFrame({
+            'date': pd.Timestamp('2024-09-01')
+            + pd.to_timedelta(rng.integers(0, 30, 500), unit='D'),
+            'symbol': rng.choice(['AAPL', 'MSFT', 'AMZN'], 500),
+        })
+        versions_df = self.versions(['AAPL', 'MSFT', 'AMZN'])
+        df = profiles_as_of(prices_df, versions_df)
+        prices_df['date'] = prices_df['date'].dt.strftime('%Y-%m-%d')
+
+        expected = []
+        for date, symbol in zip(prices_df['date'], prices_df['symbol']):
+            valid = versions_df[
+                (versions_df['symbol'] == symbol)
+                & (versions_df['start_date'] < versions_df['end_date'])
+                & (versions_df['end_date'] > date)
+            ]
+            first = valid['start_date'] == versions_df.loc[
+                (versions_df['symbol'] == symbol)
+                & (versions_df['start_date'] < versions_df['end_date']),
+                'start_date',
+            ].min()
+            valid = valid[first | (valid['start_date'] <= date)]
+            expected.append(valid['industry'].iloc[0] if len(valid) else None)
+
+        self.assertEqual(list(df['industry']), expected)
+        self.assertEqual(set(df.loc[df['symbol'] == 'MSFT', 'name']), {'Microsoft'})
+
+
+if __name__ == "__main__":
+    unittest.main()
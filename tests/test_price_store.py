@@ -0,0 +1,145 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from silver.load_parquet import append_silver_prices
+from silver.price_store import (
+    PriceStore,
+    build_price_store,
+    read_index,
+    update_price_store,
+)
+
+
+class TestPriceStore(unittest.TestCase):
+    """
+    Unit tests for the memory-mapped store of the silver.price_store module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.silver_path = os.path.join(self.tmp_dir.name, 'silver')
+        self.root = os.path.join(self.tmp_dir.name, 'price_store')
+
+        # Silver rows in no particular order
+        dates = pd.date_range('2024-09-02', periods=5).date
+        append_silver_prices(pd.DataFrame({
+            'date': np.concatenate([dates[::-1], dates]),
+            'symbol': ['MSFT'] * 5 + ['AAPL'] * 5,
+            'open_price': np.arange(10, dtype=float),
+            'high_price': np.arange(10, dtype=float) + 1,
+            'low_price': np.arange(10, dtype=float) - 1,
+            'close_price': np.arange(10, dtype=float) + 0.5,
+            'volume': np.arange(10) * 100,
+        }), self.silver_path)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_history_is_a_sorted_view(self) -> None:
+        """
+        Test that the history of a symbol is a date-sorted slice of the mapping.
+        """
+        self.assertEqual(build_price_store(self.silver_path, self.root), 10)
+        store = PriceStore(self.root)
+
+        self.assertEqual(store.symbols(), ['AAPL', 'MSFT'])
+        history = store.history('MSFT')
+        self.assertTrue(np.shares_memory(history, store.segments[0]))
+        self.assertTrue(np.all(np.diff(history['date']) > 0))
+        self.assertEqual(list(history['close_price']), [4.5, 3.5, 2.5, 1.5, 0.5])
+
+        window = store.history('AAPL', '2024-09-03', '2024-09-04')
+        self.assertEqual(list(window['volume']), [600, 700])
+        self.assertEqual(len(store.history('TSLA')), 0)
+
+    def data_files(self) -> list:
+        return sorted(
+            name for name in os.listdir(self.root) if name.startswith('prices_')
+        )
+
+    def test_rebuild_replaces_data_file(self) -> None:
+        """
+        Test that a rebuild keeps the data file it supersedes until the next
+        one, so a reader of the previous index can still open it, and that a
+        reader whose segments are already removed opens the current store.
+        """
+        build_price_store(self.silver_path, self.root)
+        first = read_index(self.root)
+        build_price_store(self.silver_path, self.root)
+
+        self.assertEqual(read_index(self.root)['retired'], first['segments'])
+        self.assertEqual(len(self.data_files()), 2)
+        with patch('silver.price_store.read_index', return_value=first):
+            self.assertEqual(len(PriceStore(self.root).history('AAPL')), 5)
+
+        build_price_store(self.silver_path, self.root)
+        self.assertEqual(len(self.data_files()), 2)
+        self.assertNotIn(first['segments'][0], self.data_files())
+
+        current = read_index(self.root)
+        with patch('silver.price_store.read_index', side_effect=[first, current]):
+            store = PriceStore(self.root)
+        df = store.to_frame('AAPL')
+        self.assertEqual(str(df['date'].iloc[0].date()), '2024-09-02')
+        self.assertEqual(list(df['symbol'].unique()), ['AAPL'])
+
+
+    def prices(self, dates: list, symbols: list) -> pd.DataFrame:
+        return pd.DataFrame({
+            'date': np.repeat(pd.to_datetime(dates).date, len(symbols)),
+            'symbol': symbols * len(dates),
+            'open_price': 1.0, 'high_price': 2.0, 'low_price': 0.5,
+            'close_price': 1.5, 'volume': 10,
+        })
+
+    def test_update_adds_new_files_only(self) -> None:
+        """
+        Test that an update only adds the silver files written since the last
+        one, keeps the history of each symbol sorted across segments, and
+        merges the segments once there are too many.
+        """
+        self.assertEqual(update_price_store(self.silver_path, self.root), 10)
+        self.assertEqual(update_price_store(self.silver_path, self.root), 0)
+
+        append_silver_prices(
+            self.prices(['2024-09-09', '2024-09-10'], ['AAPL', 'TSLA']),
+            self.silver_path,
+        )
+        # A late price of a date before the last ones of AAPL
+        append_silver_prices(self.prices(['2024-08-30'], ['AAPL']), self.silver_path)
+        self.assertEqual(update_price_store(self.silver_path, self.root), 5)
+
+        store = PriceStore(self.root)
+        self.assertEqual(len(store.segments), 2)
+        self.assertEqual(store.symbols(), ['AAPL', 'MSFT', 'TSLA'])
+        self.assertEqual(
+            [str(day) for day in store.history('AAPL')['date'].astype('datetime64[D]')],
+            ['2024-08-30', '2024-09-02', '2024-09-03', '2024-09-04', '2024-09-05',
+             '2024-09-06', '2024-09-09', '2024-09-10'],
+        )
+        self.assertTrue(np.shares_memory(store.history('MSFT'), store.segments[0]))
+        self.assertEqual(len(store.dates()), 8)
+
+        append_silver_prices(self.prices(['2024-09-11'], ['MSFT']), self.silver_path)
+        self.assertEqual(
+            update_price_store(self.silver_path, self.root, max_segments=2), 1
+        )
+        merged = PriceStore(self.root)
+        self.assertEqual(len(merged.segments), 1)
+        self.assertEqual(len(merged.history('AAPL')), 8)
+        self.assertEqual(len(merged.history('MSFT')), 6)
+        # The merged segments are kept for the readers of the previous index
+        self.assertEqual(len(self.data_files()), 3)
+        self.assertEqual(len(read_index(self.root)['retired']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
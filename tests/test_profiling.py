@@ -0,0 +1,63 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiling import profiled
+
+
+class TestProfiling(unittest.TestCase):
+    """
+    Unit tests for the task profiling of the utils.profiling module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+
+        @profiled("silver", root=self.root)
+        def task(**context) -> int:
+            rows = [list(range(1000)) for _ in range(100)]
+            return len(rows)
+
+        self.task = task
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_disabled_by_default(self) -> None:
+        """
+        Test that the task runs unchanged when profiling is not enabled.
+        """
+        self.assertEqual(self.task(ds='2024-09-10'), 100)
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_enabled_by_dag_run(self) -> None:
+        """
+        Test that a DAG run with {"profile": true} writes the profile, the
+        report and the peak memory of the stage.
+        """
+        dag_run = MagicMock(conf={'profile': True})
+        self.assertEqual(self.task(ds='2024-09-10', dag_run=dag_run), 100)
+
+        directory = os.path.join(self.root, '2024-09-10')
+        self.assertEqual(
+            sorted(os.listdir(directory)),
+            ['silver.prof', 'silver_report.txt', 'summary.json'],
+        )
+        with open(os.path.join(directory, 'summary.json')) as file:
+            summary = json.load(file)['silver']
+        self.assertEqual(summary['status'], 'success')
+        self.assertGreater(summary['peak_rss_mb'], 0)
+        self.assertGreater(summary['peak_traced_mb'], 0)
+        with open(os.path.join(directory, 'silver_report.txt')) as file:
+            self.assertIn('test_profiling.py', file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.archive import ResponseArchive
+from bronze.providers import AlphaVantageProvider, ArchiveProvider, FileProvider
+
+
+class TestFileProvider(unittest.TestCase):
+    """
+    Unit tests for the file-based provider from the bronze.providers module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = self.tmp_dir.name
+        os.makedirs(os.path.join(root, 'alpha_vantage'))
+        os.makedirs(os.path.join(root, 'finnhub'))
+
+        with open(os.path.join(root, 'alpha_vantage', 'AAPL.json'), 'w') as file:
+            json.dump({
+                "Time Series (Daily)": {
+                    "2024-09-10": {
+                        "1. open": "150.00",
+                        "2. high": "155.00",
+                        "3. low": "148.00",
+                        "4. close": "152.00",
+                        "5. volume": "1200000"
+                    }
+                }
+            }, file)
+        with open(os.path.join(root, 'finnhub', 'AAPL.json'), 'w') as file:
+            json.dump({"ticker": "AAPL", "name": "Apple Inc"}, file)
+
+        self.provider = FileProvider(root)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_daily_prices(self) -> None:
+        """
+        Test that stored payloads are parsed and missing symbols are skipped.
+        """
+        records = self.provider.fetch_daily_stock_prices_records(
+            ['AAPL', 'MSFT'], '2024-09-10'
+        )
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['stock_symbol'], 'AAPL')
+        self.assertEqual(records[0]['open_price'], 150.00)
+
+    def test_stock_profiles(self) -> None:
+        """
+        Test that stored profiles are parsed.
+        """
+        records = self.provider.fetch_stock_records(['AAPL', 'MSFT'])
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['name'], 'Apple Inc')
+
+
+class TestAlphaVantageBulkQuotes(unittest.TestCase):
+    """
+    Unit tests for the bulk quotes path of the Alpha Vantage provider.
+    """
+
+    @patch('bronze.api_data_downloader.requests.get')
+    def test_bulk_with_fallback(self, mock_get: MagicMock) -> None:
+        """
+        Test that one bulk request covers the quoted symbols and only the
+        symbols missing from it are fetched one by one.
+        """
+        bulk_response = MagicMock()
+        bulk_response.json.return_value = {
+            "data": [
+                {"symbol": "AAPL", "timestamp": "2024-09-10 16:00:00.000",
+                 "open": "150.00", "high": "155.00", "low": "148.00",
+                 "close": "152.00", "volume": "1200000"},
+                {"symbol": "MSFT", "timestamp": "2024-09-09 16:00:00.000",
+                 "open": "400.00", "high": "405.00", "low": "398.00",
+                 "close": "401.00", "volume": "900000"},
+            ]
+        }
+        daily_response = MagicMock()
+        daily_response.json.return_value = {"Time Series (Daily)": {}}
+        mock_get.side_effect = [bulk_response, daily_response]
+
+        provider = AlphaVantageProvider('dummy_api_key', bulk=True, bulk_size=100)
+        records = provider.fetch_daily_stock_prices_records(
+            ['AAPL', 'MSFT'], '2024-09-10'
+        )
+
+        self.assertEqual([record['stock_symbol'] for record in records], ['AAPL'])
+        self.assertEqual(mock_get.call_count, 2)
+        # Both requests are charged to the quota, not only the bulk one
+        self.assertEqual(provider.request_cost(['AAPL', 'MSFT']), 1)
+        self.assertEqual(provider.requests_made, 2)
+
+    @patch('bronze.api_data_downloader.requests.get')
+    def test_malformed_quote_falls_back(self, mock_get: MagicMock) -> None:
+        """
+        Test that a quote without a symbol does not abort the batch, and the
+        symbols left without a quote are fetched one by one.
+        """
+        bulk_response = MagicMock()
+        bulk_response.json.return_value = {
+            "data": [
+                {"timestamp": "2024-09-10 16:00:00.000", "close": "401.00"},
+                "not a quote",
+                {"symbol": "AAPL", "timestamp": "2024-09-10 16:00:00.000",
+                 "open": "150.00", "high": "155.00", "low": "148.00",
+                 "close": "152.00", "volume": "1200000"},
+            ]
+        }
+        daily_response = MagicMock()
+        daily_response.json.return_value = {"Time Series (Daily)": {
+            "2024-09-10": {"1. open": "400.00", "2. high": "405.00",
+                           "3. low": "398.00", "4. close": "401.00",
+                           "5. volume": "900000"},
+        }}
+        mock_get.side_effect = [bulk_response, daily_response]
+
+        provider = AlphaVantageProvider('dummy_api_key', bulk=True, bulk_size=100)
+        records = provider.fetch_daily_stock_prices_records(
+            ['AAPL', 'MSFT'], '2024-09-10'
+        )
+
+        self.assertEqual(
+            [record['stock_symbol'] for record in records], ['AAPL', 'MSFT']
+        )
+        self.assertIn('symbol=MSFT&', mock_get.call_args.args[0])
+        self.assertEqual(provider.requests_made, 2)
+
+
+class TestArchiveReplay(unittest.TestCase):
+    """
+    Unit tests for the raw response archive and its replay provider.
+    """
+
+    @patch('bronze.api_data_downloader.requests.get')
+    def test_replay_from_archive(self, mock_get: MagicMock) -> None:
+        """
+        Test that archived responses are content-addressed and replayed
+        into the same records without calling the API.
+        """
+        payload = {
+            "Time Series (Daily)": {
+                "2024-09-10": {
+                    "1. open": "150.00",
+                    "2. high": "155.00",
+                    "3. low": "148.00",
+                    "4. close": "152.00",
+                    "5. volume": "1200000"
+                }
+            }
+        }
+        mock_response = MagicMock()
+        mock_response.json.return_value = payload
+        mock_get.return_value = mock_response
+
+        with tempfile.TemporaryDirectory() as root:
+            archive = ResponseArchive('2024-09-10', root)
+            provider = AlphaVantageProvider('dummy_api_key', archive=archive)
+            fetched = provider.fetch_daily_stock_prices_records(
+                ['AAPL', 'MSFT'], '2024-09-10'
+            )
+            archive.save()
+
+            # Identical payloads are stored once
+            self.assertEqual(
+                archive.responses['alpha_vantage']['AAPL'],
+                archive.responses['alpha_vantage']['MSFT'],
+            )
+
+            mock_get.reset_mock()
+            replay = ArchiveProvider(ResponseArchive('2024-09-10', root))
+            replayed = replay.fetch_daily_stock_prices_records(
+                replay.symbols(), '2024-09-10'
+            )
+
+            self.assertEqual(replayed, fetched)
+            mock_get.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
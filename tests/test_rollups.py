@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gold.rollups import aggregate_ohlcv, aggregate_sectors
+
+
+class TestRollups(unittest.TestCase):
+    """
+    Unit tests for the aggregations of the gold.rollups module.
+    """
+
+    def setUp(self) -> None:
+        self.prices_df = pd.DataFrame({
+            'date': pd.to_datetime([
+                '2024-09-10', '2024-09-09', '2024-09-16', '2024-09-09'
+            ]).date,
+            'symbol': ['AAPL', 'AAPL', 'AAPL', 'MSFT'],
+            'open_price': [152.0, 150.0, 160.0, 400.0],
+            'high_price': [158.0, 155.0, 162.0, 410.0],
+            'low_price': [149.0, 148.0, 157.0, 395.0],
+            'close_price': [156.0, 152.0, 161.0, 404.0],
+            'volume': [1000, 1200, 900, 500],
+            'industry': ['Technology', 'Technology', 'Technology', None],
+        })
+
+    def test_weekly_ohlcv(self) -> None:
+        """
+        Test that a week keeps the first open, last close and its extremes.
+        """
+        df = aggregate_ohlcv(self.prices_df, 'W-SUN')
+
+        self.assertEqual(len(df), 3)
+        week = df[(df['symbol'] == 'AAPL')].iloc[0]
+        self.assertEqual(str(week['period_start']), '2024-09-09')
+        self.assertEqual(week['open_price'], 150.0)
+        self.assertEqual(week['high_price'], 158.0)
+        self.assertEqual(week['low_price'], 148.0)
+        self.assertEqual(week['close_price'], 156.0)
+        self.assertEqual(week['volume'], 2200)
+        self.assertEqual(week['trading_days'], 2)
+
+    def test_monthly_ohlcv(self) -> None:
+        """
+        Test that every day of the month is aggregated in a single row.
+        """
+        df = aggregate_ohlcv(self.prices_df, 'M')
+
+        month = df[df['symbol'] == 'AAPL'].iloc[0]
+        self.assertEqual(str(month['period_start']), '2024-09-01')
+        self.assertEqual(month['close_price'], 161.0)
+        self.assertEqual(month['trading_days'], 3)
+
+    def test_sector_aggregates(self) -> None:
+        """
+        Test the daily aggregates per industry, with missing industries grouped.
+        """
+        df = aggregate_sectors(self.prices_df)
+
+        self.assertEqual(len(df), 4)
+        unknown = df[df['industry'] == 'Unknown'].iloc[0]
+        self.assertEqual(unknown['symbol_count'], 1)
+        self.assertEqual(unknown['total_volume'], 500)
+        self.assertAlmostEqual(unknown['avg_price_change_pct'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from silver.load_parquet import (
+    append_silver_prices,
+    changed_profiles,
+    create_date_table,
+    new_dates,
+    new_prices,
+    save_loaded_prices,
+    silver_price_files,
+)
+from silver.table_insert_sql import insert_stock_prices_data
+from utils.config import REDSHIFT_SCHEMA
+from utils.parquet import DATE_SILVER_SCHEMA, STOCK_SILVER_SCHEMA, write_parquet
+
+
+def prices(dates: list, symbols: list) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': [pd.Timestamp(date).date() for date in dates for _ in symbols],
+        'symbol': symbols * len(dates),
+        'open_price': 100.5, 'high_price': 110.25, 'low_price': 99.75,
+        'close_price': 105.0, 'volume': 1000,
+    })
+
+
+class TestSilverDelta(unittest.TestCase):
+    """
+    Unit tests for the delta of the silver.load_parquet module.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, 'silver')
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_new_prices_read_the_partitions_of_their_dates(self) -> None:
+        """
+        Test that only the prices with a new (date, symbol) are kept, that
+        each run adds files without rewriting the previous ones, and that the
+        partitions of other dates are not opened.
+        """
+        first = append_silver_prices(
+            prices(['2024-09-09', '2024-09-10'], ['AAPL', 'MSFT']), self.root
+        )
+        append_silver_prices(prices(['2024-09-10'], ['TSLA']), self.root)
+        self.assertEqual(len(silver_price_files(self.root)), 3)
+        self.assertTrue(all(os.path.exists(path) for path in first))
+
+        # A partition of another date that cannot be read
+        os.makedirs(os.path.join(self.root, 'date=2024-09-06'))
+        with open(os.path.join(self.root, 'date=2024-09-06', 'part-0.parquet'),
+                  'w') as file:
+            file.write('not a parquet file')
+
+        bronze_df = prices(['2024-09-10', '2024-09-11'], ['AAPL', 'TSLA', 'GOOGL'])
+        delta = new_prices(bronze_df, self.root)
+        self.assertEqual(
+            list(zip(delta['date'].astype(str), delta['symbol'])),
+            [('2024-09-10', 'GOOGL'), ('2024-09-11', 'AAPL'),
+             ('2024-09-11', 'TSLA'), ('2024-09-11', 'GOOGL')],
+        )
+        self.assertEqual(len(new_prices(bronze_df, os.path.join(self.root, 'x'))), 6)
+
+    def test_changed_profiles_and_new_dates(self) -> None:
+        """
+        Test that only new or changed profiles and new dates are kept.
+        """
+        profile = {'symbol': 'AAPL', 'name': 'Apple Inc', 'industry': 'Technology',
+                   'exchange': 'NASDAQ', 'logo': '', 'weburl': ''}
+        stock_path = os.path.join(self.tmp_dir.name, 'stock.parquet')
+        write_parquet(pd.DataFrame([profile]), stock_path, STOCK_SILVER_SCHEMA)
+
+        stock_df = pd.DataFrame([
+            profile,
+            {**profile, 'symbol': 'MSFT', 'name': 'Microsoft'},
+            {**profile, 'symbol': 'AAPL', 'industry': 'Hardware'},
+        ])
+        changed = changed_profiles(stock_df, stock_path)
+        self.assertEqual(list(changed['symbol']), ['MSFT', 'AAPL'])
+        self.assertEqual(changed['industry'].iloc[1], 'Hardware')
+
+        date_path = os.path.join(self.tmp_dir.name, 'date.parquet')
+        write_parquet(
+            create_date_table(pd.Series(['2024-09-09'])), date_path, DATE_SILVER_SCHEMA
+        )
+        dates = new_dates(create_date_table(pd.Series(['2024-09-09', '2024-09-10'])),
+                          date_path)
+        self.assertEqual([str(date) for date in dates['date']], ['2024-09-10'])
+
+    def test_empty_delta_removes_loaded_prices(self) -> None:
+        """
+        Test that a run without new prices removes the loaded prices of a
+        prior run, so the gold layer does not process them again.
+        """
+        path = os.path.join(self.tmp_dir.name, 'loaded.parquet')
+        loaded = prices(['2024-09-10'], ['AAPL']).assign(id_transaction=1)
+        with patch('silver.load_parquet.loaded_prices_path', lambda date: path):
+            save_loaded_prices(loaded, '2024-09-10')
+            self.assertTrue(os.path.exists(path))
+            save_loaded_prices(loaded.iloc[:0], '2024-09-10')
+        self.assertFalse(os.path.exists(path))
+
+
+class TestInsertStockPrices(unittest.TestCase):
+    """
+    Unit tests for the id_transaction mapping of the inserted prices of the
+    silver.table_insert_sql module, against a SQLite database.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        schema_path = os.path.join(self.tmp_dir.name, 'schema.db')
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}"
+        )
+
+        @event.listens_for(self.engine, 'connect')
+        def attach_schema(connection, _) -> None:
+            connection.execute(f'ATTACH DATABASE "{schema_path}" AS "{REDSHIFT_SCHEMA}"')
+
+        with self.engine.begin() as connection:
+            connection.execute(text(f"""
+                CREATE TABLE "{REDSHIFT_SCHEMA}".daily_stock_prices_table (
+                    id_transaction INTEGER PRIMARY KEY AUTOINCREMENT, date DATE,
+                    symbol TEXT, open_price REAL, high_price REAL, low_price REAL,
+                    close_price REAL, volume INTEGER)
+            """))
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_inserted_rows_get_their_id_transaction(self) -> None:
+        """
+        Test that the existing rows are skipped and each inserted row gets
+        the id_transaction the table generated for its (date, symbol).
+        """
+        with self.engine.begin() as connection:
+            first = insert_stock_prices_data(connection, prices(['2024-09-09'], ['AAPL']))
+            loaded = insert_stock_prices_data(
+                connection, prices(['2024-09-09', '2024-09-10'], ['AAPL', 'MSFT'])
+            )
+            table = pd.read_sql_query(
+                f'SELECT id_transaction, date, symbol '
+                f'FROM "{REDSHIFT_SCHEMA}".daily_stock_prices_table',
+                connection,
+            )
+
+        self.assertEqual(list(first['id_transaction']), [1])
+        self.assertEqual(
+            list(zip(loaded['date'].astype(str), loaded['symbol'])),
+            [('2024-09-09', 'MSFT'), ('2024-09-10', 'AAPL'), ('2024-09-10', 'MSFT')],
+        )
+        expected = table.set_index(['date', 'symbol'])['id_transaction']
+        for row in loaded.itertuples():
+            self.assertEqual(
+                row.id_transaction, expected[(str(row.date), row.symbol)]
+            )
+        self.assertEqual(loaded['id_transaction'].nunique(), 3)
+
+        # Nothing is inserted again
+        with self.engine.begin() as connection:
+            again = insert_stock_prices_data(connection, prices(['2024-09-10'], ['MSFT']))
+        self.assertTrue(again.empty)
+        self.assertIn('id_transaction', again.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gold.calculate_stock_attributes import (
+    add_attributes,
+    daily_attributes,
+    iter_attribute_batches,
+    symbol_batches,
+)
+from utils.config import REDSHIFT_SCHEMA
+
+SYMBOLS = ['AAPL', 'AMZN', 'GOOGL', 'MSFT', 'TSLA']
+
+
+class TestStockAttributes(unittest.TestCase):
+    """
+    Unit tests for the daily calculation and the chunked recompute of the
+    gold.calculate_stock_attributes module, reading the prices from a SQLite
+    database.
+    """
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        schema_path = os.path.join(self.tmp_dir.name, 'schema.db')
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(self.tmp_dir.name, 'main.db')}"
+        )
+
+        @event.listens_for(self.engine, 'connect')
+        def attach_schema(connection, _) -> None:
+            connection.execute(f'ATTACH DATABASE "{schema_path}" AS "{REDSHIFT_SCHEMA}"')
+
+        rng = np.random.default_rng(0)
+        dates = pd.date_range('2024-09-02', periods=20).strftime('%Y-%m-%d')
+        self.prices_df = pd.DataFrame({
+            'id_transaction': np.arange(len(SYMBOLS) * len(dates)),
+            'date': np.tile(dates, len(SYMBOLS)),
+            'symbol': np.repeat(SYMBOLS, len(dates)),
+            'open_price': rng.uniform(100, 110, len(SYMBOLS) * len(dates)),
+            'high_price': rng.uniform(110, 120, len(SYMBOLS) * len(dates)),
+            'low_price': rng.uniform(90, 100, len(SYMBOLS) * len(dates)),
+            'close_price': rng.uniform(100, 110, len(SYMBOLS) * len(dates)),
+            'volume': rng.integers(1000, 2000, len(SYMBOLS) * len(dates)),
+        })
+        # Store the rows shuffled, so the query has to sort them
+        with self.engine.begin() as connection:
+            self.prices_df.sample(frac=1, random_state=0).to_sql(
+                'daily_stock_prices_table', connection, schema=REDSHIFT_SCHEMA,
+                index=False,
+            )
+
+    def tearDown(self) -> None:
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_batches_hold_whole_symbols(self) -> None:
+        """
+        Test that chunks split in the middle of a symbol are regrouped into
+        batches of whole symbols, and that a low ceiling makes more batches.
+        """
+        chunks = [self.prices_df[start:start + 7] for start in range(0, 100, 7)]
+        batches = list(symbol_batches(chunks, memory_limit_mb=0.005))
+
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(len(batch) for batch in batches), len(self.prices_df))
+        seen = [set(batch['symbol']) for batch in batches]
+        for i, symbols in enumerate(seen):
+            for other in seen[i + 1:]:
+                self.assertFalse(symbols & other)
+
+        self.assertEqual(len(list(symbol_batches(chunks, memory_limit_mb=100))), 1)
+
+    def recompute(self, start_date: str, end_date: str) -> pd.DataFrame:
+        with self.engine.connect() as connection:
+            batches = list(iter_attribute_batches(
+                connection, start_date, end_date, memory_limit_mb=0.005, chunksize=6,
+            ))
+        self.assertGreater(len(batches), 1)
+        return pd.concat(batches, ignore_index=True)
+
+    def test_streamed_recompute_matches_full_read(self) -> None:
+        """
+        Test that the attributes streamed in small chunks and batches match
+        those computed per symbol over the whole history at once.
+        """
+        streamed = self.recompute('2024-09-05', '2024-09-21')
+
+        full = add_attributes(self.prices_df)
+        expected = full[full['date'].between('2024-09-05', '2024-09-21')]
+        pd.testing.assert_frame_equal(
+            streamed, expected.reset_index(drop=True), check_dtype=False
+        )
+
+        # The moving average never mixes the volumes of two symbols, and the
+        # first dates of the range use the prices before it
+        msft = self.prices_df[self.prices_df['symbol'] == 'MSFT']['volume']
+        self.assertAlmostEqual(
+            streamed[streamed['symbol'] == 'MSFT']['volume_moving_avg'].iloc[1],
+            msft.iloc[0:5].mean(),
+        )
+
+    def test_recompute_matches_daily_run(self) -> None:
+        """
+        Test that recomputing a date, alone or within a range, writes the
+        same attributes as the daily run of the date.
+        """
+        date = '2024-09-10'
+        prices = self.prices_df[self.prices_df['date'] == date]
+        with self.engine.connect() as connection:
+            daily = daily_attributes(connection, prices)
+
+        for start_date, end_date in [(date, date), ('2024-09-03', '2024-09-15')]:
+            recomputed = self.recompute(start_date, end_date)
+            recomputed = recomputed[recomputed['date'] == date]
+            pd.testing.assert_frame_equal(
+                recomputed.reset_index(drop=True), daily, check_dtype=False
+            )
+        self.assertTrue((daily['volume_moving_avg'] > 0).all())
+
+if __name__ == "__main__":
+    unittest.main()
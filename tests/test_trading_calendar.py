@@ -0,0 +1,77 @@
+import datetime
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tasks.backfill import backfill_dates
+from utils.parquet import bronze_path
+from utils.trading_calendar import (
+    exchange_calendars,
+    is_trading_day,
+    nyse_holidays,
+    trading_days,
+)
+
+
+class TestTradingCalendar(unittest.TestCase):
+    """
+    Unit tests for the exchange calendars of the utils.trading_calendar module
+    and the backfill dates derived from them.
+    """
+
+    def test_nyse_holidays(self) -> None:
+        """
+        Test the moving and observed holidays, Juneteenth from 2022 on, and
+        that a New Year's Day on a Saturday is not observed.
+        """
+        self.assertEqual([str(day) for day in nyse_holidays(2024)], [
+            '2024-01-01', '2024-01-15', '2024-02-19', '2024-03-29', '2024-05-27',
+            '2024-06-19', '2024-07-04', '2024-09-02', '2024-11-28', '2024-12-25',
+        ])
+        self.assertNotIn(datetime.date(2021, 6, 18), nyse_holidays(2021))
+        self.assertIn(datetime.date(2022, 6, 20), nyse_holidays(2022))
+        self.assertEqual(nyse_holidays(2022)[0], datetime.date(2022, 1, 17))
+        self.assertIn(datetime.date(2021, 12, 24), nyse_holidays(2021))
+        self.assertIn(datetime.date(2025, 1, 9), nyse_holidays(2025))
+
+    def test_trading_days(self) -> None:
+        """
+        Test that weekends and holidays are not trading days of the calendar
+        of the listed exchanges.
+        """
+        calendars = exchange_calendars(
+            ['NASDAQ NMS - GLOBAL MARKET', 'NEW YORK STOCK EXCHANGE, INC.', None]
+        )
+        self.assertEqual(calendars, ['XNYS'])
+        self.assertEqual(exchange_calendars([], default='XNYS'), ['XNYS'])
+
+        self.assertFalse(is_trading_day('2024-07-04', calendars))
+        self.assertFalse(is_trading_day(datetime.date(2024, 7, 6), calendars))
+        self.assertTrue(is_trading_day('2024-07-05', calendars))
+        self.assertEqual(trading_days('2024-12-24', '2025-01-02', calendars), [
+            '2024-12-24', '2024-12-26', '2024-12-27', '2024-12-30', '2024-12-31',
+            '2025-01-02',
+        ])
+
+    def test_backfill_dates(self) -> None:
+        """
+        Test that a backfill only lists the trading days without bronze prices.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            open(bronze_path('daily_stock_prices_table', '2024-09-03', root=tmp_dir),
+                 'wb').close()
+            dates = backfill_dates(
+                '2024-08-30', '2024-09-06', ['XNYS'], tmp_dir,
+                os.path.join(tmp_dir, 'compacted'),
+            )
+        self.assertEqual(
+            dates, ['2024-08-30', '2024-09-04', '2024-09-05', '2024-09-06']
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
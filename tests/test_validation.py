@@ -0,0 +1,99 @@
+import math
+import os
+import sys
+import unittest
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bronze.api_data_downloader import parse_daily_stock_prices
+from bronze.validation import validate_daily_stock_prices, validate_stock
+
+
+class TestValidation(unittest.TestCase):
+    """
+    Unit tests for the checks of the bronze.validation module.
+    """
+
+    def setUp(self) -> None:
+        self.df = pd.DataFrame({
+            'date': ['2024-09-10'] * 6,
+            'stock_symbol': ['AAPL', 'MSFT', 'AMZN', 'TSLA', 'AAPL', 'GOOGL'],
+            'open_price': [150.0, 400.0, np.nan, 200.0, 151.0, 160.0],
+            'high_price': [155.0, 398.0, 180.0, 210.0, 156.0, 165.0],
+            'low_price': [148.0, 395.0, 170.0, 195.0, 149.0, 158.0],
+            'close_price': [152.0, 399.0, 175.0, 205.0, 153.0, 162.0],
+            'volume': [1000.0, 2000.0, 3000.0, -5.0, 1100.0, 900.0],
+        })
+        self.history_df = pd.DataFrame({
+            'stock_symbol': ['AAPL', 'GOOGL'],
+            'last_close': [150.0, 100.0],
+            'return_std': [0.01, 0.01],
+            'observations': [59, 59],
+        })
+
+    def test_parser_keeps_missing_fields_as_nan(self) -> None:
+        """
+        Test that a missing field is parsed as NaN instead of 0.
+        """
+        record = parse_daily_stock_prices({
+            "Time Series (Daily)": {
+                "2024-09-10": {"1. open": "150.00", "4. close": "152.00"}
+            }
+        }, 'AAPL', '2024-09-10')
+
+        self.assertEqual(record['open_price'], 150.0)
+        self.assertTrue(math.isnan(record['high_price']))
+        self.assertTrue(math.isnan(record['volume']))
+
+    def test_daily_stock_prices_checks(self) -> None:
+        """
+        Test that each failing row is quarantined with the checks it failed.
+        """
+        valid_df, quarantined_df, counts = validate_daily_stock_prices(
+            self.df, self.history_df, sigma=6, min_history=20
+        )
+
+        self.assertEqual(list(valid_df['stock_symbol']), ['AAPL'])
+        self.assertEqual(valid_df['close_price'].iloc[0], 153.0)
+        reasons = dict(zip(quarantined_df['stock_symbol'], quarantined_df['reasons']))
+        self.assertEqual(reasons, {
+            'AAPL': 'duplicate_key',
+            'MSFT': 'high_below_open_close',
+            'AMZN': 'missing_value',
+            'TSLA': 'negative_volume',
+            'GOOGL': 'price_jump',
+        })
+        self.assertEqual(counts['price_jump'], 1)
+        self.assertEqual(counts['low_above_open_close'], 0)
+
+    def test_jump_check_needs_history(self) -> None:
+        """
+        Test that the jump check is skipped without enough history.
+        """
+        valid_df, _, counts = validate_daily_stock_prices(
+            self.df, self.history_df.assign(observations=5), min_history=20
+        )
+
+        self.assertEqual(counts['price_jump'], 0)
+        self.assertIn('GOOGL', list(valid_df['stock_symbol']))
+
+    def test_stock_checks(self) -> None:
+        """
+        Test the checks of the stock profiles.
+        """
+        df = pd.DataFrame({
+            'symbol': ['AAPL', '', 'AAPL'],
+            'name': ['Apple Inc', 'Unknown', 'Apple Inc.'],
+        })
+        valid_df, quarantined_df, counts = validate_stock(df)
+
+        self.assertEqual(list(valid_df['name']), ['Apple Inc.'])
+        self.assertEqual(len(quarantined_df), 2)
+        self.assertEqual(counts, {'missing_symbol': 1, 'duplicate_key': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # Load environment variables from the .env file
 DIR_PATH: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,11 +11,172 @@ load_dotenv(dotenv_path)
 API_KEY_ALPHA: Optional[str] = os.getenv('API_KEY_ALPHA')
 API_KEY_FINHUB: Optional[str] = os.getenv('API_KEY_FINHUB')
 
+# Base URLs of the data providers (overridable to point at a mock server)
+ALPHA_VANTAGE_URL: str = os.getenv(
+    'ALPHA_VANTAGE_URL', 'https://www.alphavantage.co/query'
+)
+FINNHUB_URL: str = os.getenv('FINNHUB_URL', 'https://finnhub.io/api/v1')
+
+# Fetch path used by the bronze layer: 'sync' (requests) or 'async' (aiohttp)
+FETCH_MODE: str = os.getenv('FETCH_MODE', 'sync')
+# Maximum number of in-flight requests of the async fetch path
+FETCH_CONCURRENCY: int = int(os.getenv('FETCH_CONCURRENCY', '10'))
+# Seconds after which the pending requests of a fetch are cancelled
+FETCH_TIMEOUT: float = float(os.getenv('FETCH_TIMEOUT', '600'))
+# Requests per minute allowed by each provider. The Alpha Vantage default is
+# the rate of a free key; premium keys allow 75 or more
+ALPHA_VANTAGE_REQUESTS_PER_MINUTE: int = int(
+    os.getenv('ALPHA_VANTAGE_REQUESTS_PER_MINUTE', '5')
+)
+FINNHUB_REQUESTS_PER_MINUTE: int = int(
+    os.getenv('FINNHUB_REQUESTS_PER_MINUTE', '60')
+)
+
+# Providers of daily prices and stock profiles: 'alpha_vantage', 'finnhub'
+# or 'file' (JSON payloads stored under PROVIDER_FILES_PATH)
+PRICE_PROVIDER: str = os.getenv('PRICE_PROVIDER', 'alpha_vantage')
+PROFILE_PROVIDER: str = os.getenv('PROFILE_PROVIDER', 'finnhub')
+PROVIDER_FILES_PATH: str = os.getenv(
+    'PROVIDER_FILES_PATH', os.path.join(DIR_PATH, 'bronze', 'data', 'provider_files')
+)
+# Alpha Vantage REALTIME_BULK_QUOTES (premium plans only)
+ALPHA_VANTAGE_BULK_QUOTES: bool = (
+    os.getenv('ALPHA_VANTAGE_BULK_QUOTES', 'false').lower() == 'true'
+)
+ALPHA_VANTAGE_BULK_SIZE: int = int(os.getenv('ALPHA_VANTAGE_BULK_SIZE', '100'))
+
+# Archive of the raw API responses, used to replay bronze without network
+ARCHIVE_RESPONSES: bool = os.getenv('ARCHIVE_RESPONSES', 'true').lower() == 'true'
+RAW_ARCHIVE_PATH: str = os.getenv(
+    'RAW_ARCHIVE_PATH', os.path.join(DIR_PATH, 'bronze', 'data', 'raw')
+)
+# Bronze mode: 'fetch' calls the APIs, 'replay' rebuilds from the archive
+BRONZE_MODE: str = os.getenv('BRONZE_MODE', 'fetch')
+
+# Directory of the per-date bronze files, and of the monthly files they are
+# compacted into once their month closed BRONZE_COMPACTION_GRACE_DAYS ago
+BRONZE_DATA_PATH: str = os.path.join(DIR_PATH, 'bronze', 'data')
+BRONZE_COMPACTED_PATH: str = os.getenv(
+    'BRONZE_COMPACTED_PATH', os.path.join(BRONZE_DATA_PATH, 'compacted')
+)
+BRONZE_COMPACTION_GRACE_DAYS: int = int(
+    os.getenv('BRONZE_COMPACTION_GRACE_DAYS', '7')
+)
+
+# Intraday ingestion: symbols whose TIME_SERIES_INTRADAY bars are loaded
+# (comma-separated, none by default), bar interval ('1min', '5min', '15min',
+# '30min' or '60min') and root of the partitioned bar files
+INTRADAY_SYMBOLS: List[str] = [
+    symbol.strip()
+    for symbol in os.getenv('INTRADAY_SYMBOLS', '').split(',')
+    if symbol.strip()
+]
+INTRADAY_INTERVAL: str = os.getenv('INTRADAY_INTERVAL', '5min')
+INTRADAY_PATH: str = os.getenv(
+    'INTRADAY_PATH', os.path.join(DIR_PATH, 'bronze', 'data', 'intraday')
+)
+
 # List of stock symbols
 STOCKS_SYMBOLS_LIST: List[str] = ['AAPL', 'MSFT', 'AMZN', 'GOOGL', 'TSLA']
 # You can uncomment the next line to add more symbols to the list
 # STOCKS_SYMBOLS_LIST += ['META', 'NVDA', 'MELI', 'JNJ', 'V']
 
+# Fetch scheduling of the bronze layer: symbols fetched first (comma-separated,
+# in order), symbols per scheduled batch, minutes after the start of the task
+# after which no new batch is started (0 for no deadline), requests allowed per
+# day by each provider (0 for no quota) and directory of the per-symbol status
+FETCH_PRIORITY_SYMBOLS: List[str] = [
+    symbol.strip()
+    for symbol in os.getenv('FETCH_PRIORITY_SYMBOLS', '').split(',')
+    if symbol.strip()
+]
+FETCH_BATCH_SIZE: int = int(os.getenv('FETCH_BATCH_SIZE', '25'))
+FETCH_DEADLINE_MINUTES: float = float(os.getenv('FETCH_DEADLINE_MINUTES', '45'))
+FETCH_DAILY_QUOTAS: Dict[str, int] = {
+    'alpha_vantage': int(os.getenv('ALPHA_VANTAGE_DAILY_QUOTA', '0')),
+    'finnhub': int(os.getenv('FINNHUB_DAILY_QUOTA', '0')),
+}
+FETCH_STATUS_PATH: str = os.getenv(
+    'FETCH_STATUS_PATH', os.path.join(DIR_PATH, 'bronze', 'data', 'fetch_status')
+)
+
+# Trading calendar: days the exchanges of the listed symbols are closed are
+# skipped before any API call if SKIP_NON_TRADING_DAYS is set; symbols of an
+# exchange without a known calendar follow TRADING_CALENDAR
+SKIP_NON_TRADING_DAYS: bool = (
+    os.getenv('SKIP_NON_TRADING_DAYS', 'true').lower() == 'true'
+)
+TRADING_CALENDAR: str = os.getenv('TRADING_CALENDAR', 'XNYS')
+
+# Validation stage between bronze and silver: price jumps beyond
+# VALIDATION_JUMP_SIGMA standard deviations of the last VALIDATION_HISTORY_DAYS
+# returns (with at least VALIDATION_MIN_HISTORY of them) are quarantined
+VALIDATION_JUMP_SIGMA: float = float(os.getenv('VALIDATION_JUMP_SIGMA', '6'))
+VALIDATION_HISTORY_DAYS: int = int(os.getenv('VALIDATION_HISTORY_DAYS', '60'))
+VALIDATION_MIN_HISTORY: int = int(os.getenv('VALIDATION_MIN_HISTORY', '20'))
+QUARANTINE_PATH: str = os.getenv(
+    'QUARANTINE_PATH', os.path.join(DIR_PATH, 'bronze', 'data', 'quarantine')
+)
+
+# Manifests of the stages completed per date, used to skip up-to-date stages
+RUN_MANIFEST_PATH: str = os.getenv(
+    'RUN_MANIFEST_PATH', os.path.join(DIR_PATH, 'run_manifests')
+)
+
+# Memory-mapped store of the silver daily prices, rebuilt by the silver layer
+PRICE_STORE_PATH: str = os.getenv(
+    'PRICE_STORE_PATH', os.path.join(DIR_PATH, 'silver', 'data', 'price_store')
+)
+
+# Profiling of the pipeline tasks, also enabled per run by triggering the DAG
+# with {"profile": true}: cProfile dumps, top tracemalloc allocations and
+# peak RSS of each stage are written to PROFILE_PATH/{date}
+PROFILE_TASKS: bool = os.getenv('PROFILE_TASKS', 'false').lower() == 'true'
+PROFILE_PATH: str = os.getenv('PROFILE_PATH', os.path.join(DIR_PATH, 'profiles'))
+PROFILE_TOP_ALLOCATIONS: int = int(os.getenv('PROFILE_TOP_ALLOCATIONS', '25'))
+
+# File replaced by the gold task every time it refreshes the gold tables
+GOLD_REFRESH_MARKER: str = os.getenv(
+    'GOLD_REFRESH_MARKER', os.path.join(RUN_MANIFEST_PATH, 'gold_refresh.json')
+)
+
+# Change data export written after the gold layer: one batch per run with
+# the rows inserted or changed by it, numbered by a monotonic watermark
+CDC_EXPORT_PATH: str = os.getenv('CDC_EXPORT_PATH', os.path.join(DIR_PATH, 'cdc'))
+
+# Read-only query service over the gold tables: address, pooled connections,
+# and entries and seconds to live of its result cache
+QUERY_SERVICE_HOST: str = os.getenv('QUERY_SERVICE_HOST', '0.0.0.0')
+QUERY_SERVICE_PORT: int = int(os.getenv('QUERY_SERVICE_PORT', '8000'))
+QUERY_POOL_SIZE: int = int(os.getenv('QUERY_POOL_SIZE', '5'))
+QUERY_CACHE_SIZE: int = int(os.getenv('QUERY_CACHE_SIZE', '256'))
+QUERY_CACHE_TTL: float = float(os.getenv('QUERY_CACHE_TTL', '300'))
+
+# Corporate actions (splits and cash dividends) and the cumulative
+# adjustment factors derived from them; dividends are only applied to the
+# adjusted prices if ADJUST_DIVIDENDS is set
+CORPORATE_ACTIONS_PATH: str = os.getenv(
+    'CORPORATE_ACTIONS_PATH',
+    os.path.join(DIR_PATH, 'silver', 'data', 'corporate_actions'),
+)
+ADJUST_DIVIDENDS: bool = os.getenv('ADJUST_DIVIDENDS', 'true').lower() == 'true'
+
+# Cross-sectional analytics of the gold layer: trailing window of daily
+# returns, symbols per block of the correlation matrix, minimum number of
+# common returns of a pair and benchmark symbol of the betas
+CROSS_SECTIONAL_WINDOW: int = int(os.getenv('CROSS_SECTIONAL_WINDOW', '60'))
+CROSS_SECTIONAL_BLOCK_SIZE: int = int(os.getenv('CROSS_SECTIONAL_BLOCK_SIZE', '512'))
+CROSS_SECTIONAL_MIN_OBSERVATIONS: int = int(
+    os.getenv('CROSS_SECTIONAL_MIN_OBSERVATIONS', '20')
+)
+BENCHMARK_SYMBOL: str = os.getenv('BENCHMARK_SYMBOL', 'SPY')
+
+# Recompute of the gold attributes over a date range: rows fetched per
+# round trip of the server-side cursor, and ceiling in MB of the rows held in
+# memory at once, which are processed and written in groups of whole symbols
+GOLD_STREAM_ROWS: int = int(os.getenv('GOLD_STREAM_ROWS', '10000'))
+GOLD_MEMORY_LIMIT_MB: float = float(os.getenv('GOLD_MEMORY_LIMIT_MB', '256'))
+
 # Redshift database connection details loaded from environment variables
 DBNAME_REDSHIFT: Optional[str] = os.getenv('DBNAME_REDSHIFT')
 USER_REDSHIFT: Optional[str] = os.getenv('USER_REDSHIFT')
@@ -23,7 +184,20 @@ PASSWORD_REDSHIFT: Optional[str] = os.getenv('PASSWORD_REDSHIFT')
 HOST_REDSHIFT: Optional[str] = os.getenv('HOST_REDSHIFT')
 PORT_REDSHIFT: Optional[str] = os.getenv('PORT_REDSHIFT')
 REDSHIFT_SCHEMA = '2024_juan_pablo_anselmo_schema'
+# SQLAlchemy URL used instead of the Redshift connection details, e.g. to run
+# the query service against a local Postgres with the same schema
+DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')
+# Maximum number of concurrent warehouse connections of the silver load.
+# 1 loads everything in a single transaction; above 1 the dimension tables
+# are loaded concurrently, then the fact table in one transaction, staged in
+# partitions of at most SILVER_FACT_PARTITION_ROWS rows
+SILVER_LOAD_CONCURRENCY: int = int(os.getenv('SILVER_LOAD_CONCURRENCY', '1'))
+SILVER_FACT_PARTITION_ROWS: int = int(
+    os.getenv('SILVER_FACT_PARTITION_ROWS', '100000')
+)
+# Rows per multi-row INSERT statement of the bulk load path
+BULK_INSERT_CHUNKSIZE: int = int(os.getenv('BULK_INSERT_CHUNKSIZE', '1000'))
 
-
-
-
+# Parquet storage settings for the bronze and silver files
+PARQUET_COMPRESSION: str = os.getenv('PARQUET_COMPRESSION', 'zstd')
+PARQUET_ROW_GROUP_SIZE: int = int(os.getenv('PARQUET_ROW_GROUP_SIZE', '131072'))
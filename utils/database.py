@@ -1,9 +1,13 @@
 import urllib.parse
+import pandas as pd
+from typing import Any, Dict, Iterator, Optional
+from sqlalchemy import text
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
 from utils.config import (
     DBNAME_REDSHIFT, USER_REDSHIFT, PASSWORD_REDSHIFT,
-    HOST_REDSHIFT, PORT_REDSHIFT
+    HOST_REDSHIFT, PORT_REDSHIFT, REDSHIFT_SCHEMA, BULK_INSERT_CHUNKSIZE,
+    DATABASE_URL, GOLD_STREAM_ROWS
 )
 
 
@@ -16,20 +20,156 @@ host: str = HOST_REDSHIFT
 port: str = PORT_REDSHIFT
 
 
-def create_redshift_engine() -> Engine:
+def create_redshift_engine(pool_size: int = 5) -> Engine:
     """
     Create a SQLAlchemy engine for connecting to a Redshift database.
 
     This function builds a connection string using the provided credentials
     and returns a SQLAlchemy engine that can be used to interact with the database.
+    If DATABASE_URL is set, it is used instead (e.g. a local Postgres).
+
+    Args:
+        pool_size (int): Number of connections kept open by the engine's pool.
 
     Returns:
         Engine: A SQLAlchemy Engine object connected to the Redshift database.
     """
 
     # Create a SQLAlchemy engine for Redshift connection
-    engine: Engine = create_engine(
-        f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}'
+    url: str = (
+        DATABASE_URL
+        or f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}'
     )
+    engine: Engine = create_engine(url, pool_size=pool_size)
     return engine
 
+
+def stream_query(
+    connection: Connection,
+    query: Any,
+    params: Optional[Dict[str, Any]] = None,
+    chunksize: int = GOLD_STREAM_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read the result of a query in DataFrames of at most `chunksize` rows
+    through a server-side cursor, so the full result set is never held in
+    memory, by the client nor by the driver.
+
+    Args:
+        connection (Connection): Connection the cursor is opened on; it must
+            not be used for other statements until the chunks are consumed.
+        query (Any): SQL query, as a string or a text() clause.
+        params (Optional[Dict[str, Any]]): Parameters of the query.
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        Iterator[pd.DataFrame]: The chunks of the result, in order.
+    """
+    streaming = connection.execution_options(stream_results=True)
+    return pd.read_sql_query(query, streaming, params=params, chunksize=chunksize)
+
+
+def bulk_insert(
+    connection: Connection,
+    df: pd.DataFrame,
+    table_name: str,
+    schema: Optional[str] = REDSHIFT_SCHEMA,
+) -> None:
+    """
+    Append a DataFrame to a table with multi-row INSERT statements, so a load
+    costs one round trip per chunk instead of one per row.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        df (pd.DataFrame): Rows to be inserted, with the table's column names.
+        table_name (str): Name of the table.
+        schema (Optional[str]): Schema of the table. Defaults to the Redshift
+            schema; None targets temporary tables.
+    """
+    df.to_sql(
+        table_name,
+        con=connection,
+        schema=schema,
+        if_exists='append',
+        index=False,
+        method='multi',
+        chunksize=BULK_INSERT_CHUNKSIZE,
+    )
+
+
+def stage_keys(
+    connection: Connection,
+    df: pd.DataFrame,
+    table_name: str,
+    columns: Dict[str, str],
+) -> None:
+    """
+    Load key columns into a temporary table of the session, so statements can
+    join against it instead of embedding a literal IN list. The caller drops
+    the table once it is no longer needed.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        df (pd.DataFrame): Rows holding the key columns.
+        table_name (str): Name of the temporary table.
+        columns (Dict[str, str]): SQL type of each key column.
+    """
+    definition = ', '.join(f'{column} {sql_type}' for column, sql_type in columns.items())
+    connection.execute(text(f'DROP TABLE IF EXISTS {table_name}'))
+    connection.execute(text(f'CREATE TEMP TABLE {table_name} ({definition})'))
+    bulk_insert(connection, df[list(columns)], table_name, schema=None)
+
+
+def delete_rows(
+    connection: Connection,
+    keys_df: pd.DataFrame,
+    table_name: str,
+    key_columns: Dict[str, str],
+) -> None:
+    """
+    Delete the rows of a table that match the given keys, joining against the
+    staged keys instead of embedding a literal IN list.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the delete.
+        keys_df (pd.DataFrame): Keys whose rows are deleted.
+        table_name (str): Name of the table in the Redshift schema.
+        key_columns (Dict[str, str]): SQL type of each key column.
+    """
+    staged_table = f'staged_{table_name}_keys'
+    condition = ' AND '.join(
+        f'{table_name}.{column} = {staged_table}.{column}' for column in key_columns
+    )
+
+    stage_keys(connection, keys_df.drop_duplicates(), staged_table, key_columns)
+    connection.execute(text(f"""
+        DELETE FROM "{REDSHIFT_SCHEMA}".{table_name}
+        USING {staged_table}
+        WHERE {condition}
+    """))
+    connection.execute(text(f'DROP TABLE {staged_table}'))
+
+
+def replace_rows(
+    connection: Connection,
+    df: pd.DataFrame,
+    table_name: str,
+    key_columns: Dict[str, str],
+    keys_df: Optional[pd.DataFrame] = None,
+) -> None:
+    """
+    Replace the rows of a table that match the given keys: the existing rows
+    are deleted by joining against the staged keys and `df` is inserted.
+
+    Args:
+        connection (Connection): Connection (and transaction) used for the load.
+        df (pd.DataFrame): Rows to be inserted, with the table's column names.
+        table_name (str): Name of the table in the Redshift schema.
+        key_columns (Dict[str, str]): SQL type of each key column.
+        keys_df (Optional[pd.DataFrame]): Keys whose rows are deleted. Defaults
+            to the keys of `df`; pass it to also clear keys without new rows.
+    """
+    keys_df = (df if keys_df is None else keys_df)[list(key_columns)]
+    delete_rows(connection, keys_df, table_name, key_columns)
+    if not df.empty:
+        bulk_insert(connection, df, table_name)
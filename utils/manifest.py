@@ -0,0 +1,181 @@
+import datetime
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from utils.config import DIR_PATH, GOLD_REFRESH_MARKER, RUN_MANIFEST_PATH
+
+
+def file_digest(path: str) -> str:
+    """
+    Compute the SHA-256 of a file, or 'missing' if it does not exist.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: The hex digest of the content of the file.
+    """
+    if not os.path.exists(path):
+        return "missing"
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_version(code_paths: List[str]) -> str:
+    """
+    Hash the Python sources of a stage, so a change in its code invalidates
+    the outputs it produced.
+
+    Args:
+        code_paths (List[str]): Files and directories, relative to the project.
+
+    Returns:
+        str: The hex digest of the sources.
+    """
+    digest = hashlib.sha256()
+    for code_path in sorted(code_paths):
+        path = os.path.join(DIR_PATH, code_path)
+        files = [path] if os.path.isfile(path) else sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+            if name.endswith(".py")
+        )
+        for file in files:
+            digest.update(os.path.relpath(file, DIR_PATH).encode())
+            digest.update(file_digest(file).encode())
+    return digest.hexdigest()
+
+
+def stage_fingerprint(
+    stage: str,
+    input_paths: List[str],
+    symbols: List[str],
+    code_paths: List[str],
+    **settings: Any,
+) -> str:
+    """
+    Fingerprint the inputs of a stage: the content of its input files, the
+    symbol set, its code version and any setting that changes its output.
+
+    Args:
+        stage (str): Name of the stage, e.g. 'silver'.
+        input_paths (List[str]): Files read by the stage.
+        symbols (List[str]): Symbols processed by the stage.
+        code_paths (List[str]): Sources of the stage, relative to the project.
+        **settings (Any): Other values the output depends on.
+
+    Returns:
+        str: The hex digest of the inputs.
+    """
+    payload = {
+        "stage": stage,
+        "inputs": {
+            os.path.basename(path): file_digest(path) for path in sorted(input_paths)
+        },
+        "symbols": sorted(symbols),
+        "code": code_version(code_paths),
+        "settings": {key: str(value) for key, value in sorted(settings.items())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class RunManifest:
+    """
+    Record of the stages completed for a date, stored as
+    `{root}/{date}.json`, so a retry or a manual re-run can skip the stages
+    whose inputs did not change.
+    """
+
+    def __init__(self, date: str, root: str = RUN_MANIFEST_PATH) -> None:
+        self.path: str = os.path.join(root, f"{date}.json")
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as file:
+                self.stages = json.load(file).get("stages", {})
+
+    def is_up_to_date(
+        self, stage: str, fingerprint: str, outputs: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Check whether the stage completed with the same fingerprint and its
+        output files still exist.
+
+        Args:
+            stage (str): Name of the stage.
+            fingerprint (str): Fingerprint of the current inputs.
+            outputs (Optional[List[str]]): Files the stage produces.
+
+        Returns:
+            bool: True if the stage can be skipped.
+        """
+        entry = self.stages.get(stage)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+        return all(os.path.exists(path) for path in outputs or [])
+
+    def result(self, stage: str) -> Any:
+        """
+        Get the result recorded for a completed stage, if any.
+        """
+        return self.stages.get(stage, {}).get("result")
+
+    def record(self, stage: str, fingerprint: str, result: Any = None) -> None:
+        """
+        Record that the stage completed for the fingerprint, replacing the
+        manifest file atomically.
+
+        Args:
+            stage (str): Name of the stage.
+            fingerprint (str): Fingerprint of the inputs it ran with.
+            result (Any): JSON-serializable result of the stage, if any.
+        """
+        self.stages[stage] = {
+            "fingerprint": fingerprint,
+            "completed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "result": result,
+        }
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({"stages": self.stages}, file, indent=2, sort_keys=True)
+        os.replace(f"{self.path}.tmp", self.path)
+
+
+def is_forced(context: Any) -> bool:
+    """
+    Check whether the DAG run was triggered with {"force": true} in its
+    configuration, to run every stage even if it is up to date.
+
+    Args:
+        context (Any): The Airflow context of the task.
+
+    Returns:
+        bool: True if the stages must not be skipped.
+    """
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf or {}) if dag_run is not None else {}
+    return bool(conf.get("force", False))
+
+
+def record_gold_refresh(date: str, path: str = GOLD_REFRESH_MARKER) -> None:
+    """
+    Replace the gold refresh marker, so the caches of the query service
+    drop the results computed before the refresh.
+
+    Args:
+        date (str): The date the gold tables were refreshed for.
+        path (str): Path of the marker file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump({
+            "date": date,
+            "refreshed_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        }, file)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,211 @@
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Any, List, Optional
+from utils.config import (
+    BRONZE_DATA_PATH,
+    PARQUET_COMPRESSION,
+    PARQUET_ROW_GROUP_SIZE,
+)
+
+# Dictionary encoding for low-cardinality string columns
+DICTIONARY_STRING: pa.DataType = pa.dictionary(pa.int32(), pa.string())
+
+# Bronze tables
+DAILY_STOCK_PRICES_BRONZE_SCHEMA: pa.Schema = pa.schema([
+    ('date', pa.date32()),
+    ('stock_symbol', DICTIONARY_STRING),
+    ('open_price', pa.float64()),
+    ('high_price', pa.float64()),
+    ('low_price', pa.float64()),
+    ('close_price', pa.float64()),
+    ('volume', pa.int64()),
+])
+STOCK_BRONZE_SCHEMA: pa.Schema = pa.schema([
+    ('symbol', DICTIONARY_STRING),
+    ('name', pa.string()),
+    ('industry', DICTIONARY_STRING),
+    ('exchange', DICTIONARY_STRING),
+    ('logo', pa.string()),
+    ('weburl', pa.string()),
+])
+# Intraday bars, partitioned by interval and date
+INTRADAY_BRONZE_SCHEMA: pa.Schema = pa.schema([
+    ('timestamp', pa.timestamp('s')),
+    ('symbol', DICTIONARY_STRING),
+    ('open_price', pa.float64()),
+    ('high_price', pa.float64()),
+    ('low_price', pa.float64()),
+    ('close_price', pa.float64()),
+    ('volume', pa.int64()),
+])
+
+# Outcome of each symbol fetched by the bronze layer for a date
+FETCH_STATUS_SCHEMA: pa.Schema = pa.schema([
+    ('date', pa.date32()),
+    ('dataset', DICTIONARY_STRING),
+    ('symbol', DICTIONARY_STRING),
+    ('priority', pa.int16()),
+    ('status', DICTIONARY_STRING),
+    ('attempts', pa.int16()),
+    ('updated_at', pa.timestamp('s')),
+])
+
+# Silver tables
+CORPORATE_ACTIONS_SCHEMA: pa.Schema = pa.schema([
+    ('symbol', DICTIONARY_STRING),
+    ('ex_date', pa.date32()),
+    ('action_type', DICTIONARY_STRING),
+    ('value', pa.float64()),
+])
+# Cumulative factors of the prices of a symbol between two ex-dates
+# (start_date inclusive, end_date exclusive)
+ADJUSTMENT_FACTORS_SCHEMA: pa.Schema = pa.schema([
+    ('symbol', DICTIONARY_STRING),
+    ('start_date', pa.date32()),
+    ('end_date', pa.date32()),
+    ('price_factor', pa.float64()),
+    ('volume_factor', pa.float64()),
+])
+DAILY_STOCK_PRICES_SILVER_SCHEMA: pa.Schema = pa.schema([
+    ('date', pa.date32()),
+    ('symbol', DICTIONARY_STRING),
+    ('open_price', pa.float64()),
+    ('high_price', pa.float64()),
+    ('low_price', pa.float64()),
+    ('close_price', pa.float64()),
+    ('volume', pa.int64()),
+])
+# Daily stock prices loaded by a silver run, with their warehouse key
+LOADED_DAILY_STOCK_PRICES_SCHEMA: pa.Schema = (
+    DAILY_STOCK_PRICES_SILVER_SCHEMA.insert(0, pa.field('id_transaction', pa.int64()))
+)
+STOCK_SILVER_SCHEMA: pa.Schema = STOCK_BRONZE_SCHEMA
+DATE_SILVER_SCHEMA: pa.Schema = pa.schema([
+    ('date', pa.date32()),
+    ('day_of_week', DICTIONARY_STRING),
+    ('day_of_week_short', DICTIONARY_STRING),
+    ('day_of_month', pa.int16()),
+    ('day_of_year', pa.int16()),
+    ('week_of_year', pa.int16()),
+    ('month', DICTIONARY_STRING),
+    ('month_short', DICTIONARY_STRING),
+    ('month_number', pa.int16()),
+    ('quarter', pa.int16()),
+    ('year', pa.int16()),
+    ('is_weekend', pa.int8()),
+])
+
+
+def bronze_path(
+    table_name: str, date: str, stage: str = "bronze", root: str = BRONZE_DATA_PATH
+) -> str:
+    """
+    Path of a bronze file of a date: 'bronze' for the files written by the
+    bronze layer, 'validated' for the rows that passed validation.
+
+    Args:
+        table_name (str): Name of the table, e.g. 'stock_table'.
+        date (str): The date of the file.
+        stage (str): Suffix of the file.
+        root (str): Directory of the bronze files.
+
+    Returns:
+        str: Path of the Parquet file.
+    """
+    return os.path.join(root, f"{table_name}_{date}_{stage}.parquet")
+
+
+def to_arrow_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """
+    Convert a DataFrame to an Arrow table conforming to the given schema.
+
+    Args:
+        df (pd.DataFrame): DataFrame holding at least the columns of the schema.
+        schema (pa.Schema): Declared schema of the table.
+
+    Returns:
+        pa.Table: The table with the columns and types of the schema.
+    """
+    table: pa.Table = pa.Table.from_pandas(df[schema.names], preserve_index=False)
+    return table.cast(schema)
+
+
+def write_parquet(df: pd.DataFrame, path: str, schema: pa.Schema) -> None:
+    """
+    Write a DataFrame to a Parquet file using a declared schema.
+
+    Args:
+        df (pd.DataFrame): DataFrame to be written.
+        path (str): Destination path of the Parquet file.
+        schema (pa.Schema): Declared schema applied before writing.
+    """
+    write_table(to_arrow_table(df, schema), path)
+
+
+def write_table(table: pa.Table, path: str) -> None:
+    """
+    Write an Arrow table to a Parquet file with the pipeline's compression
+    and row group settings.
+
+    Args:
+        table (pa.Table): Table to be written.
+        path (str): Destination path of the Parquet file.
+    """
+    pq.write_table(
+        table,
+        path,
+        compression=PARQUET_COMPRESSION,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+    )
+
+
+def read_table(
+    path: str,
+    schema: Optional[pa.Schema] = None,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Any]] = None,
+) -> pa.Table:
+    """
+    Read a Parquet file as an Arrow table, projecting only the needed columns.
+
+    Files written before the schemas were declared are cast to the schema,
+    so callers always get the same types.
+
+    Args:
+        path (str): Path of the Parquet file.
+        schema (Optional[pa.Schema]): Declared schema of the table, if any.
+        columns (Optional[List[str]]): Columns to read. Defaults to all columns.
+        filters (Optional[List[Any]]): Row filters in the pyarrow format, e.g.
+            [('date', '>=', start)]; row groups outside them are skipped.
+
+    Returns:
+        pa.Table: The table read from the file.
+    """
+    table: pa.Table = pq.read_table(path, columns=columns, filters=filters)
+    if schema is not None:
+        names: List[str] = columns if columns is not None else schema.names
+        table = table.select(names).cast(
+            pa.schema([schema.field(name) for name in names])
+        )
+    return table
+
+
+def read_parquet(
+    path: str,
+    schema: Optional[pa.Schema] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Read a Parquet file into a DataFrame, projecting only the needed columns.
+
+    Args:
+        path (str): Path of the Parquet file.
+        schema (Optional[pa.Schema]): Declared schema of the table, if any.
+        columns (Optional[List[str]]): Columns to read. Defaults to all columns.
+
+    Returns:
+        pd.DataFrame: The DataFrame read from the file.
+    """
+    return read_table(path, schema, columns).to_pandas()
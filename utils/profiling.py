@@ -0,0 +1,147 @@
+import cProfile
+import datetime
+import functools
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+from utils.config import PROFILE_PATH, PROFILE_TASKS, PROFILE_TOP_ALLOCATIONS
+
+# Frames of the tracing itself, left out of the allocation report
+IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+def is_profiling(context: Dict[str, Any]) -> bool:
+    """
+    Check whether the task must be profiled, either because PROFILE_TASKS is
+    set or because the DAG run was triggered with {"profile": true} in its
+    configuration.
+
+    Args:
+        context (Dict[str, Any]): The Airflow context of the task.
+
+    Returns:
+        bool: True if the task must be profiled.
+    """
+    dag_run = context.get("dag_run")
+    conf = (dag_run.conf or {}) if dag_run is not None else {}
+    return bool(conf.get("profile", PROFILE_TASKS))
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of the process, in megabytes.
+    """
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def write_profile(
+    stage: str,
+    directory: str,
+    profiler: cProfile.Profile,
+    snapshot: tracemalloc.Snapshot,
+    summary: Dict[str, Any],
+    top: int = PROFILE_TOP_ALLOCATIONS,
+) -> None:
+    """
+    Write the profile of a stage: the cProfile dump, readable with pstats or
+    snakeviz, a report of the hottest functions and largest allocations, and
+    the stage's entry in summary.json.
+
+    Args:
+        stage (str): Name of the stage, e.g. 'silver'.
+        directory (str): Directory of the profiles of the run.
+        profiler (cProfile.Profile): Profiler that traced the stage.
+        snapshot (tracemalloc.Snapshot): Allocations alive at the end of the stage.
+        summary (Dict[str, Any]): Duration and memory figures of the stage.
+        top (int): Number of functions and allocations in the report.
+    """
+    os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(os.path.join(directory, f"{stage}.prof"))
+
+    stream = io.StringIO()
+    stream.write(f"Stage '{stage}': {json.dumps(summary)}\n\n")
+    stream.write(f"Top {top} functions by cumulative time:\n")
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    stream.write(f"\nTop {top} allocations by line:\n")
+    allocations = snapshot.filter_traces(IGNORED_FRAMES).statistics("lineno")
+    for statistic in allocations[:top]:
+        stream.write(f"{statistic}\n")
+
+    report_path: str = os.path.join(directory, f"{stage}_report.txt")
+    with open(report_path, "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+
+    # Merge the stage into the summary of the run
+    summary_path: str = os.path.join(directory, "summary.json")
+    stages: Dict[str, Any] = {}
+    if os.path.exists(summary_path):
+        with open(summary_path, encoding="utf-8") as file:
+            stages = json.load(file)
+    stages[stage] = summary
+    with open(f"{summary_path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(stages, file, indent=2, sort_keys=True)
+    os.replace(f"{summary_path}.tmp", summary_path)
+
+
+def profiled(stage: str, root: str = PROFILE_PATH) -> Callable:
+    """
+    Decorate a task so that, when profiling is enabled for the run, it runs
+    under cProfile and tracemalloc and its profile is written to
+    `{root}/{date}`. The task is called unchanged otherwise.
+
+    Args:
+        stage (str): Name of the stage, used to name its profile files.
+        root (str): Directory of the profiles.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(task: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(task)
+        def wrapper(**context: Any) -> Any:
+            if not is_profiling(context):
+                return task(**context)
+
+            date: str = context.get("ds") or datetime.date.today().isoformat()
+            profiler = cProfile.Profile()
+            tracemalloc.start()
+            start: float = time.perf_counter()
+            status: str = "failed"
+            try:
+                profiler.enable()
+                result = task(**context)
+                status = "success"
+                return result
+            finally:
+                profiler.disable()
+                snapshot = tracemalloc.take_snapshot()
+                _, traced_peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                summary: Dict[str, Any] = {
+                    "status": status,
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "peak_rss_mb": round(peak_rss_mb(), 1),
+                    "peak_traced_mb": round(traced_peak / (1 << 20), 1),
+                }
+                write_profile(
+                    stage, os.path.join(root, date), profiler, snapshot, summary
+                )
+                print(f"Profile of stage '{stage}' written: {summary}")
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,206 @@
+import datetime
+import numpy as np
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List
+from utils.config import TRADING_CALENDAR
+
+# Years covered by the precomputed holiday tables
+FIRST_YEAR: int = 2000
+LAST_YEAR: int = 2100
+# Unscheduled closures of the NYSE (national days of mourning, hurricanes)
+NYSE_SPECIAL_CLOSURES: List[datetime.date] = [
+    datetime.date(2001, 9, 11),
+    datetime.date(2001, 9, 12),
+    datetime.date(2001, 9, 13),
+    datetime.date(2001, 9, 14),
+    datetime.date(2004, 6, 11),
+    datetime.date(2007, 1, 2),
+    datetime.date(2012, 10, 29),
+    datetime.date(2012, 10, 30),
+    datetime.date(2018, 12, 5),
+    datetime.date(2025, 1, 9),
+]
+
+
+def easter_sunday(year: int) -> datetime.date:
+    """
+    Get the date of Easter Sunday of a year (anonymous Gregorian algorithm).
+    """
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    j = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * j) // 433
+    month = (h + j - 7 * m + 90) // 25
+    day = (h + j - 7 * m + 33 * month + 19) % 32
+    return datetime.date(year, month, day)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> datetime.date:
+    """
+    Get the n-th given weekday (0 for Monday) of a month, counting from the
+    end of the month if n is negative.
+    """
+    if n > 0:
+        first = datetime.date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7 + 7 * (n - 1)
+        return first + datetime.timedelta(days=offset)
+    last = datetime.date(year + month // 12, month % 12 + 1, 1)
+    last -= datetime.timedelta(days=1)
+    offset = (last.weekday() - weekday) % 7 + 7 * (-n - 1)
+    return last - datetime.timedelta(days=offset)
+
+
+def observed(date: datetime.date) -> datetime.date:
+    """
+    Move a holiday on a Saturday to the Friday before and one on a Sunday to
+    the Monday after.
+    """
+    if date.weekday() == 5:
+        return date - datetime.timedelta(days=1)
+    if date.weekday() == 6:
+        return date + datetime.timedelta(days=1)
+    return date
+
+
+def nyse_holidays(year: int) -> List[datetime.date]:
+    """
+    List the full-day holidays of the NYSE, whose calendar NASDAQ shares, in a
+    year.
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        List[datetime.date]: The weekdays of the year the exchange is closed.
+    """
+    holidays: List[datetime.date] = [
+        nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        easter_sunday(year) - datetime.timedelta(days=2),  # Good Friday
+        nth_weekday(year, 5, 0, -1),  # Memorial Day
+        observed(datetime.date(year, 7, 4)),  # Independence Day
+        nth_weekday(year, 9, 0, 1),  # Labor Day
+        nth_weekday(year, 11, 3, 4),  # Thanksgiving Day
+        observed(datetime.date(year, 12, 25)),  # Christmas Day
+    ]
+    # New Year's Day on a Saturday is not moved to the last day of the
+    # previous year, which closes its books
+    new_year = datetime.date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.append(observed(new_year))
+    if year >= 2022:
+        holidays.append(observed(datetime.date(year, 6, 19)))  # Juneteenth
+    holidays += [date for date in NYSE_SPECIAL_CLOSURES if date.year == year]
+    return sorted(holidays)
+
+
+# Holiday rules of each calendar, by ISO 10383 market identifier
+CALENDARS: Dict[str, Callable[[int], List[datetime.date]]] = {
+    "XNYS": nyse_holidays,
+}
+# Calendar of the exchanges reported in stock_table, by the start of their name
+EXCHANGE_CALENDARS: Dict[str, str] = {
+    "NASDAQ": "XNYS",
+    "NEW YORK STOCK EXCHANGE": "XNYS",
+    "NYSE": "XNYS",
+}
+
+
+@lru_cache(maxsize=None)
+def holiday_table(calendar: str) -> np.ndarray:
+    """
+    Precompute the holidays of a calendar from FIRST_YEAR to LAST_YEAR.
+
+    Args:
+        calendar (str): Key of the calendar in CALENDARS.
+
+    Returns:
+        np.ndarray: The sorted holidays as datetime64[D].
+    """
+    rules = CALENDARS[calendar]
+    return np.array(
+        [day for year in range(FIRST_YEAR, LAST_YEAR + 1) for day in rules(year)],
+        dtype="datetime64[D]",
+    )
+
+
+@lru_cache(maxsize=None)
+def business_calendar(calendar: str) -> np.busdaycalendar:
+    """
+    Get the NumPy business day calendar of the weekdays that are not holidays
+    of a calendar, to test many dates at once.
+    """
+    return np.busdaycalendar(weekmask="1111100", holidays=holiday_table(calendar))
+
+
+def exchange_calendars(
+    exchanges: Iterable[str], default: str = TRADING_CALENDAR
+) -> List[str]:
+    """
+    Get the calendars of the exchanges the symbols are listed on.
+
+    Args:
+        exchanges (Iterable[str]): Exchanges as reported in stock_table, e.g.
+            'NASDAQ NMS - GLOBAL MARKET'.
+        default (str): Calendar of the exchanges without a known calendar,
+            also used if no exchange is known yet.
+
+    Returns:
+        List[str]: The distinct calendars, sorted.
+    """
+    calendars = {
+        next(
+            (
+                calendar
+                for prefix, calendar in EXCHANGE_CALENDARS.items()
+                if str(exchange).upper().startswith(prefix)
+            ),
+            default,
+        )
+        for exchange in exchanges
+        if exchange
+    }
+    return sorted(calendars or {default})
+
+
+def is_trading_day(date: Any, calendars: List[str]) -> bool:
+    """
+    Check whether any of the calendars is open on a date.
+
+    Args:
+        date (Any): Date as a date or an ISO string.
+        calendars (List[str]): Output of exchange_calendars.
+
+    Returns:
+        bool: True if at least one of the exchanges trades on the date.
+    """
+    day = np.datetime64(date, "D")
+    return any(
+        bool(np.is_busday(day, busdaycal=business_calendar(calendar)))
+        for calendar in calendars
+    )
+
+
+def trading_days(start: Any, end: Any, calendars: List[str]) -> List[str]:
+    """
+    List the dates between start and end, both included, on which any of the
+    calendars is open.
+
+    Args:
+        start (Any): First date, as a date or an ISO string.
+        end (Any): Last date, as a date or an ISO string.
+        calendars (List[str]): Output of exchange_calendars.
+
+    Returns:
+        List[str]: The trading days as ISO strings, in order.
+    """
+    days = np.arange(
+        np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]"
+    )
+    is_open = np.zeros(len(days), dtype=bool)
+    for calendar in calendars:
+        is_open |= np.is_busday(days, busdaycal=business_calendar(calendar))
+    return [str(day) for day in days[is_open]]